@@ -40,6 +40,23 @@ __license__ = "GNU General Public License (GPL), Version 3"
 plugin_manager_configuration = {
     "logging_format" : "%(asctime)s [%(levelname)s] %(message)s",
     "plugin_id_logging" : True,
-    "thread_id_logging" : True
+    "thread_id_logging" : True,
+    "load_workers" : 0,
+    "discovery_manifest" : True,
+    "plugin_registry" : False,
+    "load_plan" : False,
+    "lifecycle_workers" : 4,
+    "lifecycle_timeout" : 0.0,
+    "unload_workers" : 0,
+    "unload_timeout" : 60.0,
+    "existence_cache_ttl" : 1.0,
+    "configuration_check_interval" : 1.0,
+    "replica_pool" : {},
+    "reload_interval" : 0.0,
+    "memory_interval" : 0.0,
+    "lock_monitor" : False,
+    "lock_report_interval" : 60.0,
+    "lock_deadlock_timeout" : 30.0,
+    "metrics" : False
 }
 """ The plugin manager configuration """
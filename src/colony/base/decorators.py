@@ -37,6 +37,8 @@ __copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
 __license__ = "GNU General Public License (GPL), Version 3"
 """ The license for the module """
 
+import time
+
 import system
 
 METHOD_NAME_VALUE = "method_name"
@@ -193,37 +195,22 @@ def load_allowed(function):
         # calls the callback function
         function(*args, **kwargs)
 
-        # retrieves the allowed functions map
-        allowed_functions_map = function.allowed_functions_map
-
         # unpacks the various arguments for the function
         original_plugin = args[0]
         allowed_plugin = args[1]
         capability = args[2]
 
-        # iterates over all the capabilities in the allowed
-        # functions map
-        for capability_key in allowed_functions_map:
-            # checks if the capability is a valid capability for the plugin
-            # currently being handled and skips the current iteration
-            # in case it's not
-            if not system.is_capability_or_sub_capability(capability_key, capability):
-                # continues the loop
-                continue
-
-            # retrieves the capability function name from the allowed
-            # functions map
-            capability_function = allowed_functions_map[capability]
-            capability_function_name = capability_function.__name__
-
-            # retrieves the capability method from the original plugin and
-            # handles the capability
+        # retrieves the names of the functions handling the capability
+        # (resolved once per capability) and calls the methods with
+        # the names from the original plugin to handle the capability
+        for capability_function_name in get_allowed_function_names(function, capability):
             capability_method = getattr(original_plugin, capability_function_name)
             capability_method(allowed_plugin, capability)
 
-    # starts the allowed functions map for
-    # the current function
+    # starts the allowed functions map and the (compiled)
+    # dispatch table for the current function
     function.allowed_functions_map = {}
+    function.dispatch_table = {}
 
     # sets the current load allowed function
     # for the load allowed reference
@@ -264,6 +251,7 @@ def load_allowed_capability(capability, load_plugin = False):
         # sets the current function for capability handling
         # in the current function
         load_allowed_current.allowed_functions_map[capability] = function
+        load_allowed_current.dispatch_table.clear()
 
         # in case the load plugin test should be made before loading
         # the capability
@@ -304,37 +292,22 @@ def unload_allowed(function):
         # calls the callback function
         function(*args, **kwargs)
 
-        # retrieves the allowed functions map
-        allowed_functions_map = function.allowed_functions_map
-
         # unpacks the various arguments for the function
         original_plugin = args[0]
         allowed_plugin = args[1]
         capability = args[2]
 
-        # iterates over all the capabilities in the allowed
-        # functions map
-        for capability_key in allowed_functions_map:
-            # checks if the capability is a valid capability for the plugin
-            # currently being handled and skips the current iteration
-            # in case it's not
-            if not system.is_capability_or_sub_capability(capability_key, capability):
-                # continues the loop
-                continue
-
-            # retrieves the capability function name from the allowed
-            # functions map
-            capability_function = allowed_functions_map[capability]
-            capability_function_name = capability_function.__name__
-
-            # retrieves the capability method from the original plugin and
-            # handles the capability
+        # retrieves the names of the functions handling the capability
+        # (resolved once per capability) and calls the methods with
+        # the names from the original plugin to handle the capability
+        for capability_function_name in get_allowed_function_names(function, capability):
             capability_method = getattr(original_plugin, capability_function_name)
             capability_method(allowed_plugin, capability)
 
-    # starts the allowed functions map for
-    # the current function
+    # starts the allowed functions map and the (compiled)
+    # dispatch table for the current function
     function.allowed_functions_map = {}
+    function.dispatch_table = {}
 
     # sets the current unload allowed function
     # for the unload allowed reference
@@ -375,6 +348,7 @@ def unload_allowed_capability(capability, load_plugin = False):
         # sets the current function for capability handling
         # in the current function
         unload_allowed_current.allowed_functions_map[capability] = function
+        unload_allowed_current.dispatch_table.clear()
 
         # in case the load plugin test should be made before unloading
         # the capability
@@ -517,6 +491,14 @@ def plugin_inject(plugin_id, plugin_version = None, load_plugin = False):
             # sets the decorator interceptor function as the function
             decorator_interceptor_function = function
 
+        # creates the metrics interceptor recording the injections
+        # of the dependency (in case the metrics are enabled)
+        decorator_interceptor_function = create_metrics_interceptor(
+            decorator_interceptor_function,
+            "colony_plugin_inject",
+            ("dependency", plugin_id)
+        )
+
         # returns the interceptor to be used
         return decorator_interceptor_function
 
@@ -890,6 +872,14 @@ def plugin_call(load_plugin = True):
         else:
             decorator_interceptor_function = function
 
+        # creates the metrics interceptor recording the calls
+        # of the method (in case the metrics are enabled)
+        decorator_interceptor_function = create_metrics_interceptor(
+            decorator_interceptor_function,
+            "colony_plugin_call",
+            ("method", function.__name__)
+        )
+
         # returns the interceptor to be used
         return decorator_interceptor_function
 
@@ -929,5 +919,105 @@ def create_load_plugin_interceptor(function):
         # calls the callback function
         return function(*args, **kwargs)
 
+    # sets the function as the loaded version of the interceptor
+    # (to be bound once the plugin is loaded, avoiding the test)
+    decorator_interceptor.loaded_function = function
+
+    # returns the decorator interceptor
+    return decorator_interceptor
+
+def get_allowed_function_names(function, capability):
+    """
+    Retrieves the names of the functions handling the given
+    capability for the given (load or unload) allowed function.
+    The names are resolved (hierarchical matching of the handled
+    capabilities) once per capability and stored in the dispatch
+    table of the allowed function.
+
+    @type function: Function
+    @param function: The (load or unload) allowed function.
+    @type capability: String
+    @param capability: The capability to be handled.
+    @rtype: Tuple
+    @return: The names of the functions handling the capability.
+    """
+
+    # tries to retrieve the names from the dispatch table
+    # in case they're already resolved returns them
+    dispatch_table = function.dispatch_table
+    function_names = dispatch_table.get(capability, None)
+    if not function_names == None: return function_names
+
+    # resolves the names of the functions handling the capability
+    # or any of its super capabilities and stores them in the
+    # dispatch table for the next calls
+    allowed_functions_map = function.allowed_functions_map
+    function_names = tuple([
+        allowed_functions_map[capability_key].__name__ for capability_key in allowed_functions_map
+        if system.is_capability_or_sub_capability(capability_key, capability)
+    ])
+    dispatch_table[capability] = function_names
+
+    # returns the names of the functions
+    return function_names
+
+def create_metrics_interceptor(function, metric_name, label):
+    """
+    Creates a metrics interceptor, that records the latency (and
+    the errors) of the calls in the metrics of the plugin manager.
+
+    @type function: Function
+    @param function: The callback function.
+    @type metric_name: String
+    @param metric_name: The prefix of the name of the metrics.
+    @type label: Tuple
+    @param label: The name and value tuple of the label identifying
+    the call (in addition to the plugin label).
+    """
+
+    def decorator_interceptor(*args, **kwargs):
+        """
+        The interceptor function for the decorator.
+
+        @type args: pointer
+        @param args: The function arguments list.
+        @type kwargs: pointer pointer
+        @param kwargs: The function arguments map.
+        """
+
+        # retrieves the original plugin instance and the metrics
+        # of its manager, in case the metrics are not enabled
+        # calls the callback function directly
+        original_plugin = args[0]
+        metrics = original_plugin.manager.metrics
+        if not metrics: return function(*args, **kwargs)
+
+        # creates the (sorted) labels of the call and
+        # retrieves the start time of the call
+        labels = (label, ("plugin", original_plugin.id))
+        start_time = time.time()
+
+        try:
+            # calls the callback function
+            return function(*args, **kwargs)
+        except:
+            # counts the error and re-raises
+            # the exception to the caller
+            metrics.increment(metric_name + "_errors_total", labels = labels)
+            raise
+        finally:
+            # records the latency of the call
+            metrics.observe(metric_name + "_seconds", time.time() - start_time, labels)
+
+    # sets the function as the metered function of the interceptor
+    # (to be bound in case the metrics are not enabled)
+    decorator_interceptor.metered_function = function
+
+    # in case the function has a loaded version (interceptor for
+    # the loading of the plugin) the loaded version of the metrics
+    # interceptor intercepts the loaded version of the function
+    loaded_function = getattr(function, "loaded_function", None)
+    if loaded_function: decorator_interceptor.loaded_function = create_metrics_interceptor(loaded_function, metric_name, label)
+
     # returns the decorator interceptor
     return decorator_interceptor
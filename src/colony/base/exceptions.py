@@ -184,3 +184,29 @@ class OperationNotComplete(PluginSystemException):
         """
 
         return "Operation not complete - %s" % self.message
+
+class OperationTimeout(PluginSystemException):
+    """
+    The operation timeout class.
+    """
+
+    def __init__(self, message):
+        """
+        Constructor of the class.
+
+        @type message: String
+        @param message: The message to be printed.
+        """
+
+        PluginSystemException.__init__(self, message)
+        self.message = message
+
+    def __str__(self):
+        """
+        Returns the string representation of the class.
+
+        @rtype: String
+        @return: The string representation of the class.
+        """
+
+        return "Operation timeout - %s" % self.message
@@ -46,20 +46,30 @@ import time
 import types
 import thread
 import signal
+import hashlib
 import inspect
+import marshal
+import weakref
 import tempfile
 import threading
 import traceback
 import subprocess
+import collections
 
 import __builtin__
 
 import logging.handlers
 
 import colony.libs.time_util
+import colony.libs.lock_util
 import colony.libs.path_util
+import colony.libs.pool_util
 import colony.libs.round_util
+import colony.libs.import_util
+import colony.libs.memory_util
 import colony.libs.string_util
+import colony.libs.metrics_util
+import colony.libs.timeline_util
 import colony.libs.version_util
 import colony.libs.string_buffer_util
 
@@ -73,6 +83,32 @@ import colony.base.configuration
 plugin_manager_configuration = colony.base.configuration.plugin_manager_configuration
 """ The plugin manager configuration """
 
+logger_local = threading.local()
+""" The thread local storage used to cache the
+(per thread) logger values """
+
+capabilities_cache = {}
+""" The cache associating the capability string
+with the (interned) capability structure """
+
+events_cache = {}
+""" The cache associating the event string
+with the (interned) event structure """
+
+loaded_functions_cache = weakref.WeakKeyDictionary()
+""" The cache associating the plugin class with the
+list of name and loaded function tuples for the methods
+intercepted for the (lazy) loading of the plugin, the
+plugin classes are weakly referenced so that the ones
+replaced (reloaded) may be collected """
+
+metered_functions_cache = weakref.WeakKeyDictionary()
+""" The cache associating the plugin class with the
+list of name and metered function tuples for the methods
+intercepted (only) for the metrics of the plugin, the
+plugin classes are weakly referenced so that the ones
+replaced (reloaded) may be collected """
+
 CPYTHON_ENVIRONMENT = colony.base.util.CPYTHON_ENVIRONMENT
 """ CPython environment value """
 
@@ -121,6 +157,45 @@ DEFAULT_TEMPORARY_PATH = u"tmp"
 DEFAULT_VARIABLE_PATH = u"var"
 """ The default variable path """
 
+DEFAULT_MANIFEST_FILE_NAME = u"discovery.manifest"
+""" The default (discovery) manifest file name """
+
+DEFAULT_REGISTRY_FILE_NAME = u"plugins.registry"
+""" The default (plugin) registry file name """
+
+DEFAULT_LOAD_PROFILE_FILE_NAME = u"load_profile.json"
+""" The default load profile (chrome trace) file name """
+
+DEFAULT_METRICS_FILE_NAME = u"metrics.prom"
+""" The default metrics (prometheus text format) file name """
+
+DEFAULT_LOAD_PLAN_FILE_NAME = u"load.plan"
+""" The default (resolved) load plan file name """
+
+MANIFEST_SAFETY_WINDOW = 2.0
+""" The time window (in seconds) in which a directory
+change is considered too recent to be safely cached """
+
+RESOLUTION_CACHE_SIZE = 4096
+""" The maximum number of entries in the resolution
+caches, after which the caches are cleared """
+
+DEFAULT_EXISTENCE_CACHE_TTL = 1.0
+""" The default time to live (in seconds) of the
+entries in the (path) existence cache """
+
+DEFAULT_CONFIGURATION_CHECK_INTERVAL = 1.0
+""" The default interval (in seconds) between the checks
+of the modification time of the configuration files """
+
+DEFAULT_WATCHDOG_CHECK_INTERVAL = 0.5
+""" The default interval (in seconds) between the checks
+of the deadlines of the (in-flight) lifecycle calls """
+
+DEFAULT_LOCK_CHECK_INTERVAL = 1.0
+""" The default interval (in seconds) between the checks
+of the lock monitor for blocked acquisitions """
+
 DEFAULT_PLUGIN_PATH = u"plugins"
 """ The default plugin path """
 
@@ -142,6 +217,18 @@ DEFAULT_LOOP_WAIT_TIMEOUT = 1.0
 DEFAULT_UNLOAD_SYSTEM_TIMEOUT = 600.0
 """ The default unload system timeout """
 
+DEFAULT_UNLOAD_PLUGIN_TIMEOUT = 60.0
+""" The default (per plugin) unload timeout used in
+the concurrent unloading of the system """
+
+UNLOAD_POLL_TIMEOUT = 0.1
+""" The timeout (in seconds) used to poll the unloading
+of plugins that are not yet started """
+
+UNLOAD_REPORT_SIZE = 5
+""" The number of (slowest) plugins to be logged in
+the report of the system unloading """
+
 EAGER_LOADING_TYPE = "eager_loading"
 """ The eager loading plugin loading type """
 
@@ -163,6 +250,9 @@ THREAD_TYPE = "thread"
 FULL_LOAD_TYPE = "full_load"
 """ The full load plugin loading type """
 
+RELOAD_TYPE = "reload"
+""" The reload plugin loading/unloading type """
+
 DEPENDENCY_TYPE = "dependency"
 """ The dependency plugin loading/unloading type """
 
@@ -184,6 +274,10 @@ FILE_REMOVED_TYPE = "file_removed"
 PLUGIN_MANAGER_TYPE = "plugin_manager"
 """ The plugin manager type """
 
+CONFIGURATION_CHANGED_EVENT = "plugin_manager.configuration_changed"
+""" The event generated upon the change of a (cached)
+plugin configuration file """
+
 PLUGIN_MANAGER_PLUGIN_VALIDATION_PREFIX = "is_valid_"
 """ The prefix for the plugin manager plugin validation prefix """
 
@@ -202,6 +296,10 @@ SPECIAL_VALUE_REGEX_VALUE = "%(?P<command>[a-zA-Z0-0_]*)(:(?P<arguments>[a-zA-Z0
 SPECIAL_VALUE_REGEX = re.compile(SPECIAL_VALUE_REGEX_VALUE)
 """ The special value regex """
 
+VOLATILE_COMMANDS = ("environment",)
+""" The commands whose resolution depends on state
+external to the manager (not cacheable) """
+
 COLONY_VALUE = "colony"
 """ The colony value """
 
@@ -323,11 +421,20 @@ class Plugin(object):
     valid = True
     """ The valid flag of the plugin """
 
+    thread_safe = True
+    """ The thread safe flag of the plugin, in case it's
+    unset the plugin is never loaded concurrently with
+    other plugins (concurrent startup loading) """
+
     logger = None
     """ The reference to the logger object that is
     going to be used by the plugin in the logging
     operation, this may come from an external source """
 
+    logger_prefix = None
+    """ The cached tuple containing the plugin id and the
+    logger prefix value computed for it """
+
     timestamp = None
     """ The timestamp that stores the load time
     of the last load operation, this value is not
@@ -343,6 +450,14 @@ class Plugin(object):
     """ The map with the plugin associated with
     the name of the event fired """
 
+    event_routing_table = None
+    """ The routing table associating the name of the
+    event fired with the tuple of handler plugins """
+
+    event_fired_cache = {}
+    """ The map associating the name of the event with
+    the result of the test for the event being fired """
+
     event_plugins_registered_loaded_map = {}
     """ The map with the plugin associated with
     the name of the event registered """
@@ -366,6 +481,11 @@ class Plugin(object):
     exception = None
     """ The exception associated with the error state """
 
+    loaded_methods = []
+    """ The names of the methods bound (in the instance)
+    to their loaded versions, without the interception
+    for the (lazy) loading of the plugin """
+
     ready_semaphore = None
     """ The ready semaphore """
 
@@ -375,6 +495,15 @@ class Plugin(object):
     ready_semaphore_release_count = 0
     """ The ready semaphore release count """
 
+    ready_semaphore_expired = []
+    """ The list of the threads running lifecycle calls expired
+    by the watchdog, for which the ready semaphore was already
+    released (their late releases are ignored) """
+
+    plugin_thread = None
+    """ The plugin thread running the lifecycle calls
+    of the plugin (only set for main and thread plugins) """
+
     original_id = None
     """ The original id of the plugin """
 
@@ -397,18 +526,34 @@ class Plugin(object):
         self.ready_semaphore = threading.Semaphore(0)
         self.ready_semaphore_lock = threading.Lock()
 
+        # instruments the ready semaphore (and its lock) in case
+        # the lock monitor of the manager is enabled, the semaphore
+        # is released by other threads (not owned)
+        lock_monitor = manager and manager.lock_monitor
+        if lock_monitor:
+            self.ready_semaphore = lock_monitor.instrument(self.ready_semaphore, "ready_semaphore[%s]" % self.id, False)
+            self.ready_semaphore_lock = lock_monitor.instrument(self.ready_semaphore_lock, "ready_semaphore_lock[%s]" % self.id)
+
         self.ready_semaphore_release_count = 0
+        self.ready_semaphore_expired = []
 
         self.logger = logging.getLogger(DEFAULT_LOGGER)
         self.dependencies_loaded = []
         self.allowed_loaded_capability = []
         self.event_plugins_fired_loaded_map = {}
+        self.event_routing_table = EventRoutingTable()
+        self.event_fired_cache = {}
         self.event_plugins_registered_loaded_map = {}
         self.event_plugin_manager_registered_loaded_list = []
         self.configuration_map = {}
         self.loaded = False
         self.lazy_loaded = False
         self.error_state = False
+        self.loaded_methods = []
+
+        # binds the metered methods (avoiding the metrics interception)
+        # in case the metrics of the manager are not enabled
+        manager and not manager.metrics and self.bind_metered_methods()
 
     def __repr__(self):
         """
@@ -451,7 +596,7 @@ class Plugin(object):
         self.manager.generate_event("plugin_manager.plugin.load_plugin", [self.id, self.version, self])
 
         # prints an info message
-        self.info("Loading plugin '%s' v%s" % (self.name, self.version))
+        self.info("Loading plugin '%s' v%s", self.name, self.version)
 
     def lazy_load_plugin(self):
         """
@@ -474,7 +619,7 @@ class Plugin(object):
         self.manager.generate_event("plugin_manager.plugin.lazy_load_plugin", [self.id, self.version, self])
 
         # prints an info message
-        self.info("Lazy loading plugin '%s' v%s" % (self.name, self.version))
+        self.info("Lazy loading plugin '%s' v%s", self.name, self.version)
 
     def end_load_plugin(self):
         """
@@ -484,7 +629,7 @@ class Plugin(object):
         # generates the end load plugin event
         self.manager.generate_event("plugin_manager.plugin.end_load_plugin", [self.id, self.version, self])
 
-        self.info("Loading process for plugin '%s' v%s completed" % (self.name, self.version))
+        self.info("Loading process for plugin '%s' v%s completed", self.name, self.version)
 
     def unload_plugin(self):
         """
@@ -516,7 +661,7 @@ class Plugin(object):
         self.manager.generate_event("plugin_manager.plugin.unload_plugin", [self.id, self.version, self])
 
         # prints an info message
-        self.info("Unloading plugin '%s' v%s" % (self.name, self.version))
+        self.info("Unloading plugin '%s' v%s", self.name, self.version)
 
     def end_unload_plugin(self):
         """
@@ -530,7 +675,7 @@ class Plugin(object):
         self.manager.generate_event("plugin_manager.plugin.end_unload_plugin", [self.id, self.version, self])
 
         # prints an info message
-        self.info("Unloading process for plugin '%s' v%s completed" % (self.name, self.version))
+        self.info("Unloading process for plugin '%s' v%s completed", self.name, self.version)
 
     def load_allowed(self, plugin, capability):
         """
@@ -561,7 +706,7 @@ class Plugin(object):
         self.register_all_handled_events_plugin(plugin)
 
         # prints an info message
-        self.info("Loading plugin '%s' v%s in '%s' v%s" % (plugin.name, plugin.version, self.name, self.version))
+        self.info("Loading plugin '%s' v%s in '%s' v%s", plugin.name, plugin.version, self.name, self.version)
 
     def unload_allowed(self, plugin, capability):
         """
@@ -592,7 +737,7 @@ class Plugin(object):
         self.unregister_all_handled_events_plugin(plugin)
 
         # prints an info message
-        self.info("Unloading plugin '%s' v%s in '%s' v%s" % (plugin.name, plugin.version, self.name, self.version))
+        self.info("Unloading plugin '%s' v%s in '%s' v%s", plugin.name, plugin.version, self.name, self.version)
 
     def dependency_injected(self, plugin):
         """
@@ -603,14 +748,14 @@ class Plugin(object):
         """
 
         self.dependencies_loaded.append(plugin)
-        self.info("Plugin dependency '%s' v%s injected in '%s' v%s" % (plugin.name, plugin.version, self.name, self.version))
+        self.info("Plugin dependency '%s' v%s injected in '%s' v%s", plugin.name, plugin.version, self.name, self.version)
 
     def init_complete(self):
         """
         Method called at the end of the plugin manager initialization.
         """
 
-        self.info("Plugin '%s' v%s notified about the end of the plugin manager init process" % (self.name, self.version))
+        self.info("Plugin '%s' v%s notified about the end of the plugin manager init process", self.name, self.version)
 
     def register_all_handled_events_plugin(self, plugin):
         """
@@ -772,7 +917,8 @@ class Plugin(object):
 
         if not plugin in self.event_plugins_fired_loaded_map[event_name]:
             self.event_plugins_fired_loaded_map[event_name].append(plugin)
-            self.info("Registering event '%s' from '%s' v%s in '%s' v%s" % (event_name, plugin.name, plugin.version, self.name, self.version))
+            self.event_routing_table.invalidate()
+            self.info("Registering event '%s' from '%s' v%s in '%s' v%s", event_name, plugin.name, plugin.version, self.name, self.version)
 
     def unregister_plugin_event(self, plugin, event_name):
         """
@@ -787,7 +933,8 @@ class Plugin(object):
         if event_name in self.event_plugins_fired_loaded_map:
             if plugin in self.event_plugins_fired_loaded_map[event_name]:
                 self.event_plugins_fired_loaded_map[event_name].remove(plugin)
-                self.info("Unregistering event '%s' from '%s' v%s in '%s' v%s" % (event_name, plugin.name, plugin.version, self.name, self.version))
+                self.event_routing_table.invalidate()
+                self.info("Unregistering event '%s' from '%s' v%s in '%s' v%s", event_name, plugin.name, plugin.version, self.name, self.version)
 
     def notify_handlers(self, event_name, event_args):
         """
@@ -799,23 +946,18 @@ class Plugin(object):
         @param event_args: The arguments to be passed to the handler.
         """
 
-        # the names of the events fired by self
-        event_names_list = self.event_plugins_fired_loaded_map.keys()
-
-        # retrieves all the events and super events that match the generated event
-        events_or_super_events_list = get_all_events_or_super_events_in_list(event_name, event_names_list)
+        # retrieves the handler plugins for the event (and super events)
+        # from the routing table (computed once per event name)
+        event_plugins_loaded = self.event_routing_table.get_handlers(event_name, self.event_plugins_fired_loaded_map)
 
-        # iterates over all the events and super events for notification
-        for event_or_super_event in events_or_super_events_list:
-            if event_or_super_event in self.event_plugins_fired_loaded_map:
-                # iterates over all the plugins registered for notification
-                for event_plugin_loaded in self.event_plugins_fired_loaded_map[event_or_super_event]:
-                    # prints an info message
-                    self.info("Notifying '%s' v%s about event '%s' generated in '%s' v%s" % (event_plugin_loaded.name, event_plugin_loaded.version, event_name, self.name, self.version))
+        # iterates over all the plugins registered for notification
+        for event_plugin_loaded in event_plugins_loaded:
+            # prints an info message
+            self.info("Notifying '%s' v%s about event '%s' generated in '%s' v%s", event_plugin_loaded.name, event_plugin_loaded.version, event_name, self.name, self.version)
 
-                    # calls the event handler for the event name with
-                    # the given event arguments
-                    event_plugin_loaded.event_handler(event_name, *event_args)
+            # calls the event handler for the event name with
+            # the given event arguments
+            event_plugin_loaded.event_handler(event_name, *event_args)
 
     def generate_event(self, event_name, event_args):
         """
@@ -827,11 +969,17 @@ class Plugin(object):
         @param event_args: The arguments to be passed to the handler.
         """
 
-        if not is_event_or_super_event_in_list(event_name, self.events_fired):
-            return
+        # retrieves the (cached) result of the test for the event
+        # being fired by the plugin, computing it in case it's not
+        # cached and returns immediately in case it's not fired
+        event_fired = self.event_fired_cache.get(event_name, None)
+        if event_fired == None:
+            event_fired = is_event_or_super_event_in_list(event_name, self.events_fired)
+            self.event_fired_cache[event_name] = event_fired
+        if not event_fired: return
 
         # prints an info message
-        self.info("Event '%s' generated in '%s' v%s" % (event_name, self.name, self.version))
+        self.info("Event '%s' generated in '%s' v%s", event_name, self.name, self.version)
 
         # notifies the event handlers
         self.notify_handlers(event_name, event_args)
@@ -847,7 +995,7 @@ class Plugin(object):
         """
 
         # prints an info message
-        self.info("Event '%s' caught in '%s' v%s" % (event_name, self.name, self.version))
+        self.info("Event '%s' caught in '%s' v%s", event_name, self.name, self.version)
 
     def reload_main_modules(self):
         """
@@ -855,7 +1003,7 @@ class Plugin(object):
         """
 
         # prints an info message
-        self.info("Reloading main modules in '%s' v%s" % (self.name, self.version))
+        self.info("Reloading main modules in '%s' v%s", self.name, self.version)
 
         # iterates over all the main modules
         for main_module in self.main_modules:
@@ -868,6 +1016,25 @@ class Plugin(object):
                 main_module_value = sys.modules[main_module]
                 reload(main_module_value)
 
+    def get_configuration(self, configuration_file_path, parser = None):
+        """
+        Retrieves the (cached) contents of the configuration file
+        of the plugin for the given path, optionally parsed with
+        the given parser.
+        Changes in the file are notified through the plugin manager
+        configuration changed event.
+
+        @type configuration_file_path: String
+        @param configuration_file_path: The path of the configuration file (relative to
+        the base of the plugin configuration path).
+        @type parser: Function
+        @param parser: The function used to parse the contents of the file.
+        @rtype: Object
+        @return: The contents (or parsed value) of the configuration file.
+        """
+
+        return self.manager.get_plugin_configuration(self.original_id, configuration_file_path, parser)
+
     def get_configuration_property(self, property_name):
         """
         Returns the configuration property for the given property name.
@@ -890,7 +1057,7 @@ class Plugin(object):
         @param property: The property name to set.
         """
 
-        self.info("Setting configuration property '%s' in '%s' v%s" % (property_name, self.name, self.version))
+        self.info("Setting configuration property '%s' in '%s' v%s", property_name, self.name, self.version)
 
         self.configuration_map[property_name] = property
 
@@ -902,7 +1069,7 @@ class Plugin(object):
         @param property_name: The property name to unset the property.
         """
 
-        self.info("Unsetting configuration property '%s' from '%s' v%s" % (property_name, self.name, self.version))
+        self.info("Unsetting configuration property '%s' from '%s' v%s", property_name, self.name, self.version)
 
         del self.configuration_map[property_name]
 
@@ -921,6 +1088,52 @@ class Plugin(object):
         # plugin is currently loaded
         self.manager.ensure(self)
 
+    def bind_loaded_methods(self):
+        """
+        Binds the methods intercepted for the (lazy) loading of
+        the plugin to their loaded versions in the instance, so
+        that the calls no longer test the loading of the plugin.
+        This method should only be called once the plugin is
+        (fully) loaded.
+        """
+
+        # retrieves the plugin class and the metrics of the manager
+        # (in case they're not enabled the metrics interceptors are
+        # bound to their metered functions, avoiding the interception)
+        plugin_class = self.__class__
+        metrics = self.manager.metrics
+
+        # binds each of the loaded functions of the plugin class
+        # in the instance (shadowing the methods with the
+        # interceptors defined in the class)
+        for name, function in get_loaded_functions(plugin_class):
+            if not metrics: function = getattr(function, "metered_function", function)
+            self.__dict__[name] = types.MethodType(function, self, plugin_class)
+            self.loaded_methods.append(name)
+
+    def bind_metered_methods(self):
+        """
+        Binds the methods intercepted only for the metrics (not for
+        the loading of the plugin) to their metered versions in the
+        instance, so that the calls are not intercepted, this
+        method should only be called in case the metrics are
+        not enabled.
+        """
+
+        plugin_class = self.__class__
+        for name, function in get_metered_functions(plugin_class):
+            self.__dict__[name] = types.MethodType(function, self, plugin_class)
+
+    def unbind_loaded_methods(self):
+        """
+        Unbinds the loaded methods of the plugin (from the instance)
+        restoring the interceptors for the (lazy) loading of the
+        plugin, this method should be called before the unloading.
+        """
+
+        for name in self.loaded_methods: self.__dict__.pop(name, None)
+        self.loaded_methods = []
+
     def is_loaded(self):
         """
         Returns the result of the loading test.
@@ -1048,7 +1261,7 @@ class Plugin(object):
         """
 
         # prints and info message
-        self.info("Exception '%s' generated in '%s' v%s" % (str(exception), self.name, self.version))
+        self.info("Exception '%s' generated in '%s' v%s", exception, self.name, self.version)
 
         # unloads the plugin
         self.manager.unload_plugin(self.id)
@@ -1072,12 +1285,19 @@ class Plugin(object):
         # increment the ready semaphore release count
         self.ready_semaphore_release_count += 1
 
-        # releases the ready semaphore
-        self.ready_semaphore.release()
+        # releases the ready semaphore, unless the current thread
+        # is running an expired lifecycle call (already released)
+        if not threading.currentThread() in self.ready_semaphore_expired:
+            self.ready_semaphore.release()
 
         # releases the ready semaphore lock
         self.ready_semaphore_lock.release()
 
+        # notifies the plugin thread (in case it exists) of the release
+        # so that a lifecycle call that keeps running after the release
+        # (eg: main loop) no longer holds a lifecycle executor worker
+        self.plugin_thread and self.plugin_thread.released()
+
     def ready_semaphore_status(self):
         """
         Retrieves the status of the ready semaphore (useful for thread enabled plugins).
@@ -1213,94 +1433,149 @@ class Plugin(object):
             # prints a log message with the formated traceback line
             self.logger.log(level, formated_traceback_line_stripped)
 
-    def debug(self, message):
+    def debug(self, message, *arguments):
         """
         Adds the given debug message to the logger.
+        The message is only formatted (using the arguments) in
+        case the debug level is enabled for the logger.
 
         @type message: String
-        @param message: The debug message to be added to the logger.
+        @param message: The debug message (format) to be added to the logger.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting.
         """
 
+        # in case the debug level is not enabled for the logger
+        # returns immediately (no formatting required)
+        if not self.logger.isEnabledFor(logging.DEBUG): return
+
         # formats the logger message then prints the
         # debug message to the current stream
-        logger_message = self.format_logger_message(message)
+        logger_message = self.format_logger_message(message, arguments)
         self.logger.debug(logger_message)
 
-    def info(self, message):
+    def info(self, message, *arguments):
         """
         Adds the given info message to the logger.
+        The message is only formatted (using the arguments) in
+        case the info level is enabled for the logger.
 
         @type message: String
-        @param message: The info message to be added to the logger.
+        @param message: The info message (format) to be added to the logger.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting.
         """
 
+        # in case the info level is not enabled for the logger
+        # returns immediately (no formatting required)
+        if not self.logger.isEnabledFor(logging.INFO): return
+
         # formats the logger message then prints the
         # info message to the current stream
-        logger_message = self.format_logger_message(message)
+        logger_message = self.format_logger_message(message, arguments)
         self.logger.info(logger_message)
 
-    def warning(self, message):
+    def warning(self, message, *arguments):
         """
         Adds the given warning message to the logger.
+        The message is only formatted (using the arguments) in
+        case the warning level is enabled for the logger.
 
         @type message: String
-        @param message: The warning message to be added to the logger.
+        @param message: The warning message (format) to be added to the logger.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting.
         """
 
+        # in case the warning level is not enabled for the logger
+        # returns immediately (no formatting required)
+        if not self.logger.isEnabledFor(logging.WARNING): return
+
         # formats the logger message then prints the
         # warning message and logs the current stack trace
-        logger_message = self.format_logger_message(message)
+        logger_message = self.format_logger_message(message, arguments)
         self.logger.warning(logger_message)
         self.log_stack_trace()
 
-    def error(self, message):
+    def error(self, message, *arguments):
         """
         Adds the given error message to the logger.
+        The message is only formatted (using the arguments) in
+        case the error level is enabled for the logger.
 
         @type message: String
-        @param message: The error message to be added to the logger.
+        @param message: The error message (format) to be added to the logger.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting.
         """
 
+        # in case the error level is not enabled for the logger
+        # returns immediately (no formatting required)
+        if not self.logger.isEnabledFor(logging.ERROR): return
+
         # formats the logger message then prints the
         # error message and logs the current stack trace
-        logger_message = self.format_logger_message(message)
+        logger_message = self.format_logger_message(message, arguments)
         self.logger.error(logger_message)
         self.log_stack_trace()
 
-    def critical(self, message):
+    def critical(self, message, *arguments):
         """
         Adds the given critical message to the logger.
+        The message is only formatted (using the arguments) in
+        case the critical level is enabled for the logger.
 
         @type message: String
-        @param message: The critical message to be added to the logger.
+        @param message: The critical message (format) to be added to the logger.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting.
         """
 
+        # in case the critical level is not enabled for the logger
+        # returns immediately (no formatting required)
+        if not self.logger.isEnabledFor(logging.CRITICAL): return
+
         # formats the logger message then prints the
         # critical message and logs the current stack trace
-        logger_message = self.format_logger_message(message)
+        logger_message = self.format_logger_message(message, arguments)
         self.logger.critical(logger_message)
         self.log_stack_trace()
 
-    def format_logger_message(self, message):
+    def format_logger_message(self, message, arguments = ()):
         """
         Formats the given message into a logging message.
 
         @type message: String
         @param message: The message to be formated into logging message.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting,
+        in case they are not set the message is used as is.
         @rtype: String
         @return: The formated logging message.
         """
 
+        # in case arguments are set formats the message
+        # with them (deferred formatting)
+        if arguments: message = message % arguments
+
+        # retrieves the (cached) plugin logger prefix value, in
+        # case it's not valid for the current plugin id (replicas
+        # change the id) re-computes it and caches it
+        logger_prefix = self.logger_prefix
+        if not logger_prefix or not logger_prefix[0] == self.id:
+            logger_prefix = (self.id, "[" + self.id + "] ")
+            self.logger_prefix = logger_prefix
+
         # the default formatting message
         formatting_message = str()
 
         # in case the plugin id logging option is activated
         if plugin_manager_configuration.get("plugin_id_logging", False):
-            formatting_message += "[" + self.id + "] "
+            formatting_message += logger_prefix[1]
 
         # in case the thread id logging option is activated
         if plugin_manager_configuration.get("thread_id_logging", False):
-            formatting_message += "[" + str(thread.get_ident()) + "] "
+            formatting_message += get_thread_logger_prefix()
 
         # appends the formatting message to the logging message and
         # returns it to the caller method
@@ -1356,6 +1631,64 @@ class PluginManagerPlugin(Plugin):
 
         Plugin.__init__(self, manager)
 
+class PluginProxy(Plugin):
+    """
+    The plugin proxy class, used as the base class for the
+    (lightweight) plugin classes created from the plugin
+    registry metadata, without the import of the plugin module.
+    The real plugin module is only imported (and the instance
+    converted into the real plugin) on the first full load of
+    the plugin, on the first access to an attribute that is
+    not defined in the plugin metadata or on the first call to
+    a (base plugin) method overridden by the real plugin class.
+    """
+
+    valid = False
+    """ The valid flag of the plugin """
+
+    proxy_module = None
+    """ The name of the module containing
+    the real plugin class """
+
+    proxy_path = None
+    """ The path to the file of the module
+    containing the real plugin class """
+
+    proxy_target = None
+    """ The real plugin class, set once the
+    real plugin module is imported """
+
+    proxy_ignored_attributes = ("metadata_map",)
+    """ The attributes that do not require the real plugin
+    to be resolved (only set after the plugin load) """
+
+    def __getattr__(self, name):
+        """
+        Retrieves the attribute with the given name from the
+        real plugin, converting the proxy into the real plugin.
+        This method is only called for the attributes not
+        defined in the proxy (plugin metadata).
+
+        @type name: String
+        @param name: The name of the attribute to be retrieved.
+        @rtype: Object
+        @return: The attribute retrieved from the real plugin.
+        """
+
+        # in case the attribute is either private (special) or ignored
+        # there's no need to resolve the real plugin (attribute error)
+        if name.startswith("__") or name in self.proxy_ignored_attributes:
+            raise AttributeError(name)
+
+        # tries to materialize the real plugin for the current
+        # proxy and in case it fails raises an attribute error
+        if not self.manager or not self.manager.materialize_plugin(self):
+            raise AttributeError(name)
+
+        # retrieves the attribute from the (now)
+        # real plugin instance
+        return getattr(self, name)
+
 class PluginManager:
     """
     The top level manager class, this is the controller (hypervisor)
@@ -1456,11 +1789,49 @@ class PluginManager:
     the loaded plugins instances (singletons) indexed
     in the object by their short name """
 
+    load_lock = None
+    """ The lock that is used to serialize the changes to the
+    shared plugin structures while plugins are being loaded
+    concurrently, set only during the concurrent loading """
+
+    load_pending = None
+    """ The set of ids of the plugins pending to be loaded
+    in the current concurrent loading, set only during the
+    concurrent loading """
+
+    load_deferred = None
+    """ The map associating the ids of the allowing and of the
+    allowed plugin with the list of (allowing plugin, allowed
+    plugin and capability) injections deferred as the allowed
+    plugin was pending, set only during the concurrent loading """
+
+    unload_report = []
+    """ The list of tuples containing the plugin id, the duration
+    and the final state of the plugins unloaded in the last
+    unloading of the system """
+
+    unload_running = {}
+    """ The map associating the id of the plugins being
+    unloaded with the tuple containing the start time and
+    the thread of the unloading """
+
+    unload_abandoned = set()
+    """ The set of ids of the plugins whose unloading exceeded
+    the deadline and were abandoned (concurrent unloading) """
+
     retrieve_lock = None
     """ The lock that is used to control the access and
     retrieval of plugin instance, no two threads may retrieve
     plugins at the same as this would create some sync problems """
 
+    snapshot_lock = None
+    """ The lock that serializes the publishing of new
+    versions of the plugin snapshot map (writers only) """
+
+    proxy_lock = None
+    """ The lock that serializes the materialization of
+    the plugin proxies into real plugins """
+
     current_id = 0
     """ The current id used for the plugin """
 
@@ -1473,8 +1844,13 @@ class PluginManager:
     return_code = 0
     """ The return code to be used on return """
 
-    event_queue = []
-    """ The queue of events to be processed """
+    event_queue = None
+    """ The queue (deque) of events to be processed, each
+    event is stored with the time of its adding """
+
+    main_loop_statistics = {}
+    """ The map containing the statistics (counters) of
+    the main loop event queue processing """
 
     manager_path = None
     """ The manager base path for execution """
@@ -1496,6 +1872,40 @@ class PluginManager:
     referred_modules = []
     """ The referred modules """
 
+    discovery_manifest = None
+    """ The (on disk) manifest of the plugin discovery
+    used to avoid the scan of unchanged plugin paths """
+
+    plugin_registry = None
+    """ The (on disk) registry of the plugin metadata used
+    to avoid the import of the (lazy) plugin modules """
+
+    load_plan = None
+    """ The (on disk) plan of the resolved loading of the
+    plugins, replayed in the boot of an unchanged set of
+    plugins, only set during the boot """
+
+    load_profiler = None
+    """ The timeline used to profile the loading of the
+    plugins, only set in case the profiling is active """
+
+    metrics = None
+    """ The registry of the (request path) metrics, fed by
+    the plugin calls and injections, only set in case the
+    metrics are enabled by configuration """
+
+    lock_monitor = None
+    """ The monitor of the (instrumented) locks of the manager
+    and of the plugins, only set in case the lock monitor is
+    enabled by configuration """
+
+    lock_thread = None
+    """ The thread checking the lock monitor for blocked
+    acquisitions and reporting the hottest locks """
+
+    lock_active = False
+    """ Flag indicating if the lock monitor thread is active """
+
     loaded_plugins = []
     """ The loaded plugins """
 
@@ -1537,13 +1947,15 @@ class PluginManager:
     """ The map associating directories with th
      id of the plugin """
 
-    capabilities_plugin_instances_map = {}
-    """ The map associating capabilities with
-    plugin instances """
+    plugin_snapshot_map = {}
+    """ The (immutable) map associating both the id and the
+    name of the completely loaded plugins with their instances,
+    this map is never changed but replaced (copy on write) so
+    that it may be read without any locking """
 
-    capabilities_sub_capabilities_map = {}
-    """ The map associating capabilities with
-    sub capabilities """
+    capabilities_index = None
+    """ The hierarchical index associating capabilities
+    (and sub capabilities) with plugin instances """
 
     plugin_threads = []
     """ The list of active running threads """
@@ -1552,6 +1964,15 @@ class PluginManager:
     """ The map associating the active running threads
     with the id of the plugin """
 
+    lifecycle_executor = None
+    """ The (shared) executor used to run the lifecycle
+    calls of the main and thread plugins """
+
+    lifecycle_watchdog = None
+    """ The watchdog of the (in-flight) lifecycle calls of
+    the main and thread plugins, expiring the calls that
+    exceed their deadline """
+
     plugin_dependent_plugins_map = {}
     """ The map associating the plugins that
     depend on the plugin with the id of the plugin """
@@ -1576,6 +1997,57 @@ class PluginManager:
     """ The map with the plugin associated with
     the name of the event fired """
 
+    event_routing_table = None
+    """ The routing table associating the name of the
+    event fired with the tuple of handler plugins """
+
+    resolution_cache = {}
+    """ The cache associating the string value with
+    the tuple of resolved string values """
+
+    existence_cache = {}
+    """ The cache associating the path with a tuple
+    containing the existence flag and the expiration time """
+
+    configuration_cache = None
+    """ The cache of the plugin configuration files, shared
+    by all the replicas of the plugins """
+
+    replica_pool = None
+    """ The pool of (pre-loaded) replicas used in the creation
+    of plugins in a new diffusion scope """
+
+    replica_executor = None
+    """ The executor (thread pool) used in the (background)
+    refill of the replica pool """
+
+    reload_monitor = None
+    """ The monitor of the plugin source files used to
+    detect the plugins to be reloaded (hot reload) """
+
+    reload_thread = None
+    """ The thread polling the reload monitor """
+
+    reload_active = False
+    """ Flag indicating if the reload monitor is active """
+
+    memory_baseline = None
+    """ The first snapshot of the memory (attributed to the
+    plugins) used as reference for the tracking of leaks """
+
+    memory_snapshot = None
+    """ The latest snapshot of the memory """
+
+    memory_diffs = {}
+    """ The map associating the plugin id with the differences
+    of memory between the two latest snapshots """
+
+    memory_thread = None
+    """ The thread taking the periodic memory snapshots """
+
+    memory_active = False
+    """ Flag indicating if the memory accounting is active """
+
     def __init__(
         self,
         manager_path = "",
@@ -1672,13 +2144,24 @@ class PluginManager:
         self.attributes_map = attributes_map
 
         self.uid = colony.base.util.get_timestamp_uid()
-        self.condition = threading.Condition()
+        self.lock_monitor = plugin_manager_configuration.get("lock_monitor", False) and colony.libs.lock_util.LockMonitor() or None
+        self.condition = self.instrument_lock(threading.Condition(), "condition")
 
         self.plugins = colony.base.util.Plugins()
-        self.retrieve_lock = threading.RLock()
+        self.retrieve_lock = self.instrument_lock(threading.RLock(), "retrieve_lock")
+        self.snapshot_lock = threading.Lock()
+        self.proxy_lock = threading.RLock()
         self.current_id = 0
         self.logger_handlers = {}
-        self.event_queue = []
+        self.event_queue = collections.deque()
+        self.main_loop_statistics = {
+            "enqueued" : 0,
+            "processed" : 0,
+            "batches" : 0,
+            "maximum_depth" : 0,
+            "total_latency" : 0.0,
+            "maximum_latency" : 0.0
+        }
         self.referred_modules = []
         self.loaded_plugins = []
         self.loaded_plugins_map = {}
@@ -1690,19 +2173,35 @@ class PluginManager:
         self.plugin_instances = []
         self.plugin_instances_map = {}
         self.plugin_names_map = {}
+        self.plugin_snapshot_map = {}
         self.plugin_dirs_map = {}
-        self.capabilities_plugin_instances_map = {}
-        self.capabilities_sub_capabilities_map = {}
+        self.capabilities_index = CapabilityIndex()
         self.plugin_threads = []
         self.plugin_threads_map = {}
+        self.lifecycle_executor = colony.libs.pool_util.ThreadPool(
+            plugin_manager_configuration.get("lifecycle_workers", 4),
+            "lifecycle"
+        )
+        self.lifecycle_watchdog = LifecycleWatchdog(self)
         self.plugin_dependent_plugins_map = {}
         self.plugin_allowed_plugins_map = {}
         self.capabilities_plugins_map = {}
         self.diffusion_scope_loaded_plugins_map = {}
         self.deleted_plugin_classes = []
         self.event_plugins_fired_loaded_map = {}
+        self.event_routing_table = EventRoutingTable()
+        self.resolution_cache = {}
+        self.existence_cache = {}
+        self.configuration_cache = ConfigurationCache(
+            plugin_manager_configuration.get("configuration_check_interval", DEFAULT_CONFIGURATION_CHECK_INTERVAL)
+        )
+        self.replica_pool = ReplicaPool(plugin_manager_configuration.get("replica_pool", {}))
+        self.replica_executor = colony.libs.pool_util.ThreadPool(1, "replica")
+        self.reload_monitor = FileMonitor()
+        self.memory_diffs = {}
+        self.metrics = plugin_manager_configuration.get("metrics", False) and colony.libs.metrics_util.MetricsRegistry() or None
 
-    def create_plugin(self, plugin_id, plugin_version):
+    def create_plugin(self, plugin_id, plugin_version, register = True):
         """
         Creates a new instance of the plugin with the given id
         and version.
@@ -1711,6 +2210,9 @@ class PluginManager:
         @param plugin_id: The id of the plugin to create an instance.
         @param plugin_version: plugin_version
         @param plugin_version: The version of the plugin to create an instance.
+        @type register: bool
+        @param register: If the capabilities of the instance should be
+        registered (not registered for the pooled replicas).
         @rtype: Plugin
         @return: The created plugin instance.
         """
@@ -1730,12 +2232,12 @@ class PluginManager:
         diffusion_scope_id = self.generate_diffusion_scope_id()
 
         # creates a new plugin instance in the new diffusion scope id
-        plugin_instance = self._create_plugin(plugin_id, plugin_version, diffusion_scope_id)
+        plugin_instance = self._create_plugin(plugin_id, plugin_version, diffusion_scope_id, register)
 
         # returns the created plugin instance
         return plugin_instance
 
-    def _create_plugin(self, plugin_id, plugin_version, diffusion_scope_id):
+    def _create_plugin(self, plugin_id, plugin_version, diffusion_scope_id, register = True):
         """
         Creates a new instance of the plugin with the given id
         and version for the given diffusion scope id.
@@ -1746,6 +2248,9 @@ class PluginManager:
         @param plugin_version: The version of the plugin to create an instance.
         @param diffusion_scope_id: int
         @param diffusion_scope_id: The diffusion scope id to be used in the creation.
+        @type register: bool
+        @param register: If the capabilities of the instance should be
+        registered (not registered for the pooled replicas).
         @rtype: Plugin
         @return: The created plugin instance.
         """
@@ -1783,7 +2288,7 @@ class PluginManager:
         plugin_instance.diffusion_scope_id = diffusion_scope_id
 
         # retrieves the path to the plugin file
-        plugin_path = inspect.getfile(plugin_class)
+        plugin_path = self._get_plugin_file_path(plugin_class)
 
         # retrieves the file system encoding
         file_system_encoding = sys.getfilesystemencoding()
@@ -1805,12 +2310,15 @@ class PluginManager:
         self.plugin_instances.append(plugin_instance)
         self.plugin_instances_map[plugin_instance_id] = plugin_instance
         self.plugin_dirs_map[plugin_instance_id] = plugin_dir
+        self.invalidate_resolution_cache()
 
         # sets the plugin instance in the diffusion scope loaded plugins map
         self.set_plugin_instance_diffusion_scope_loaded_plugins_map(diffusion_scope_id, plugin_id, plugin_instance)
 
-        # registers the plugin capabilities in the plugin manager
-        self.register_plugin_capabilities(plugin_instance)
+        # registers the plugin capabilities in the plugin manager, the
+        # pooled replicas are only registered when taken from the pool
+        # so that the idle replicas are not injected in allowing plugins
+        register and self.register_plugin_capabilities(plugin_instance)
 
         # increments the current id
         self.current_id += 1
@@ -1818,6 +2326,116 @@ class PluginManager:
         # returns the plugin instance
         return plugin_instance
 
+    def start_replica_pool(self):
+        """
+        Starts the replica pool, filling (in background) the pool of
+        each of the pooled plugins up to the high watermark.
+        """
+
+        for plugin_id in self.replica_pool.get_plugin_ids(): self.refill_replica_pool(plugin_id)
+
+    def stop_replica_pool(self):
+        """
+        Stops the replica pool, closing it and waiting for
+        the (background) refill to finish.
+        """
+
+        self.replica_pool.close()
+        self.replica_executor.stop(DEFAULT_UNLOAD_SYSTEM_TIMEOUT)
+
+    def refill_replica_pool(self, plugin_id):
+        """
+        Refills (asynchronously) the pool of replicas of the plugin
+        with the given id up to the high watermark, in case the pool
+        is already being refilled nothing is done.
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin to refill the pool.
+        """
+
+        # marks the pool of the plugin as being refilled and submits
+        # the refill to the executor (in case it's not being refilled)
+        if not self.replica_pool.begin_refill(plugin_id): return
+        self.replica_executor.submit(self._refill_replica_pool, plugin_id)
+
+    def take_replica(self, plugin_id, plugin_version):
+        """
+        Takes a ready (pre-loaded) replica of the plugin with the
+        given id and version from the replica pool, triggering the
+        refill of the pool in case it drops below the low watermark.
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin to take a replica.
+        @type plugin_version: String
+        @param plugin_version: The version of the plugin.
+        @rtype: Plugin
+        @return: The ready replica or invalid in case there's none
+        available (miss) and it must be created inline.
+        """
+
+        # takes a replica (valid for the requested version) from the
+        # pool and registers its capabilities (not registered while idle)
+        replica = self.replica_pool.take(plugin_id, plugin_version)
+        if replica:
+            self.retrieve_lock.acquire()
+            try: self.register_plugin_capabilities(replica)
+            finally: self.retrieve_lock.release()
+
+        # triggers the refill of the pool in case it dropped
+        # below the low watermark
+        if self.replica_pool.needs_refill(plugin_id): self.refill_replica_pool(plugin_id)
+
+        # returns the replica
+        return replica
+
+    def get_replica_pool_statistics(self):
+        """
+        Retrieves the statistics of the replica pool (hits, misses,
+        created and failed replicas and available replicas).
+
+        @rtype: Dictionary
+        @return: The map containing the statistics of the replica pool.
+        """
+
+        return self.replica_pool.get_statistics()
+
+    def _refill_replica_pool(self, plugin_id):
+        """
+        Refills the pool of replicas of the plugin with the given id
+        up to the high watermark, creating and loading the replicas
+        (without injection in the allowing plugins).
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin to refill the pool.
+        """
+
+        try:
+            # retrieves the plugin class for the plugin id, in
+            # case it's not available there's nothing to be done
+            plugin_class = self.plugin_classes_map.get(plugin_id, None)
+            if not plugin_class: self.warning("Plugin '%s' not available for the replica pool", plugin_id); return
+
+            # iterates while the pool is not full creating and loading
+            # replicas, the retrieve lock is acquired (per replica) so that
+            # the loading of the (lazy) dependencies is serialized with the
+            # loading of the plugins in the retrieval (and inline creation)
+            while not self.replica_pool.is_full(plugin_id):
+                self.retrieve_lock.acquire()
+                try:
+                    replica = self.create_plugin(plugin_id, plugin_class.version, False)
+                    result = self.__load_plugin(replica, ALLOWED_TYPE, inject = False)
+                finally:
+                    self.retrieve_lock.release()
+
+                # in case the load of the replica failed notifies the pool
+                # and stops the refill (avoids creation loops)
+                if not result: self.replica_pool.fail(plugin_id); break
+                self.replica_pool.put(plugin_id, replica)
+        finally:
+            # unmarks the pool of the plugin
+            # as being refilled
+            self.replica_pool.end_refill(plugin_id)
+
     def generate_replica_id(self):
         """
         Generates the replica id.
@@ -1862,9 +2480,6 @@ class PluginManager:
         @param log_level: The log level of the logger.
         """
 
-        # retrieves the minimal log level between the current log level and the default one
-        minimal_log_level = DEFAULT_LOGGING_LEVEL < log_level and DEFAULT_LOGGING_LEVEL or log_level
-
         # creates the (complete) logger file name by concatenating the
         # various prefixes, name separators, run mode and file name extensions
         logger_file_name = DEFAULT_LOGGING_FILE_NAME_PREFIX + DEFAULT_LOGGING_FILE_NAME_SEPARATOR +\
@@ -1876,10 +2491,12 @@ class PluginManager:
 
         # retrieves the logger, sets the logger propagation
         # to avoid propagation and then updates the logger
-        # level to the minimal log level
+        # level to the configured log level, this is the level
+        # that gates the (lazy) formatting of the messages so
+        # no handler may lower it without disabling that gate
         logger = logging.getLogger(DEFAULT_LOGGER)
         logger.propagate = 0
-        logger.setLevel(minimal_log_level)
+        logger.setLevel(log_level)
 
         # creates the stream handler and sets the logger level
         # for the stream handler (the currently selected log level)
@@ -1897,16 +2514,15 @@ class PluginManager:
 
         # creates the broadcast handler so that the logging messages
         # may be sent to the world (network broadcast), then sets the
-        # minimal level in it so that the maximum amount of information
-        # is logged "into it" (permissive logging)
+        # configured log level in it (as in the logger itself)
         broadcast_handler = colony.base.loggers.BroadcastHandler()
-        broadcast_handler.setLevel(minimal_log_level)
+        broadcast_handler.setLevel(log_level)
 
         # creates the in memory handler object and then again sets
-        # the minimal log level in it so that it may have the
-        # maximum amount of information available for handling
+        # the configured log level in it, the messages below that
+        # level are filtered by the logger before reaching it
         memory_handler = colony.base.loggers.MemoryHandler()
-        memory_handler.setLevel(minimal_log_level)
+        memory_handler.setLevel(log_level)
 
         # retrieves the logging format and uses it
         # to create the proper logging formatter
@@ -1943,6 +2559,154 @@ class PluginManager:
         self.logger_handlers["broadcast"] = broadcast_handler
         self.logger_handlers["memory"] = memory_handler
 
+    def start_load_profiler(self):
+        """
+        Starts the load profiler, recording the timeline of the
+        loading of the plugins (and its steps) until the end of
+        the loading of the plugin system.
+        """
+
+        # creates the timeline to be used as the load profiler
+        self.load_profiler = colony.libs.timeline_util.Timeline()
+
+    def stop_load_profiler(self):
+        """
+        Stops the load profiler, dumping the recorded timeline in
+        the chrome trace event format into the variable path.
+        """
+
+        # in case no load profiler is active
+        # there's nothing to be stopped
+        load_profiler = self.load_profiler
+        if not load_profiler: return
+
+        # unsets the load profiler (no more
+        # spans are going to be recorded)
+        self.load_profiler = None
+
+        # retrieves the variable path and uses it to create
+        # the path to the load profile file
+        variable_path = self.get_variable_path()
+        profile_file_path = os.path.join(variable_path, DEFAULT_LOAD_PROFILE_FILE_NAME)
+
+        try:
+            # creates the variable path in case it does not exists
+            # and dumps the timeline into the profile file
+            if not os.path.exists(variable_path): os.makedirs(variable_path)
+            load_profiler.dump(profile_file_path)
+        except BaseException, exception:
+            # prints a warning message
+            self.warning("Problem writing load profile: %s", exception)
+        else:
+            # prints an info message
+            self.info("Load profile written to '%s'", profile_file_path)
+
+    def begin_load_span(self, name, plugin):
+        """
+        Begins a span of the load profiler with the given name
+        for the given plugin, in case the profiler is not active
+        no span is created.
+
+        @type name: String
+        @param name: The name of the span (loading step).
+        @type plugin: Plugin
+        @param plugin: The plugin being loaded.
+        @rtype: Tuple
+        @return: The created span or invalid in case
+        the profiler is not active.
+        """
+
+        load_profiler = self.load_profiler
+        if not load_profiler: return None
+        return load_profiler.begin(name, "load", {"plugin" : plugin.id})
+
+    def end_load_span(self, span):
+        """
+        Ends the given span of the load profiler, in case
+        the span is not valid nothing is done.
+
+        @type span: Tuple
+        @param span: The span to be ended.
+        """
+
+        load_profiler = self.load_profiler
+        if not span or not load_profiler: return
+        load_profiler.end(span)
+
+    def get_metrics(self):
+        """
+        Retrieves the registry of the metrics, to be used to
+        record (custom) counters, gauges and latencies.
+
+        @rtype: MetricsRegistry
+        @return: The registry of the metrics or invalid in
+        case the metrics are not enabled.
+        """
+
+        return self.metrics
+
+    def get_metrics_snapshot(self):
+        """
+        Retrieves a snapshot of the metrics (merged from the
+        various threads), updating the gauges of the plugin
+        manager before the snapshot.
+
+        @rtype: Dictionary
+        @return: The map containing the counters, the gauges and
+        the histograms or invalid in case the metrics are not enabled.
+        """
+
+        # in case the metrics are not enabled
+        # there's no snapshot to be retrieved
+        metrics = self.metrics
+        if not metrics: return None
+
+        # updates the gauges of the plugin manager and
+        # retrieves the snapshot of the metrics
+        loaded_plugins = [plugin for plugin in self.plugin_instances if plugin.is_loaded()]
+        metrics.set_gauge("colony_plugins", len(self.plugin_instances))
+        metrics.set_gauge("colony_plugins_loaded", len(loaded_plugins))
+        metrics.set_gauge("colony_event_queue_depth", len(self.event_queue))
+        return metrics.get_snapshot()
+
+    def dump_metrics(self, file_path = None):
+        """
+        Dumps a snapshot of the metrics in the prometheus text
+        format into the file in the given path (by default the
+        metrics file in the variable path).
+
+        @type file_path: String
+        @param file_path: The path to the file to dump the metrics.
+        @rtype: String
+        @return: The path to the file where the metrics were dumped
+        or invalid in case the metrics are not enabled (or the
+        dumping failed).
+        """
+
+        # in case the metrics are not enabled
+        # there's nothing to be dumped
+        metrics = self.metrics
+        if not metrics: return None
+
+        # retrieves the variable path and uses it to create
+        # the (default) path to the metrics file
+        variable_path = self.get_variable_path()
+        file_path = file_path or os.path.join(variable_path, DEFAULT_METRICS_FILE_NAME)
+
+        try:
+            # creates the directory of the file in case it does
+            # not exists and dumps the snapshot into the file
+            directory_path = os.path.dirname(file_path)
+            if not os.path.exists(directory_path): os.makedirs(directory_path)
+            metrics.dump(file_path, self.get_metrics_snapshot())
+        except BaseException, exception:
+            # prints a warning message
+            self.warning("Problem writing metrics: %s", exception)
+            return None
+
+        # returns the path to the file
+        return file_path
+
     def load_system(self):
         """
         Starts the process of loading the plugin system.
@@ -1971,6 +2735,10 @@ class PluginManager:
             # generates the system information map
             self.generate_system_information_map()
 
+            # loads the discovery manifest so that the
+            # unchanged plugin paths are not scanned
+            self.load_discovery_manifest()
+
             # gets all modules from all plugin paths
             for plugin_path in self.plugin_paths:
                 # retrieves all the modules from the plugin path and uses them
@@ -1978,6 +2746,10 @@ class PluginManager:
                 plugin_path_modules = self.get_all_modules(plugin_path, suffix = "plugin")
                 self.referred_modules.extend(plugin_path_modules)
 
+            # flushes the discovery manifest (persisting
+            # the changes resulting from the scan)
+            self.flush_discovery_manifest()
+
             # defines the plugin system configuration
             plugin_system_configuration = {
                 "library_paths" : self.library_paths,
@@ -1989,6 +2761,26 @@ class PluginManager:
             # starts the plugin loading process
             self.init_plugin_system(plugin_system_configuration)
 
+            # stops the load profiler dumping the recorded
+            # timeline (in case the profiler is active)
+            self.stop_load_profiler()
+
+            # starts the (background) filling of the
+            # replica pool for the pooled plugins
+            self.start_replica_pool()
+
+            # starts the monitor of the plugin source
+            # files (hot reload) in case it's enabled
+            self.start_reload_monitor()
+
+            # starts the (periodic) accounting of the memory
+            # of the plugins in case it's enabled
+            self.start_memory_accounting()
+
+            # starts the checking and reporting of the
+            # (instrumented) locks in case it's enabled
+            self.start_lock_monitor()
+
             # starts the main loop
             self.main_loop()
         except BaseException, exception:
@@ -2023,22 +2815,46 @@ class PluginManager:
         self.kill_system_timer = threading.Timer(DEFAULT_UNLOAD_SYSTEM_TIMEOUT, self._kill_system_timeout)
         self.kill_system_timer.start()
 
-        # iterates over all the plugin instances
-        for plugin_instance in self.plugin_instances:
-            # in case the plugin instance is loaded
-            if plugin_instance.is_loaded():
-                # in case the plugin contains the main type capability
-                if MAIN_TYPE in plugin_instance.capabilities:
-                    # unloads the plugin using the main type unloading
-                    self._unload_plugin(plugin_instance, None, MAIN_TYPE)
-                # in case the plugin contains the thread type capability
-                elif THREAD_TYPE in plugin_instance.capabilities:
-                    # unloads the plugin using the thread type unloading
-                    self._unload_plugin(plugin_instance, None, THREAD_TYPE)
-                # otherwise
-                else:
-                    # unloads the plugin normally
-                    self._unload_plugin(plugin_instance, None)
+        # stops the replica pool and the reload monitor so that
+        # no more replicas are created and no plugins are
+        # reloaded during the unloading (the memory accounting
+        # is stopped as well)
+        self.stop_replica_pool()
+        self.stop_reload_monitor()
+        self.stop_memory_accounting()
+
+        # resets the structures used in the control and
+        # report of the unloading of the plugins
+        self.unload_report = []
+        self.unload_running = {}
+        self.unload_abandoned = set()
+
+        # retrieves the current time for the measurement
+        # of the unloading time of the system
+        start_time = time.time()
+
+        # in case the unloading should be done concurrently
+        # unloads the loaded plugins in reverse dependency order
+        # otherwise iterates over all the plugin instances
+        # unloading the loaded ones (serially)
+        if self.is_concurrent_unloading():
+            plugins = [plugin_instance for plugin_instance in self.plugin_instances if plugin_instance.is_loaded()]
+            self.unload_plugins_concurrent(plugins)
+        else:
+            for plugin_instance in self.plugin_instances:
+                if plugin_instance.is_loaded(): self._unload_plugin_graph(plugin_instance)
+
+        # logs the report of the unloading, with the
+        # plugins that consumed most of the time
+        self.log_unload_report(time.time() - start_time)
+
+        # dumps the metrics (in case they're enabled) so that
+        # the values of the session are available after exit
+        self.dump_metrics()
+
+        # stops the lock monitor (kept running during the
+        # unloading so that blocked unloads are detected)
+        self.stop_lock_monitor()
 
         # in case thread safety is requested
         if thread_safe:
@@ -2073,42 +2889,45 @@ class PluginManager:
     def main_loop(self):
         """
         The main loop for the plugin manager.
+        The events are drained from the queue in batches and
+        processed outside the lock, so that the producers of
+        events are never blocked by long running executions.
         """
 
+        # retrieves the timeout to be used in the wait for events, in
+        # case the loop runs in the main thread the wait must be timed
+        # (woken periodically) so that the signals are processed,
+        # otherwise the loop is only woken upon notification
+        is_main_thread = isinstance(threading.currentThread(), threading._MainThread)
+        wait_timeout = is_main_thread and DEFAULT_LOOP_WAIT_TIMEOUT or None
+
         # main loop cycle
         while self.main_loop_active:
             # acquires the condition
             self.condition.acquire()
 
-            # iterates while the event queue has no items
-            while not len(self.event_queue):
-                try:
-                    # waits for the condition to be notified
-                    # this wait releases after the defined timeout
-                    # in order to provide a away to process external interrupts
-                    self.condition.wait(DEFAULT_LOOP_WAIT_TIMEOUT)
-                except RuntimeError:
-                    # timeout occurred (ignores it)
-                    pass
-
-            # pops the top item
-            event = self.event_queue.pop(0)
-
-            # in case the event is of type execute
-            if event.event_name == EXECUTE_VALUE:
-                execution_method = event.event_args[0]
-                execution_arguments = event.event_args[1:]
-                execution_method(*execution_arguments)
-            # in case the event is of type exit
-            elif event.event_name == EXIT_VALUE:
-                # unloads the thread based plugins
-                self._unload_thread_plugins()
-
-                # returns the method exiting the plugin system
-                return
+            try:
+                # iterates while the event queue has no items
+                while not self.event_queue:
+                    try:
+                        # waits for the condition to be notified
+                        # (releases after the timeout in case it's set)
+                        self.condition.wait(wait_timeout)
+                    except RuntimeError:
+                        # timeout occurred (ignores it)
+                        pass
+
+                # retrieves the complete batch of events from
+                # the queue replacing it with an empty one
+                events = self.event_queue
+                self.event_queue = collections.deque()
+            finally:
+                # releases the condition
+                self.condition.release()
 
-            # releases the condition
-            self.condition.release()
+            # processes the batch of events (outside the lock) and
+            # in case the exit event was processed returns immediately
+            if self._process_events(events): return
 
     def add_event(self, event):
         """
@@ -2121,14 +2940,85 @@ class PluginManager:
         # acquires the condition
         self.condition.acquire()
 
-        # adds the event to the event queue
-        self.event_queue.append(event)
+        try:
+            # adds the event to the event queue (with the
+            # current time for latency measurement)
+            self.event_queue.append((time.time(), event))
+
+            # updates the statistics of the main loop with the
+            # new event and the current depth of the queue
+            statistics = self.main_loop_statistics
+            statistics["enqueued"] += 1
+            depth = len(self.event_queue)
+            if depth > statistics["maximum_depth"]: statistics["maximum_depth"] = depth
+
+            # notifies the condition
+            self.condition.notify()
+        finally:
+            # releases the condition
+            self.condition.release()
 
-        # notifies the condition
-        self.condition.notify()
+    def get_main_loop_statistics(self):
+        """
+        Retrieves the statistics of the main loop event queue,
+        including the current depth of the queue and the latency
+        (in seconds) between the adding and the processing of events.
 
-        # releases the condition
-        self.condition.release()
+        @rtype: Dictionary
+        @return: The map containing the statistics of the main loop.
+        """
+
+        # creates a copy of the statistics and adds the
+        # current depth and the average latency to it
+        statistics = dict(self.main_loop_statistics)
+        processed = statistics["processed"]
+        statistics["depth"] = len(self.event_queue)
+        statistics["average_latency"] = processed and statistics["total_latency"] / processed or 0.0
+
+        # returns the statistics
+        return statistics
+
+    def _process_events(self, events):
+        """
+        Processes the given batch of events (in order), updating
+        the statistics of the main loop.
+
+        @type events: deque
+        @param events: The batch of (timed) events to be processed.
+        @rtype: bool
+        @return: If the exit event was processed.
+        """
+
+        # updates the number of batches processed
+        # in the statistics of the main loop
+        statistics = self.main_loop_statistics
+        statistics["batches"] += 1
+
+        # iterates while there are events in the batch
+        while events:
+            # pops the top item and updates the statistics
+            # with the latency of the event
+            timestamp, event = events.popleft()
+            latency = time.time() - timestamp
+            statistics["processed"] += 1
+            statistics["total_latency"] += latency
+            if latency > statistics["maximum_latency"]: statistics["maximum_latency"] = latency
+
+            # in case the event is of type execute
+            if event.event_name == EXECUTE_VALUE:
+                execution_method = event.event_args[0]
+                execution_arguments = event.event_args[1:]
+                execution_method(*execution_arguments)
+            # in case the event is of type exit
+            elif event.event_name == EXIT_VALUE:
+                # unloads the thread based plugins
+                self._unload_thread_plugins()
+
+                # returns valid (exit processed)
+                return True
+
+        # returns invalid (no exit)
+        return False
 
     def expand_workspace_path(self):
         """
@@ -2164,6 +3054,11 @@ class PluginManager:
         # if necessary
         self.create_workspace_path()
 
+        # invalidates the resolution and configuration caches
+        # as the resolved paths may depend on the workspace
+        self.invalidate_resolution_cache()
+        self.configuration_cache.invalidate()
+
     def check_standard_input(self):
         """
         Checks if the standard input to be used should
@@ -2217,6 +3112,15 @@ class PluginManager:
             self.warning("Path '%s' does not exist in the current filesystem" % (path))
             return modules
 
+        # retrieves the modification time of the path (before the
+        # listing) and tries to retrieve the modules from the discovery
+        # manifest, in case they're valid returns them immediately
+        discovery_manifest = self.discovery_manifest
+        modification_time = os.path.getmtime(path)
+        if discovery_manifest:
+            manifest_modules = discovery_manifest.get(path, suffix, modification_time)
+            if not manifest_modules == None: return manifest_modules
+
         # retrieves the directory list for the path
         dir_list = os.listdir(path)
 
@@ -2248,9 +3152,301 @@ class PluginManager:
             # adds the module into it
             if not module_name in modules: modules.append(module_name)
 
+        # updates the discovery manifest with the modules
+        # found at the modification time of the path
+        discovery_manifest and discovery_manifest.set(path, suffix, modification_time, modules)
+
         # returns the modules list
         return modules
 
+    def load_discovery_manifest(self):
+        """
+        Loads the (on disk) discovery manifest from the variable
+        path, in case the discovery manifest is disabled by
+        configuration no manifest is loaded.
+        """
+
+        # in case the discovery manifest is disabled
+        # there's nothing to be loaded
+        if not plugin_manager_configuration.get("discovery_manifest", True): return
+
+        # retrieves the variable path and uses it to create
+        # the path to the discovery manifest file
+        variable_path = self.get_variable_path()
+        manifest_file_path = os.path.join(variable_path, DEFAULT_MANIFEST_FILE_NAME)
+
+        # creates the discovery manifest and loads it
+        # from the manifest file
+        self.discovery_manifest = DiscoveryManifest(manifest_file_path)
+        self.discovery_manifest.load()
+
+    def flush_discovery_manifest(self):
+        """
+        Flushes the discovery manifest into the variable path,
+        the failure to write it is not considered critical.
+        """
+
+        # in case no discovery manifest is
+        # loaded there's nothing to be flushed
+        if not self.discovery_manifest: return
+
+        try:
+            # flushes the discovery manifest
+            # into the manifest file
+            self.discovery_manifest.flush()
+        except BaseException, exception:
+            # prints a warning message (the manifest is
+            # only an optimization and may be skipped)
+            self.warning("Problem writing discovery manifest: %s", exception)
+
+    def load_plugin_registry(self):
+        """
+        Loads the (on disk) plugin registry from the variable
+        path, in case the plugin registry is disabled by
+        configuration no registry is loaded.
+        """
+
+        # in case the plugin registry is disabled or
+        # already loaded there's nothing to be loaded
+        if not plugin_manager_configuration.get("plugin_registry", False): return
+        if self.plugin_registry: return
+
+        # retrieves the variable path and uses it to create
+        # the path to the plugin registry file
+        variable_path = self.get_variable_path()
+        registry_file_path = os.path.join(variable_path, DEFAULT_REGISTRY_FILE_NAME)
+
+        # creates the plugin registry and loads it
+        # from the registry file
+        self.plugin_registry = PluginRegistry(registry_file_path)
+        self.plugin_registry.load()
+
+    def update_plugin_registry(self):
+        """
+        Updates the plugin registry with the metadata of the
+        (real) plugin classes currently available and flushes
+        it into the variable path, the failure to write it is
+        not considered critical.
+        """
+
+        # in case no plugin registry is loaded
+        # there's nothing to be updated
+        if not self.plugin_registry: return
+
+        # groups the (real) plugin classes by the name of the
+        # module, the proxy classes are ignored (not changed)
+        module_plugin_classes = {}
+        for plugin_class in self.plugin_classes:
+            if issubclass(plugin_class, PluginProxy): continue
+            plugin_classes = module_plugin_classes.setdefault(plugin_class.__module__, [])
+            plugin_classes.append(plugin_class)
+
+        # iterates over all the modules to set the metadata of the
+        # plugin class in the registry, the modules that are not plugin
+        # modules or that define more than one plugin class are ignored
+        for module_name, plugin_classes in module_plugin_classes.items():
+            if not module_name in self.referred_modules: continue
+            if len(plugin_classes) > 1: self.plugin_registry.remove(module_name)
+            else: self.plugin_registry.set(module_name, plugin_classes[0])
+
+        try:
+            # flushes the plugin registry
+            # into the registry file
+            self.plugin_registry.flush()
+        except BaseException, exception:
+            # prints a warning message (the registry is
+            # only an optimization and may be skipped)
+            self.warning("Problem writing plugin registry: %s", exception)
+
+    def begin_load_plan(self):
+        """
+        Begins the (on disk) load plan for the boot, loading it from
+        the variable path and activating it for the fingerprint of the
+        current plugins, in case the fingerprint is the same as the one
+        of the plan the resolution of the previous boot is replayed,
+        otherwise the resolution is recorded.
+        In case the load plan is disabled by configuration no plan
+        is used (the resolution is always done).
+        """
+
+        # in case the load plan is disabled
+        # there's nothing to be loaded
+        if not plugin_manager_configuration.get("load_plan", False): return
+
+        # retrieves the variable path and uses it to create
+        # the path to the load plan file
+        variable_path = self.get_variable_path()
+        plan_file_path = os.path.join(variable_path, DEFAULT_LOAD_PLAN_FILE_NAME)
+
+        # creates the load plan and loads it from the file, then
+        # activates it for the fingerprint of the current plugins
+        self.load_plan = LoadPlan(plan_file_path)
+        self.load_plan.load()
+        replay = self.load_plan.activate(self.get_plugins_fingerprint())
+
+        # prints a debug message about the mode of the load plan
+        self.debug("Load plan %s", replay and "replayed (unchanged plugins)" or "recorded")
+
+    def end_load_plan(self):
+        """
+        Ends the load plan for the boot, flushing the recorded
+        resolution into the variable path (the failure to write it
+        is not considered critical) and deactivating the plan so
+        that the resolution is done after the boot.
+        """
+
+        # in case no load plan is active
+        # there's nothing to be ended
+        load_plan = self.load_plan
+        if not load_plan: return
+
+        # deactivates the load plan (the resolution
+        # is no longer replayed nor recorded)
+        self.load_plan = None
+
+        try:
+            # flushes the load plan
+            # into the plan file
+            load_plan.flush()
+        except BaseException, exception:
+            # prints a warning message (the load plan is
+            # only an optimization and may be skipped)
+            self.warning("Problem writing load plan: %s", exception)
+
+    def get_plugins_fingerprint(self):
+        """
+        Retrieves the fingerprint of the current (non replica) plugins,
+        computed from the ids and versions of the plugins.
+
+        @rtype: String
+        @return: The fingerprint of the current plugins.
+        """
+
+        plugins = sorted((plugin.id, plugin.version) for plugin in self.plugin_instances if not plugin.is_replica())
+        return hashlib.md5(repr(plugins)).hexdigest()
+
+    def materialize_plugin(self, plugin):
+        """
+        Materializes the given plugin, in case it's a proxy (created
+        from the plugin registry) the real plugin module is imported
+        and the proxy is converted into an instance of the real plugin
+        class, keeping the current plugin (instance) state.
+
+        @type plugin: Plugin
+        @param plugin: The plugin to be materialized.
+        @rtype: bool
+        @return: The result of the plugin materialization.
+        """
+
+        # acquires the proxy lock so that no two threads
+        # materialize the same plugin at the same time
+        self.proxy_lock.acquire()
+
+        try:
+            # in case the plugin is not a proxy (already materialized)
+            # there's nothing to be done (returns in success)
+            if not isinstance(plugin, PluginProxy): return True
+
+            # retrieves the proxy class and the (real) plugin
+            # class in case it has already been imported
+            proxy_class = plugin.__class__
+            plugin_class = proxy_class.proxy_target
+
+            # in case the real plugin class is not yet
+            # imported it must be imported from the module
+            if not plugin_class:
+                # retrieves the name of the module
+                # containing the real plugin class
+                module_name = proxy_class.proxy_module
+
+                try:
+                    # imports the plugin module and retrieves the
+                    # plugin class (with the same name) from it
+                    __import__(module_name)
+                    module = sys.modules[module_name]
+                    plugin_class = getattr(module, proxy_class.__name__)
+                except BaseException, exception:
+                    # prints an error message
+                    self.error("Problem importing module %s: %s", module_name, unicode(exception))
+
+                    # sets the exception in the plugin and
+                    # sets the plugin error state flag
+                    plugin.exception = exception
+                    plugin.error_state = True
+
+                    # returns false (materialization failed)
+                    return False
+
+                # prints a debug message
+                self.debug("Materialized plugin '%s' v%s from module %s", plugin.name, plugin.version, module_name)
+
+                # sets the (computed) name values of the proxy class in
+                # the real plugin class and invalidates the proxy class
+                # so that it's no longer considered a plugin class
+                plugin_class._name = proxy_class._name
+                plugin_class.short_name = proxy_class.short_name
+                proxy_class.proxy_target = plugin_class
+                proxy_class.valid = False
+
+                # replaces the proxy class with the real plugin
+                # class in the plugin manager structures
+                self._replace_plugin_class(proxy_class, plugin_class)
+
+            # converts the instance into a real plugin instance running
+            # the real plugin initialization and then restoring the
+            # previous state of the instance (no state is lost)
+            plugin_state = dict(plugin.__dict__)
+            plugin.__class__ = plugin_class
+            plugin_class.__init__(plugin, self)
+            plugin.__dict__.update(plugin_state)
+        finally:
+            # releases the proxy lock
+            self.proxy_lock.release()
+
+        # returns true (materialization succeeded)
+        return True
+
+    def _replace_plugin_class(self, plugin_class, new_plugin_class):
+        """
+        Replaces the given plugin class with the new plugin class
+        in all the plugin manager structures referring plugin classes.
+
+        @type plugin_class: Class
+        @param plugin_class: The plugin class to be replaced.
+        @type new_plugin_class: Class
+        @param new_plugin_class: The plugin class to be used
+        as replacement.
+        """
+
+        # replaces the plugin class in the lists
+        # of (loaded) plugin classes
+        for plugin_classes in (self.loaded_plugins, self.plugin_classes):
+            if not plugin_class in plugin_classes: continue
+            index = plugin_classes.index(plugin_class)
+            plugin_classes[index] = new_plugin_class
+
+        # replaces the plugin class in the maps associating
+        # the plugin (instance) ids with the plugin classes
+        for plugin_classes_map in (self.loaded_plugins_map, self.plugin_classes_map):
+            for plugin_id, _plugin_class in plugin_classes_map.items():
+                if not _plugin_class == plugin_class: continue
+                plugin_classes_map[plugin_id] = new_plugin_class
+
+    def _get_plugin_file_path(self, plugin_class):
+        """
+        Retrieves the path to the file of the module containing
+        the given plugin class, in case the plugin class is a proxy
+        the path is retrieved from the registry (no import).
+
+        @type plugin_class: Class
+        @param plugin_class: The plugin class to retrieve the path.
+        @rtype: String
+        @return: The path to the file of the plugin module.
+        """
+
+        if issubclass(plugin_class, PluginProxy): return plugin_class.proxy_path
+        return inspect.getfile(plugin_class)
+
     def init_plugin_system(self, configuration):
         """
         Starts the plugin loading process.
@@ -2277,12 +3473,23 @@ class PluginManager:
         # starts all the available the plugins
         self.start_plugins()
 
+        # updates the plugin registry with the
+        # metadata of the started plugins
+        self.update_plugin_registry()
+
+        # begins the (resolved) load plan so that the resolution
+        # of the previous boot is replayed (or recorded)
+        self.begin_load_plan()
+
         # loads the startup plugins
         self.load_startup_plugins()
 
         # loads the main plugins
         self.load_main_plugins()
 
+        # ends the load plan flushing the recorded resolution
+        self.end_load_plan()
+
         # installs the signal handlers
         self.install_signal_handlers()
 
@@ -2348,10 +3555,20 @@ class PluginManager:
         """
 
         # prints an info message
-        self.info("Loading plugins (importing %d main module files)..." % len(plugins))
+        self.info("Loading plugins (importing %d main module files)...", len(plugins))
+
+        # loads the plugin registry so that the lazy plugins
+        # may be created as proxies (without import)
+        self.load_plugin_registry()
+        plugin_registry = self.plugin_registry
 
         # iterates over all the available plugins
         for plugin in plugins:
+            # in case there's a valid proxy class for the plugin module
+            # in the registry the import of the module is deferred
+            if plugin_registry and not plugin in sys.modules and\
+                plugin_registry.get_proxy_class(plugin): continue
+
             # in case the plugin module is not currently loaded
             if not plugin in sys.modules:
                 try:
@@ -2424,7 +3641,7 @@ class PluginManager:
         plugin_instance = plugin(self)
 
         # retrieves the path to the plugin file
-        plugin_path = inspect.getfile(plugin)
+        plugin_path = self._get_plugin_file_path(plugin)
 
         # retrieves the file system encoding
         file_system_encoding = sys.getfilesystemencoding()
@@ -2463,6 +3680,7 @@ class PluginManager:
         self.plugin_instances_map[plugin_id] = plugin_instance
         self.plugin_names_map[plugin_name] = plugin_instance
         self.plugin_dirs_map[plugin_id] = plugin_dir
+        self.invalidate_resolution_cache()
 
         # sets the plugin instance in the diffusion scope loaded plugins map
         self.set_plugin_instance_diffusion_scope_loaded_plugins_map(None, plugin_id, plugin_instance)
@@ -2473,6 +3691,516 @@ class PluginManager:
         # increments the current id
         self.current_id += 1
 
+    def start_reload_monitor(self):
+        """
+        Starts the monitor of the plugin source files, polling the
+        files periodically (reload interval) and reloading the changed
+        plugins (and the plugins that depend on them) in the main loop.
+        The monitor is only started in case the reload interval is set
+        and threads are allowed.
+        """
+
+        # retrieves the reload interval and in case it's not
+        # set (or threads are not allowed) returns immediately
+        reload_interval = plugin_manager_configuration.get("reload_interval", 0.0)
+        if not reload_interval or not self.allow_threads: return
+
+        # updates the monitor with the current source files (initial
+        # modification times) and starts the polling thread
+        self.reload_monitor.update(self.get_reload_files_map())
+        self.reload_active = True
+        self.reload_thread = threading.Thread(target = self._reload_monitor_loop, args = (reload_interval,), name = "reload")
+        self.reload_thread.daemon = True
+        self.reload_thread.start()
+
+    def stop_reload_monitor(self):
+        """
+        Stops the monitor of the plugin source files.
+        """
+
+        self.reload_active = False
+
+    def get_reload_files_map(self):
+        """
+        Retrieves the map associating the source files of the started
+        plugins (plugin module and imported main modules) with the ids
+        of the plugins that must be reloaded upon their change.
+
+        @rtype: Dictionary
+        @return: The map associating the source file path with
+        the set of ids of the plugins.
+        """
+
+        # creates the files map and iterates over all the started
+        # plugin classes adding the source files of each plugin
+        files_map = {}
+        for plugin in list(self.loaded_plugins):
+            # retrieves the paths of the plugin module file and of the
+            # (imported) main module files of the plugin
+            file_paths = [self._get_plugin_file_path(plugin)]
+            for main_module in plugin.main_modules:
+                module = sys.modules.get(main_module, None)
+                module_file = module and getattr(module, "__file__", None)
+                module_file and file_paths.append(module_file)
+
+            # adds the (source) file paths to the files map
+            # associating them with the plugin id
+            for file_path in file_paths:
+                if file_path[-4:] in (".pyc", ".pyo"): file_path = file_path[:-1]
+                files_map.setdefault(file_path, set()).add(plugin.id)
+
+        # returns the files map
+        return files_map
+
+    def get_reload_closure(self, plugins):
+        """
+        Retrieves the closure of plugins to be reloaded for the given
+        (changed) plugins, the closure contains the plugins and all the
+        plugins that depend on them (transitively) in breadth first
+        order (the dependencies before the dependent plugins).
+
+        @type plugins: List
+        @param plugins: The list of changed plugins.
+        @rtype: List
+        @return: The list of plugins in the reload closure.
+        """
+
+        # creates the closure list and the set of visited plugin ids
+        # and iterates (breadth first) over the plugins and dependents
+        closure = []
+        visited = set()
+        queue = collections.deque(plugins)
+        while queue:
+            plugin = queue.popleft()
+            if plugin.id in visited: continue
+            visited.add(plugin.id)
+            closure.append(plugin)
+            queue.extend(self.get_plugin_dependent_plugins_map(plugin.id))
+
+        # returns the closure
+        return closure
+
+    def reload_plugins(self, plugin_ids):
+        """
+        Reloads the plugins with the given ids (changed source files)
+        and the plugins that depend on them, the remaining plugins are
+        kept running.
+        The closure of plugins is unloaded (dependent plugins first),
+        the modules of the changed plugins are re-imported (including
+        the main modules) and the plugins of the closure that were
+        loaded are loaded again.
+        The replicas of the changed plugins are unloaded (stale classes)
+        and new ones are created upon the next injection.
+
+        @type plugin_ids: List
+        @param plugin_ids: The list of ids of the changed plugins.
+        """
+
+        # retrieves the (original) changed plugins and computes the
+        # closure of plugins to be reloaded and the ids of the ones
+        # currently loaded (to be loaded after the reload)
+        plugins = [self._get_plugin_by_id(plugin_id) for plugin_id in plugin_ids]
+        plugins = [plugin for plugin in plugins if plugin]
+        if not plugins: return
+        closure = self.get_reload_closure(plugins)
+        loaded_ids = [plugin.id for plugin in closure if plugin.is_loaded()]
+
+        # prints an info message
+        self.info("Reloading %d plugins (%d changed)", len(closure), len(plugins))
+
+        # retrieves the replicas of the changed plugins (removing them
+        # from the replica pool) and unloads them (stale classes)
+        changed_ids = set([plugin.id for plugin in plugins])
+        replicas = [value for value in self.plugin_instances if value.is_replica() and value.original_id in changed_ids]
+        for plugin_id in changed_ids: self.replica_pool.remove(plugin_id)
+        for replica in replicas: self.unload_plugin(replica.id, RELOAD_TYPE)
+
+        # unloads the plugins of the closure in reverse order
+        # (the dependent plugins are unloaded first)
+        for plugin in reversed(closure): self.unload_plugin(plugin.id, RELOAD_TYPE)
+
+        # stops the modules of the changed plugins removing their
+        # main modules from the loaded modules (re-imported upon
+        # load) and imports and starts the modules again
+        modules = [plugin.__module__ for plugin in plugins]
+        for plugin in plugins:
+            for main_module in plugin.main_modules: colony.libs.import_util.reload_import(main_module)
+            self.stop_module(plugin.__module__)
+        self.load_plugins(modules)
+        self.start_plugins()
+
+        # loads the plugins of the closure that were loaded
+        # before the reload (in the closure order)
+        for plugin_id in loaded_ids:
+            if not self._get_plugin_by_id(plugin_id): self.warning("Plugin '%s' not available after reload", plugin_id); continue
+            self.load_plugin(plugin_id, RELOAD_TYPE)
+
+        # refills the replica pool of the changed plugins (in case
+        # they're pooled) and updates the reload monitor with the
+        # new source files (new main modules)
+        for plugin_id in changed_ids:
+            self.replica_pool.needs_refill(plugin_id) and self.refill_replica_pool(plugin_id)
+        self.reload_monitor.update(self.get_reload_files_map())
+
+        # prints an info message
+        self.info("Finished reloading plugins")
+
+    def _reload_monitor_loop(self, reload_interval):
+        """
+        The loop of the reload monitor thread, polling the source
+        files of the plugins and scheduling the reload of the changed
+        plugins in the main loop (serialized with other operations).
+        The (cached) plugin configurations are also checked in each
+        iteration (configuration hot reload).
+
+        @type reload_interval: float
+        @param reload_interval: The interval (in seconds) between
+        each poll of the source files.
+        """
+
+        while self.reload_active:
+            # sleeps for the reload interval and in case the
+            # monitor is no longer active returns immediately
+            time.sleep(reload_interval)
+            if not self.reload_active: return
+
+            try:
+                # checks the cached plugin configurations
+                # for changes (notifying the plugins)
+                self.check_plugin_configurations()
+
+                # updates the watched files with the current ones and checks
+                # them for changes, scheduling the reload of the changed
+                # plugins in the main loop (in case there are changes)
+                self.reload_monitor.update(self.get_reload_files_map())
+                changed_ids = self.reload_monitor.check()
+                if not changed_ids: continue
+                self.info("Source files changed for %d plugins, scheduling reload", len(changed_ids))
+                self.add_event(colony.base.util.Event(EXECUTE_VALUE, [self.reload_plugins, list(changed_ids)]))
+            except BaseException, exception:
+                # prints an error message
+                self.error("Problem in the reload monitor: %s" % unicode(exception))
+
+    def start_memory_accounting(self):
+        """
+        Starts the (periodic) accounting of the memory of the plugins,
+        taking a snapshot of the memory in each interval (memory interval)
+        and logging the plugins with the largest growth since the first
+        snapshot (leak tracking).
+        The accounting is only started in case the memory interval is set
+        and threads are allowed.
+        """
+
+        # retrieves the memory interval and in case it's not
+        # set (or threads are not allowed) returns immediately
+        memory_interval = plugin_manager_configuration.get("memory_interval", 0.0)
+        if not memory_interval or not self.allow_threads: return
+
+        # takes the first snapshot of the memory (baseline)
+        # and starts the snapshot thread
+        self.take_memory_snapshot()
+        self.memory_active = True
+        self.memory_thread = threading.Thread(target = self._memory_accounting_loop, args = (memory_interval,), name = "memory")
+        self.memory_thread.daemon = True
+        self.memory_thread.start()
+
+    def stop_memory_accounting(self):
+        """
+        Stops the (periodic) accounting of the memory of the plugins.
+        """
+
+        self.memory_active = False
+
+    def get_memory_owners_map(self):
+        """
+        Retrieves the map associating the names of the modules of the
+        plugins (plugin module and main modules) with the ids of the
+        plugins, used to attribute the memory to the plugins.
+        The packages of the main modules are associated with the plugin
+        as well (prefixed names) unless they're shared between plugins.
+
+        @rtype: Dictionary
+        @return: The map associating the module (or package prefix)
+        name with the id of the plugin.
+        """
+
+        # creates the maps of owners and of the packages and iterates
+        # over all the plugins (the replicas are accounted for the
+        # original plugin as they share the modules)
+        owners_map = {}
+        packages_map = {}
+        for plugin in list(self.plugin_instances):
+            if plugin.is_replica(): continue
+
+            # associates the plugin module and the main modules with
+            # the plugin and gathers the packages of the main modules
+            owners_map[plugin.__class__.__module__] = plugin.id
+            for main_module in plugin.main_modules:
+                owners_map[main_module] = plugin.id
+                if not "." in main_module: continue
+                package_name = main_module.rsplit(".", 1)[0] + "."
+                packages_map.setdefault(package_name, set()).add(plugin.id)
+
+        # associates the packages that are used by a single
+        # plugin with the plugin (prefixed names)
+        for package_name, plugin_ids in packages_map.items():
+            if not len(plugin_ids) == 1: continue
+            owners_map.setdefault(package_name, list(plugin_ids)[0])
+
+        # returns the owners map
+        return owners_map
+
+    def take_memory_snapshot(self):
+        """
+        Takes a snapshot of the memory attributed to the plugins (the
+        objects reachable from the plugin instances, including replicas,
+        and from the plugin and main modules) and computes the differences
+        against the previous snapshot.
+        The manager is not walked (boundary) and the objects shared
+        between plugins are attributed to a single plugin, so the values
+        are meant for the tracking of growth rather than as absolute sizes.
+        The first snapshot is kept as reference (baseline) for
+        the tracking of leaks.
+
+        @rtype: Dictionary
+        @return: The map associating the plugin id with the differences
+        of memory (count, size and types) against the previous snapshot.
+        """
+
+        # retrieves the owners map and creates the function that
+        # resolves the owner of a module, trying the module name
+        # and then the (prefix) names of the packages
+        owners_map = self.get_memory_owners_map()
+        def get_owner(module_name):
+            if not module_name: return None
+            if module_name in owners_map: return owners_map[module_name]
+            index = module_name.rfind(".")
+            while index > 0:
+                owner = owners_map.get(module_name[:index + 1], None)
+                if owner: return owner
+                index = module_name.rfind(".", 0, index)
+            return None
+
+        # creates the map of roots of the plugins, with the modules owned
+        # by the plugins and the plugin instances (the replicas are
+        # accounted for the original plugin)
+        roots = {}
+        for module_name, module in sys.modules.items():
+            owner = module and get_owner(module_name)
+            owner and roots.setdefault(owner, []).append(module)
+        for plugin in list(self.plugin_instances):
+            roots.setdefault(plugin.original_id, []).append(plugin)
+
+        # takes the snapshot of the memory (not walking the manager nor
+        # its logger) and computes the differences against the previous
+        # snapshot (in case it exists)
+        memory_snapshot = colony.libs.memory_util.take_snapshot(roots, (self, self.logger))
+        previous_snapshot = self.memory_snapshot or colony.libs.memory_util.MemorySnapshot()
+        self.memory_diffs = memory_snapshot.compare(previous_snapshot)
+        self.memory_baseline = self.memory_baseline or memory_snapshot
+        self.memory_snapshot = memory_snapshot
+
+        # returns the differences
+        return self.memory_diffs
+
+    def get_memory_diffs(self):
+        """
+        Retrieves the differences of memory between the two latest
+        snapshots for each of the plugins.
+
+        @rtype: Dictionary
+        @return: The map associating the plugin id with the differences
+        of memory (count, size and types).
+        """
+
+        return self.memory_diffs
+
+    def get_memory_top_growers(self, count = 10):
+        """
+        Retrieves the plugins with the largest growth of memory since
+        the first snapshot (baseline), sorted by the growth in size.
+
+        @type count: int
+        @param count: The maximum number of plugins to be retrieved.
+        @rtype: List
+        @return: The list of tuples containing the plugin id, the growth
+        in size (bytes), the growth in number of objects and the list of
+        the types with the largest growth (in size).
+        """
+
+        # in case there's no snapshot there's no
+        # growth to be reported
+        if not self.memory_snapshot: return []
+
+        # computes the differences of the latest snapshot against
+        # the baseline and sorts the plugins by growth in size
+        memory_diffs = self.memory_snapshot.compare(self.memory_baseline)
+        top_growers = []
+        for plugin_id, memory_diff in memory_diffs.items():
+            if memory_diff["size"] <= 0: continue
+            types = sorted(memory_diff["types"].items(), key = lambda value: value[1][1], reverse = True)
+            top_growers.append((plugin_id, memory_diff["size"], memory_diff["count"], types[:3]))
+        top_growers.sort(key = lambda value: value[1], reverse = True)
+
+        # returns the top growers
+        return top_growers[:count]
+
+    def _memory_accounting_loop(self, memory_interval):
+        """
+        The loop of the memory accounting thread, taking a snapshot of
+        the memory of the plugins in each interval and logging the
+        plugins with the largest growth (since the baseline).
+
+        @type memory_interval: float
+        @param memory_interval: The interval (in seconds) between
+        each snapshot of the memory.
+        """
+
+        while self.memory_active:
+            # sleeps for the memory interval and in case the
+            # accounting is no longer active returns immediately
+            time.sleep(memory_interval)
+            if not self.memory_active: return
+
+            try:
+                # takes the snapshot of the memory and prints a debug
+                # message for each of the plugins with the largest growth
+                self.take_memory_snapshot()
+                for plugin_id, size, count, types in self.get_memory_top_growers():
+                    types_string = ", ".join("%s +%d" % (name, value[1]) for name, value in types)
+                    self.debug("Memory growth of %s: %d bytes in %d objects (%s)", plugin_id, size, count, types_string)
+            except BaseException, exception:
+                # prints an error message
+                self.error("Problem in the memory accounting: %s" % unicode(exception))
+
+    def instrument_lock(self, lock, name, owned = True):
+        """
+        Instruments the given lock (or semaphore or condition) in case
+        the lock monitor is enabled, recording its wait and hold times
+        and the contending call sites in the monitor.
+
+        @type lock: Lock
+        @param lock: The lock to be instrumented.
+        @type name: String
+        @param name: The name of the lock in the monitor.
+        @type owned: bool
+        @param owned: If the lock is owned by the acquiring thread
+        (released by the same thread).
+        @rtype: Lock
+        @return: The instrumented version of the lock or the lock
+        itself in case the lock monitor is not enabled.
+        """
+
+        lock_monitor = self.lock_monitor
+        if not lock_monitor: return lock
+        return lock_monitor.instrument(lock, name, owned)
+
+    def start_lock_monitor(self):
+        """
+        Starts the (periodic) checking of the lock monitor, dumping
+        the wait-for graph in case an acquisition is waiting for more
+        than the deadlock timeout and reporting the hottest locks in
+        each interval (lock report interval).
+        The checking is only started in case the lock monitor is
+        enabled and threads are allowed.
+        """
+
+        # in case the lock monitor is not enabled (or threads
+        # are not allowed) returns immediately
+        if not self.lock_monitor or not self.allow_threads: return
+
+        # retrieves the report interval and the deadlock
+        # timeout and starts the checking thread
+        report_interval = plugin_manager_configuration.get("lock_report_interval", 60.0)
+        deadlock_timeout = plugin_manager_configuration.get("lock_deadlock_timeout", 30.0)
+        self.lock_active = True
+        self.lock_thread = threading.Thread(target = self._lock_monitor_loop, args = (report_interval, deadlock_timeout), name = "lock")
+        self.lock_thread.daemon = True
+        self.lock_thread.start()
+
+    def stop_lock_monitor(self):
+        """
+        Stops the (periodic) checking of the lock monitor.
+        """
+
+        self.lock_active = False
+
+    def get_lock_report(self, count = 10):
+        """
+        Retrieves the report of the hottest locks, the ones with the
+        largest time waiting for them, with the contending call sites.
+
+        @type count: int
+        @param count: The maximum number of locks to be retrieved.
+        @rtype: List
+        @return: The list of tuples containing the name of the lock,
+        the number of acquisitions, the number of contentions, the total
+        and maximum wait time, the total and maximum hold time and the
+        top contending call sites, or invalid in case the lock monitor
+        is not enabled.
+        """
+
+        # in case the lock monitor is not enabled
+        # there's no report to be retrieved
+        lock_monitor = self.lock_monitor
+        if not lock_monitor: return None
+
+        # creates the report from the statistics of the hottest locks
+        return [
+            (
+                value.name,
+                value.acquisitions,
+                value.contentions,
+                value.wait_time,
+                value.wait_maximum,
+                value.hold_time,
+                value.hold_maximum,
+                value.get_top_sites()
+            ) for value in lock_monitor.get_hottest(count)
+        ]
+
+    def _lock_monitor_loop(self, report_interval, deadlock_timeout):
+        """
+        The loop of the lock monitor thread, checking for blocked
+        acquisitions (dumping the wait-for graph) and printing the
+        report of the hottest locks in each report interval.
+
+        @type report_interval: float
+        @param report_interval: The interval (in seconds) between
+        each report of the hottest locks.
+        @type deadlock_timeout: float
+        @param deadlock_timeout: The time (in seconds) after which
+        an acquisition is considered blocked.
+        """
+
+        report_time = time.time()
+
+        while self.lock_active:
+            # sleeps for the check interval and in case the
+            # monitor is no longer active returns immediately
+            time.sleep(DEFAULT_LOCK_CHECK_INTERVAL)
+            if not self.lock_active: return
+
+            try:
+                # retrieves the report of the blocked acquisitions (wait-for
+                # graph) and prints it as a warning (in case it exists)
+                blocked_report = self.lock_monitor.get_blocked_report(deadlock_timeout)
+                blocked_report and self.warning("Lock acquisition blocked for more than %.1fs\n%s", deadlock_timeout, blocked_report)
+
+                # in case the report interval has not elapsed
+                # there's no report of the hottest locks
+                if not report_interval or time.time() - report_time < report_interval: continue
+                report_time = time.time()
+
+                # prints an info message for each of the hottest locks
+                # (with the top contending call sites)
+                for name, _acquisitions, contentions, wait_time, wait_maximum, hold_time, _hold_maximum, sites in self.get_lock_report(5):
+                    sites_string = ", ".join("%s %.3fs" % (site, site_wait_time) for site, _count, site_wait_time in sites)
+                    self.info("Lock '%s' waited %.3fs in %d contentions (maximum %.3fs, held %.3fs), sites: %s", name, wait_time, contentions, wait_maximum, hold_time, sites_string)
+            except BaseException, exception:
+                # prints an error message
+                self.error("Problem in the lock monitor: %s" % unicode(exception))
+
     def stop_plugin_complete_by_id(self, plugin_id):
         """
         Stops a plugin with the given id, removing it and the referring module from the plugin system.
@@ -2495,8 +4223,9 @@ class PluginManager:
         @param module: The name of the plugin module to stop.
         """
 
-        # retrieves the module object from the loaded modules
-        module_obj = sys.modules[module]
+        # retrieves the module object from the loaded modules, the
+        # module may not be loaded in case the plugin is a proxy
+        module_obj = sys.modules.get(module, None)
 
         # retrieves the plugin class for the given module
         plugin_class = self.get_plugin_class_by_module_name(module)
@@ -2504,12 +4233,16 @@ class PluginManager:
         # stops the plugin
         self.stop_plugin(plugin_class)
 
-        # removes the plugin class from the plugin
-        delattr(module_obj, plugin_class.__name__)
-
         # adds the plugin class to the list of deleted plugin classes
         self.deleted_plugin_classes.append(plugin_class)
 
+        # in case the module is not loaded there's no
+        # need to remove it (returns immediately)
+        if not module_obj: return
+
+        # removes the plugin class from the plugin
+        delattr(module_obj, plugin_class.__name__)
+
         # deletes the module from the list of loaded modules
         del sys.modules[module]
 
@@ -2559,6 +4292,8 @@ class PluginManager:
         del self.plugin_instances_map[plugin_id]
         del self.plugin_names_map[plugin_name]
         del self.plugin_dirs_map[plugin_id]
+        self.invalidate_resolution_cache()
+        self.unpublish_plugin_snapshot(plugin_instance)
 
         # unregisters the plugin capabilities in the plugin manager
         self.unregister_plugin_capabilities(plugin_instance)
@@ -2690,43 +4425,10 @@ class PluginManager:
         """
 
         # iterates over all the plugin instance capabilities
+        # adding the plugin to the capabilities index (the
+        # super capabilities are handled by the index hierarchy)
         for capability in plugin.capabilities:
-            # retrieves the capability and super capabilities list
-            capability_and_super_capabilites_list = capability_and_super_capabilites(capability)
-
-            # retrieves the capability and super capabilities list length
-            capability_and_super_capabilites_list_length = len(capability_and_super_capabilites_list)
-
-            # iterates over the capability or super capabilities list length range
-            for capability_or_super_capability_index in range(capability_and_super_capabilites_list_length):
-                # retrieves the capability from the capability and super capabilities list
-                capability = capability_and_super_capabilites_list[capability_or_super_capability_index]
-
-                # retrieves the sub capabilities list from the the capability and super capabilities list
-                sub_capabilities_list = capability_and_super_capabilites_list[capability_or_super_capability_index + 1:]
-
-                # in case the capability does not exists in the capabilities plugin instances map
-                if not capability in self.capabilities_plugin_instances_map:
-                    # creates a new list as the value for the capability in the
-                    # capabilities plugin instances map
-                    self.capabilities_plugin_instances_map[capability] = []
-
-                # adds the plugin to the capabilities plugin instances map for the capability
-                self.capabilities_plugin_instances_map[capability].append(plugin)
-
-                # in case the capability does not exists in the capabilities and sub capabilities map
-                if not capability in self.capabilities_sub_capabilities_map:
-                    # creates a new list as the value for the capability in the
-                    # capabilities and sub capabilities map
-                    self.capabilities_sub_capabilities_map[capability] = []
-
-                # iterates over all the sub capabilities in the sub capabilities list
-                for sub_capability in sub_capabilities_list:
-                    # in case the sub capability is not defined for the capability in the
-                    # capabilities sub capabilities map
-                    if not sub_capability in self.capabilities_sub_capabilities_map[capability]:
-                        # adds the sub capability to the capabilities sub capabilities map for the capability
-                        self.capabilities_sub_capabilities_map[capability].append(sub_capability)
+            self.capabilities_index.add(capability, plugin)
 
     def unregister_plugin_capabilities(self, plugin):
         """
@@ -2737,42 +4439,9 @@ class PluginManager:
         """
 
         # iterates over all the plugin instance capabilities
+        # removing the plugin from the capabilities index
         for capability in plugin.capabilities:
-            # retrieves the capability and super capabilities list
-            capability_and_super_capabilites_list = capability_and_super_capabilites(capability)
-
-            # retrieves the capability and super capabilities list length
-            capability_and_super_capabilites_list_length = len(capability_and_super_capabilites_list)
-
-            # iterates over the capability and super capabilities list length range
-            for capability_or_super_capability_index in range(capability_and_super_capabilites_list_length):
-                # retrieves the capability from the capability and super capabilities list
-                capability = capability_and_super_capabilites_list[capability_or_super_capability_index]
-
-                # retrieves the sub capabilities list from the the capability and super capabilities list
-                sub_capabilities_list = capability_and_super_capabilites_list[capability_or_super_capability_index + 1:]
-
-                # in case the capability exists in the capabilities plugin instances map
-                if capability in self.capabilities_plugin_instances_map:
-                    # in case the plugin exists in the value for the capability in the
-                    # capabilities plugin instances map
-                    if plugin in self.capabilities_plugin_instances_map[capability]:
-                        # removes the plugin from the capabilities plugin instances map value for
-                        # the capability
-                        self.capabilities_plugin_instances_map[capability].remove(plugin)
-
-                # in case the capability exists in the capabilities and sub capabilities map
-                if capability in self.capabilities_sub_capabilities_map:
-                    # iterates over all the sub capabilities in the sub capabilities list
-                    for sub_capability in sub_capabilities_list:
-                        # in case the sub capability exists the in the capabilities sub capabilities map
-                        # for the capability
-                        if sub_capability in self.capabilities_sub_capabilities_map[capability]:
-                            # in case this is the only instance to be registered with the given sub capability
-                            if len(self.capabilities_plugin_instances_map[sub_capability]) == 0:
-                                # removes the sub capability from the value of capabilities sub capabilities map
-                                # for the given capability
-                                self.capabilities_sub_capabilities_map[capability].remove(sub_capability)
+            self.capabilities_index.remove(capability, plugin)
 
     def load_plugin_manager_plugins(self):
         """
@@ -2796,12 +4465,15 @@ class PluginManager:
         # not mean to be loaded in execution command
         if self.execution_command: return
 
-        # iterates over all the plugin instances
-        for plugin in self.plugin_instances:
-            # searches for the startup type in the plugin capabilities
-            # in case the plugins contains such capability must load
-            # it because it's considered to be a startup plugin
-            if STARTUP_TYPE in plugin.capabilities: self._load_plugin(plugin, None, STARTUP_TYPE)
+        # retrieves the startup plugins, the ones that contain the startup
+        # type in the plugin capabilities and in case the concurrent
+        # loading is enabled loads them using the load graph
+        plugins = [plugin for plugin in self.plugin_instances if STARTUP_TYPE in plugin.capabilities]
+        if self.is_concurrent_loading(): self.load_plugins_concurrent(plugins, STARTUP_TYPE); return
+
+        # iterates over all the startup plugins to load them
+        # (serial loading in the plugin instances order)
+        for plugin in plugins: self._load_plugin(plugin, None, STARTUP_TYPE)
 
     def load_main_plugins(self):
         """
@@ -2813,47 +4485,590 @@ class PluginManager:
         # not mean to be loaded in execution command
         if self.execution_command: return
 
-        # iterates over all the plugin instances
-        for plugin in self.plugin_instances:
-            # searches for the main type in the plugin capabilities
-            # in case the plugins contains such capability must load
-            # it because it's considered to be a main plugin
-            if MAIN_TYPE in plugin.capabilities: self._load_plugin(plugin, None, MAIN_TYPE)
+        # retrieves the main plugins, the ones that contain the main
+        # type in the plugin capabilities and in case the concurrent
+        # loading is enabled loads them using the load graph
+        plugins = [plugin for plugin in self.plugin_instances if MAIN_TYPE in plugin.capabilities]
+        if self.is_concurrent_loading(): self.load_plugins_concurrent(plugins, MAIN_TYPE); return
 
-    def install_signal_handlers(self):
-        """
-        Installs the signal handlers for the plugin
-        manager.
+        # iterates over all the main plugins to load them
+        # (serial loading in the plugin instances order)
+        for plugin in plugins: self._load_plugin(plugin, None, MAIN_TYPE)
+
+    def is_concurrent_loading(self):
         """
+        Retrieves if the startup loading of the plugins should be
+        done concurrently, using a pool of worker threads.
+        This is only possible in case threads are allowed and the
+        number of load workers is configured to more than one.
 
-        # in case the installation of the signal handlers is
-        # currently disabled returns immediately avoids the
-        # registration of the handlers
-        if not self.install_signals: return
+        @rtype: bool
+        @return: If the startup loading of plugins is concurrent.
+        """
 
-        # installs the sigterm handler for plugin manager kill
-        # (may create problems with existing handlers)
-        signal.signal(signal.SIGTERM, self._kill_system_signal_handler)
+        load_workers = plugin_manager_configuration.get("load_workers", 0)
+        return self.allow_threads and load_workers > 1
 
-    def notify_load_complete_loaded_plugins(self):
-        """
-        Notifies the loaded plugins about the load complete.
+    def load_plugins_concurrent(self, plugins, loading_type):
         """
+        Loads the given (root) plugins and the plugins they require
+        (dependencies and allowed plugins) concurrently.
+        The load graph is built up front and the plugins are loaded
+        in waves (topological order of the dependencies) on a bounded
+        pool of workers, each wave containing only plugins whose
+        dependencies are already loaded. The injection of allowed
+        plugins that are still pending in the graph is deferred to
+        the end of the wave that loads them.
+        The plugins that are not thread safe are loaded serially in
+        each wave and the ones that are part of a cycle or depend on
+        a plugin that failed to load are loaded serially at the end.
 
-        # retrieves the loaded plugins list
-        loaded_plugins_list = self.get_all_loaded_plugins()
+        @type plugins: List
+        @param plugins: The list of (root) plugins to be loaded.
+        @type loading_type: String
+        @param loading_type: The loading type to be used in the
+        loading of the root plugins.
+        """
+
+        # builds the load graph for the plugins retrieving the ordered
+        # list of plugins, the map of dependencies and the map with
+        # the load types, then creates the sets for control
+        plugins_list, dependencies_map, types_map = self._get_load_graph(plugins, loading_type)
+        remaining = set([plugin.id for plugin in plugins_list])
+        failed = set()
+        serial = []
+
+        # retrieves the number of load workers and creates
+        # the pool of workers to be used in the loading
+        load_workers = plugin_manager_configuration.get("load_workers", 0)
+        pool = colony.libs.pool_util.ThreadPool(load_workers, "load")
+
+        # sets the load lock so that the changes to the shared
+        # structures are serialized during the concurrent loading
+        # and sets the pending plugins as the ones in the graph
+        self.load_lock = self.retrieve_lock
+        self.load_pending = set(remaining)
+        self.load_deferred = {}
 
-        # iterates over all the loaded plugins
-        for loaded_plugin in loaded_plugins_list:
-            # notifies the plugin about the load complete
-            loaded_plugin.init_complete()
+        try:
+            while remaining:
+                # creates the wave of plugins ready to be loaded (all the
+                # dependencies are loaded) and moves the plugins that
+                # depend on a failed plugin to the serial loading
+                wave = []
+                for plugin in plugins_list:
+                    if not plugin.id in remaining: continue
+                    dependency_ids = dependencies_map[plugin.id]
+                    if [value for value in dependency_ids if value in failed]:
+                        remaining.remove(plugin.id); failed.add(plugin.id); serial.append(plugin)
+                    elif not [value for value in dependency_ids if value in remaining]:
+                        wave.append(plugin)
+
+                # in case there are no plugins ready to be loaded, the
+                # remaining plugins are part of a cycle (serial loading)
+                if not wave:
+                    if not remaining: break
+                    self.info("Cycle found in the load graph, loading %d plugins serially", len(remaining))
+                    serial.extend([plugin for plugin in plugins_list if plugin.id in remaining])
+                    break
 
-    def notify_load_complete_handlers(self):
-        """
-        Notifies the init complete handlers about the load complete.
+                # loads the thread safe plugins of the wave concurrently and
+                # then the remaining ones serially (deterministic order)
+                self.debug("Loading wave of %d plugins concurrently", len(wave))
+                futures = [pool.submit(self._load_plugin_graph, plugin, types_map[plugin.id]) for plugin in wave if plugin.thread_safe]
+                for future in futures: future.wait()
+                for plugin in wave:
+                    if not plugin.thread_safe: self._load_plugin_graph(plugin, types_map[plugin.id])
+                for future in futures: future.result()
+
+                # updates the control sets with the result of the wave
+                # marking the plugins not loaded as failed
+                for plugin in wave:
+                    remaining.remove(plugin.id)
+                    self.load_pending.discard(plugin.id)
+                    if not plugin.is_loaded_or_lazy_loaded(): failed.add(plugin.id)
+
+                # injects (serially) the allowed plugins loaded in the
+                # wave whose injection was deferred (only the deferred
+                # injections, the remaining ones are already done)
+                self._inject_deferred([plugin.id for plugin in wave])
+        finally:
+            # unsets the load lock and the pending plugins and
+            # stops the pool of workers (no more loading required)
+            self.load_lock = None
+            self.load_pending = None
+            pool.stop()
+
+        try:
+            # loads the remaining plugins serially in the order of the
+            # load graph and injects the remaining deferred injections
+            for plugin in serial: self._load_plugin_graph(plugin, types_map[plugin.id])
+            self._inject_deferred([plugin.id for plugin in serial])
+        finally:
+            # unsets the deferred injections (no more
+            # injections are going to be deferred)
+            self.load_deferred = None
+
+    def _get_load_graph(self, plugins, loading_type):
         """
+        Builds the load graph for the given (root) plugins, the graph
+        includes the plugins required for their loading (dependencies
+        and allowed plugins), transitively.
+        Only the dependencies are used as edges of the graph, the allowed
+        plugins are injected after being loaded.
 
-        # iterates over all the init complete handlers
+        @type plugins: List
+        @param plugins: The list of (root) plugins.
+        @type loading_type: String
+        @param loading_type: The loading type of the root plugins.
+        @rtype: Tuple
+        @return: The ordered list of plugins in the graph, the map
+        associating the plugin id with the ids of the dependency plugins
+        and the map associating the plugin id with the load type tuple.
+        """
+
+        # in case the graph for the root plugins was built in the
+        # (replayed) load plan and all of the plugins are available
+        # the graph is retrieved from the plan
+        load_plan = self.load_plan
+        graph_key = (loading_type, tuple([plugin.id for plugin in plugins]))
+        graph = load_plan and load_plan.get_graph(graph_key)
+        if graph:
+            plugin_ids, dependencies_map, types_map = graph
+            plugins_list = [self.plugin_instances_map.get(plugin_id, None) for plugin_id in plugin_ids]
+            if not None in plugins_list: return plugins_list, dependencies_map, types_map
+
+        # creates the structures that represent the graph
+        # the load types are set for the root plugins
+        plugins_list = []
+        dependencies_map = {}
+        types_map = {}
+        for plugin in plugins: types_map[plugin.id] = (None, loading_type)
+
+        # iterates (depth first) over all the plugins in the graph
+        # starting with the root ones (in the original order)
+        stack = list(reversed(plugins))
+        while stack:
+            plugin = stack.pop()
+            if plugin.id in dependencies_map: continue
+
+            # retrieves the required plugins, the plugin dependencies
+            # and the plugins that provide the allowed capabilities
+            required_plugins = []
+            for plugin_dependency in plugin.dependencies:
+                if not plugin_dependency.__class__ == PluginDependency: continue
+                dependency_plugin = self._get_plugin_by_id_and_version(plugin_dependency.plugin_id, plugin_dependency.plugin_version)
+                if not dependency_plugin: continue
+                required_plugins.append((dependency_plugin, DEPENDENCY_TYPE))
+            for capability_allowed in plugin.capabilities_allowed:
+                if type(capability_allowed) == types.TupleType: capability_allowed, _diffusion_policy = capability_allowed
+                for allowed_plugin in self._get_plugins_by_capability_cache(capability_allowed):
+                    if allowed_plugin == plugin: continue
+                    required_plugins.append((allowed_plugin, ALLOWED_TYPE))
+
+            # adds the plugin to the graph and the required plugins
+            # that are not yet loaded to the stack (to be visited),
+            # the dependencies are set as edges of the graph
+            plugins_list.append(plugin)
+            dependencies_map[plugin.id] = []
+            for required_plugin, required_type in required_plugins:
+                if required_plugin.is_loaded_or_lazy_loaded(): continue
+                if required_type == DEPENDENCY_TYPE: dependencies_map[plugin.id].append(required_plugin.id)
+                if not required_plugin.id in types_map: types_map[required_plugin.id] = (required_type, None)
+                stack.append(required_plugin)
+
+        # records the graph in the load plan (in case it's active)
+        # and returns the graph structures
+        graph = ([plugin.id for plugin in plugins_list], dependencies_map, types_map)
+        load_plan and load_plan.set_graph(graph_key, graph)
+        return plugins_list, dependencies_map, types_map
+
+    def is_concurrent_unloading(self):
+        """
+        Retrieves if the unloading of the system should be done
+        concurrently, using a pool of worker threads.
+        This is only possible in case threads are allowed and the
+        number of unload workers is configured to more than one.
+
+        @rtype: bool
+        @return: If the unloading of the system is concurrent.
+        """
+
+        unload_workers = plugin_manager_configuration.get("unload_workers", 0)
+        return self.allow_threads and unload_workers > 1
+
+    def unload_plugins_concurrent(self, plugins):
+        """
+        Unloads the given plugins concurrently in reverse dependency
+        order, a plugin is only unloaded after the plugins that depend
+        on it (and the plugins in which it's allowed) are unloaded.
+        The plugins are unloaded in waves on a bounded pool of workers
+        and each plugin has a deadline for its unloading, after which
+        it's abandoned (reported) and the unloading proceeds.
+        The plugins that are not thread safe are unloaded one at a time
+        and the ones that are part of a cycle are unloaded at the end.
+        The plugins required by an abandoned plugin (transitively) are
+        kept loaded (reported), as the abandoned unloading may still be
+        using them.
+
+        @type plugins: List
+        @param plugins: The list of (loaded) plugins to be unloaded.
+        """
+
+        # builds the unload graph associating the plugin id with the
+        # ids of the plugins that must be unloaded before it, the
+        # dependent plugins and the plugins in which it's allowed
+        plugin_ids = set([plugin.id for plugin in plugins])
+        before_map = {}
+        for plugin in plugins:
+            before_ids = [value.id for value in self.get_plugin_dependent_plugins_map(plugin.id)]
+            before_ids += [value[0].id for value in self.get_plugin_allowed_plugins_map(plugin.id)]
+            before_map[plugin.id] = [value for value in before_ids if value in plugin_ids and not value == plugin.id]
+        remaining = set(plugin_ids)
+        kept_ids = set()
+        serial = []
+
+        # retrieves the number of unload workers and the (per plugin)
+        # timeout and creates the pool of workers for the unloading
+        unload_workers = plugin_manager_configuration.get("unload_workers", 0)
+        unload_timeout = plugin_manager_configuration.get("unload_timeout", DEFAULT_UNLOAD_PLUGIN_TIMEOUT)
+        pool = colony.libs.pool_util.ThreadPool(unload_workers, "unload")
+
+        try:
+            while remaining:
+                # keeps the plugins that must be unloaded after an abandoned
+                # (or kept) plugin, as the abandoned unloading may still be
+                # running, the plugins they require are kept in the next
+                # iteration (once they're no longer remaining)
+                kept = [plugin for plugin in plugins if plugin.id in remaining and\
+                    self._is_unload_kept(before_map[plugin.id], kept_ids)]
+                for plugin in kept: self._keep_unload(plugin, remaining, kept_ids)
+                if kept: continue
+
+                # creates the wave of plugins ready to be unloaded (all
+                # the plugins that must be unloaded before are unloaded)
+                wave = [plugin for plugin in plugins if plugin.id in remaining and\
+                    not [value for value in before_map[plugin.id] if value in remaining]]
+
+                # in case there are no plugins ready to be unloaded, the
+                # remaining plugins are part of a cycle (serial unloading)
+                if not wave:
+                    self.info("Cycle found in the unload graph, unloading %d plugins serially", len(remaining))
+                    serial.extend([plugin for plugin in plugins if plugin.id in remaining])
+                    break
+
+                # unloads the thread safe plugins of the wave concurrently
+                # and then the remaining ones one at a time
+                self.debug("Unloading wave of %d plugins concurrently", len(wave))
+                futures = [(plugin, pool.submit(self._unload_plugin_graph, plugin)) for plugin in wave if plugin.thread_safe]
+                self._wait_unload_futures(futures, pool, unload_timeout)
+                for plugin in wave:
+                    if plugin.thread_safe: continue
+                    self._wait_unload_futures([(plugin, pool.submit(self._unload_plugin_graph, plugin))], pool, unload_timeout)
+
+                # removes the plugins of the wave from the remaining ones
+                for plugin in wave: remaining.remove(plugin.id)
+
+            # unloads the plugins that are part of a cycle one at
+            # a time (the dependent plugins are unloaded recursively)
+            for plugin in serial:
+                if not plugin.is_loaded(): continue
+                if self._is_unload_kept(before_map[plugin.id], kept_ids):
+                    self._keep_unload(plugin, remaining, kept_ids); continue
+                self._wait_unload_futures([(plugin, pool.submit(self._unload_plugin_graph, plugin))], pool, unload_timeout)
+        finally:
+            # stops the pool of workers (not waiting for the workers
+            # in case there are abandoned unloadings)
+            pool.stop(self.unload_abandoned and 0.0 or None)
+
+    def get_unload_report(self):
+        """
+        Retrieves the report of the last unloading of the system,
+        as a list of tuples containing the plugin id, the duration
+        (in seconds) and the final state of the unloading (unloaded,
+        failed, timeout or kept), sorted by duration (slowest first).
+
+        @rtype: List
+        @return: The report of the last unloading of the system.
+        """
+
+        unload_report = list(self.unload_report)
+        unload_report.sort(key = lambda value: value[1], reverse = True)
+        return unload_report
+
+    def log_unload_report(self, elapsed_time):
+        """
+        Logs the report of the last unloading of the system, with
+        the plugins that consumed most of the unloading time.
+
+        @type elapsed_time: float
+        @param elapsed_time: The total time (in seconds) used in
+        the unloading of the system.
+        """
+
+        # retrieves the unload report and logs the total time and the
+        # plugins that consumed most of the unloading time
+        unload_report = self.get_unload_report()
+        self.info("Unloaded %d plugins in %.2f seconds", len(unload_report), elapsed_time)
+        for plugin_id, duration, state in unload_report[:UNLOAD_REPORT_SIZE]:
+            self.info("Unloading of '%s' took %.2f seconds (%s)", plugin_id, duration, state)
+
+    def _unload_plugin_graph(self, plugin):
+        """
+        Unloads the given plugin using the unloading type defined by
+        its capabilities (main, thread or normal) and records the
+        duration of the unloading in the unload report.
+
+        @type plugin: Plugin
+        @param plugin: The plugin to be unloaded.
+        @rtype: bool
+        @return: The result of the plugin unload.
+        """
+
+        # retrieves the unloading type for the plugin, from
+        # the main and thread type capabilities
+        if MAIN_TYPE in plugin.capabilities: unloading_type = MAIN_TYPE
+        elif THREAD_TYPE in plugin.capabilities: unloading_type = THREAD_TYPE
+        else: unloading_type = None
+
+        # sets the plugin as running (for deadline control) and
+        # unloads it, removing it from running after the unloading
+        start_time = time.time()
+        self.unload_running[plugin.id] = (start_time, threading.currentThread())
+        try: result = self._unload_plugin(plugin, None, unloading_type)
+        finally: self.unload_running.pop(plugin.id, None)
+
+        # adds the result of the unloading to the unload report, in case
+        # the plugin was abandoned it's already reported (timeout)
+        if not plugin.id in self.unload_abandoned:
+            self.unload_report.append((plugin.id, time.time() - start_time, result and "unloaded" or "failed"))
+
+        # returns the result
+        return result
+
+    def _is_unload_kept(self, before_ids, kept_ids):
+        """
+        Retrieves if a plugin must be kept (not unloaded) for the given
+        ids of the plugins that must be unloaded before it, in case any
+        of them is abandoned or kept the plugin must be kept.
+
+        @type before_ids: List
+        @param before_ids: The ids of the plugins that must be
+        unloaded before the plugin.
+        @type kept_ids: Set
+        @param kept_ids: The ids of the plugins already kept.
+        @rtype: bool
+        @return: If the plugin must be kept (not unloaded).
+        """
+
+        for before_id in before_ids:
+            if before_id in self.unload_abandoned or before_id in kept_ids: return True
+        return False
+
+    def _keep_unload(self, plugin, remaining, kept_ids):
+        """
+        Keeps the given plugin loaded (not unloaded), removing it from
+        the remaining plugins and reporting it in the unload report.
+
+        @type plugin: Plugin
+        @param plugin: The plugin to be kept.
+        @type remaining: Set
+        @param remaining: The ids of the remaining plugins.
+        @type kept_ids: Set
+        @param kept_ids: The ids of the plugins already kept.
+        """
+
+        remaining.discard(plugin.id)
+        kept_ids.add(plugin.id)
+        self.unload_report.append((plugin.id, 0.0, "kept"))
+        self.warning("Keeping plugin '%s' v%s loaded, required by an abandoned unloading", plugin.name, plugin.version)
+
+    def _wait_unload_futures(self, futures, pool, timeout):
+        """
+        Waits for the unloading of the plugins in the given list of
+        futures, in case the unloading of a plugin exceeds the timeout
+        (since its start) the plugin is abandoned and its worker is
+        detached from the pool (so that the unloading proceeds).
+
+        @type futures: List
+        @param futures: The list of tuples containing the plugin
+        and the future of its unloading.
+        @type pool: ThreadPool
+        @param pool: The pool of workers used in the unloading.
+        @type timeout: float
+        @param timeout: The (per plugin) timeout for the unloading.
+        """
+
+        # creates the list of pending futures
+        # and iterates while there are pending ones
+        pending = list(futures)
+        while pending:
+            # retrieves the first pending plugin and future and waits
+            # for it until its deadline (or polls it in case the plugin
+            # unloading is not yet started)
+            plugin, future = pending[0]
+            running = self.unload_running.get(plugin.id, None)
+            wait_timeout = running and max(running[0] + timeout - time.time(), 0.0) or UNLOAD_POLL_TIMEOUT
+
+            # in case the future is finished logs the (possible)
+            # exception raised in the unloading and continues
+            if future.wait(wait_timeout):
+                pending.pop(0)
+                try: future.result()
+                except BaseException, exception: self.error("Problem unloading plugin '%s' v%s: %s" % (plugin.name, plugin.version, unicode(exception)))
+                continue
+
+            # in case the unloading of the plugin is not started or not
+            # yet expired continues waiting for it
+            running = self.unload_running.get(plugin.id, None)
+            if not running or time.time() - running[0] < timeout: continue
+
+            # abandons the unloading of the plugin (reporting it) and
+            # detaches its worker so that a new worker is started
+            pending.pop(0)
+            self.unload_abandoned.add(plugin.id)
+            self.unload_report.append((plugin.id, time.time() - running[0], "timeout"))
+            self.warning("Unloading of plugin '%s' v%s exceeded the deadline (%.2f seconds), abandoning it", plugin.name, plugin.version, timeout)
+            pool.detach(running[1])
+
+    def _load_plugin_graph(self, plugin, load_type):
+        """
+        Loads the given plugin from the load graph using the given
+        load type tuple (type and loading type).
+
+        @type plugin: Plugin
+        @param plugin: The plugin to be loaded.
+        @type load_type: Tuple
+        @param load_type: The tuple containing the type and the
+        loading type for the plugin.
+        """
+
+        # unpacks the load type and in case the plugin is a root
+        # plugin (loading type defined) loads it directly injecting
+        # it in the allowing plugins (as the injection from the
+        # allowing plugins may have been deferred) otherwise uses
+        # the loading that injects the plugin in the allowing ones
+        type, loading_type = load_type
+        if loading_type: self._load_plugin(plugin, type, loading_type) and self.inject_all_allowed(plugin)
+        else: self.__load_plugin(plugin, type)
+
+    def _defer_allowed(self, plugin, allowed_plugin, capability):
+        """
+        Defers the injection of the given allowed plugin (pending in
+        the concurrent loading) in the given plugin for the given
+        capability, the injection is done once the allowed plugin
+        is loaded (end of its wave).
+
+        @type plugin: Plugin
+        @param plugin: The plugin to have the allowed plugin injected.
+        @type allowed_plugin: Plugin
+        @param allowed_plugin: The (pending) allowed plugin.
+        @type capability: String/Tuple
+        @param capability: The capability (allowed) for which the
+        allowed plugin is going to be injected.
+        """
+
+        load_lock = self.load_lock
+        load_lock and load_lock.acquire()
+        try:
+            deferred = self.load_deferred.setdefault((plugin.id, allowed_plugin.id), [])
+            if not capability in [value[2] for value in deferred]: deferred.append((plugin, allowed_plugin, capability))
+        finally:
+            load_lock and load_lock.release()
+
+    def _is_load_deferred(self, plugin, allowed_plugin):
+        """
+        Retrieves if the injection of the given allowed plugin in the
+        given plugin is deferred in the current concurrent loading, in
+        which case the injection is done by the deferred replay.
+
+        @type plugin: Plugin
+        @param plugin: The plugin to have the allowed plugin injected.
+        @type allowed_plugin: Plugin
+        @param allowed_plugin: The allowed plugin.
+        @rtype: bool
+        @return: If the injection of the allowed plugin is deferred.
+        """
+
+        load_deferred = self.load_deferred
+        return bool(load_deferred) and (plugin.id, allowed_plugin.id) in load_deferred
+
+    def _inject_deferred(self, plugin_ids):
+        """
+        Injects the deferred allowed plugins with the given ids (loaded)
+        in the plugins that allow them, for the capabilities for which
+        the injection was deferred.
+
+        @type plugin_ids: List
+        @param plugin_ids: The list of ids of the allowed plugins to
+        have their deferred injections done.
+        """
+
+        # retrieves (and removes) the deferred injections for the
+        # allowed plugins, sorted by the order of the allowed plugins
+        # and then by the id of the allowing plugin (deterministic)
+        plugin_ids = set(plugin_ids)
+        keys = sorted(key for key in self.load_deferred if key[1] in plugin_ids)
+        deferred = []
+        for key in keys: deferred.extend(self.load_deferred.pop(key))
+
+        # iterates over the deferred injections, loading the allowed
+        # plugin (if necessary) with allowed type and injecting it
+        # in the (loaded) allowing plugin
+        for plugin, allowed_plugin, capability in deferred:
+            if not plugin.is_loaded(): continue
+            if self.__load_plugin(allowed_plugin, ALLOWED_TYPE): self._inject_allowed(plugin, allowed_plugin, capability)
+
+    def _is_load_pending(self, plugin):
+        """
+        Retrieves if the given plugin is pending to be loaded
+        in the current concurrent loading (if any).
+
+        @type plugin: Plugin
+        @param plugin: The plugin to be checked.
+        @rtype: bool
+        @return: If the plugin is pending to be loaded.
+        """
+
+        load_pending = self.load_pending
+        return bool(load_pending) and plugin.id in load_pending
+
+    def install_signal_handlers(self):
+        """
+        Installs the signal handlers for the plugin
+        manager.
+        """
+
+        # in case the installation of the signal handlers is
+        # currently disabled returns immediately avoids the
+        # registration of the handlers
+        if not self.install_signals: return
+
+        # installs the sigterm handler for plugin manager kill
+        # (may create problems with existing handlers)
+        signal.signal(signal.SIGTERM, self._kill_system_signal_handler)
+
+    def notify_load_complete_loaded_plugins(self):
+        """
+        Notifies the loaded plugins about the load complete.
+        """
+
+        # retrieves the loaded plugins list
+        loaded_plugins_list = self.get_all_loaded_plugins()
+
+        # iterates over all the loaded plugins
+        for loaded_plugin in loaded_plugins_list:
+            # notifies the plugin about the load complete
+            span = self.begin_load_span("init_complete", loaded_plugin)
+            loaded_plugin.init_complete()
+            self.end_load_span(span)
+
+    def notify_load_complete_handlers(self):
+        """
+        Notifies the init complete handlers about the load complete.
+        """
+
+        # iterates over all the init complete handlers
         for init_complete_handler in self.init_complete_handlers:
             init_complete_handler()
 
@@ -3017,7 +5232,7 @@ class PluginManager:
         # unloads the system using no thread safety
         self.unload_system(False)
 
-    def __load_plugin(self, plugin, type = None, loading_type = None):
+    def __load_plugin(self, plugin, type = None, loading_type = None, inject = True):
         """
         Loads the given plugin with the given type and loading type.
         The loading of the plugin consists the loading of the plugin itself (_load_plugin)
@@ -3029,6 +5244,9 @@ class PluginManager:
         @param type: The type of plugin to be loaded.
         @type loading_type: String
         @param loading_type: The loading type to be used.
+        @type inject: bool
+        @param inject: If the plugin should be injected in all the
+        plugins that allow it (the injection may be deferred).
         @rtype: bool
         @return: The result of the plugin load.
         """
@@ -3044,7 +5262,7 @@ class PluginManager:
         # in case the plugin does not pass the test plugin load
         if not self.test_plugin_load(plugin):
             # prints an info message
-            self.info("Plugin '%s' v%s not ready to be loaded" % (plugin.name, plugin.version))
+            self.info("Plugin '%s' v%s not ready to be loaded", plugin.name, plugin.version)
 
             # returns false
             return False
@@ -3060,8 +5278,8 @@ class PluginManager:
                 return False
 
         # injects the plugin in all the plugins that allow
-        # one of it's capabilities.
-        self.inject_all_allowed(plugin)
+        # one of it's capabilities (in case it's requested)
+        inject and self.inject_all_allowed(plugin)
 
         # returns true
         return True
@@ -3085,6 +5303,34 @@ class PluginManager:
         @requires: The result of the plugin load.
         """
 
+        # in case the load profiler is not active or the plugin
+        # is already loaded the steps are run directly (no span)
+        load_profiler = self.load_profiler
+        if not load_profiler or plugin.is_loaded():
+            return self._load_plugin_steps(plugin, type, loading_type)
+
+        # runs the steps of the loading of the plugin
+        # recording them under a (plugin) span
+        span = load_profiler.begin(plugin.id, "plugin", {"type" : type, "loading_type" : loading_type})
+        try: return self._load_plugin_steps(plugin, type, loading_type)
+        finally: self.end_load_span(span)
+
+    def _load_plugin_steps(self, plugin, type = None, loading_type = None):
+        """
+        Runs the various steps of the loading of the given plugin
+        with the given type and loading type, the steps are recorded
+        as spans in case the load profiler is active.
+
+        @type plugin: Plugin
+        @param plugin: The plugin to be loaded.
+        @type type: String
+        @param type: The type of plugin to be loaded.
+        @type loading_type: String
+        @param loading_type: The loading type to be used.
+        @rtype: bool
+        @requires: The result of the plugin load.
+        """
+
         # generates the init load plugin event
         self.generate_event("plugin_manager.init_load_plugin", [plugin.id, plugin.version, plugin])
 
@@ -3107,17 +5353,35 @@ class PluginManager:
             # returns true
             return True
 
+        # in case the plugin is a proxy and the load is not a lazy
+        # one the real plugin must be materialized (module import)
+        if isinstance(plugin, PluginProxy) and\
+            (plugin.loading_type == EAGER_LOADING_TYPE or type == FULL_LOAD_TYPE):
+            span = self.begin_load_span("materialize_plugin", plugin)
+            materialized = self.materialize_plugin(plugin)
+            self.end_load_span(span)
+            if not materialized: return False
+
+        # tests the plugin for loading (pre-conditions)
+        span = self.begin_load_span("test_plugin_load", plugin)
+        test_result = self.test_plugin_load(plugin)
+        self.end_load_span(span)
+
         # in case the plugin load is not successful
-        if not self.test_plugin_load(plugin):
+        if not test_result:
             # prints an info message
-            self.info("Plugin '%s' v%s not ready to be loaded" % (plugin.name, plugin.version))
+            self.info("Plugin '%s' v%s not ready to be loaded", plugin.name, plugin.version)
 
             # returns false
             return False
 
         # in case a type is defined, prints an information
         # message about this loading type
-        if type: self.info("Loading of type: '%s'" % (type))
+        if type: self.info("Loading of type: '%s'", type)
+
+        # begins the span for the (lazy) load of the plugin
+        is_lazy_load = plugin.loading_type == LAZY_LOADING_TYPE and not type == FULL_LOAD_TYPE
+        span = self.begin_load_span(is_lazy_load and "lazy_load_plugin" or "load_plugin", plugin)
 
         # in case the plugin to be loaded is either of type main or thread
         if loading_type == MAIN_TYPE or loading_type == THREAD_TYPE:
@@ -3127,13 +5391,11 @@ class PluginManager:
                 plugin_thread = self.plugin_threads_map[plugin.id]
 
                 # prints an info message
-                self.info("Thread restarted for plugin '%s' v%s" % (plugin.name, plugin.version))
+                self.info("Thread restarted for plugin '%s' v%s", plugin.name, plugin.version)
             else:
-                # creates a new tread to run the main plugin
-                plugin_thread = PluginThread(plugin)
-
-                # starts the thread
-                plugin_thread.start()
+                # creates a new plugin thread (events queue) to run the
+                # main plugin in the (shared) lifecycle executor
+                plugin_thread = PluginThread(plugin, self.lifecycle_executor)
 
                 # adds the plugin thread to the plugin threads list
                 self.plugin_threads.append(plugin_thread)
@@ -3142,7 +5404,7 @@ class PluginManager:
                 self.plugin_threads_map[plugin.id] = plugin_thread
 
                 # prints an info message
-                self.info("New thread started for plugin '%s' v%s" % (plugin.name, plugin.version))
+                self.info("New thread queue started for plugin '%s' v%s", plugin.name, plugin.version)
 
             # sets the plugin load as not completed
             plugin_thread.set_load_complete(False)
@@ -3185,6 +5447,9 @@ class PluginManager:
                     # sets the plugin error state flag
                     plugin.error_state = True
 
+        # ends the span for the (lazy) load of the plugin
+        self.end_load_span(span)
+
         # in case the plugin is in an error state
         if plugin.error_state:
             # prints the error message
@@ -3202,8 +5467,13 @@ class PluginManager:
             return False
 
         # injects the plugin dependencies
-        if not self.inject_dependencies(plugin):
-            return False
+        span = self.begin_load_span("inject_dependencies", plugin)
+        injected = self.inject_dependencies(plugin)
+        self.end_load_span(span)
+        if not injected: return False
+
+        # begins the span for the end load of the plugin
+        span = self.begin_load_span("end_load_plugin", plugin)
 
         # in case the plugin to be loaded is either of type main or thread
         if loading_type == MAIN_TYPE or loading_type == THREAD_TYPE:
@@ -3233,6 +5503,9 @@ class PluginManager:
                     # sets the plugin error state flag
                     plugin.error_state = True
 
+        # ends the span for the end load of the plugin
+        self.end_load_span(span)
+
         # in case the plugin is in an error state
         if plugin.error_state:
             # prints the error message
@@ -3242,13 +5515,26 @@ class PluginManager:
             return False
 
         # injects the allowed plugins into the plugin
-        if not self.inject_allowed(plugin):
-            return False
+        span = self.begin_load_span("inject_allowed", plugin)
+        injected = self.inject_allowed(plugin)
+        self.end_load_span(span)
+        if not injected: return False
 
         # retrieves the current loading state for the plugin manager
         if self.get_init_complete():
             # notifies the plugin about the load complete
+            span = self.begin_load_span("init_complete", plugin)
             plugin.init_complete()
+            self.end_load_span(span)
+
+        # binds the loaded methods of the (completely loaded) plugin
+        # so that the calls no longer test the loading of the plugin
+        plugin.unbind_loaded_methods()
+        plugin.bind_loaded_methods()
+
+        # publishes the (completely loaded) plugin in the plugin
+        # snapshot map so that it may be retrieved without locking
+        self.publish_plugin_snapshot(plugin)
 
         # generates the end load plugin event
         self.generate_event("plugin_manager.end_load_plugin", [plugin.id, plugin.version, plugin])
@@ -3273,18 +5559,43 @@ class PluginManager:
         @requires: The result of the plugin unload.
         """
 
-        # in case the plugin is not loaded
-        if not plugin.is_loaded():
-            # returns true
-            return True
+        # acquires the retrieve lock so that the changes in the manager
+        # structures are serialized with the other (concurrent) unloadings
+        # and the loadings (the lifecycle calls are made without the lock)
+        self.retrieve_lock.acquire()
+
+        try:
+            # in case the plugin is not loaded
+            if not plugin.is_loaded():
+                # returns true
+                return True
+
+            # removes the plugin from the plugin snapshot map so that
+            # the lock free retrieval no longer returns it
+            self.unpublish_plugin_snapshot(plugin)
+
+            # unbinds the loaded methods of the plugin restoring the
+            # interceptors for the (lazy) loading of the plugin
+            plugin.unbind_loaded_methods()
+
+            # retrieves a copy of the plugins that depend on the plugin
+            # (the map may be changed by the other unloadings)
+            dependent_plugins = list(self.get_plugin_dependent_plugins_map(plugin.id))
+        finally:
+            # releases the retrieve lock
+            self.retrieve_lock.release()
 
         # in case a type is defined
         if type:
             # prints an info message
-            self.info("Unloading of type: '%s'" % (type))
+            self.info("Unloading of type: '%s'", type)
 
         # unloads the plugins that depend on the plugin being unloaded
-        for dependent_plugin in self.get_plugin_dependent_plugins_map(plugin.id):
+        for dependent_plugin in dependent_plugins:
+            # in case the dependent plugin unloading was abandoned
+            # (deadline exceeded) it must not be unloaded again
+            if dependent_plugin.id in self.unload_abandoned: continue
+
             # in case the dependent plugin is loaded
             if dependent_plugin.is_loaded():
                 if MAIN_TYPE in dependent_plugin.capabilities:
@@ -3294,26 +5605,35 @@ class PluginManager:
                 else:
                     self._unload_plugin(dependent_plugin, DEPENDENCY_TYPE)
 
-        # notifies the allowed plugins about the unload
-        for allowed_plugin_info in self.get_plugin_allowed_plugins_map(plugin.id):
-            # retrieves the allowed plugin
-            allowed_plugin = allowed_plugin_info[0]
+        # acquires the retrieve lock so that the notification of the
+        # allowed plugins and the clearing of the maps are serialized
+        # (as the injection of the allowed plugins in the loading)
+        self.retrieve_lock.acquire()
+
+        try:
+            # notifies the allowed plugins about the unload
+            for allowed_plugin_info in list(self.get_plugin_allowed_plugins_map(plugin.id)):
+                # retrieves the allowed plugin
+                allowed_plugin = allowed_plugin_info[0]
 
-            # retrieves the allowed capability
-            allowed_capability = allowed_plugin_info[1]
+                # retrieves the allowed capability
+                allowed_capability = allowed_plugin_info[1]
 
-            # in case the allowed plugin is loaded
-            if allowed_plugin.is_loaded():
-                allowed_plugin.unload_allowed(plugin, allowed_capability)
+                # in case the allowed plugin is loaded
+                if allowed_plugin.is_loaded():
+                    allowed_plugin.unload_allowed(plugin, allowed_capability)
 
-        # clears the map for the dependent plugins
-        self.clear_plugin_dependent_plugins_map(plugin.id)
+            # clears the map for the dependent plugins
+            self.clear_plugin_dependent_plugins_map(plugin.id)
 
-        # clears the map for the allowed plugins
-        self.clear_plugin_allowed_plugins_map(plugin.id)
+            # clears the map for the allowed plugins
+            self.clear_plugin_allowed_plugins_map(plugin.id)
 
-        # clears the map for the capabilities plugins
-        self.clear_capabilities_plugins_map_for_plugin(plugin.id)
+            # clears the map for the capabilities plugins
+            self.clear_capabilities_plugins_map_for_plugin(plugin.id)
+        finally:
+            # releases the retrieve lock
+            self.retrieve_lock.release()
 
         # if it's a main or thread type unload
         if unloading_type == MAIN_TYPE or unloading_type == THREAD_TYPE:
@@ -3409,6 +5729,11 @@ class PluginManager:
             # joins the plugin thread (waiting for the end of it)
             plugin_thread.join(DEFAULT_UNLOAD_SYSTEM_TIMEOUT)
 
+        # stops the lifecycle executor and watchdog (the threads are
+        # re-started in case new lifecycle calls are submitted)
+        self.lifecycle_executor.stop(DEFAULT_UNLOAD_SYSTEM_TIMEOUT)
+        self.lifecycle_watchdog.stop()
+
     def test_plugin_load(self, plugin):
         """
         Tests the given plugin, to check if the loading is possible.
@@ -3435,7 +5760,7 @@ class PluginManager:
         # tests the plugin against the current platform
         if not self.test_threads(plugin):
             # prints an info message
-            self.info("Current thread permissions is not compatible with plugin '%s' v%s" % (plugin_name, plugin_version))
+            self.info("Current thread permissions is not compatible with plugin '%s' v%s", plugin_name, plugin_version)
 
             # returns false
             return False
@@ -3443,7 +5768,7 @@ class PluginManager:
         # tests the plugin against the current platform
         if not self.test_platform_compatible(plugin):
             # prints an info message
-            self.info("Current platform (%s) not compatible with plugin '%s' v%s" % (self.platform, plugin_name, plugin_version))
+            self.info("Current platform (%s) not compatible with plugin '%s' v%s", self.platform, plugin_name, plugin_version)
 
             # returns false
             return False
@@ -3451,7 +5776,7 @@ class PluginManager:
         # tests the plugin for the availability of the dependencies
         if not self.test_dependencies_available(plugin):
             # prints an info message
-            self.info("Missing dependencies for plugin '%s' v%s" % (plugin_name, plugin_version))
+            self.info("Missing dependencies for plugin '%s' v%s", plugin_name, plugin_version)
 
             # returns false
             return False
@@ -3474,6 +5799,11 @@ class PluginManager:
         @return: The result of the plugin dependencies available check.
         """
 
+        # in case the dependencies of the plugin were satisfied
+        # in the (replayed) load plan there's no need to test them
+        load_plan = self.load_plan
+        if load_plan and load_plan.is_satisfied(plugin.id): return True
+
         # retrieves the plugin dependencies
         plugin_dependencies = plugin.dependencies
 
@@ -3483,11 +5813,15 @@ class PluginManager:
             # in case the test dependency tests fails
             if not plugin_dependency.test_dependency(self):
                 # prints an info message
-                self.info("Problem with dependency for plugin '%s' v%s" % (plugin.name, plugin.version))
+                self.info("Problem with dependency for plugin '%s' v%s", plugin.name, plugin.version)
 
                 # returns false
                 return False
 
+        # records the dependencies of the plugin as
+        # satisfied in the load plan (in case it's active)
+        load_plan and load_plan.set_satisfied(plugin.id)
+
         # returns true
         return True
 
@@ -3541,7 +5875,7 @@ class PluginManager:
             # and so a log message is printed and the function returns to
             # the calling method in failure
             if not capability in plugin.capabilities: continue
-            self.info("Threads not allowed for plugin '%s' v%s" % (plugin.name, plugin.version))
+            self.info("Threads not allowed for plugin '%s' v%s", plugin.name, plugin.version)
             return False
 
         # returns value as all the tests have passed with success
@@ -3636,6 +5970,17 @@ class PluginManager:
 
             # iterates over all the plugins of the defined capability
             for allowed_plugin in allowed_plugins:
+                # in case the capability defines a diffusion policy the replicas
+                # are skipped (the diffusion scopes are created from the original)
+                if plugin_capability_allowed_type == types.TupleType and allowed_plugin.is_replica():
+                    continue
+
+                # in case the plugin is pending in the concurrent loading
+                # the injection is deferred (done after its loading)
+                if self._is_load_pending(allowed_plugin):
+                    self._defer_allowed(plugin, allowed_plugin, plugin_capability_allowed)
+                    continue
+
                 # loads the plugin (if necessary) with allowed type
                 if self.__load_plugin(allowed_plugin, ALLOWED_TYPE):
                     # injects the allowed plugin in the plugin with the given capability
@@ -3657,49 +6002,77 @@ class PluginManager:
         @param capability: The capability for witch the allowed plugin is being injected.
         """
 
-        # in case both the plugin and the allowed plugins are valid and
-        # the allowed plugin is not already "allowed" in the plugin
-        # for the current capability
-        if plugin and allowed_plugin and not (allowed_plugin, capability) in plugin.allowed_loaded_capability:
-            # retrieves the capability type
-            capability_type = type(capability)
-
-            # in case the capability type is tuple
-            if capability_type == types.TupleType:
-                # retrieves the real capability and diffusion policy
-                capability, diffusion_policy = capability
-
-                # in case the diffusion policy is same diffusion scope
-                if diffusion_policy == SAME_DIFFUSION_SCOPE:
-                    # in case the allowed plugin id already exists in the diffusion scope
-                    if allowed_plugin.id in self.diffusion_scope_loaded_plugins_map[plugin.diffusion_scope]:
-                        allowed_plugin = self.diffusion_scope_loaded_plugins_map[plugin.diffusion_scope][allowed_plugin.id]
-                    else:
-                        # prints an info message
-                        self.info("Creating allowed plugin '%s' v%s as same diffusion scope" % (allowed_plugin.id, allowed_plugin.version))
-
-                        # creates a new allowed plugin (in a the same diffusion scope as the plugin)
-                        allowed_plugin = self._create_plugin(allowed_plugin.id, allowed_plugin.version, plugin.diffusion_scope)
-
-                    # loads the allowed plugin (if necessary) with allowed type
-                    self.__load_plugin(allowed_plugin, ALLOWED_TYPE)
-                # in case the diffusion policy is new diffusion scope
-                elif diffusion_policy == NEW_DIFFUSION_SCOPE:
-                    # prints an info message
-                    self.info("Creating allowed plugin '%s' v%s as new diffusion scope" % (allowed_plugin.id, allowed_plugin.version))
+        # retrieves the load lock (only set in the concurrent loading)
+        # and acquires it so that the injection is serialized
+        load_lock = self.load_lock
+        load_lock and load_lock.acquire()
 
-                    # creates a new allowed plugin (in a new diffusion scope)
-                    allowed_plugin = self.create_plugin(allowed_plugin.id, allowed_plugin.version)
-
-                    # loads the allowed plugin (if necessary) with allowed type
-                    self.__load_plugin(allowed_plugin, ALLOWED_TYPE)
-
-            # calls the load allowed in the plugin with the allowed plugin
-            plugin.load_allowed(allowed_plugin, capability)
-
-            # adds the allowed plugin to the allowed plugins map for the given allowed plugin
-            # and capability
-            self.add_plugin_allowed_plugins_map(allowed_plugin.id, (plugin, capability))
+        try:
+            # retrieves the real capability (without the diffusion policy)
+            # as it's the one registered in the allowed loaded capability
+            capability_name = type(capability) == types.TupleType and capability[0] or capability
+
+            # in case both the plugin and the allowed plugins are valid and
+            # the allowed plugin is not already "allowed" in the plugin
+            # for the current capability
+            if plugin and allowed_plugin and not (allowed_plugin, capability_name) in plugin.allowed_loaded_capability:
+                # retrieves the capability type
+                capability_type = type(capability)
+
+                # in case the capability type is tuple
+                if capability_type == types.TupleType:
+                    # retrieves the real capability and diffusion policy
+                    capability, diffusion_policy = capability
+
+                    # in case the diffusion policy is same diffusion scope
+                    if diffusion_policy == SAME_DIFFUSION_SCOPE:
+                        # in case the allowed plugin id already exists in the diffusion scope
+                        if allowed_plugin.id in self.diffusion_scope_loaded_plugins_map[plugin.diffusion_scope_id]:
+                            allowed_plugin = self.diffusion_scope_loaded_plugins_map[plugin.diffusion_scope_id][allowed_plugin.id]
+                        else:
+                            # prints an info message
+                            self.info("Creating allowed plugin '%s' v%s as same diffusion scope", allowed_plugin.id, allowed_plugin.version)
+
+                            # creates a new allowed plugin (in a the same diffusion scope as the plugin)
+                            allowed_plugin = self._create_plugin(allowed_plugin.id, allowed_plugin.version, plugin.diffusion_scope_id)
+
+                        # loads the allowed plugin (if necessary) with allowed type
+                        self.__load_plugin(allowed_plugin, ALLOWED_TYPE)
+                    # in case the diffusion policy is new diffusion scope
+                    elif diffusion_policy == NEW_DIFFUSION_SCOPE:
+                        # tries to take a ready (pre-loaded) replica of the
+                        # allowed plugin from the replica pool
+                        replica = self.take_replica(allowed_plugin.id, allowed_plugin.version)
+
+                        # in case a ready replica was taken (hit) injects it in the
+                        # plugins that allow it (deferred in the pre-loading)
+                        if replica and replica.is_loaded_or_lazy_loaded():
+                            self.info("Using pooled allowed plugin '%s' v%s as new diffusion scope", allowed_plugin.id, allowed_plugin.version)
+                            allowed_plugin = replica
+                            self.inject_all_allowed(allowed_plugin)
+                        else:
+                            # prints an info message
+                            self.info("Creating allowed plugin '%s' v%s as new diffusion scope", allowed_plugin.id, allowed_plugin.version)
+
+                            self.retrieve_lock.acquire()
+                            try:
+                                # creates a new allowed plugin (in a new diffusion scope)
+                                allowed_plugin = replica or self.create_plugin(allowed_plugin.id, allowed_plugin.version)
+
+                                # loads the allowed plugin (if necessary) with allowed type
+                                self.__load_plugin(allowed_plugin, ALLOWED_TYPE)
+                            finally:
+                                self.retrieve_lock.release()
+
+                # calls the load allowed in the plugin with the allowed plugin
+                plugin.load_allowed(allowed_plugin, capability)
+
+                # adds the allowed plugin to the allowed plugins map for the given allowed plugin
+                # and capability
+                self.add_plugin_allowed_plugins_map(allowed_plugin.id, (plugin, capability))
+        finally:
+            # releases the load lock (in case it's set)
+            load_lock and load_lock.release()
 
     def inject_all_allowed(self, plugin):
         """
@@ -3717,6 +6090,8 @@ class PluginManager:
             capability_plugins = self.get_capabilities_plugins_map(plugin_capability)
 
             for capability_plugin in capability_plugins:
+                if self._is_load_pending(capability_plugin): continue
+                if self._is_load_deferred(capability_plugin, plugin): continue
                 if capability_plugin.is_loaded():
                     self._inject_allowed(capability_plugin, plugin, plugin_capability)
 
@@ -3757,9 +6132,9 @@ class PluginManager:
         del self.diffusion_scope_loaded_plugins_map[diffusion_scope_id][plugin_id]
 
     def add_plugin_dependent_plugins_map(self, plugin_id, dependency_plugin_instance):
-        if not plugin_id in self.plugin_dependent_plugins_map:
-            self.plugin_dependent_plugins_map[plugin_id] = []
-        self.plugin_dependent_plugins_map[plugin_id].append(dependency_plugin_instance)
+        # uses the set default method of the map so that the creation
+        # of the list is atomic (concurrent loading safe)
+        self.plugin_dependent_plugins_map.setdefault(plugin_id, []).append(dependency_plugin_instance)
 
     def get_plugin_dependent_plugins_map(self, plugin_id):
         if plugin_id in self.plugin_dependent_plugins_map:
@@ -3771,9 +6146,9 @@ class PluginManager:
         self.plugin_dependent_plugins_map[plugin_id] = []
 
     def add_plugin_allowed_plugins_map(self, plugin_id, allowed_plugin_info_list):
-        if not plugin_id in self.plugin_allowed_plugins_map:
-            self.plugin_allowed_plugins_map[plugin_id] = []
-        self.plugin_allowed_plugins_map[plugin_id].append(allowed_plugin_info_list)
+        # uses the set default method of the map so that the creation
+        # of the list is atomic (concurrent loading safe)
+        self.plugin_allowed_plugins_map.setdefault(plugin_id, []).append(allowed_plugin_info_list)
 
     def get_plugin_allowed_plugins_map(self, plugin_id):
         if plugin_id in self.plugin_allowed_plugins_map:
@@ -3804,16 +6179,10 @@ class PluginManager:
         capabilities plugins map.
         """
 
-        # in case the capability does not exist in the
-        # capabilities plugins map
-        if not capability in self.capabilities_plugins_map:
-            # sets an empty list as value for the capability in
-            # the capabilities plugins map
-            self.capabilities_plugins_map[capability] = []
-
         # adds the plugin to the capabilities plugins map for the given
-        # capability
-        self.capabilities_plugins_map[capability].append(plugin)
+        # capability, creating the list in case it does not exist (the
+        # set default method is used so that the creation is atomic)
+        self.capabilities_plugins_map.setdefault(capability, []).append(plugin)
 
     def get_capabilities_plugins_map(self, capability):
         """
@@ -3890,7 +6259,7 @@ class PluginManager:
 
         # test the plugin
         if not self.test_plugin_load(plugin):
-            self.info("Plugin '%s' v%s not ready to be loaded" % (plugin.name, plugin.version))
+            self.info("Plugin '%s' v%s not ready to be loaded", plugin.name, plugin.version)
             return False
 
         if MAIN_TYPE in plugin.capabilities:
@@ -4021,9 +6390,10 @@ class PluginManager:
         The retrieval of the plugin only uses the version is it's
         specified.
 
-        Note that this method cannot be called at the same time
-        from different threads as this would block the control
-        flow to avoid unwanted sync problems.
+        Completely loaded plugins are retrieved from the plugin
+        snapshot map without any locking, only the retrieval
+        of a plugin that is not yet loaded blocks the control
+        flow (retrieve lock) to avoid unwanted sync problems.
 
         @type plugin_id: String
         @param plugin_id: The id of the plugin to retrieve.
@@ -4033,6 +6403,13 @@ class PluginManager:
         @return: The plugin with the given id and optionally version.
         """
 
+        # tries to retrieve the plugin from the current plugin snapshot
+        # map (lock free) and in case it's loaded and the version is
+        # valid returns it immediately (fast path)
+        plugin = self.plugin_snapshot_map.get(plugin_id, None)
+        if plugin and plugin.is_loaded() and (not plugin_version or\
+            colony.libs.version_util.version_cmp(plugin.version, plugin_version)): return plugin
+
         # acquires the retrieve lock so that no multiple retrieval
         # of plugins occur this would create some sync problems
         self.retrieve_lock.acquire()
@@ -4086,6 +6463,62 @@ class PluginManager:
         # returns the plugin (instance)
         return plugin
 
+    def publish_plugin_snapshot(self, plugin):
+        """
+        Publishes a new version of the plugin snapshot map
+        containing the given (loaded) plugin.
+        The map is copied and replaced so that any reader
+        holding the previous version remains consistent.
+
+        @type plugin: Plugin
+        @param plugin: The plugin to be added to the snapshot.
+        """
+
+        # acquires the snapshot lock so that no concurrent
+        # publishing overrides the changes of this one
+        self.snapshot_lock.acquire()
+
+        try:
+            # creates a copy of the current plugin snapshot map
+            # and sets the plugin under its id and under its name,
+            # (the name is only used in case it refers the plugin
+            # and does not collide with any plugin id)
+            plugin_snapshot_map = dict(self.plugin_snapshot_map)
+            plugin_snapshot_map[plugin.id] = plugin
+            plugin_name = getattr(plugin, "_name", None)
+            if plugin_name and self.plugin_names_map.get(plugin_name, None) == plugin and\
+                not plugin_name in self.plugin_instances_map: plugin_snapshot_map[plugin_name] = plugin
+
+            # replaces the plugin snapshot map with the new version
+            # (atomic reference assignment)
+            self.plugin_snapshot_map = plugin_snapshot_map
+        finally:
+            # releases the snapshot lock
+            self.snapshot_lock.release()
+
+    def unpublish_plugin_snapshot(self, plugin):
+        """
+        Publishes a new version of the plugin snapshot map
+        without the given plugin.
+
+        @type plugin: Plugin
+        @param plugin: The plugin to be removed from the snapshot.
+        """
+
+        # acquires the snapshot lock so that no concurrent
+        # publishing overrides the changes of this one
+        self.snapshot_lock.acquire()
+
+        try:
+            # creates a new plugin snapshot map without the entries
+            # referring the plugin and replaces the current one
+            self.plugin_snapshot_map = dict(
+                [(key, value) for key, value in self.plugin_snapshot_map.items() if not value == plugin]
+            )
+        finally:
+            # releases the snapshot lock
+            self.snapshot_lock.release()
+
     def get_plugin_by_id(self, plugin_id):
         """
         Retrieves an instance of a plugin with the given id.
@@ -4158,27 +6591,10 @@ class PluginManager:
         @return: The list of plugins for the given capability and sub capabilities.
         """
 
-        # the results list
-        result = []
-
-        # the capability converted to internal capability structure
-        capability_structure = Capability(capability)
-
-        # iterates over all the plugin instances
-        for plugin in self.plugin_instances:
-            # retrieves the plugin capabilities structure
-            plugin_capabilities_structure = convert_to_capability_list(plugin.capabilities)
-
-            # iterates over all the plugin capabilities structure
-            for plugin_capability_structure in plugin_capabilities_structure:
-                # in case the plugin capability structure is capability is sub
-                # capability of the capability structure
-                if capability_structure.is_capability_or_sub_capability(plugin_capability_structure):
-                    # adds the plugin to the results list
-                    result.append(self.assert_plugin(plugin))
-
-        # returns the results list
-        return result
+        # retrieves the plugins for the capability from the capabilities
+        # index and asserts each of them (ensuring they are loaded)
+        plugins = self.capabilities_index.get(capability)
+        return [self.assert_plugin(plugin) for plugin in plugins]
 
     def _get_plugins_by_capability_cache(self, capability):
         """
@@ -4190,29 +6606,21 @@ class PluginManager:
         @return: The list of plugins for the given capability and sub capabilities.
         """
 
-        # creates the results list to hold
-        # the various plugin instances
-        result = []
-
-        # in case the capability does not exist in the capabilities sub capabilities map
-        if not capability in self.capabilities_sub_capabilities_map:
-            # returns the result (empty list)
-            return result
-
-        # retrieves the capability and sub capabilities list for the current capability
-        capability_and_sub_capabilities_list = [capability] + self.capabilities_sub_capabilities_map[capability]
-
-        # iterates over all the capabilities (or sub capabilities) in the
-        # capability and sub capabilities list
-        for capability_or_sub_capability in capability_and_sub_capabilities_list:
-            # retrieves the plugin instances that have the given capability
-            plugin_instances = self.capabilities_plugin_instances_map[capability_or_sub_capability]
-
-            # adds the plugin instances to the result
-            result += plugin_instances
+        # in case the plugins of the capability were resolved in the
+        # (replayed) load plan and all of them are available they're
+        # retrieved from the plan
+        load_plan = self.load_plan
+        plugin_ids = load_plan and load_plan.get_capability(capability)
+        if not plugin_ids == None:
+            plugins = [self.plugin_instances_map.get(plugin_id, None) for plugin_id in plugin_ids]
+            if not None in plugins: return plugins
 
-        # returns the result
-        return result
+        # the capabilities index is already a cache structure
+        # so the retrieval is delegated to the default method,
+        # the result is recorded in the load plan (in case it's active)
+        plugins = self._get_plugins_by_capability(capability)
+        load_plan and load_plan.set_capability(capability, [plugin.id for plugin in plugins])
+        return plugins
 
     def _get_plugins_by_capability(self, capability):
         """
@@ -4224,21 +6632,9 @@ class PluginManager:
         @return: The list of plugins for the given capability and sub capabilities.
         """
 
-        # creates the results list to hold
-        # the various plugin instances
-        result = []
-
-        # the capability converter to internal capability structure
-        capability_structure = Capability(capability)
-
-        for plugin in self.plugin_instances:
-            plugin_capabilities_structure = convert_to_capability_list(plugin.capabilities)
-
-            for plugin_capability_structure in plugin_capabilities_structure:
-                if capability_structure.is_capability_or_sub_capability(plugin_capability_structure):
-                    result.append(plugin)
-
-        return result
+        # retrieves the plugins for the capability from the capabilities
+        # index (sub tree walk over the capability node)
+        return self.capabilities_index.get(capability)
 
     def __get_plugins_by_capability(self, capability):
         """
@@ -4271,7 +6667,7 @@ class PluginManager:
         result = []
 
         # the capability converter to internal capability structure
-        capability_structure = Capability(capability_allowed)
+        capability_structure = get_capability(capability_allowed)
 
         for plugin in self.plugin_instances:
             plugin_capabilities_structure = convert_to_capability_list(plugin.capabilities_allowed)
@@ -4296,7 +6692,7 @@ class PluginManager:
         result = []
 
         # the capability converter to internal capability structure
-        capability_structure = Capability(capability_allowed)
+        capability_structure = get_capability(capability_allowed)
 
         for plugin in self.plugin_instances:
             plugin_capabilities_structure = convert_to_capability_list(plugin.capabilities_allowed)
@@ -4414,7 +6810,7 @@ class PluginManager:
         result = []
 
         # the capability converter to internal capability structure
-        capability_structure = Capability(capability)
+        capability_structure = get_capability(capability)
 
         for plugin in self.plugin_instances:
             plugin_capabilities_structure = convert_to_capability_list(plugin.capabilities_allowed)
@@ -4439,7 +6835,7 @@ class PluginManager:
         result = []
 
         # the capability converter to internal capability structure
-        capability_structure = Capability(capability)
+        capability_structure = get_capability(capability)
 
         for plugin in self.plugin_instances:
             plugin_capabilities_structure = convert_to_capability_list(plugin.capabilities_allowed)
@@ -4481,8 +6877,8 @@ class PluginManager:
         # iterates over all the string values in
         # the string values list
         for string_value in string_values_list:
-            # in case the paths exists
-            if os.path.exists(string_value):
+            # in case the paths exists (cached test)
+            if self._path_exists(string_value):
                 # returns the string value
                 return string_value
 
@@ -4525,6 +6921,19 @@ class PluginManager:
             # returns an empty list
             return []
 
+        # tries to retrieve the string values list from the resolution
+        # cache, in case it's found returns a copy of it
+        string_values_list = self.resolution_cache.get(string_value, None)
+        if not string_values_list == None: return list(string_values_list)
+
+        # retrieves the current resolution cache (the reference is kept
+        # so that an invalidation during the resolution discards it)
+        resolution_cache = self.resolution_cache
+
+        # starts the cacheable flag, that controls if the resolved
+        # values may be cached (depend only on manager state)
+        cacheable = True
+
         # finds all the matches using the special value regex
         # over the string value
         special_value_matches = SPECIAL_VALUE_REGEX.finditer(string_value)
@@ -4538,6 +6947,10 @@ class PluginManager:
             command = special_value_match.group(COMMAND_VALUE)
             arguments = special_value_match.group(ARGUMENTS_VALUE)
 
+            # in case the command is volatile (depends on external
+            # state) the resolved values are not cacheable
+            if command in VOLATILE_COMMANDS: cacheable = False
+
             # in case the arguments are defined
             if arguments:
                 # splits the arguments value
@@ -4647,21 +7060,67 @@ class PluginManager:
         # the string values list
         string_values_list = [value.get_value() for value in string_buffers_list]
 
+        # in case the values are cacheable sets them in the resolution
+        # cache (clearing it in case the maximum size is reached)
+        if cacheable:
+            if len(resolution_cache) >= RESOLUTION_CACHE_SIZE: resolution_cache.clear()
+            resolution_cache[string_value] = tuple(string_values_list)
+
         # returns the string values list
         return string_values_list
 
-    def get_plugin_path_by_id(self, plugin_id):
+    def invalidate_resolution_cache(self):
+        """
+        Invalidates the resolution caches (string values and path
+        existence), this method should be called whenever the state
+        used in the resolution changes (eg: prefix paths, workspace
+        path, plugin paths or configuration).
         """
-        Retrieves the plugin execution path for the given plugin id.
 
-        @type plugin_id: String
-        @param plugin_id: The id of the plugin to retrieve the execution path.
-        @rtype: String
-        @return: The plugin execution path for the plugin with the given id.
+        self.resolution_cache = {}
+        self.existence_cache = {}
+
+    def _path_exists(self, path):
         """
+        Tests if the given path exists, using the existence cache
+        so that both positive and negative results are re-used for
+        a short amount of time (time to live).
 
-        # in case the plugin id exists in the
-        # plugin dirs map
+        @type path: String
+        @param path: The path to be tested for existence.
+        @rtype: bool
+        @return: If the path exists.
+        """
+
+        # retrieves the current time and tries to retrieve the cached
+        # existence value for the path in case it's not expired
+        current_time = time.time()
+        existence_cache = self.existence_cache
+        cached_value = existence_cache.get(path, None)
+        if cached_value and cached_value[1] > current_time: return cached_value[0]
+
+        # tests the path for existence and caches the value (clearing
+        # the cache in case the maximum size is reached)
+        exists = os.path.exists(path)
+        ttl = plugin_manager_configuration.get("existence_cache_ttl", DEFAULT_EXISTENCE_CACHE_TTL)
+        if len(existence_cache) >= RESOLUTION_CACHE_SIZE: existence_cache.clear()
+        existence_cache[path] = (exists, current_time + ttl)
+
+        # returns the existence value
+        return exists
+
+    def get_plugin_path_by_id(self, plugin_id):
+        """
+        Retrieves the plugin execution path for the given plugin id.
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin to retrieve the execution path.
+        @rtype: String
+        @return: The plugin execution path for the plugin with the given id.
+        """
+
+        # in case the plugin id exists in the
+        # plugin dirs map
         if plugin_id in self.plugin_dirs_map:
             # returns the value of the plugin id
             # in the plugin dirs map (plugin path)
@@ -4811,6 +7270,64 @@ class PluginManager:
             # returns the configuration file
             return configuration_file
 
+    def get_plugin_configuration(self, plugin_id, configuration_file_path, parser = None):
+        """
+        Retrieves the (cached) contents of the plugin configuration
+        file for the given plugin id and configuration file path.
+        In case a parser is given the (cached) parsed value is returned
+        instead of the contents, the value is cached per parser and
+        must be considered read-only.
+        The contents are shared by all the replicas of the plugin
+        and upon change of the file the configuration changed event
+        is generated (with the plugin id and the file path).
+
+        @type plugin_id: String
+        @param plugin_id: The plugin id to be used in the configuration
+        file retrieval.
+        @type configuration_file_path: String
+        @param configuration_file_path: The path of the configuration file (relative to
+        the base of the plugin configuration path).
+        @type parser: Function
+        @param parser: The function used to parse the contents of the
+        file, receiving the contents and returning the parsed value.
+        @rtype: Object
+        @return: The contents (or parsed value) of the configuration file
+        or invalid in case the file does not exist.
+        """
+
+        # retrieves the original plugin id (removing the replica
+        # suffix) so that the replicas share the configuration
+        plugin_id = plugin_id.split("[", 1)[0]
+
+        # creates the list of candidate file paths from the plugin
+        # configuration paths (in order of precedence)
+        plugin_configuration_paths = self.get_plugin_configuration_paths_by_id(plugin_id)
+        file_paths = [os.path.join(plugin_configuration_path, configuration_file_path) for plugin_configuration_path in plugin_configuration_paths]
+
+        # retrieves the configuration from the cache and in case it
+        # changed generates the configuration changed event
+        key = (plugin_id, configuration_file_path)
+        configuration, changed = self.configuration_cache.get(key, file_paths, parser)
+        changed and self.generate_event(CONFIGURATION_CHANGED_EVENT, [plugin_id, configuration_file_path])
+
+        # returns the configuration
+        return configuration
+
+    def check_plugin_configurations(self):
+        """
+        Checks all the (cached) plugin configuration files for
+        changes, generating the configuration changed event for
+        each of the changed files.
+        This method may be called periodically to allow the hot
+        reload of the configuration of the plugins.
+        """
+
+        # checks the configuration cache for changes and generates
+        # the configuration changed event for each changed file
+        changed_keys = self.configuration_cache.check()
+        for plugin_id, configuration_file_path in changed_keys:
+            self.generate_event(CONFIGURATION_CHANGED_EVENT, [plugin_id, configuration_file_path])
+
     def get_plugin_module_name_by_id(self, plugin_id):
         """
         Retrieves the plugin module name for the given plugin id.
@@ -4901,9 +7418,10 @@ class PluginManager:
 
         if not plugin in self.event_plugins_fired_loaded_map[event_name]:
             self.event_plugins_fired_loaded_map[event_name].append(plugin)
+            self.event_routing_table.invalidate()
 
             # prints an info message
-            self.info("Registering event '%s' from '%s' v%s in plugin manager" % (event_name, plugin.name, plugin.version))
+            self.info("Registering event '%s' from '%s' v%s in plugin manager", event_name, plugin.name, plugin.version)
 
     def unregister_plugin_manager_event(self, plugin, event_name):
         """
@@ -4915,12 +7433,15 @@ class PluginManager:
         @param event_name: The name of the event to be unregistered.
         """
 
-        if event_name in self.event_plugins_fired_loaded_map:
-            if plugin in self.event_plugins_fired_loaded_map[event_name]:
-                self.event_plugins_fired_loaded_map[event_name].remove(plugin)
+        # removes the plugin from the list of plugins for the event, the
+        # removal is atomic (no check) as the plugins may be unregistered
+        # concurrently (lifecycle calls of the concurrent unloading)
+        try: self.event_plugins_fired_loaded_map.get(event_name, []).remove(plugin)
+        except ValueError: return
+        self.event_routing_table.invalidate()
 
-                # prints an info message
-                self.info("Unregistering event '%s' from '%s' v%s in plugin manager" % (event_name, plugin.name, plugin.version))
+        # prints an info message
+        self.info("Unregistering event '%s' from '%s' v%s in plugin manager", event_name, plugin.name, plugin.version)
 
     def notify_handlers(self, event_name, event_args):
         """
@@ -4932,21 +7453,16 @@ class PluginManager:
         @param event_args: The arguments to be passed to the handler.
         """
 
-        # the names of the events fired by self
-        event_names_list = self.event_plugins_fired_loaded_map.keys()
+        # retrieves the handler plugins for the event (and super events)
+        # from the routing table (computed once per event name)
+        event_plugins_loaded = self.event_routing_table.get_handlers(event_name, self.event_plugins_fired_loaded_map)
 
-        # retrieves all the events and super events that match the generated event
-        events_or_super_events_list = get_all_events_or_super_events_in_list(event_name, event_names_list)
+        # iterates over all the plugins registered for notification
+        for event_plugin_loaded in event_plugins_loaded:
+            self.info("Notifying '%s' v%s about event '%s' generated in plugin manager", event_plugin_loaded.name, event_plugin_loaded.version, event_name)
 
-        # iterates over all the events and super events for notification
-        for event_or_super_event in events_or_super_events_list:
-            if event_or_super_event in self.event_plugins_fired_loaded_map:
-                # iterates over all the plugins registered for notification
-                for event_plugin_loaded in self.event_plugins_fired_loaded_map[event_or_super_event]:
-                    self.info("Notifying '%s' v%s about event '%s' generated in plugin manager" % (event_plugin_loaded.name, event_plugin_loaded.version, event_name))
-
-                    # calls the event handler for the event and the event arguments
-                    event_plugin_loaded.event_handler(event_name, *event_args)
+            # calls the event handler for the event and the event arguments
+            event_plugin_loaded.event_handler(event_name, *event_args)
 
     def generate_event(self, event_name, event_args):
         """
@@ -4959,7 +7475,7 @@ class PluginManager:
         """
 
         # prints an info message
-        self.info("Event '%s' generated in plugin manager" % (event_name))
+        self.info("Event '%s' generated in plugin manager", event_name)
 
         # notifies the event handlers of the event name with the event arguments
         self.notify_handlers(event_name, event_args)
@@ -5135,90 +7651,114 @@ class PluginManager:
             # prints a log message with the formated traceback line
             self.logger.log(level, formated_traceback_line_stripped)
 
-    def debug(self, message):
+    def debug(self, message, *arguments):
         """
         Adds the given debug message to the logger.
+        The message is only formatted (using the arguments) in
+        case the debug level is enabled for the logger.
 
         @type message: String
-        @param message: The debug message to be added to the logger.
+        @param message: The debug message (format) to be added to the logger.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting.
         """
 
-        # in case no logger is defined it's not possible
-        # to print the message as a debug
-        if not self.logger: return
+        # in case no logger is defined or the debug level is not
+        # enabled it's not possible to print the message as a debug
+        if not self.logger or not self.logger.isEnabledFor(logging.DEBUG): return
 
         # formats the logger message and prints it
         # as a debu message into the logger
-        logger_message = self.format_logger_message(message)
+        logger_message = self.format_logger_message(message, arguments)
         self.logger.debug(logger_message)
 
-    def info(self, message):
+    def info(self, message, *arguments):
         """
         Adds the given info message to the logger.
+        The message is only formatted (using the arguments) in
+        case the info level is enabled for the logger.
 
         @type message: String
-        @param message: The info message to be added to the logger.
+        @param message: The info message (format) to be added to the logger.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting.
         """
 
-        # in case no logger is defined it's not possible
-        # to print the message as an info
-        if not self.logger: return
+        # in case no logger is defined or the info level is not
+        # enabled it's not possible to print the message as an info
+        if not self.logger or not self.logger.isEnabledFor(logging.INFO): return
 
         # formats the logger message and prints it
         # as an info message into the logger
-        logger_message = self.format_logger_message(message)
+        logger_message = self.format_logger_message(message, arguments)
         self.logger.info(logger_message)
 
-    def warning(self, message):
+    def warning(self, message, *arguments):
         """
         Adds the given warning message to the logger.
+        The message is only formatted (using the arguments) in
+        case the warning level is enabled for the logger.
 
         @type message: String
-        @param message: The warning message to be added to the logger.
+        @param message: The warning message (format) to be added to the logger.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting.
         """
 
-        # in case no logger is defined it's not possible
-        # to print the message as a warning
-        if not self.logger: return
+        # in case no logger is defined or the warning level is not
+        # enabled it's not possible to print the message as a warning
+        if not self.logger or not self.logger.isEnabledFor(logging.WARNING): return
 
         # formats the logger message and prints it
         # as a warning message into the logger
-        logger_message = self.format_logger_message(message)
+        logger_message = self.format_logger_message(message, arguments)
         self.logger.warning(logger_message)
 
         # logs the stack trace
         self.log_stack_trace()
 
-    def error(self, message):
+    def error(self, message, *arguments):
         """
         Adds the given error message to the logger.
+        The message is only formatted (using the arguments) in
+        case the error level is enabled for the logger.
 
         @type message: String
-        @param message: The error message to be added to the logger.
+        @param message: The error message (format) to be added to the logger.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting.
         """
 
-        # in case no logger is defined it's not possible
-        # to print the message as an error
-        if not self.logger: return
+        # in case no logger is defined or the error level is not
+        # enabled it's not possible to print the message as an error
+        if not self.logger or not self.logger.isEnabledFor(logging.ERROR): return
 
         # formats the logger message and prints it
         # as an error message into the logger
-        logger_message = self.format_logger_message(message)
+        logger_message = self.format_logger_message(message, arguments)
         self.logger.error(logger_message)
 
         # logs the stack trace
         self.log_stack_trace()
 
-    def critical(self, message):
+    def critical(self, message, *arguments):
         """
         Adds the given critical message to the logger.
+        The message is only formatted (using the arguments) in
+        case the critical level is enabled for the logger.
 
         @type message: String
-        @param message: The critical message to be added to the logger.
+        @param message: The critical message (format) to be added to the logger.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting.
         """
 
+        # in case no logger is defined or the critical level is not
+        # enabled it's not possible to print the message as a critical
+        if not self.logger or not self.logger.isEnabledFor(logging.CRITICAL): return
+
         # formats the logger message
-        logger_message = self.format_logger_message(message)
+        logger_message = self.format_logger_message(message, arguments)
 
         # prints the critical message
         self.logger.critical(logger_message)
@@ -5226,16 +7766,23 @@ class PluginManager:
         # logs the stack trace
         self.log_stack_trace()
 
-    def format_logger_message(self, message):
+    def format_logger_message(self, message, arguments = ()):
         """
         Formats the given message into a logging message.
 
         @type message: String
         @param message: The message to be formated into logging message.
+        @type arguments: Tuple
+        @param arguments: The arguments to be used in the message formatting,
+        in case they are not set the message is used as is.
         @rtype: String
         @return: The formated logging message.
         """
 
+        # in case arguments are set formats the message
+        # with them (deferred formatting)
+        if arguments: message = message % arguments
+
         # the default formatting message
         formatting_message = str()
 
@@ -5245,7 +7792,7 @@ class PluginManager:
 
         # in case the thread id logging option is activated
         if plugin_manager_configuration.get("thread_id_logging", False):
-            formatting_message += "[" + str(thread.get_ident()) + "] "
+            formatting_message += get_thread_logger_prefix()
 
         # appends the formatting message to the logging message
         logger_message = formatting_message + message
@@ -5838,6 +8385,13 @@ class PluginManager:
         # prints an error message
         self.error("Unloading timeout (%.2f seconds) reached, killing the system..." % DEFAULT_UNLOAD_SYSTEM_TIMEOUT)
 
+        # prints an error message for each of the plugins still
+        # being unloaded and logs the report of the unloading
+        current_time = time.time()
+        for plugin_id, running in self.unload_running.items():
+            self.error("Plugin '%s' still unloading after %.2f seconds" % (plugin_id, current_time - running[0]))
+        self.log_unload_report(DEFAULT_UNLOAD_SYSTEM_TIMEOUT)
+
         # exits in error
         exit(2)
 
@@ -6258,13 +8812,17 @@ class OperativeSystemCondition(Condition):
         else:
             return False
 
-class Capability:
+class Capability(object):
     """
-    Class that describes a neutral structure for a capability.
+    Class that describes a neutral (immutable) structure for a capability.
+    The structure is backed by a tuple of the capability components and
+    contains the (precomputed) set of the capability and super capabilities
+    so that the sub capability tests are set membership tests.
+    The structures should be retrieved using the get capability function
+    that returns interned (shared) instances.
     """
 
-    list_value = []
-    """ The value of the capability described as a list """
+    __slots__ = ("string_value", "list_value", "super_values", "ancestors")
 
     def __init__(self, string_value = None):
         """
@@ -6274,46 +8832,33 @@ class Capability:
         @param string_value: The capability string value.
         """
 
-        # in case the string value is valid
-        if string_value:
-            # splits the string value to retrieve the list value
-            self.list_value = string_value.split(".")
-        else:
-            # sets the list value as an empty list
-            self.list_value = []
-
-    def __eq__(self, capability):
-        # retrieves the list value for self
-        list_value_self = self.list_value
-
-        # retrieves the list value for capability
-        list_value_capability = capability.list_value
+        # splits the string value to retrieve the list value (tuple)
+        # and computes the string values and the set of the capability
+        # and super capabilities (tuple prefixes of the list value)
+        list_value = string_value and tuple(string_value.split(".")) or ()
+        prefixes = [list_value[:index + 1] for index in range(len(list_value))]
+        object.__setattr__(self, "string_value", string_value or "")
+        object.__setattr__(self, "list_value", list_value)
+        object.__setattr__(self, "super_values", tuple([".".join(prefix) for prefix in prefixes]))
+        object.__setattr__(self, "ancestors", frozenset(prefixes))
 
-        # in case some of the lists is invalid
-        if not list_value_self or not list_value_capability:
-            # returns false
-            return False
+    def __setattr__(self, name, value):
+        raise AttributeError("capability structure is immutable")
 
-        # retrieves the length of the list value for self
-        length_self = len(list_value_self)
-
-        # retrieves the length of the list value for capability
-        length_capability = len(list_value_capability)
+    def __repr__(self):
+        return "<Capability %s>" % self.string_value
 
-        # in case the lengths for the list are different
-        if not length_self == length_capability:
-            # returns false
-            return False
+    def __hash__(self):
+        return hash(self.list_value)
 
-        # iterates over all the lists
-        for index in range(length_self):
-            # compares both values
-            if list_value_self[index] != list_value_capability[index]:
-                # returns false
-                return False
+    def __eq__(self, capability):
+        # in case the capability is not a capability structure
+        # or any of the values is empty (invalid) returns false
+        if not isinstance(capability, Capability): return False
+        if not self.list_value or not capability.list_value: return False
 
-        # returns true
-        return True
+        # returns the result of the comparison of the values
+        return self.list_value == capability.list_value
 
     def __ne__(self, capability):
         # retrieves the not value of the equals method
@@ -6327,32 +8872,7 @@ class Capability:
         @return: The list of the capability and all super capabilities.
         """
 
-        # creates the capability and super capabilities list
-        capability_and_super_capabilites_list = []
-
-        # retrieves the list value
-        list_value_self = self.list_value
-
-        # start the current capability value
-        curent_capability_value = None
-
-        # iterates over the list of values self
-        for value_self in list_value_self:
-            # in case the current capability value is valied
-            if curent_capability_value:
-                # appends the value self and a dot to the current capability value
-                curent_capability_value += "." + value_self
-            # otherwise (initial iteration)
-            else:
-                # sets the current capability value as the value self
-                curent_capability_value = value_self
-
-            # adds the current capability value to the capability
-            # and super capabilities list
-            capability_and_super_capabilites_list.append(curent_capability_value)
-
-        # returns the capability and super capabilities list
-        return capability_and_super_capabilites_list
+        return list(self.super_values)
 
     def is_sub_capability(self, capability):
         """
@@ -6364,38 +8884,9 @@ class Capability:
         @return: The result of the is sub capability test.
         """
 
-        # retrieves the list value self
-        list_value_self = self.list_value
-
-        # retrieves the list value capability
-        list_value_capability = capability.list_value
-
-        # in case any of the lists is empty or invalid
-        if not list_value_self or not list_value_capability:
-            # returns false
-            return False
-
-        # retrieves the list value self length
-        list_value_self_length = len(list_value_self)
-
-        # retrieves the list value capability length
-        list_value_capability_length = len(list_value_capability)
-
-        # in case the list value capability length is less or
-        # equal than list value self length
-        if list_value_capability_length <= list_value_self_length:
-            # returns false
-            return False
-
-        # iterates over the list value self range
-        for index in range(list_value_self_length):
-            # in case the values of each list are different
-            if list_value_self[index] != list_value_capability[index]:
-                # returns false
-                return False
-
-        # returns true
-        return True
+        # the capability is a sub capability in case it's deeper and
+        # the value of self is one of its super capabilities
+        return len(capability.list_value) > len(self.list_value) and self.list_value in capability.ancestors
 
     def is_capability_or_sub_capability(self, capability):
         """
@@ -6407,22 +8898,21 @@ class Capability:
         @return: The result of the is capability or sub capability test.
         """
 
-        # in case the capability is equal or sub capability
-        if self.__eq__(capability) or self.is_sub_capability(capability):
-            # returns true
-            return True
-        # otherwise
-        else:
-            # returns false
-            return False
+        # the (empty) value is never contained in the ancestors
+        # so no explicit validation of the value is required
+        return self.list_value in capability.ancestors
 
-class Event:
+class Event(object):
     """
-    Class that describes a neutral structure for an event.
+    Class that describes a neutral (immutable) structure for an event.
+    The structure is backed by a tuple of the event components and
+    contains the (precomputed) set of the event and super events so
+    that the sub event tests are set membership tests.
+    The structures should be retrieved using the get event function
+    that returns interned (shared) instances.
     """
 
-    list_value = []
-    """ The value of the event described as a list """
+    __slots__ = ("string_value", "list_value", "ancestors")
 
     def __init__(self, string_value = None):
         """
@@ -6432,46 +8922,30 @@ class Event:
         @param string_value: The event string value.
         """
 
-        # in case the string value is valid
-        if string_value:
-            # splits the string value to retrieve the list value
-            self.list_value = string_value.split(".")
-        else:
-            # sets the list value as an empty list
-            self.list_value = []
-
-    def __eq__(self, event):
-        # retrieves the list value for self
-        list_value_self = self.list_value
-
-        # retrieves the list value for event
-        list_value_event = event.list_value
-
-        # in case some of the lists is invalid
-        if not list_value_self or not list_value_event:
-            # returns false
-            return False
+        # splits the string value to retrieve the list value (tuple)
+        # and computes the set of the event and super events
+        list_value = string_value and tuple(string_value.split(".")) or ()
+        object.__setattr__(self, "string_value", string_value or "")
+        object.__setattr__(self, "list_value", list_value)
+        object.__setattr__(self, "ancestors", frozenset([list_value[:index + 1] for index in range(len(list_value))]))
 
-        # retrieves the length of the list value for self
-        length_self = len(list_value_self)
+    def __setattr__(self, name, value):
+        raise AttributeError("event structure is immutable")
 
-        # retrieves the length of the list value for event
-        length_event = len(list_value_event)
+    def __repr__(self):
+        return "<Event %s>" % self.string_value
 
-        # in case the lengths for the list are different
-        if not length_self == length_event:
-            # returns false
-            return False
+    def __hash__(self):
+        return hash(self.list_value)
 
-        # iterates over all the lists
-        for index in range(length_self):
-            # compares both values
-            if list_value_self[index] != list_value_event[index]:
-                # returns false
-                return False
+    def __eq__(self, event):
+        # in case the event is not an event structure or any
+        # of the values is empty (invalid) returns false
+        if not isinstance(event, Event): return False
+        if not self.list_value or not event.list_value: return False
 
-        # returns true
-        return True
+        # returns the result of the comparison of the values
+        return self.list_value == event.list_value
 
     def __ne__(self, event):
         return not self.__eq__(event)
@@ -6486,37 +8960,9 @@ class Event:
         @return: The result of the is sub event test.
         """
 
-        # retrieves the list value self
-        list_value_self = self.list_value
-
-        # retrieves the list value event
-        list_value_event = event.list_value
-
-        # in case any of the lists is empty or invalid
-        if not list_value_self or not list_value_event:
-            # returns false
-            return False
-
-        # retrieves the list value self length
-        list_value_self_length = len(list_value_self)
-
-        # retrieves the list value event length
-        list_value_event_length = len(list_value_event)
-
-        # in case the list value event length is less or
-        # equal than list value self length
-        if list_value_event_length <= list_value_self_length:
-            return False
-
-        # iterates over the list value self range
-        for index in range(list_value_self_length):
-            # in case the values of each list are different
-            if list_value_self[index] != list_value_event[index]:
-                # returns false
-                return False
-
-        # returns true
-        return True
+        # the event is a sub event in case it's deeper and the
+        # value of self is one of its super events
+        return len(event.list_value) > len(self.list_value) and self.list_value in event.ancestors
 
     def is_event_or_sub_event(self, event):
         """
@@ -6528,156 +8974,1619 @@ class Event:
         @return: The result of the is event or sub event test.
         """
 
-        # in case the capability is equal or sub capability
-        if self.__eq__(event) or self.is_sub_event(event):
-            # returns true
-            return True
-        # otherwise
-        else:
-            # returns false
-            return False
+        # the (empty) value is never contained in the ancestors
+        # so no explicit validation of the value is required
+        return self.list_value in event.ancestors
 
-def capability_and_super_capabilites(capability):
+class CapabilityIndex:
     """
-    Retrieves the list of the capability and all super capabilities.
-
-    @type capability: String
-    @param capability: The capability to retrieve the the list of the
-    capability and all super capabilities.
-    @rtype: List
-    @return: The list of the capability and all super capabilities.
+    Class that describes a hierarchical (trie) index of
+    capabilities, where each node represents one of the
+    dotted components of a capability string.
+    Retrieving the plugins for a capability (and its sub
+    capabilities) is a walk over the matching sub tree.
     """
 
-    # creates the capability structure from the capability string
-    capability_structure = Capability(capability)
+    root_node = None
+    """ The root node of the index, associated with
+    the empty capability """
 
-    # returns the list of the capability and all super capabilities
-    return capability_structure.capability_and_super_capabilites()
+    sequence = 0
+    """ The current registration sequence value, used to
+    keep the registration order in the retrieval """
 
-def is_capability_or_sub_capability(base_capability, capability):
-    """
-    Tests if the given capability is capability or sub capability
-    of the given base capability.
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
 
-    @type base_capability: String
-    @param base_capability: The base capability to be used for test.
-    @type capability: String
-    @param capability: The capability to be tested.
-    @rtype: bool
-    @return: The result of the test.
-    """
+        self.root_node = CapabilityIndexNode()
+        self.sequence = 0
 
-    # creates the base capability structure from
-    # the base capability string
-    base_capability_structure = Capability(base_capability)
+    def add(self, capability, plugin):
+        """
+        Adds the given plugin to the index under the
+        node of the given capability.
 
-    # creates the capability structure from the capability string
-    capability_structure = Capability(capability)
+        @type capability: String
+        @param capability: The capability to register the plugin.
+        @type plugin: Plugin
+        @param plugin: The plugin to be registered.
+        """
+
+        # retrieves the capability value (the capability may
+        # be defined as a tuple with a diffusion policy) and
+        # splits it into the various capability components
+        if type(capability) == types.TupleType: capability, _diffusion_policy = capability
+        if not capability: return
+        capability_components = capability.split(".")
+
+        # starts the current node at the root node and walks
+        # the index creating the missing nodes along the way,
+        # invalidating the cached values of each of them
+        current_node = self.root_node
+        current_node.cache = None
+        for capability_component in capability_components:
+            child_node = current_node.children.get(capability_component, None)
+            if child_node == None:
+                child_node = CapabilityIndexNode()
+                current_node.children[capability_component] = child_node
+            current_node = child_node
+            current_node.cache = None
+
+        # adds the plugin to the final node together with the
+        # current sequence value and then increments it
+        current_node.entries.append((self.sequence, plugin))
+        self.sequence += 1
+
+    def remove(self, capability, plugin):
+        """
+        Removes the given plugin from the node of the given
+        capability, empty nodes are pruned from the index.
 
-    # returns the result of the is capability or sub capability test
-    return base_capability_structure.is_capability_or_sub_capability(capability_structure)
+        @type capability: String
+        @param capability: The capability to unregister the plugin.
+        @type plugin: Plugin
+        @param plugin: The plugin to be unregistered.
+        """
+
+        # retrieves the capability value and splits it into
+        # the various capability components
+        if type(capability) == types.TupleType: capability, _diffusion_policy = capability
+        if not capability: return
+        capability_components = capability.split(".")
+
+        # walks the index recording the path of nodes, in case
+        # any of the nodes is missing there's nothing to remove
+        path = [(None, self.root_node)]
+        current_node = self.root_node
+        for capability_component in capability_components:
+            current_node = current_node.children.get(capability_component, None)
+            if current_node == None: return
+            path.append((capability_component, current_node))
+
+        # filters the entries of the final node removing the
+        # ones associated with the plugin (in case there's none
+        # no changes to the index are required)
+        entries = [entry for entry in current_node.entries if not entry[1] == plugin]
+        if len(entries) == len(current_node.entries): return
+        current_node.entries = entries
+
+        # iterates over the path (in reverse order) to invalidate
+        # the caches and to prune the nodes that became empty
+        for index in range(len(path) - 1, -1, -1):
+            capability_component, node = path[index]
+            node.cache = None
+            if not index or node.entries or node.children: continue
+            _parent_component, parent_node = path[index - 1]
+            del parent_node.children[capability_component]
+
+    def get(self, capability):
+        """
+        Retrieves the list of plugins registered for the given
+        capability or any of its sub capabilities, the plugins
+        are returned in registration order.
 
-def is_capability_or_sub_capability_in_list(base_capability, capability_list):
-    """
-    Tests if any of the capabilities in the capability list is capability or
-    sub capability of the given base capability.
+        @type capability: String
+        @param capability: The capability to retrieve the plugins.
+        @rtype: List
+        @return: The list of plugins for the capability and
+        sub capabilities.
+        """
 
-    @type base_capability: String
-    @param base_capability: The base capability to be used for test.
-    @type capability_list: List
-    @param capability_list: The list of capabilities to be tested.
-    @rtype: bool
-    @return: The result of the test.
-    """
+        # in case the capability is not valid there are
+        # no plugins to be returned
+        if not capability: return []
 
-    # iterates over all the capabilities in the capability list
-    for capability in capability_list:
-        # tests if the capability is capability or
-        # sub capability of the base capability
-        if is_capability_or_sub_capability(base_capability, capability):
-            # returns true
-            return True
+        # walks the index down to the node that represents
+        # the capability, returning an empty list in case
+        # the node does not exist
+        current_node = self.root_node
+        for capability_component in capability.split("."):
+            current_node = current_node.children.get(capability_component, None)
+            if current_node == None: return []
 
-    # returns false
-    return False
+        # in case the cache of the node is not set, computes
+        # it from the sub tree walk (sorted by registration)
+        cache = current_node.cache
+        if cache == None:
+            entries = []
+            current_node.collect(entries)
+            entries.sort()
+            cache = tuple([plugin for _sequence, plugin in entries])
+            current_node.cache = cache
 
-def convert_to_capability_list(capability_list):
-    """
-    Converts the given capability list (list of strings),
-    into a list of capability objects (structures).
+        # returns a (new) list with the plugins so that
+        # the cached value is not changed by the caller
+        return list(cache)
 
-    @type capability_list: List
-    @para capability_list: The list of capability strings.
-    @rtype: List
-    @return: The list of converted capability objects (structures).
+    def clear(self):
+        """
+        Clears the index, removing all the registered plugins.
+        """
+
+        self.root_node = CapabilityIndexNode()
+
+class CapabilityIndexNode:
+    """
+    Class that describes a node in the capability index,
+    representing a capability component.
     """
 
-    # creates the list of capability structures
-    capability_list_structure = []
+    entries = []
+    """ The list of tuples (sequence and plugin) registered
+    for exactly the capability of the node """
 
-    # iterates over all the capabilities in the capability list
-    for capability in capability_list:
-        # retrieves the capability type
-        capability_type = type(capability)
+    children = {}
+    """ The map associating the capability components with
+    the child nodes """
 
-        # in case the capability type is tuple
-        if capability_type == types.TupleType:
-            # retrieves the capability value and diffusion policy
-            capability_value, _diffusion_policy = capability
-        else:
-            # sets the capability values as the capability itself
-            capability_value = capability
+    cache = None
+    """ The cached tuple of plugins for the sub tree of the
+    node (invalidated on any change) """
 
-        # creates the capability structure from the
-        # capability string
-        capability_structure = Capability(capability_value)
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
 
-        # adds the capability structure to the list
-        # of capability structures
-        capability_list_structure.append(capability_structure)
+        self.entries = []
+        self.children = {}
+        self.cache = None
 
-    # returns the list of capability structures
-    return capability_list_structure
+    def collect(self, entries):
+        """
+        Collects the entries of the node and of all the nodes
+        in its sub tree into the given list.
 
-def is_event_or_sub_event(base_event, event):
-    """
-    Tests if the given event is event or sub event
-    of the given base event.
+        @type entries: List
+        @param entries: The list to be extended with the entries.
+        """
 
-    @type base_event: String
-    @param base_event: The base event to be used for test.
-    @type event: String
-    @param event: The event to be tested.
-    @rtype: bool
-    @return: The result of the test.
+        # creates the stack of nodes to be visited and walks
+        # the sub tree adding the entries of each node
+        nodes = [self]
+        while nodes:
+            node = nodes.pop()
+            entries.extend(node.entries)
+            nodes.extend(node.children.values())
+
+class EventRoutingTable:
+    """
+    Class that describes a routing table for events, associating
+    the (concrete) name of an event with the flat tuple of handler
+    plugins registered for the event or any of its super events.
+    The routes are computed on demand and the table must be
+    invalidated whenever the registered handlers change.
     """
 
-    # creates the base event structure from
-    # the base event string
-    base_event_structure = Event(base_event)
+    routes = {}
+    """ The map associating the event name with the
+    tuple of handler plugins """
 
-    # creates the event structure from the event string
-    event_structure = Event(event)
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
 
-    # returns the result of the is event or sub event test
-    return base_event_structure.is_event_or_sub_event(event_structure)
+        self.routes = {}
 
-def is_event_or_super_event(base_event, event):
-    """
-    Tests if the given event is event or super event
-    of the given base event.
+    def get_handlers(self, event_name, handlers_map):
+        """
+        Retrieves the tuple of handler plugins for the event with
+        the given name, computing the route from the given map
+        of handlers in case it's not yet cached.
 
-    @type base_event: String
-    @param base_event: The base event to be used for test.
-    @type event: String
-    @param event: The event to be tested.
-    @rtype: bool
-    @return: The result of the test.
-    """
+        @type event_name: String
+        @param event_name: The name of the event to retrieve the handlers.
+        @type handlers_map: Dictionary
+        @param handlers_map: The map associating the name of the events
+        with the list of handler plugins registered for them.
+        @rtype: Tuple
+        @return: The tuple of handler plugins for the event.
+        """
 
-    # returns the result of the is event or sub event test
-    # inverting the arguments
-    return is_event_or_sub_event(event, base_event)
+        # in case the event name is not valid there
+        # are no handlers to be returned
+        if not event_name: return ()
+
+        # retrieves the current routes map (the reference is kept
+        # so that an invalidation during the computation discards
+        # the computed route) and tries to retrieve the handlers
+        routes = self.routes
+        handlers = routes.get(event_name, None)
+        if not handlers == None: return handlers
+
+        # computes the handlers from the event and the super events
+        # of it (the prefixes of the event name) from the most generic
+        # to the most specific one and caches the route
+        handlers = []
+        event_components = event_name.split(".")
+        for index in range(len(event_components)):
+            super_event_name = ".".join(event_components[:index + 1])
+            handlers.extend(handlers_map.get(super_event_name, ()))
+        handlers = tuple(handlers)
+        routes[event_name] = handlers
+
+        # returns the handlers
+        return handlers
+
+    def invalidate(self):
+        """
+        Invalidates the routing table, removing all the
+        computed routes.
+        """
+
+        self.routes = {}
+
+class PersistentMap:
+    """
+    Class that describes a map of entries persisted (serialized)
+    into a file, the file is written atomically and in case it's
+    not valid (corrupt or incompatible) the entries are discarded.
+    """
+
+    file_path = None
+    """ The path to the file where the map
+    is persisted (serialized) """
+
+    entries = {}
+    """ The map containing the entries
+    to be persisted """
+
+    dirty = False
+    """ Flag that controls if the map has been
+    changed since the last flush operation """
+
+    def __init__(self, file_path):
+        """
+        Constructor of the class.
+
+        @type file_path: String
+        @param file_path: The path to the file where the
+        map is persisted (serialized).
+        """
+
+        self.file_path = file_path
+
+        self.entries = {}
+
+    def load(self):
+        """
+        Loads the entries from the file, in case the file
+        does not exist or is not valid the map is left empty.
+        """
+
+        # in case the file does not exists there's
+        # nothing to be loaded (returns immediately)
+        if not os.path.exists(self.file_path): return
+
+        try:
+            # opens the file and reads the
+            # (serialized) entries from it
+            file = open(self.file_path, "rb")
+            try: entries = marshal.load(file)
+            finally: file.close()
+        except BaseException:
+            # sets the entries as invalid (the
+            # file is corrupt or incompatible)
+            entries = None
+
+        # in case the loaded entries are not valid
+        # ignores them and marks the map as dirty
+        # so that the file is re-written
+        if not type(entries) == types.DictType:
+            self.dirty = True
+            return
+
+        # sets the loaded entries in the map
+        self.entries = entries
+
+    def flush(self):
+        """
+        Flushes the entries into the file, in case they have
+        been changed since the last flush.
+        The file is written atomically (moved from a temporary
+        file) so that concurrent readers never see a partial file.
+        """
+
+        # in case the map has not been changed there's
+        # no need to flush it (returns immediately)
+        if not self.dirty: return
+
+        # retrieves the directory of the file and
+        # creates it in case it does not exists
+        directory_path = os.path.dirname(self.file_path)
+        if not os.path.exists(directory_path): os.makedirs(directory_path)
+
+        # writes the entries into a temporary file and then
+        # moves it into the final file path
+        temporary_file_path = self.file_path + ".tmp"
+        file = open(temporary_file_path, "wb")
+        try: marshal.dump(self.entries, file)
+        finally: file.close()
+        if os.path.exists(self.file_path): os.remove(self.file_path)
+        os.rename(temporary_file_path, self.file_path)
+
+        # unsets the dirty flag (the map is flushed)
+        self.dirty = False
+
+class DiscoveryManifest(PersistentMap):
+    """
+    Class that describes an (on disk) manifest of the plugin
+    discovery process, associating the plugin paths with the
+    list of modules found in them at a certain modification
+    time of the directory.
+    The manifest avoids the listing and the stat of every entry
+    of the (unchanged) plugin paths, as only the directories
+    with a different modification time are rescanned.
+    """
+
+    def get(self, path, suffix, modification_time):
+        """
+        Retrieves the list of modules for the given path and
+        suffix in case the manifest entry is valid for the
+        given modification time of the path.
+
+        @type path: String
+        @param path: The path to retrieve the modules.
+        @type suffix: String
+        @param suffix: The suffix used to filter the modules.
+        @type modification_time: float
+        @param modification_time: The current modification time
+        of the path (directory).
+        @rtype: List
+        @return: The list of modules for the path or invalid in
+        case there's no valid entry for the path.
+        """
+
+        # retrieves the entry for the path and suffix and in case
+        # it's not defined or outdated returns invalid
+        entry = self.entries.get((path, suffix), None)
+        if not entry: return None
+        if not entry[0] == modification_time: return None
+
+        # returns a copy of the list of modules
+        # of the entry (avoids external changes)
+        return list(entry[1])
+
+    def set(self, path, suffix, modification_time, modules):
+        """
+        Sets the list of modules for the given path and suffix
+        at the given modification time of the path.
+        In case the modification time is too recent the entry
+        is not set, as changes in the same (timestamp) resolution
+        window would not be detected.
+
+        @type path: String
+        @param path: The path to set the modules.
+        @type suffix: String
+        @param suffix: The suffix used to filter the modules.
+        @type modification_time: float
+        @param modification_time: The modification time of the
+        path (directory) before the listing of the modules.
+        @type modules: List
+        @param modules: The list of modules found in the path.
+        """
+
+        # in case the modification time is too recent (possible
+        # changes in the same resolution window) the entry is not
+        # safe to be set (returns immediately)
+        if time.time() - modification_time < MANIFEST_SAFETY_WINDOW: return
+
+        # sets the entry for the path and suffix and
+        # marks the manifest as changed (dirty)
+        self.entries[(path, suffix)] = (modification_time, list(modules))
+        self.dirty = True
+
+class PluginRegistry(PersistentMap):
+    """
+    Class that describes an (on disk) registry of the plugin
+    metadata, associating the name of the plugin modules with
+    the metadata of the plugin class defined in them.
+    The registry allows the creation of (lightweight) plugin
+    proxy classes without the import of the plugin modules.
+    Only the lazy loaded plugins with a metadata that can be
+    serialized are registered.
+    """
+
+    proxy_classes = {}
+    """ The map associating the name of the plugin modules
+    with the proxy classes created for them, the reference
+    is required as the sub classes are weakly referenced """
+
+    def __init__(self, file_path):
+        """
+        Constructor of the class.
+
+        @type file_path: String
+        @param file_path: The path to the file where the
+        registry is persisted (serialized).
+        """
+
+        PersistentMap.__init__(self, file_path)
+
+        self.proxy_classes = {}
+
+    def get(self, module_name):
+        """
+        Retrieves the metadata entry for the plugin module with
+        the given name, in case the entry is valid for the current
+        modification time of the module file.
+
+        @type module_name: String
+        @param module_name: The name of the plugin module.
+        @rtype: Dictionary
+        @return: The metadata entry for the plugin module or
+        invalid in case there's no valid entry for it.
+        """
+
+        # retrieves the entry for the module and in case
+        # it's not defined returns invalid
+        entry = self.entries.get(module_name, None)
+        if not entry: return None
+
+        # retrieves the current modification time of the module
+        # file and in case it's not the same as the one of the entry
+        # returns invalid (the entry is outdated)
+        try: modification_time = os.path.getmtime(entry["source_path"])
+        except OSError: return None
+        if not entry["modification_time"] == modification_time: return None
+
+        # in case the entry does not contain the overridden methods
+        # (created by a previous version) it's considered outdated
+        if not "overridden" in entry: return None
+
+        # returns the (valid) entry
+        return entry
+
+    def set(self, module_name, plugin_class):
+        """
+        Sets the metadata entry for the plugin module with the given
+        name from the given plugin class, in case the plugin class
+        is not eligible for registration the entry is removed.
+
+        @type module_name: String
+        @param module_name: The name of the plugin module.
+        @type plugin_class: Class
+        @param plugin_class: The plugin class to retrieve the metadata.
+        """
+
+        # creates the entry for the plugin class and in case it's not
+        # valid (not eligible) removes the entry for the module
+        entry = self._create_entry(plugin_class)
+        if not entry: self.remove(module_name); return
+
+        # in case the entry is the same as the current
+        # one there's nothing to be changed
+        if self.entries.get(module_name, None) == entry: return
+
+        # sets the entry for the module and marks
+        # the registry as changed (dirty)
+        self.entries[module_name] = entry
+        self.dirty = True
+
+    def remove(self, module_name):
+        """
+        Removes the metadata entry for the plugin module
+        with the given name (in case it exists).
+
+        @type module_name: String
+        @param module_name: The name of the plugin module.
+        """
+
+        # in case there's no entry for the module
+        # there's nothing to be removed
+        if not module_name in self.entries: return
+
+        # removes the entry for the module and marks
+        # the registry as changed (dirty)
+        del self.entries[module_name]
+        self.dirty = True
+
+    def get_proxy_class(self, module_name):
+        """
+        Retrieves the plugin proxy class for the plugin module with
+        the given name, the proxy class is created from the (valid)
+        metadata entry of the module.
+
+        @type module_name: String
+        @param module_name: The name of the plugin module.
+        @rtype: Class
+        @return: The plugin proxy class for the plugin module or
+        invalid in case there's no valid entry for it.
+        """
+
+        # in case the proxy class is already created for
+        # the module returns it immediately
+        proxy_class = self.proxy_classes.get(module_name, None)
+        if proxy_class: return proxy_class
+
+        # retrieves the (valid) entry for the module and in
+        # case it's not set returns invalid
+        entry = self.get(module_name)
+        if not entry: return None
+
+        # creates the dependencies from their serialized
+        # tuple representation (plugin or package)
+        dependencies = []
+        for dependency in entry["dependencies"]:
+            dependency_type = dependency[0]
+            if dependency_type == "plugin": dependencies.append(PluginDependency(*dependency[1:]))
+            else: dependencies.append(PackageDependency(*dependency[1:]))
+
+        # creates the map of attributes for the proxy class from
+        # the metadata of the entry and the proxy values
+        attributes = dict(entry["metadata"])
+        attributes["dependencies"] = dependencies
+        attributes["valid"] = True
+        attributes["proxy_module"] = module_name
+        attributes["proxy_path"] = entry["path"]
+        attributes["__module__"] = module_name
+
+        # adds the methods that materialize the real plugin for the
+        # (base plugin) methods overridden by the real plugin class,
+        # so that the calls (eg: lifecycle) reach the real methods
+        for name in entry["overridden"]: attributes[name] = create_proxy_method(name)
+
+        # creates the proxy class with the name of the real plugin
+        # class and sets it in the proxy classes map
+        proxy_class = type(entry["class_name"], (PluginProxy,), attributes)
+        self.proxy_classes[module_name] = proxy_class
+
+        # returns the proxy class
+        return proxy_class
+
+    def _create_entry(self, plugin_class):
+        """
+        Creates the metadata entry for the given plugin class, in
+        case the plugin class is not eligible for registration
+        (not lazy loaded or not serializable) invalid is returned.
+
+        @type plugin_class: Class
+        @param plugin_class: The plugin class to create the entry.
+        @rtype: Dictionary
+        @return: The metadata entry for the plugin class.
+        """
+
+        # in case the plugin is not lazy loaded (it's going to be
+        # loaded anyway) or it's a plugin manager plugin or overrides
+        # the lazy load (not possible in the proxy) it's not eligible
+        if not plugin_class.loading_type == LAZY_LOADING_TYPE: return None
+        if issubclass(plugin_class, PluginManagerPlugin): return None
+        if not plugin_class.lazy_load_plugin.im_func == Plugin.lazy_load_plugin.im_func: return None
+
+        # creates the serialized tuple representation of the
+        # dependencies, in case any of them contains conditions
+        # or is of an unknown type the plugin is not eligible
+        dependencies = []
+        for dependency in plugin_class.dependencies:
+            if dependency.conditions_list: return None
+            if isinstance(dependency, PluginDependency):
+                dependencies.append((
+                    "plugin",
+                    dependency.plugin_id,
+                    dependency.plugin_version,
+                    dependency.diffusion_policy,
+                    dependency.mandatory
+                ))
+            elif isinstance(dependency, PackageDependency):
+                dependencies.append((
+                    "package",
+                    dependency.package_name,
+                    dependency.package_import_name,
+                    dependency.package_version,
+                    dependency.package_url,
+                    dependency.mandatory
+                ))
+            else: return None
+
+        # retrieves the path to the plugin file and the path to the
+        # source file (used for the modification time validation)
+        path = inspect.getfile(plugin_class)
+        source_path = path
+        if source_path.endswith((".pyc", ".pyo")) and\
+            os.path.exists(source_path[:-1]): source_path = source_path[:-1]
+
+        # creates the entry with the metadata of the plugin class
+        entry = {
+            "class_name" : plugin_class.__name__,
+            "path" : path,
+            "source_path" : source_path,
+            "modification_time" : os.path.getmtime(source_path),
+            "dependencies" : dependencies,
+            "overridden" : get_overridden_methods(plugin_class),
+            "metadata" : {
+                "id" : plugin_class.id,
+                "name" : plugin_class.name,
+                "description" : plugin_class.description,
+                "version" : plugin_class.version,
+                "author" : plugin_class.author,
+                "loading_type" : plugin_class.loading_type,
+                "platforms" : plugin_class.platforms,
+                "attributes" : plugin_class.attributes,
+                "capabilities" : plugin_class.capabilities,
+                "capabilities_allowed" : plugin_class.capabilities_allowed,
+                "events_fired" : plugin_class.events_fired,
+                "events_handled" : plugin_class.events_handled,
+                "main_modules" : plugin_class.main_modules,
+                "thread_safe" : plugin_class.thread_safe
+            }
+        }
+
+        # tries to serialize the entry, in case it's not possible
+        # (not serializable metadata) the plugin is not eligible
+        try: marshal.dumps(entry)
+        except ValueError: return None
+
+        # returns the entry
+        return entry
+
+class LoadPlan(PersistentMap):
+    """
+    Class that describes an (on disk) plan of the resolved loading
+    of the plugins, containing the plugins with satisfied dependencies,
+    the resolved capability to plugins map and the (concurrent) load
+    graphs, keyed by the fingerprint of the plugins.
+    In the boot of an unchanged set of plugins (same fingerprint) the
+    plan is replayed, skipping the resolution passes, otherwise the
+    plan is reset and the resolution is recorded.
+    """
+
+    replay = False
+    """ Flag indicating if the plan is replayed (the
+    fingerprint of the plugins is unchanged) """
+
+    def activate(self, fingerprint):
+        """
+        Activates the plan for the given fingerprint of the plugins,
+        in case the fingerprint is not the same as the one of the
+        (loaded) plan the plan is reset (recorded from scratch).
+
+        @type fingerprint: String
+        @param fingerprint: The fingerprint of the current plugins.
+        @rtype: bool
+        @return: If the plan is replayed (unchanged fingerprint).
+        """
+
+        # in case the fingerprint is the same as the one
+        # of the plan the plan is replayed
+        self.replay = self.entries.get("fingerprint", None) == fingerprint
+        if self.replay: return True
+
+        # resets the entries of the plan for the fingerprint
+        # and marks the plan as changed (dirty)
+        self.entries = {
+            "fingerprint" : fingerprint,
+            "satisfied" : set(),
+            "capabilities" : {},
+            "graphs" : {}
+        }
+        self.dirty = True
+        return False
+
+    def is_satisfied(self, plugin_id):
+        """
+        Retrieves if the dependencies of the plugin with the
+        given id are satisfied in the (replayed) plan.
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin.
+        @rtype: bool
+        @return: If the dependencies of the plugin are satisfied.
+        """
+
+        return self.replay and plugin_id in self.entries["satisfied"]
+
+    def set_satisfied(self, plugin_id):
+        """
+        Sets the dependencies of the plugin with the given
+        id as satisfied in the plan.
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin.
+        """
+
+        satisfied = self.entries["satisfied"]
+        if plugin_id in satisfied: return
+        satisfied.add(plugin_id)
+        self.dirty = True
+
+    def get_capability(self, capability):
+        """
+        Retrieves the ids of the plugins resolved for the
+        given capability in the (replayed) plan.
+
+        @type capability: String
+        @param capability: The capability to retrieve the plugins.
+        @rtype: List
+        @return: The list of ids of the plugins for the capability
+        or invalid in case the capability is not resolved.
+        """
+
+        if not self.replay: return None
+        return self.entries["capabilities"].get(capability, None)
+
+    def set_capability(self, capability, plugin_ids):
+        """
+        Sets the ids of the plugins resolved for the
+        given capability in the plan.
+
+        @type capability: String
+        @param capability: The capability of the plugins.
+        @type plugin_ids: List
+        @param plugin_ids: The list of ids of the plugins.
+        """
+
+        capabilities = self.entries["capabilities"]
+        if capabilities.get(capability, None) == plugin_ids: return
+        capabilities[capability] = plugin_ids
+        self.dirty = True
+
+    def get_graph(self, key):
+        """
+        Retrieves the (concurrent) load graph for the given
+        key (loading type and root plugin ids) in the (replayed)
+        plan.
+
+        @type key: Tuple
+        @param key: The key of the load graph.
+        @rtype: Tuple
+        @return: The list of ids of the plugins in the graph, the map
+        of dependencies and the map of load types or invalid in case
+        the graph is not set.
+        """
+
+        if not self.replay: return None
+        return self.entries["graphs"].get(key, None)
+
+    def set_graph(self, key, graph):
+        """
+        Sets the (concurrent) load graph for the given key
+        (loading type and root plugin ids) in the plan.
+
+        @type key: Tuple
+        @param key: The key of the load graph.
+        @type graph: Tuple
+        @param graph: The list of ids of the plugins in the graph,
+        the map of dependencies and the map of load types.
+        """
+
+        graphs = self.entries["graphs"]
+        if graphs.get(key, None) == graph: return
+        graphs[key] = graph
+        self.dirty = True
+
+class ConfigurationCache:
+    """
+    Class that describes a cache of (plugin) configuration files,
+    associating a key (plugin id and relative path) with the contents
+    of the file and the values parsed from them.
+    The modification time of the files is only checked once per
+    interval, so that the repeated access to the configuration
+    avoids both the stat and the (re-)parsing of the file.
+    """
+
+    interval = DEFAULT_CONFIGURATION_CHECK_INTERVAL
+    """ The interval (in seconds) between the checks
+    of the modification time of the files """
+
+    entries = {}
+    """ The map associating the key with the entry list
+    containing the file path, the modification time, the
+    check time, the contents, the (weak) map of parsed values
+    (by parser) and the candidate file paths """
+
+    lock = None
+    """ The lock controlling the access to the entries """
+
+    def __init__(self, interval = DEFAULT_CONFIGURATION_CHECK_INTERVAL):
+        """
+        Constructor of the class.
+
+        @type interval: float
+        @param interval: The interval (in seconds) between the
+        checks of the modification time of the files.
+        """
+
+        self.interval = interval
+
+        self.entries = {}
+        self.lock = threading.RLock()
+
+    def get(self, key, file_paths, parser = None):
+        """
+        Retrieves the contents of the configuration file for the
+        given key, the file is the first one of the given candidate
+        file paths that exists.
+        In case a parser is given the value parsed from the contents
+        is returned instead, the value is parsed once per change and
+        stored (weakly) under the parser itself, so the parsers that are
+        re-created on every call (eg: lambdas and bound methods) are
+        called on every retrieval and the parser is called without
+        holding the lock of the cache.
+        The parsed value is shared by all the callers using the same
+        parser and must be considered read-only.
+
+        @type key: Tuple
+        @param key: The key identifying the configuration file.
+        @type file_paths: List
+        @param file_paths: The list of candidate file paths (in
+        order of precedence) for the configuration file.
+        @type parser: Function
+        @param parser: The function used to parse the contents of
+        the file, receiving the contents and returning the value.
+        @rtype: Tuple
+        @return: A tuple containing the contents (or parsed value)
+        and a flag indicating if the file changed since the previous
+        check, the contents are invalid in case no file exists.
+        """
+
+        self.lock.acquire()
+        try:
+            # retrieves the entry for the key and in case it's not
+            # defined or its check time is expired refreshes it
+            entry = self.entries.get(key, None)
+            changed = False
+            if not entry or time.time() - entry[2] >= self.interval:
+                entry, changed = self._refresh(key, file_paths)
+
+            # in case no parser is defined or there are no contents
+            # returns the (raw) contents of the file
+            contents = entry[3]
+            if not parser or contents == None: return contents, changed
+
+            # retrieves the map of parsed values from the entry and in
+            # case the contents are already parsed by the parser returns
+            # the stored value (parsers that are not referenceable are
+            # never found in the map)
+            values = entry[4]
+            if parser in values: return values[parser], changed
+        finally:
+            self.lock.release()
+
+        # parses the contents (outside the lock) and stores the value
+        # in case the entry was not replaced in the meantime (the
+        # parsers that are not referenceable are not stored)
+        value = parser(contents)
+        self.lock.acquire()
+        try:
+            if self.entries.get(key, None) is entry:
+                try: values[parser] = value
+                except TypeError: pass
+        finally:
+            self.lock.release()
+
+        # returns the parsed value
+        return value, changed
+
+    def check(self):
+        """
+        Checks all the entries of the cache for changes (ignoring
+        the interval), refreshing the changed entries.
+
+        @rtype: List
+        @return: The list of keys of the changed entries.
+        """
+
+        self.lock.acquire()
+        try:
+            # refreshes all the entries (with the file paths
+            # used in their creation) and gathers the changed keys
+            changed_keys = []
+            for key, entry in self.entries.items():
+                _entry, changed = self._refresh(key, entry[5])
+                changed and changed_keys.append(key)
+        finally:
+            self.lock.release()
+
+        # returns the changed keys
+        return changed_keys
+
+    def invalidate(self, key = None):
+        """
+        Invalidates the entry for the given key or all the
+        entries in case no key is defined.
+
+        @type key: Tuple
+        @param key: The key of the entry to be invalidated.
+        """
+
+        self.lock.acquire()
+        try:
+            if key == None: self.entries = {}
+            elif key in self.entries: del self.entries[key]
+        finally:
+            self.lock.release()
+
+    def _refresh(self, key, file_paths):
+        # retrieves the first of the candidate file paths that
+        # exists and its modification time
+        file_path = None
+        modification_time = None
+        for candidate_file_path in file_paths:
+            try: modification_time = os.stat(candidate_file_path).st_mtime
+            except OSError: continue
+            file_path = candidate_file_path
+            break
+
+        # in case the entry exists and the file is the same (path
+        # and modification time) only the check time is updated
+        entry = self.entries.get(key, None)
+        if entry and entry[0] == file_path and entry[1] == modification_time:
+            entry[2] = time.time()
+            return entry, False
+
+        # reads the contents of the file (in case it exists)
+        # closing the file immediately after the read
+        contents = None
+        if file_path:
+            file = open(file_path, "rb")
+            try: contents = file.read()
+            finally: file.close()
+
+        # creates the new entry (with an empty map of parsed values)
+        # and sets it in the entries, the entry is only considered
+        # changed in case it replaces a previous one
+        new_entry = [file_path, modification_time, time.time(), contents, weakref.WeakKeyDictionary(), tuple(file_paths)]
+        self.entries[key] = new_entry
+        return new_entry, not entry == None
+
+def get_thread_logger_prefix():
+    """
+    Retrieves the logger prefix for the current thread,
+    containing the thread identifier, the value is cached
+    in the thread local storage.
+
+    @rtype: String
+    @return: The logger prefix for the current thread.
+    """
+
+    # retrieves the (cached) logger prefix from the thread
+    # local storage and in case it's not set computes it
+    logger_prefix = getattr(logger_local, "prefix", None)
+    if logger_prefix == None:
+        logger_prefix = "[" + str(thread.get_ident()) + "] "
+        logger_local.prefix = logger_prefix
+
+    # returns the logger prefix
+    return logger_prefix
+
+class ReplicaPool:
+    """
+    Class that describes a pool of (pre-created and pre-loaded)
+    plugin replicas, to be used in the creation of plugins in a new
+    diffusion scope (allowed injection).
+    The pool of replicas of each plugin is controlled by a low and
+    a high watermark, once the number of available replicas drops
+    below the low watermark the pool should be refilled up to the
+    high watermark (asynchronously).
+    """
+
+    watermarks = {}
+    """ The map associating the plugin id with the tuple
+    containing the low and the high watermarks """
+
+    replicas = {}
+    """ The map associating the plugin id with the
+    deque of available (ready) replicas """
+
+    refilling = set()
+    """ The set of ids of the plugins whose pool
+    is currently being refilled """
+
+    statistics = {}
+    """ The map associating the plugin id with the map
+    of statistics (hits, misses, created and failed) """
+
+    closed = False
+    """ Flag indicating if the pool is closed, no more
+    replicas are taken or created """
+
+    lock = None
+    """ The lock controlling the access to the pool """
+
+    def __init__(self, watermarks = {}):
+        """
+        Constructor of the class.
+
+        @type watermarks: Dictionary
+        @param watermarks: The map associating the id of the plugins
+        to be pooled with the tuple containing the low and the
+        high watermarks.
+        """
+
+        self.watermarks = dict(watermarks)
+
+        self.replicas = {}
+        self.refilling = set()
+        self.statistics = {}
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def get_plugin_ids(self):
+        """
+        Retrieves the ids of the plugins to be pooled.
+
+        @rtype: List
+        @return: The list of ids of the plugins to be pooled.
+        """
+
+        return self.watermarks.keys()
+
+    def take(self, plugin_id, plugin_version = None):
+        """
+        Takes a ready replica of the plugin with the given id (and
+        version) from the pool, in case there's none available (miss)
+        invalid is returned and the replica must be created inline.
+        A replica of another version is kept in the pool (miss).
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin to take a replica.
+        @type plugin_version: String
+        @param plugin_version: The version of the plugin, in case
+        it's not defined any version is valid.
+        @rtype: Plugin
+        @return: The ready replica or invalid in case of miss.
+        """
+
+        self.lock.acquire()
+        try:
+            # retrieves the deque of replicas for the plugin and the first
+            # replica in it (in case there's one available), in case it's
+            # valid for the requested version it's popped from the deque
+            replicas = self.replicas.get(plugin_id, None)
+            replica = not self.closed and replicas and replicas[0] or None
+            if replica and plugin_version and\
+                not colony.libs.version_util.version_cmp(replica.version, plugin_version): replica = None
+            replica and replicas.popleft()
+
+            # updates the statistics of the plugin with
+            # the result of the take (hit or miss)
+            statistics = self._get_statistics(plugin_id)
+            statistics[replica and "hits" or "misses"] += 1
+        finally:
+            self.lock.release()
+
+        # returns the replica
+        return replica
+
+    def put(self, plugin_id, replica):
+        """
+        Puts the given (ready) replica in the pool of the
+        plugin with the given id.
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin of the replica.
+        @type replica: Plugin
+        @param replica: The ready replica to be put in the pool.
+        """
+
+        self.lock.acquire()
+        try:
+            self.replicas.setdefault(plugin_id, collections.deque()).append(replica)
+            self._get_statistics(plugin_id)["created"] += 1
+        finally:
+            self.lock.release()
+
+    def fail(self, plugin_id):
+        """
+        Notifies the pool about a failure in the creation of
+        a replica of the plugin with the given id.
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin of the replica.
+        """
+
+        self.lock.acquire()
+        try: self._get_statistics(plugin_id)["failed"] += 1
+        finally: self.lock.release()
+
+    def needs_refill(self, plugin_id):
+        """
+        Retrieves if the pool of the plugin with the given id is
+        below the low watermark (and is not being refilled).
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin to be tested.
+        @rtype: bool
+        @return: If the pool of the plugin must be refilled.
+        """
+
+        # in case the plugin is not pooled or the pool is closed
+        # or being refilled there's no need to refill it
+        if not plugin_id in self.watermarks: return False
+        if self.closed or plugin_id in self.refilling: return False
+
+        # retrieves the low watermark and tests it
+        # against the number of available replicas
+        low_watermark, _high_watermark = self.watermarks[plugin_id]
+        return len(self.replicas.get(plugin_id, ())) < low_watermark
+
+    def begin_refill(self, plugin_id):
+        """
+        Marks the pool of the plugin with the given id as being
+        refilled, in case it's already being refilled (or closed)
+        the refill must not be started.
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin to be refilled.
+        @rtype: bool
+        @return: If the refill of the pool may be started.
+        """
+
+        self.lock.acquire()
+        try:
+            if self.closed or plugin_id in self.refilling: return False
+            self.refilling.add(plugin_id)
+            return True
+        finally:
+            self.lock.release()
+
+    def end_refill(self, plugin_id):
+        """
+        Unmarks the pool of the plugin with the given
+        id as being refilled.
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin refilled.
+        """
+
+        self.lock.acquire()
+        try: self.refilling.discard(plugin_id)
+        finally: self.lock.release()
+
+    def is_full(self, plugin_id):
+        """
+        Retrieves if the pool of the plugin with the given id
+        reached the high watermark (or the pool is closed).
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin to be tested.
+        @rtype: bool
+        @return: If the pool of the plugin is full.
+        """
+
+        _low_watermark, high_watermark = self.watermarks[plugin_id]
+        return self.closed or len(self.replicas.get(plugin_id, ())) >= high_watermark
+
+    def remove(self, plugin_id):
+        """
+        Removes all the available replicas of the plugin with
+        the given id from the pool (eg: stale replicas).
+
+        @type plugin_id: String
+        @param plugin_id: The id of the plugin to remove the replicas.
+        @rtype: List
+        @return: The list of removed replicas.
+        """
+
+        self.lock.acquire()
+        try: return list(self.replicas.pop(plugin_id, ()))
+        finally: self.lock.release()
+
+    def close(self):
+        """
+        Closes the pool, no more replicas are taken or
+        created (the available replicas are kept loaded).
+        """
+
+        self.closed = True
+
+    def get_statistics(self):
+        """
+        Retrieves the statistics of the pool, the statistics of each
+        plugin (including the number of available replicas) and the
+        total number of hits and misses.
+
+        @rtype: Dictionary
+        @return: The map containing the statistics of the pool.
+        """
+
+        self.lock.acquire()
+        try:
+            # creates the map of statistics with a copy of the statistics
+            # of each plugin (with the available replicas) and the totals
+            statistics = {"hits" : 0, "misses" : 0, "plugins" : {}}
+            for plugin_id, plugin_statistics in self.statistics.items():
+                plugin_statistics = dict(plugin_statistics)
+                plugin_statistics["available"] = len(self.replicas.get(plugin_id, ()))
+                statistics["plugins"][plugin_id] = plugin_statistics
+                statistics["hits"] += plugin_statistics["hits"]
+                statistics["misses"] += plugin_statistics["misses"]
+        finally:
+            self.lock.release()
+
+        # returns the statistics
+        return statistics
+
+    def _get_statistics(self, plugin_id):
+        statistics = self.statistics.get(plugin_id, None)
+        if statistics: return statistics
+        statistics = {"hits" : 0, "misses" : 0, "created" : 0, "failed" : 0}
+        self.statistics[plugin_id] = statistics
+        return statistics
+
+class FileMonitor:
+    """
+    Class that describes a (polling) monitor of files, associating
+    the path of each watched file with a set of keys and detecting
+    the changes in the files through their modification time.
+    """
+
+    files = {}
+    """ The map associating the path of the watched file with
+    the list containing the modification time and the keys """
+
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
+
+        self.files = {}
+
+    def update(self, files_map):
+        """
+        Updates the set of watched files with the given map, the
+        files not yet watched start being watched (with the current
+        modification time) and the ones not in the map are removed.
+
+        @type files_map: Dictionary
+        @param files_map: The map associating the path of the files
+        to be watched with the set of keys of each file.
+        """
+
+        # creates the new map of files re-using the modification
+        # time of the files already watched (changes not lost)
+        files = {}
+        for file_path, keys in files_map.items():
+            entry = self.files.get(file_path, None)
+            if entry: modification_time = entry[0]
+            else: modification_time = self._get_modification_time(file_path)
+            files[file_path] = [modification_time, set(keys)]
+        self.files = files
+
+    def check(self):
+        """
+        Checks the watched files for changes (modification time
+        changed or file removed) updating the modification times.
+
+        @rtype: Set
+        @return: The set of keys of the changed files.
+        """
+
+        # iterates over all the watched files comparing the current
+        # modification time with the previous one and gathers the
+        # keys of the changed files
+        changed_keys = set()
+        for file_path, entry in self.files.items():
+            modification_time = self._get_modification_time(file_path)
+            if modification_time == entry[0]: continue
+            entry[0] = modification_time
+            changed_keys.update(entry[1])
+
+        # returns the changed keys
+        return changed_keys
+
+    def _get_modification_time(self, file_path):
+        try: return os.stat(file_path).st_mtime
+        except OSError: return None
+
+def get_capability(capability):
+    """
+    Retrieves the (interned) capability structure for the given
+    capability string, the structure is created only once for
+    each capability string and shared by all the callers.
+
+    @type capability: String
+    @param capability: The capability string.
+    @rtype: Capability
+    @return: The (interned) capability structure.
+    """
+
+    # tries to retrieve the capability structure from the cache
+    # and in case it's not found creates it and sets it in the
+    # cache (atomically so that concurrent callers share it)
+    capability_structure = capabilities_cache.get(capability, None)
+    if capability_structure: return capability_structure
+    return capabilities_cache.setdefault(capability, Capability(capability))
+
+def get_event(event):
+    """
+    Retrieves the (interned) event structure for the given
+    event string, the structure is created only once for
+    each event string and shared by all the callers.
+
+    @type event: String
+    @param event: The event string.
+    @rtype: Event
+    @return: The (interned) event structure.
+    """
+
+    # tries to retrieve the event structure from the cache
+    # and in case it's not found creates it and sets it in the
+    # cache (atomically so that concurrent callers share it)
+    event_structure = events_cache.get(event, None)
+    if event_structure: return event_structure
+    return events_cache.setdefault(event, Event(event))
+
+def get_loaded_functions(plugin_class):
+    """
+    Retrieves the list of name and loaded function tuples for
+    the methods of the given plugin class that are intercepted
+    for the (lazy) loading of the plugin, the list is computed
+    only once for each plugin class.
+
+    @type plugin_class: Class
+    @param plugin_class: The plugin class to retrieve the
+    loaded functions.
+    @rtype: List
+    @return: The list of name and loaded function tuples.
+    """
+
+    # tries to retrieve the loaded functions from the
+    # cache returning them in case they're found
+    loaded_functions = loaded_functions_cache.get(plugin_class, None)
+    if not loaded_functions == None: return loaded_functions
+
+    # iterates over the classes in the resolution order (the
+    # first definition of a name is the one in use) collecting
+    # the functions with a loaded version (interceptors)
+    loaded_functions = []
+    names = set()
+    for _class in inspect.getmro(plugin_class):
+        for name, value in _class.__dict__.items():
+            if name in names: continue
+            names.add(name)
+            loaded_function = getattr(value, "loaded_function", None)
+            if loaded_function: loaded_functions.append((name, loaded_function))
+
+    # sets the loaded functions in the cache and returns them
+    return loaded_functions_cache.setdefault(plugin_class, loaded_functions)
+
+def get_overridden_methods(plugin_class):
+    """
+    Retrieves the (sorted) list of names of the methods of the
+    base plugin class that are overridden by the given plugin class.
+
+    @type plugin_class: Class
+    @param plugin_class: The plugin class to retrieve the
+    overridden methods.
+    @rtype: List
+    @return: The sorted list of names of the overridden methods.
+    """
+
+    overridden_methods = []
+    for name, value in inspect.getmembers(Plugin, inspect.ismethod):
+        if name.startswith("__"): continue
+        if getattr(plugin_class, name).im_func == value.im_func: continue
+        overridden_methods.append(name)
+    return overridden_methods
+
+def create_proxy_method(name):
+    """
+    Creates the method (for the plugin proxy class) that
+    materializes the real plugin and calls the method with
+    the given name in the (now) real plugin instance.
+
+    @type name: String
+    @param name: The name of the method (overridden by
+    the real plugin class).
+    @rtype: Function
+    @return: The created proxy method.
+    """
+
+    def proxy_method(self, *args, **kwargs):
+        # tries to materialize the real plugin for the current
+        # proxy and in case it fails raises an exception
+        if not self.manager or not self.manager.materialize_plugin(self):
+            raise colony.base.exceptions.PluginSystemException("problem materializing plugin '%s'" % self.id)
+
+        # calls the method in the (now)
+        # real plugin instance
+        return getattr(self, name)(*args, **kwargs)
+
+    # sets the name of the method and returns it
+    proxy_method.__name__ = name
+    return proxy_method
+
+def get_metered_functions(plugin_class):
+    """
+    Retrieves the list of name and metered function tuples for
+    the methods of the given plugin class that are intercepted
+    only for the metrics (the ones intercepted for the loading
+    are bound with the loaded functions), the list is computed
+    only once for each plugin class.
+
+    @type plugin_class: Class
+    @param plugin_class: The plugin class to retrieve the
+    metered functions.
+    @rtype: List
+    @return: The list of name and metered function tuples.
+    """
+
+    # tries to retrieve the metered functions from the
+    # cache returning them in case they're found
+    metered_functions = metered_functions_cache.get(plugin_class, None)
+    if not metered_functions == None: return metered_functions
+
+    # iterates over the classes in the resolution order (the
+    # first definition of a name is the one in use) collecting
+    # the functions with a metered version and no loaded version
+    metered_functions = []
+    names = set()
+    for _class in inspect.getmro(plugin_class):
+        for name, value in _class.__dict__.items():
+            if name in names: continue
+            names.add(name)
+            metered_function = getattr(value, "metered_function", None)
+            if not metered_function or hasattr(value, "loaded_function"): continue
+            metered_functions.append((name, metered_function))
+
+    # sets the metered functions in the cache and returns them
+    return metered_functions_cache.setdefault(plugin_class, metered_functions)
+
+def capability_and_super_capabilites(capability):
+    """
+    Retrieves the list of the capability and all super capabilities.
+
+    @type capability: String
+    @param capability: The capability to retrieve the the list of the
+    capability and all super capabilities.
+    @rtype: List
+    @return: The list of the capability and all super capabilities.
+    """
+
+    # retrieves the capability structure from the capability string
+    capability_structure = get_capability(capability)
+
+    # returns the list of the capability and all super capabilities
+    return capability_structure.capability_and_super_capabilites()
+
+def is_capability_or_sub_capability(base_capability, capability):
+    """
+    Tests if the given capability is capability or sub capability
+    of the given base capability.
+
+    @type base_capability: String
+    @param base_capability: The base capability to be used for test.
+    @type capability: String
+    @param capability: The capability to be tested.
+    @rtype: bool
+    @return: The result of the test.
+    """
+
+    # retrieves the base capability structure from
+    # the base capability string
+    base_capability_structure = get_capability(base_capability)
+
+    # retrieves the capability structure from the capability string
+    capability_structure = get_capability(capability)
+
+    # returns the result of the is capability or sub capability test
+    return base_capability_structure.is_capability_or_sub_capability(capability_structure)
+
+def is_capability_or_sub_capability_in_list(base_capability, capability_list):
+    """
+    Tests if any of the capabilities in the capability list is capability or
+    sub capability of the given base capability.
+
+    @type base_capability: String
+    @param base_capability: The base capability to be used for test.
+    @type capability_list: List
+    @param capability_list: The list of capabilities to be tested.
+    @rtype: bool
+    @return: The result of the test.
+    """
+
+    # iterates over all the capabilities in the capability list
+    for capability in capability_list:
+        # tests if the capability is capability or
+        # sub capability of the base capability
+        if is_capability_or_sub_capability(base_capability, capability):
+            # returns true
+            return True
+
+    # returns false
+    return False
+
+def convert_to_capability_list(capability_list):
+    """
+    Converts the given capability list (list of strings),
+    into a list of capability objects (structures).
+
+    @type capability_list: List
+    @para capability_list: The list of capability strings.
+    @rtype: List
+    @return: The list of converted capability objects (structures).
+    """
+
+    # creates the list of capability structures
+    capability_list_structure = []
+
+    # iterates over all the capabilities in the capability list
+    for capability in capability_list:
+        # retrieves the capability type
+        capability_type = type(capability)
+
+        # in case the capability type is tuple
+        if capability_type == types.TupleType:
+            # retrieves the capability value and diffusion policy
+            capability_value, _diffusion_policy = capability
+        else:
+            # sets the capability values as the capability itself
+            capability_value = capability
+
+        # retrieves the capability structure from the
+        # capability string
+        capability_structure = get_capability(capability_value)
+
+        # adds the capability structure to the list
+        # of capability structures
+        capability_list_structure.append(capability_structure)
+
+    # returns the list of capability structures
+    return capability_list_structure
+
+def is_event_or_sub_event(base_event, event):
+    """
+    Tests if the given event is event or sub event
+    of the given base event.
+
+    @type base_event: String
+    @param base_event: The base event to be used for test.
+    @type event: String
+    @param event: The event to be tested.
+    @rtype: bool
+    @return: The result of the test.
+    """
+
+    # retrieves the base event structure from
+    # the base event string
+    base_event_structure = get_event(base_event)
+
+    # retrieves the event structure from the event string
+    event_structure = get_event(event)
+
+    # returns the result of the is event or sub event test
+    return base_event_structure.is_event_or_sub_event(event_structure)
+
+def is_event_or_super_event(base_event, event):
+    """
+    Tests if the given event is event or super event
+    of the given base event.
+
+    @type base_event: String
+    @param base_event: The base event to be used for test.
+    @type event: String
+    @param event: The event to be tested.
+    @rtype: bool
+    @return: The result of the test.
+    """
+
+    # returns the result of the is event or sub event test
+    # inverting the arguments
+    return is_event_or_sub_event(event, base_event)
 
 def is_event_or_sub_event_in_list(base_event, event_list):
     """
@@ -6771,9 +10680,9 @@ def convert_to_event_list(event_list):
 
     # iterates over all the events in the event list
     for event in event_list:
-        # creates the event structure from the
+        # retrieves the event structure from the
         # event string
-        event_structure = Event(event)
+        event_structure = get_event(event)
 
         # adds the event structure to the list
         # of event structures
@@ -6782,14 +10691,26 @@ def convert_to_event_list(event_list):
     # returns the list of event structures
     return event_list_structure
 
-class PluginThread(threading.Thread):
+class PluginThread:
     """
-    The plugin thread class.
+    The plugin thread class, the (serialized) queue of lifecycle
+    events of a main or thread plugin.
+    The events are executed one at a time (in order) by the shared
+    lifecycle executor of the plugin manager, so that no operative
+    system thread is created per plugin or per lifecycle call.
+    A call that releases the ready semaphore and keeps running (eg:
+    main loop) is detached from the executor upon the release, so
+    that neither the executor nor the queue of the plugin are
+    blocked by it.
     """
 
     plugin = None
     """ The plugin to be used """
 
+    executor = None
+    """ The (shared) executor used to run the
+    lifecycle calls of the plugin """
+
     load_complete = False
     """ The load complete flag """
 
@@ -6802,45 +10723,68 @@ class PluginThread(threading.Thread):
     end_unload_complete = False
     """ The end unload complete flag """
 
-    load_plugin_thread = None
-    """ The thread that controls the load plugin
-    method call """
+    event_queue = None
+    """ The queue (deque) of events to be processed """
 
-    end_load_plugin_thread = None
-    """ The thread that controls the end load
-    plugin method call """
+    lock = None
+    """ The lock controlling the access to the
+    queue and to the execution state """
 
-    unload_plugin_thread = None
-    """ The thread that controls the unload
-    plugin method call """
+    busy = False
+    """ Flag indicating if there's an event currently
+    scheduled or running in the executor """
 
-    end_unload_plugin_thread = None
-    """ The thread that controls the end unload
-    plugin method call """
+    running_token = None
+    """ The token identifying the event call currently
+    running, unset in case the call is detached """
 
-    event_queue = []
-    """ The queue of events to be processed """
+    running_worker = None
+    """ The worker thread running the current event call """
 
-    condition = None
-    """ The plugin thread condition """
+    running_future = None
+    """ The future of the current event call """
 
-    def __init__(self, plugin):
+    running_release_count = 0
+    """ The ready semaphore release count of the plugin
+    at the start of the current event call """
+
+    calling_worker = None
+    """ The worker thread running the lifecycle method of the
+    current event call, unset once the method returns """
+
+    detached_futures = []
+    """ The list of futures of the detached (long
+    running) event calls """
+
+    exit_future = None
+    """ The future of the exit event call """
+
+    exited = False
+    """ Flag indicating if the exit event was processed """
+
+    def __init__(self, plugin, executor):
         """
         Constructor of the class.
 
         @type plugin: Plugin
         @param plugin: The plugin to be used.
+        @type executor: ThreadPool
+        @param executor: The (shared) executor used to run
+        the lifecycle calls of the plugin.
         """
 
-        threading.Thread.__init__(self)
         self.plugin = plugin
+        self.executor = executor
 
-        self.daemon = True
-        self.condition = threading.Condition()
-
-        self.event_queue = []
+        self.event_queue = collections.deque()
+        self.lock = plugin.manager.instrument_lock(threading.Lock(), "plugin_thread[%s]" % plugin.id)
+        self.detached_futures = []
         self.load_complete = False
 
+        # sets the plugin thread in the plugin so that the
+        # releases of the ready semaphore are notified
+        plugin.plugin_thread = self
+
     def set_load_complete(self, value):
         """
         Sets the load complete.
@@ -6883,23 +10827,35 @@ class PluginThread(threading.Thread):
 
     def add_event(self, event):
         """
-        Adds an event to the event queue.
+        Adds an event to the event queue, scheduling it
+        for execution in the lifecycle executor.
 
         @type event: String
         @param event: The event to be added to the event queue.
         """
 
-        # acquires the condition
-        self.condition.acquire()
-
-        # adds the event to the event queue
-        self.event_queue.append(event)
-
-        # notifies the condition
-        self.condition.notify()
+        self.lock.acquire()
 
-        # releases the condition
-        self.condition.release()
+        try:
+            # in case the exit event was already processed
+            # no more events are accepted (ignores it)
+            if self.exited: return
+
+            # adds the event to the event queue
+            self.event_queue.append(event)
+
+            # in case the current call has released the ready semaphore
+            # (from another thread) and is still running (long running
+            # call) it's detached so that the queue is no longer blocked
+            if self.running_worker and not\
+                self.plugin.ready_semaphore_release_count == self.running_release_count:
+                self._detach()
+
+            # schedules the next event (in case
+            # there's no event currently running)
+            self._schedule()
+        finally:
+            self.lock.release()
 
     def process_event(self, event):
         """
@@ -6908,138 +10864,420 @@ class PluginThread(threading.Thread):
         @type event: Event
         @param event: The event to be processed.
         @rtype: bool
-        @return: If the upper loop should be terminated.
+        @return: If the event is the exit (final) event.
         """
 
         if event.event_name == EXIT_VALUE:
-            if self.load_plugin_thread and self.load_plugin_thread.isAlive():
-                self.load_plugin_thread.join(DEFAULT_UNLOAD_SYSTEM_TIMEOUT)
-            if self.end_load_plugin_thread and self.end_load_plugin_thread.isAlive():
-                self.end_load_plugin_thread.join(DEFAULT_UNLOAD_SYSTEM_TIMEOUT)
-            if self.unload_plugin_thread and self.unload_plugin_thread.isAlive():
-                self.unload_plugin_thread.join(DEFAULT_UNLOAD_SYSTEM_TIMEOUT)
-            if self.end_unload_plugin_thread and self.end_unload_plugin_thread.isAlive():
-                self.end_unload_plugin_thread.join(DEFAULT_UNLOAD_SYSTEM_TIMEOUT)
             return True
         elif event.event_name == LOAD_VALUE:
-            self.load_plugin_thread = PluginEventThread(self.plugin, self.plugin.load_plugin)
-            self.load_plugin_thread.start()
+            self.call_method(self.plugin.load_plugin)
             self.load_complete = True
         elif event.event_name == LAZY_LOAD_VALUE:
-            self.lazy_load_plugin_thread = PluginEventThread(self.plugin, self.plugin.lazy_load_plugin)
-            self.lazy_load_plugin_thread.start()
+            self.call_method(self.plugin.lazy_load_plugin)
             self.load_complete = True
         elif event.event_name == END_LOAD_VALUE:
-            self.end_load_plugin_thread = PluginEventThread(self.plugin, self.plugin.end_load_plugin)
-            self.end_load_plugin_thread.start()
+            self.call_method(self.plugin.end_load_plugin)
             self.end_load_complete = True
         elif event.event_name == UNLOAD_VALUE:
-            self.unload_plugin_thread = PluginEventThread(self.plugin, self.plugin.unload_plugin)
-            self.unload_plugin_thread.start()
+            self.call_method(self.plugin.unload_plugin)
             self.unload_complete = True
         elif event.event_name == END_UNLOAD_VALUE:
-            self.end_unload_plugin_thread = PluginEventThread(self.plugin, self.plugin.end_unload_plugin)
-            self.end_unload_plugin_thread.start()
+            self.call_method(self.plugin.end_unload_plugin)
             self.end_unload_complete = True
 
-    def run(self):
+    def call_method(self, method):
         """
-        Starts running the thread.
+        Calls the given (lifecycle) method of the plugin, releasing
+        the ready semaphore of the plugin in case the method did not
+        release it (so that the manager is never blocked).
+
+        @type method: Method
+        @param method: The lifecycle method of the plugin to be called.
         """
 
-        # loops continuously
-        while True:
-            # acquires the condition
-            self.condition.acquire()
+        # retrieves the original semaphore release count
+        original_semaphore_release_count = self.running_release_count
 
-            # iterates while the event queue is empty
-            while not len(self.event_queue):
-                # waits for the condition
-                self.condition.wait()
+        # sets the current thread as the calling worker so that a release
+        # of the ready semaphore during the method detaches the call
+        current_thread = threading.currentThread()
+        self.lock.acquire()
+        try: self.calling_worker = current_thread
+        finally: self.lock.release()
 
-            # retrieves the event
-            event = self.event_queue.pop(0)
+        try:
+            if self.plugin.manager.stop_on_cycle_error:
+                # calls the event method
+                method()
+            else:
+                try:
+                    # calls the event method
+                    method()
+                except BaseException, exception:
+                    # prints an error message
+                    self.plugin.error("Problem starting thread plugin: " + unicode(exception))
 
-            # processes the event
-            if self.process_event(event):
-                # releases the condition
-                self.condition.release()
+                    # sets the exception in the plugin
+                    self.plugin.exception = exception
 
-                # returns immediately
-                return
+                    # sets the plugin error state flag
+                    self.plugin.error_state = True
+        finally:
+            # unsets the calling worker (the method returned) in case
+            # it was not replaced by the call of the next event
+            self.lock.acquire()
+            try:
+                if self.calling_worker == current_thread: self.calling_worker = None
+            finally:
+                self.lock.release()
 
-            # releases the condition
-            self.condition.release()
+            # in case the call was expired by the watchdog (the ready
+            # semaphore was already released) removes the current
+            # thread from the expired ones and returns immediately
+            expired = current_thread in self.plugin.ready_semaphore_expired
+            expired and self.plugin.ready_semaphore_expired.remove(current_thread)
+            if expired: return
+
+        # acquires the ready semaphore lock
+        self.plugin.ready_semaphore_lock.acquire()
+
+        # retrieves the new semaphore release count
+        new_semaphore_release_count = self.plugin.ready_semaphore_release_count
+
+        # releases the ready semaphore lock
+        self.plugin.ready_semaphore_lock.release()
+
+        # in case the semaphore is locked waiting for the release
+        if new_semaphore_release_count == original_semaphore_release_count:
+            # releases the ready semaphore
+            self.plugin.release_ready_semaphore()
+
+            # prints log message
+            self.plugin.error("No Semaphore released upon thread call")
+
+    def released(self):
+        """
+        Notifies the plugin thread of a release of the ready semaphore
+        of the plugin, in case the release is made by the lifecycle
+        method of the current call (in its worker) the call is detached
+        from the executor, as it's considered to be long running (eg: main
+        loop) and the next event of the plugin is scheduled.
+        """
+
+        self.lock.acquire()
+        try:
+            # in case the release is not made by the running lifecycle
+            # method of the current call (returned, detached or expired
+            # calls or other threads) there's nothing to be done
+            current_thread = threading.currentThread()
+            if not self.calling_worker == current_thread or\
+                not self.running_worker == current_thread: return
+
+            # detaches the current call and schedules
+            # the next event (in case it exists)
+            self._detach()
+            self._schedule()
+        finally:
+            self.lock.release()
+
+    def expire(self, token, exception):
+        """
+        Expires the lifecycle call identified by the given token (in case
+        it's still running and did not release the ready semaphore),
+        setting the plugin in error state and releasing the ready semaphore
+        on behalf of the call, so that the manager is no longer blocked.
+        The worker running the call is detached from the executor so that
+        the queue of events of the plugin is not blocked by it.
+
+        @type token: Object
+        @param token: The token identifying the lifecycle call.
+        @type exception: Exception
+        @param exception: The exception to be set in the plugin.
+        @rtype: Thread
+        @return: The worker thread running the expired call or invalid
+        in case the call was not expired.
+        """
+
+        plugin = self.plugin
+
+        self.lock.acquire()
+        try:
+            # in case the call is no longer running (finished
+            # or detached) there's nothing to be expired
+            if not self.running_token == token: return None
+
+            plugin.ready_semaphore_lock.acquire()
+            try:
+                # in case the call already released the ready
+                # semaphore the manager is no longer blocked
+                if not plugin.ready_semaphore_release_count == self.running_release_count: return None
+
+                # sets the exception and the error state in the plugin
+                # and releases the ready semaphore (ignoring the late
+                # release of the running worker)
+                worker = self.running_worker
+                plugin.exception = exception
+                plugin.error_state = True
+                plugin.ready_semaphore_expired.append(worker)
+                plugin.ready_semaphore_release_count += 1
+                plugin.ready_semaphore.release()
+            finally:
+                plugin.ready_semaphore_lock.release()
+
+            # detaches the worker (the expired call is not joined
+            # as it may never finish) and schedules the next event
+            self._detach()
+            self.detached_futures.pop()
+            self._schedule()
+        finally:
+            self.lock.release()
+
+        # returns the worker of the expired call
+        return worker
+
+    def join(self, timeout = None):
+        """
+        Waits for the exit event to be processed and for the
+        detached (long running) calls to finish, each wait is
+        bounded by the given timeout.
+
+        @type timeout: float
+        @param timeout: The maximum amount of time to wait for
+        each of the calls (in seconds).
+        """
+
+        # retrieves the futures to be waited, the exit one
+        # (in case it exists) and the detached ones
+        self.lock.acquire()
+        try: futures = [self.exit_future] + list(self.detached_futures)
+        finally: self.lock.release()
+
+        # waits for each of the (valid) futures
+        for future in futures: future and future.wait(timeout)
+
+    def isAlive(self):
+        """
+        Retrieves if the plugin thread is still alive, meaning
+        that the exit event was not yet processed.
+
+        @rtype: bool
+        @return: If the plugin thread is still alive.
+        """
+
+        return not self.exited
+
+    def _schedule(self):
+        # in case there's an event currently running or the queue
+        # is empty there's nothing to be scheduled
+        if self.busy or not self.event_queue: return
+
+        # retrieves the next event and submits its execution to the
+        # executor (identified by a unique token object)
+        event = self.event_queue.popleft()
+        token = object()
+        self.busy = True
+        self.running_token = token
+        future = self.executor.submit(self._execute, event, token)
+        self.running_future = future
+
+        # in case the event is the exit one stores the
+        # future so that it's possible to join it
+        if event.event_name == EXIT_VALUE: self.exit_future = future
+
+    def _detach(self):
+        # detaches the worker running the current call from the
+        # executor (a replacement worker is started) and stores
+        # the future of the current call for joining
+        self.executor.detach(self.running_worker)
+        self.detached_futures.append(self.running_future)
+
+        # unsets the running state so that the next
+        # event may be scheduled (queue unblocked)
+        self.busy = False
+        self.running_token = None
+        self.running_worker = None
+        self.running_future = None
+
+    def _execute(self, event, token):
+        # sets the running state for the current call, storing the
+        # release count of the ready semaphore before the call
+        self.lock.acquire()
+        try:
+            self.running_worker = threading.currentThread()
+            self.running_release_count = self.plugin.ready_semaphore_release_count
+        finally:
+            self.lock.release()
 
-class PluginEventThread(threading.Thread):
+        # registers the call in the watchdog of the lifecycle
+        # calls (tracking the deadline of the call)
+        watchdog = self.plugin.manager.lifecycle_watchdog
+        watchdog.add_call(self, token, event.event_name)
+
+        try:
+            # processes the event and in case it's the
+            # exit event marks the plugin thread as exited
+            if self.process_event(event): self.exited = True
+        finally:
+            # removes the call from the watchdog
+            watchdog.remove_call(token)
+
+            # in case the current call was not detached unsets
+            # the running state and schedules the next event
+            self.lock.acquire()
+            try:
+                if self.running_token == token:
+                    self.busy = False
+                    self.running_token = None
+                    self.running_worker = None
+                    self.running_future = None
+                    self._schedule()
+            finally:
+                self.lock.release()
+
+class LifecycleWatchdog:
     """
-    The plugin event thread class.
+    The lifecycle watchdog class, tracking the in-flight lifecycle
+    calls of the main and thread plugins with a deadline per plugin
+    (lifecycle timeout attribute of the plugin or configuration).
+    A call exceeding its deadline without releasing the ready semaphore
+    is expired, the stack of its thread is dumped and the plugin is set
+    in error state, so that the rest of the system continues loading.
     """
 
-    plugin = None
-    """ The plugin that contains the method to be executed """
+    manager = None
+    """ The plugin manager """
+
+    calls = {}
+    """ The map associating the token of the lifecycle call with
+    the tuple containing the plugin thread, the name of the event,
+    the deadline (timestamp) and the timeout of the call """
 
-    method = None
-    """ The method for the event thread """
+    lock = None
+    """ The lock controlling the access to the calls """
 
-    def __init__(self, plugin, method):
+    thread = None
+    """ The thread checking the deadlines of the calls """
+
+    active = False
+    """ Flag indicating if the watchdog thread is active """
+
+    def __init__(self, manager):
         """
         Constructor of the class.
 
-        @type plugin: Plugin
-        @param plugin: The plugin that contains the method to be executed.
-        @type method: Method
-        @param method: The method for the event thread.
+        @type manager: PluginManager
+        @param manager: The plugin manager.
         """
 
-        threading.Thread.__init__(self)
-
-        self.plugin = plugin
-        self.method = method
+        self.manager = manager
 
-        self.daemon = True
+        self.calls = {}
+        self.lock = threading.Lock()
 
-    def run(self):
+    def add_call(self, plugin_thread, token, event_name):
         """
-        The method to start running the thread.
+        Adds the lifecycle call identified by the given token to the
+        tracked calls, in case a timeout is defined for the plugin.
+        The watchdog thread is started in case it's not running.
+
+        @type plugin_thread: PluginThread
+        @param plugin_thread: The plugin thread running the call.
+        @type token: Object
+        @param token: The token identifying the lifecycle call.
+        @type event_name: String
+        @param event_name: The name of the event of the call.
         """
 
-        if self.plugin.manager.stop_on_cycle_error:
-            # retrieves the original semaphore release count
-            original_semaphore_release_count = self.plugin.ready_semaphore_release_count
+        # retrieves the timeout for the lifecycle calls of the plugin
+        # (the attribute of the plugin overrides the configuration)
+        # and in case it's not defined returns immediately
+        timeout = plugin_thread.plugin.attributes.get(
+            "lifecycle_timeout",
+            plugin_manager_configuration.get("lifecycle_timeout", 0.0)
+        )
+        if not timeout or event_name == EXIT_VALUE: return
 
-            # calls the event thread method
-            self.method()
-        else:
-            try:
-                # retrieves the original semaphore release count
-                original_semaphore_release_count = self.plugin.ready_semaphore_release_count
+        self.lock.acquire()
+        try:
+            # adds the call with the deadline and starts the
+            # watchdog thread in case it's not active
+            self.calls[token] = (plugin_thread, event_name, time.time() + timeout, timeout)
+            if self.active: return
+            self.active = True
+            self.thread = threading.Thread(target = self._loop, name = "watchdog")
+            self.thread.daemon = True
+            self.thread.start()
+        finally:
+            self.lock.release()
 
-                # calls the event thread method
-                self.method()
-            except BaseException, exception:
-                # prints an error message
-                self.plugin.error("Problem starting thread plugin: " + unicode(exception))
+    def remove_call(self, token):
+        """
+        Removes the lifecycle call identified by the given
+        token from the tracked calls.
 
-                # sets the exception in the plugin
-                self.plugin.exception = exception
+        @type token: Object
+        @param token: The token identifying the lifecycle call.
+        """
 
-                # sets the plugin error state flag
-                self.plugin.error_state = True
+        self.lock.acquire()
+        try: self.calls.pop(token, None)
+        finally: self.lock.release()
 
-        # acquires the ready semaphore lock
-        self.plugin.ready_semaphore_lock.acquire()
+    def stop(self):
+        """
+        Stops the watchdog thread (it's re-started once
+        a new call is added).
+        """
 
-        # retrieves the original semaphore release count
-        new_semaphore_release_count = self.plugin.ready_semaphore_release_count
+        self.lock.acquire()
+        try: self.active = False
+        finally: self.lock.release()
 
-        # releases the ready semaphore lock
-        self.plugin.ready_semaphore_lock.release()
+    def check(self):
+        """
+        Checks the deadlines of the tracked calls, expiring the calls
+        that exceeded them, dumping the stack of the thread running
+        the call and setting the plugin in error state.
 
-        # in case the semaphore is locked waiting for the release
-        if new_semaphore_release_count == original_semaphore_release_count:
-            # releases the ready semaphore
-            self.plugin.release_ready_semaphore()
+        @rtype: List
+        @return: The list of the plugins of the expired calls.
+        """
 
-            # prints log message
-            self.plugin.error("No Semaphore released upon thread call")
+        # retrieves (and removes) the calls that
+        # exceeded their deadline
+        current = time.time()
+        self.lock.acquire()
+        try:
+            expired = [(key, value) for key, value in self.calls.items() if value[2] <= current]
+            for key, _value in expired: del self.calls[key]
+        finally:
+            self.lock.release()
+
+        plugins = []
+
+        for token, (plugin_thread, event_name, _deadline, timeout) in expired:
+            # expires the call in the plugin thread, in case it
+            # was not expired (finished or released) continues
+            plugin = plugin_thread.plugin
+            message = "%s call of plugin '%s' exceeded %.1fs" % (event_name, plugin.id, timeout)
+            exception = colony.base.exceptions.OperationTimeout(message)
+            worker = plugin_thread.expire(token, exception)
+            if not worker: continue
+
+            # retrieves the stack of the thread running the call
+            # and prints it in an error message
+            frame = sys._current_frames().get(worker.ident, None)
+            stack = frame and "".join(traceback.format_stack(frame)) or "unavailable"
+            self.manager.error("Lifecycle %s, stack of thread '%s':\n%s" % (message, worker.name, stack.rstrip()))
+            plugins.append(plugin)
+
+        # returns the plugins of the expired calls
+        return plugins
+
+    def _loop(self):
+        while self.active:
+            # sleeps for the check interval and checks the
+            # deadlines of the calls (printing the errors)
+            time.sleep(DEFAULT_WATCHDOG_CHECK_INTERVAL)
+            try: self.check()
+            except BaseException, exception: self.manager.error("Problem in the lifecycle watchdog: %s" % unicode(exception))
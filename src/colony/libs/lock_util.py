@@ -0,0 +1,450 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import os
+import sys
+import time
+import thread
+import threading
+import traceback
+
+class LockStatistics:
+    """
+    The lock statistics class, holding the accumulated wait
+    and hold times of the instrumented locks with a name.
+    """
+
+    name = None
+    """ The name of the lock(s) """
+
+    acquisitions = 0
+    """ The number of acquisitions of the lock """
+
+    contentions = 0
+    """ The number of acquisitions that had to wait
+    for the lock (contended acquisitions) """
+
+    wait_time = 0.0
+    """ The total time (in seconds) waiting for the lock """
+
+    wait_maximum = 0.0
+    """ The maximum time (in seconds) waiting for the lock """
+
+    hold_time = 0.0
+    """ The total time (in seconds) holding the lock """
+
+    hold_maximum = 0.0
+    """ The maximum time (in seconds) holding the lock """
+
+    sites = {}
+    """ The map associating the (contending) call site with
+    the list containing the number of contentions and the
+    total time waiting for the lock """
+
+    def __init__(self, name):
+        """
+        Constructor of the class.
+
+        @type name: String
+        @param name: The name of the lock(s).
+        """
+
+        self.name = name
+        self.sites = {}
+
+    def get_top_sites(self, count = 3):
+        """
+        Retrieves the call sites with the largest time waiting
+        for the lock (contending call sites).
+
+        @type count: int
+        @param count: The maximum number of sites to be retrieved.
+        @rtype: List
+        @return: The list of tuples containing the call site, the
+        number of contentions and the total wait time.
+        """
+
+        sites = [(site, value[0], value[1]) for site, value in self.sites.items()]
+        sites.sort(key = lambda value: value[2], reverse = True)
+        return sites[:count]
+
+class LockMonitor:
+    """
+    The lock monitor class, creating the instrumented versions of
+    the locks (locks, semaphores and conditions) and recording their
+    wait and hold times and the contending call sites.
+    The monitor keeps track of the threads waiting for the locks and
+    of the holders of the locks, so that the wait-for graph may be
+    dumped in case an acquisition takes too long (deadlock detection).
+    """
+
+    statistics = {}
+    """ The map associating the name of the lock
+    with the lock statistics """
+
+    waiting = {}
+    """ The map associating the id of the waiting thread with
+    the tuple containing the lock, the call site and the
+    timestamp of the start of the wait """
+
+    reported = set()
+    """ The set of the waits (thread id and start timestamp)
+    already reported as blocked """
+
+    lock = None
+    """ The (internal) lock controlling the access
+    to the structures of the monitor """
+
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
+
+        self.statistics = {}
+        self.waiting = {}
+        self.reported = set()
+        self.lock = threading.Lock()
+
+    def instrument(self, lock, name, owned = True):
+        """
+        Creates the instrumented version of the given lock (or
+        condition) to be used in place of it.
+        The ownership should be unset for the locks that may be
+        released by a thread other than the acquiring one (eg:
+        semaphores), in which case no hold time is recorded.
+
+        @type lock: Lock
+        @param lock: The lock (or semaphore or condition) to be
+        instrumented.
+        @type name: String
+        @param name: The name of the lock in the statistics.
+        @type owned: bool
+        @param owned: If the lock is owned by the acquiring thread
+        (released by the same thread).
+        @rtype: InstrumentedLock
+        @return: The instrumented version of the lock.
+        """
+
+        lock_class = hasattr(lock, "wait") and InstrumentedCondition or InstrumentedLock
+        return lock_class(lock, name, self, owned)
+
+    def get_hottest(self, count = 10):
+        """
+        Retrieves the statistics of the locks with the largest
+        (total) time waiting for them.
+
+        @type count: int
+        @param count: The maximum number of locks to be retrieved.
+        @rtype: List
+        @return: The list of the lock statistics sorted by the
+        total wait time.
+        """
+
+        self.lock.acquire()
+        try: statistics = [value for value in self.statistics.values() if value.contentions]
+        finally: self.lock.release()
+        statistics.sort(key = lambda value: value.wait_time, reverse = True)
+        return statistics[:count]
+
+    def get_wait_graph(self):
+        """
+        Retrieves the wait-for graph, with the threads waiting for
+        the locks and the threads holding them (for the owned locks).
+
+        @rtype: List
+        @return: The list of tuples containing the id of the waiting
+        thread, the lock, the call site, the timestamp of the start of
+        the wait and the list of the ids of the holding threads (and
+        their call sites).
+        """
+
+        self.lock.acquire()
+        try:
+            return [
+                (thread_id, lock, site, start, [(key, value[1]) for key, value in lock.holders.items()])
+                for thread_id, (lock, site, start) in self.waiting.items()
+            ]
+        finally:
+            self.lock.release()
+
+    def get_cycles(self, wait_graph):
+        """
+        Retrieves the cycles in the given wait-for graph, each of
+        the cycles is a deadlock between the threads in it.
+
+        @type wait_graph: List
+        @param wait_graph: The wait-for graph to find the cycles.
+        @rtype: List
+        @return: The list of cycles (lists of thread ids).
+        """
+
+        # creates the map of the edges (waiting thread to the
+        # holding threads) and the list of cycles
+        edges = dict((value[0], [holder[0] for holder in value[4]]) for value in wait_graph)
+        cycles = []
+        visited = set()
+
+        # iterates over the waiting threads following the edges
+        # (depth first) until a thread already in the path is found
+        for thread_id in edges:
+            path = []
+            stack = [(thread_id, iter([thread_id]))]
+            while stack:
+                _thread_id, iterator = stack[-1]
+                next_id = next(iterator, None)
+                if next_id == None:
+                    stack.pop()
+                    path and path.pop()
+                    continue
+                if next_id in path:
+                    cycle = path[path.index(next_id):]
+                    if not set(cycle) in [set(value) for value in cycles]: cycles.append(cycle)
+                    continue
+                if next_id in visited: continue
+                visited.add(next_id)
+                path.append(next_id)
+                stack.append((next_id, iter(edges.get(next_id, []))))
+
+        # returns the cycles
+        return cycles
+
+    def get_blocked_report(self, timeout):
+        """
+        Retrieves the report of the wait-for graph in case there's
+        an acquisition waiting for more than the given timeout (not
+        yet reported), containing the waiting and holding threads,
+        the deadlocks (cycles) and the stacks of the threads.
+
+        @type timeout: float
+        @param timeout: The time (in seconds) after which an
+        acquisition is considered blocked.
+        @rtype: String
+        @return: The report of the wait-for graph or invalid in
+        case there's no (new) blocked acquisition.
+        """
+
+        # retrieves the wait-for graph and the new blocked acquisitions
+        # (removing the reported waits that are no longer waiting), in
+        # case there's no new blocked acquisition returns immediately
+        wait_graph = self.get_wait_graph()
+        current = time.time()
+        waits = set((value[0], value[3]) for value in wait_graph)
+        blocked = [value for value in waits if current - value[1] > timeout]
+        blocked = [value for value in blocked if not value in self.reported]
+        self.reported.intersection_update(waits)
+        if not blocked: return None
+        self.reported.update(blocked)
+
+        # retrieves the names of the threads and the current frames
+        # and creates the lines of the report with the graph
+        names = dict((value.ident, value.name) for value in threading.enumerate())
+        frames = sys._current_frames()
+        lines = ["Wait-for graph (%d waiting threads):" % len(wait_graph)]
+        for thread_id, lock, site, start, holders in wait_graph:
+            holders_string = ", ".join("%s at %s" % (names.get(key, key), value) for key, value in holders) or "unknown"
+            lines.append("  %s waiting %.3fs for '%s' at %s, held by %s" %\
+                (names.get(thread_id, thread_id), current - start, lock.name, site, holders_string))
+
+        # adds the deadlocks (cycles) to the report
+        for cycle in self.get_cycles(wait_graph):
+            lines.append("Deadlock between %s" % " -> ".join(unicode(names.get(value, value)) for value in cycle + cycle[:1]))
+
+        # adds the stacks of the waiting and holding threads
+        thread_ids = set(value[0] for value in wait_graph)
+        for value in wait_graph: thread_ids.update(holder[0] for holder in value[4])
+        for thread_id in thread_ids:
+            frame = frames.get(thread_id, None)
+            if not frame: continue
+            lines.append("Stack of %s:" % names.get(thread_id, thread_id))
+            lines.extend(line.rstrip() for line in traceback.format_stack(frame))
+
+        # returns the report
+        return "\n".join(lines)
+
+    def _start_wait(self, lock, site, start):
+        self.lock.acquire()
+        try: self.waiting[thread.get_ident()] = (lock, site, start)
+        finally: self.lock.release()
+
+    def _end_wait(self):
+        self.lock.acquire()
+        try: self.waiting.pop(thread.get_ident(), None)
+        finally: self.lock.release()
+
+    def _record_acquire(self, name, site, wait_time):
+        self.lock.acquire()
+        try:
+            statistics = self.statistics.get(name, None) or self.statistics.setdefault(name, LockStatistics(name))
+            statistics.acquisitions += 1
+            if not wait_time: return
+            statistics.contentions += 1
+            statistics.wait_time += wait_time
+            statistics.wait_maximum = max(statistics.wait_maximum, wait_time)
+            value = statistics.sites.setdefault(site, [0, 0.0])
+            value[0] += 1
+            value[1] += wait_time
+        finally:
+            self.lock.release()
+
+    def _record_hold(self, name, hold_time):
+        self.lock.acquire()
+        try:
+            statistics = self.statistics.get(name, None) or self.statistics.setdefault(name, LockStatistics(name))
+            statistics.hold_time += hold_time
+            statistics.hold_maximum = max(statistics.hold_maximum, hold_time)
+        finally:
+            self.lock.release()
+
+class InstrumentedLock:
+    """
+    The instrumented lock class, wrapping a lock (or semaphore)
+    and recording its wait and hold times in the monitor.
+    The remaining attributes are delegated to the wrapped lock.
+    """
+
+    lock = None
+    """ The wrapped lock """
+
+    name = None
+    """ The name of the lock """
+
+    monitor = None
+    """ The monitor recording the times of the lock """
+
+    owned = True
+    """ If the lock is owned by the acquiring thread """
+
+    holders = {}
+    """ The map associating the id of the holding thread with
+    the list containing the timestamp of the acquisition, the
+    call site and the (reentrant) acquisition depth """
+
+    def __init__(self, lock, name, monitor, owned = True):
+        """
+        Constructor of the class.
+
+        @type lock: Lock
+        @param lock: The lock to be wrapped.
+        @type name: String
+        @param name: The name of the lock.
+        @type monitor: LockMonitor
+        @param monitor: The monitor recording the times of the lock.
+        @type owned: bool
+        @param owned: If the lock is owned by the acquiring thread.
+        """
+
+        self.lock = lock
+        self.name = name
+        self.monitor = monitor
+        self.owned = owned
+        self.holders = {}
+
+    def __getattr__(self, name):
+        return getattr(self.lock, name)
+
+    def __enter__(self):
+        self.acquire(1, 2)
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.release()
+
+    def acquire(self, blocking = 1, depth = 1):
+        # retrieves the call site and tries to acquire the lock
+        # without blocking (uncontended acquisition)
+        site = _get_site(depth + 1)
+        if self.lock.acquire(0):
+            self._acquired(site, 0.0)
+            return True
+        if not blocking: return False
+
+        # registers the wait in the monitor and waits
+        # for the lock (contended acquisition)
+        start = time.time()
+        self.monitor._start_wait(self, site, start)
+        try: self.lock.acquire()
+        finally: self.monitor._end_wait()
+        self._acquired(site, time.time() - start)
+        return True
+
+    def release(self):
+        self.owned and self._released()
+        self.lock.release()
+
+    def _acquired(self, site, wait_time):
+        self.monitor._record_acquire(self.name, site, wait_time)
+        if not self.owned: return
+        thread_id = thread.get_ident()
+        holder = self.holders.get(thread_id, None)
+        if holder: holder[2] += 1
+        else: self.holders[thread_id] = [time.time(), site, 1]
+
+    def _released(self):
+        thread_id = thread.get_ident()
+        holder = self.holders.get(thread_id, None)
+        if not holder: return
+        holder[2] -= 1
+        if holder[2]: return
+        del self.holders[thread_id]
+        self.monitor._record_hold(self.name, time.time() - holder[0])
+
+class InstrumentedCondition(InstrumentedLock):
+    """
+    The instrumented condition class, wrapping a condition and
+    recording the wait and hold times of its lock in the monitor.
+    The time waiting for the condition to be notified is not
+    accounted as holding (nor waiting for) the lock.
+    """
+
+    def wait(self, timeout = None):
+        # removes the holder of the current thread (recording
+        # the hold time) as the lock is released in the wait
+        thread_id = thread.get_ident()
+        holder = self.holders.pop(thread_id, None)
+        holder and self.monitor._record_hold(self.name, time.time() - holder[0])
+
+        # waits for the condition and restores the holder
+        # of the current thread (lock re-acquired)
+        try: self.lock.wait(timeout)
+        finally: holder and self.holders.__setitem__(thread_id, [time.time(), holder[1], holder[2]])
+
+def _get_site(depth):
+    frame = sys._getframe(depth)
+    code = frame.f_code
+    return "%s:%d (%s)" % (os.path.basename(code.co_filename), frame.f_lineno, code.co_name)
@@ -0,0 +1,200 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import gc
+import sys
+import time
+import types
+
+class MemorySnapshot:
+    """
+    The memory snapshot class, holding the number and size of
+    the objects attributed to each of the owners (reachable from
+    their roots), split by the name of the type of the objects.
+    """
+
+    owners = {}
+    """ The map associating the owner with the map of type
+    name and count and size (in bytes) list """
+
+    timestamp = None
+    """ The timestamp of the snapshot """
+
+    def __init__(self, owners = None, timestamp = None):
+        """
+        Constructor of the class.
+
+        @type owners: Dictionary
+        @param owners: The map associating the owner with the map
+        of type name and count and size list.
+        @type timestamp: float
+        @param timestamp: The timestamp of the snapshot.
+        """
+
+        self.owners = owners or {}
+        self.timestamp = timestamp or time.time()
+
+    def get_totals(self, owner):
+        """
+        Retrieves the total number and size of the objects
+        attributed to the given owner.
+
+        @type owner: Object
+        @param owner: The owner to retrieve the totals.
+        @rtype: Tuple
+        @return: The total number and size (in bytes) of the objects.
+        """
+
+        types_map = self.owners.get(owner, {})
+        count = sum(value[0] for value in types_map.values())
+        size = sum(value[1] for value in types_map.values())
+        return count, size
+
+    def compare(self, previous):
+        """
+        Compares the snapshot with the given previous snapshot
+        retrieving the differences (growth) for each of the owners.
+
+        @type previous: MemorySnapshot
+        @param previous: The previous snapshot to compare against.
+        @rtype: Dictionary
+        @return: The map associating the owner with the map containing
+        the difference in the number and size of the objects and
+        the differences for each of the types.
+        """
+
+        diffs = {}
+
+        # iterates over the owners of both snapshots computing
+        # the differences for each of the types of objects
+        for owner in set(self.owners.keys() + previous.owners.keys()):
+            types_map = self.owners.get(owner, {})
+            previous_types_map = previous.owners.get(owner, {})
+            types_diffs = {}
+            for type_name in set(types_map.keys() + previous_types_map.keys()):
+                count, size = types_map.get(type_name, (0, 0))
+                previous_count, previous_size = previous_types_map.get(type_name, (0, 0))
+                if count == previous_count and size == previous_size: continue
+                types_diffs[type_name] = (count - previous_count, size - previous_size)
+
+            # computes the differences of the totals and
+            # sets them in the map of differences
+            count, size = self.get_totals(owner)
+            previous_count, previous_size = previous.get_totals(owner)
+            diffs[owner] = {
+                "count" : count - previous_count,
+                "size" : size - previous_size,
+                "types" : types_diffs
+            }
+
+        # returns the map of differences
+        return diffs
+
+def take_snapshot(roots, boundaries = ()):
+    """
+    Takes a snapshot of the memory, walking the objects reachable
+    from the roots of each of the owners (referents of the objects)
+    and attributing them to the owner, so that the builtin containers
+    (eg: lists of dictionaries) held by the owners are accounted.
+    The modules (other than the roots), the classes, the roots of the
+    other owners and the given boundary objects are not walked, and the
+    objects reachable from more than one owner are only attributed to
+    the first owner (in sorted order) reaching them.
+    The memory allocated outside the python objects (eg: by extensions)
+    and the objects only reachable from the boundaries (eg: module level
+    values of modules that are not roots) are not accounted.
+
+    @type roots: Dictionary
+    @param roots: The map associating the owner with the list of root
+    objects (eg: instances and modules) of the owner.
+    @type boundaries: Tuple
+    @param boundaries: The objects that are not walked (eg: shared
+    structures referred by the roots).
+    @rtype: MemorySnapshot
+    @return: The snapshot of the memory.
+    """
+
+    owners = {}
+
+    # collects the garbage (so that only the live objects are accounted)
+    # and creates the set of ids of the objects that are not walked, the
+    # boundaries, the (loaded) modules and the roots of all the owners
+    gc.collect()
+    boundary = set([id(value) for value in boundaries])
+    modules = [module for module in sys.modules.values() if module]
+    for value in modules + [value for values in roots.values() for value in values]:
+        boundary.add(id(value))
+        if type(value) == types.ModuleType: boundary.add(id(value.__dict__))
+
+    # iterates over the owners (in sorted order) walking the objects
+    # reachable from their roots (the visited objects are not walked
+    # again so that the shared objects are attributed only once)
+    visited = set()
+    for owner in sorted(roots.keys()):
+        # creates the stack of objects to be walked from the roots of
+        # the owner (for the modules their dictionary is walked)
+        stack = []
+        for root in roots[owner]:
+            if type(root) == types.ModuleType: root = root.__dict__
+            if id(root) in visited: continue
+            visited.add(id(root))
+            stack.append(root)
+
+        types_map = owners.setdefault(owner, {})
+        while stack:
+            # retrieves the object and its type (the class for the
+            # old style instances) and accounts its size for the owner
+            _object = stack.pop()
+            object_type = type(_object)
+            if object_type == types.InstanceType: object_type = _object.__class__
+            value = types_map.setdefault(object_type.__name__, [0, 0])
+            value[0] += 1
+            value[1] += sys.getsizeof(_object, 0)
+
+            # adds the referents of the object that are not yet visited
+            # and are not boundaries (classes and modules) to the stack
+            for referent in gc.get_referents(_object):
+                referent_id = id(referent)
+                if referent_id in visited or referent_id in boundary: continue
+                if isinstance(referent, (types.TypeType, types.ClassType, types.ModuleType)): continue
+                visited.add(referent_id)
+                stack.append(referent)
+
+    # creates and returns the snapshot
+    return MemorySnapshot(owners)
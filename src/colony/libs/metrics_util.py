@@ -0,0 +1,488 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import os
+import math
+import types
+import threading
+
+SUB_BUCKET_COUNT = 16
+""" The number of (linear) sub buckets in each power of two
+range of the histograms, controls the precision of the values
+(the relative error is bounded by the inverse of this value) """
+
+MINIMUM_VALUE = 1e-9
+""" The minimum value recorded in the histograms, smaller
+(or negative) values are clamped to this value """
+
+def get_bucket_index(value):
+    """
+    Retrieves the index of the (log linear) bucket of the
+    histograms for the given value, the values are split in
+    power of two ranges and each range in linear sub buckets.
+
+    @type value: float
+    @param value: The value to retrieve the bucket index.
+    @rtype: int
+    @return: The index of the bucket for the value.
+    """
+
+    # splits the value in mantissa (between one half and one)
+    # and exponent and uses the mantissa to compute the linear
+    # sub bucket inside of the power of two range
+    mantissa, exponent = math.frexp(max(value, MINIMUM_VALUE))
+    sub_bucket = int((mantissa - 0.5) * 2 * SUB_BUCKET_COUNT)
+    return exponent * SUB_BUCKET_COUNT + sub_bucket
+
+def get_bucket_bound(index):
+    """
+    Retrieves the (inclusive) upper bound of the values of the
+    bucket of the histograms with the given index.
+
+    @type index: int
+    @param index: The index of the bucket.
+    @rtype: float
+    @return: The upper bound of the values of the bucket.
+    """
+
+    exponent, sub_bucket = divmod(index, SUB_BUCKET_COUNT)
+    return math.ldexp(0.5 + (sub_bucket + 1) / (2.0 * SUB_BUCKET_COUNT), exponent)
+
+def get_labels(labels):
+    """
+    Normalizes the given labels into a (sorted) tuple of name
+    and value pairs, that may be used as part of a key.
+
+    @type labels: Dictionary
+    @param labels: The labels as a map or as a tuple of name
+    and value pairs (already normalized).
+    @rtype: Tuple
+    @return: The normalized tuple of labels.
+    """
+
+    if not labels: return ()
+    if type(labels) == types.DictType: return tuple(sorted(labels.items()))
+    return labels
+
+class Histogram:
+    """
+    The histogram class, recording the distribution of values
+    (latencies) in sparse log linear buckets, with a bounded
+    relative error (hdr style) and mergeable.
+    """
+
+    counts = {}
+    """ The map associating the index of the
+    buckets with the number of values in them """
+
+    count = 0
+    """ The number of recorded values """
+
+    total = 0.0
+    """ The sum of the recorded values """
+
+    minimum = None
+    """ The minimum recorded value """
+
+    maximum = None
+    """ The maximum recorded value """
+
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
+
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def record(self, value):
+        """
+        Records the given value in the histogram.
+
+        @type value: float
+        @param value: The value to be recorded.
+        """
+
+        index = get_bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.minimum == None or value < self.minimum: self.minimum = value
+        if self.maximum == None or value > self.maximum: self.maximum = value
+
+    def merge(self, histogram):
+        """
+        Merges the values of the given histogram into
+        the current histogram.
+
+        @type histogram: Histogram
+        @param histogram: The histogram to be merged.
+        """
+
+        # adds the counts of the buckets of the histogram, the
+        # items are copied first as the histogram may be changed
+        # (by its owner thread) during the merge
+        for index, count in histogram.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+
+        # updates the aggregated values with the
+        # ones from the merged histogram
+        self.count += histogram.count
+        self.total += histogram.total
+        if not histogram.minimum == None and (self.minimum == None or histogram.minimum < self.minimum):
+            self.minimum = histogram.minimum
+        if not histogram.maximum == None and (self.maximum == None or histogram.maximum > self.maximum):
+            self.maximum = histogram.maximum
+
+    def get_buckets(self):
+        """
+        Retrieves the list of (non empty) buckets of the histogram
+        as tuples of upper bound and cumulative count.
+
+        @rtype: List
+        @return: The sorted list of upper bound and
+        cumulative count tuples.
+        """
+
+        buckets = []
+        cumulative_count = 0
+        for index in sorted(self.counts):
+            cumulative_count += self.counts[index]
+            buckets.append((get_bucket_bound(index), cumulative_count))
+        return buckets
+
+    def get_quantile(self, quantile):
+        """
+        Retrieves the (estimated) value at the given quantile,
+        the estimation is the upper bound of the bucket containing
+        the quantile (bounded by the maximum value).
+
+        @type quantile: float
+        @param quantile: The quantile (between zero and one).
+        @rtype: float
+        @return: The estimated value at the quantile or invalid
+        in case there're no values recorded.
+        """
+
+        if not self.count: return None
+        target_count = max(int(math.ceil(quantile * self.count)), 1)
+        for bound, cumulative_count in self.get_buckets():
+            if cumulative_count >= target_count: return min(bound, self.maximum)
+        return self.maximum
+
+class MetricsStore:
+    """
+    The metrics store class, holding the counters and the
+    histograms recorded by a single thread.
+    """
+
+    counters = {}
+    """ The map associating the name and labels
+    key with the value of the counters """
+
+    histograms = {}
+    """ The map associating the name and labels
+    key with the histograms """
+
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
+
+        self.counters = {}
+        self.histograms = {}
+
+    def merge(self, store):
+        """
+        Merges the counters and the histograms of the given
+        store into the current store.
+
+        @type store: MetricsStore
+        @param store: The store to be merged.
+        """
+
+        for key, value in store.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, histogram in store.histograms.items():
+            _histogram = self.histograms.get(key, None)
+            if not _histogram: _histogram = self.histograms[key] = Histogram()
+            _histogram.merge(histogram)
+
+class MetricsRegistry:
+    """
+    The metrics registry class, recording counters, gauges and
+    latency histograms, the counters and the histograms are kept
+    in thread local stores (no locking in the recording) that
+    are merged on read (snapshot).
+    """
+
+    local = None
+    """ The thread local storage holding the
+    store of the current thread """
+
+    stores = []
+    """ The list of thread and store tuples for
+    the threads that recorded metrics """
+
+    retired = None
+    """ The store aggregating the metrics of the
+    threads that already exited """
+
+    gauges = {}
+    """ The map associating the name and labels
+    key with the value of the gauges """
+
+    lock = None
+    """ The lock controlling the access to
+    the stores and the gauges """
+
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
+
+        self.local = threading.local()
+        self.stores = []
+        self.retired = MetricsStore()
+        self.gauges = {}
+        self.lock = threading.Lock()
+
+    def increment(self, name, value = 1, labels = None):
+        """
+        Increments the counter with the given name and labels
+        by the given value.
+
+        @type name: String
+        @param name: The name of the counter.
+        @type value: int
+        @param value: The value to increment the counter.
+        @type labels: Dictionary
+        @param labels: The labels of the counter (map or
+        tuple of name and value pairs).
+        """
+
+        counters = self._get_store().counters
+        key = (name, get_labels(labels))
+        counters[key] = counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, labels = None):
+        """
+        Sets the value of the gauge with the given
+        name and labels.
+
+        @type name: String
+        @param name: The name of the gauge.
+        @type value: float
+        @param value: The value of the gauge.
+        @type labels: Dictionary
+        @param labels: The labels of the gauge (map or
+        tuple of name and value pairs).
+        """
+
+        self.gauges[(name, get_labels(labels))] = value
+
+    def observe(self, name, value, labels = None):
+        """
+        Records the given value in the histogram with the
+        given name and labels.
+
+        @type name: String
+        @param name: The name of the histogram.
+        @type value: float
+        @param value: The value to be recorded (eg: latency).
+        @type labels: Dictionary
+        @param labels: The labels of the histogram (map or
+        tuple of name and value pairs).
+        """
+
+        histograms = self._get_store().histograms
+        key = (name, get_labels(labels))
+        histogram = histograms.get(key, None)
+        if not histogram: histogram = histograms[key] = Histogram()
+        histogram.record(value)
+
+    def get_snapshot(self):
+        """
+        Retrieves a snapshot of the metrics, merging the stores
+        of the various threads, the stores of the threads that
+        already exited are folded into the retired store.
+
+        @rtype: Dictionary
+        @return: The map containing the counters, the gauges and
+        the histograms (maps associating name and labels keys
+        with the values).
+        """
+
+        snapshot = MetricsStore()
+
+        self.lock.acquire()
+        try:
+            # retires the stores of the threads that exited and merges
+            # the stores of the (alive) threads, the retired store and
+            # copies the gauges into the snapshot
+            self._retire_stores()
+            for _thread, store in self.stores: snapshot.merge(store)
+            snapshot.merge(self.retired)
+            gauges = dict(self.gauges)
+        finally:
+            self.lock.release()
+
+        # returns the snapshot map
+        return {
+            "counters" : snapshot.counters,
+            "gauges" : gauges,
+            "histograms" : snapshot.histograms
+        }
+
+    def get_prometheus(self, snapshot = None):
+        """
+        Retrieves the metrics (snapshot) in the prometheus
+        text exposition format.
+
+        @type snapshot: Dictionary
+        @param snapshot: The snapshot to be used, in case it's
+        not defined a new snapshot is created.
+        @rtype: String
+        @return: The metrics in the prometheus text format.
+        """
+
+        snapshot = snapshot or self.get_snapshot()
+        lines = []
+
+        # adds the counters and the gauges (simple values) with
+        # the type comment before the first value of each name
+        for metric_type, values in (("counter", snapshot["counters"]), ("gauge", snapshot["gauges"])):
+            previous_name = None
+            for name, labels in sorted(values):
+                if not name == previous_name: lines.append("# TYPE %s %s" % (name, metric_type))
+                previous_name = name
+                value = values[(name, labels)]
+                lines.append("%s%s %s" % (name, _format_labels(labels), _format_value(value)))
+
+        # adds the histograms with the cumulative buckets (the
+        # non empty ones and the infinite one), sum and count
+        histograms = snapshot["histograms"]
+        previous_name = None
+        for name, labels in sorted(histograms):
+            if not name == previous_name: lines.append("# TYPE %s histogram" % name)
+            previous_name = name
+            histogram = histograms[(name, labels)]
+            for bound, cumulative_count in histogram.get_buckets():
+                bucket_labels = labels + (("le", _format_value(bound)),)
+                lines.append("%s_bucket%s %d" % (name, _format_labels(bucket_labels), cumulative_count))
+            bucket_labels = labels + (("le", "+Inf"),)
+            lines.append("%s_bucket%s %d" % (name, _format_labels(bucket_labels), histogram.count))
+            lines.append("%s_sum%s %s" % (name, _format_labels(labels), _format_value(histogram.total)))
+            lines.append("%s_count%s %d" % (name, _format_labels(labels), histogram.count))
+
+        # joins the lines (with the final newline
+        # required by the format) and returns them
+        return "\n".join(lines) + "\n"
+
+    def dump(self, file_path, snapshot = None):
+        """
+        Dumps the metrics (snapshot) in the prometheus text format
+        into the file in the given path, the file is written
+        atomically (moved from a temporary file) so that the
+        collectors never read a partial file.
+
+        @type file_path: String
+        @param file_path: The path to the file to dump the metrics.
+        @type snapshot: Dictionary
+        @param snapshot: The snapshot to be used, in case it's
+        not defined a new snapshot is created.
+        """
+
+        contents = self.get_prometheus(snapshot)
+        temporary_file_path = file_path + ".tmp"
+        file = open(temporary_file_path, "wb")
+        try: file.write(contents)
+        finally: file.close()
+        if os.name == "nt" and os.path.exists(file_path): os.remove(file_path)
+        os.rename(temporary_file_path, file_path)
+
+    def _get_store(self):
+        # retrieves the store of the current thread, in case
+        # it's the first time (no store) the store is created
+        # and registered in the registry (for the merging)
+        store = getattr(self.local, "store", None)
+        if store: return store
+        store = MetricsStore()
+        self.local.store = store
+        self.lock.acquire()
+        try:
+            # retires the stores of the threads that exited (so that a
+            # registry that is never read does not grow indefinitely)
+            # and adds the store of the current thread
+            self._retire_stores()
+            self.stores.append((threading.currentThread(), store))
+        finally:
+            self.lock.release()
+        return store
+
+    def _retire_stores(self):
+        # moves the stores of the threads that exited into the
+        # retired store (so that the list of stores does not grow
+        # indefinitely), this method must be called with the lock
+        stores = []
+        for thread, store in self.stores:
+            if thread.isAlive(): stores.append((thread, store))
+            else: self.retired.merge(store)
+        self.stores = stores
+
+def _format_labels(labels):
+    # in case there're no labels an empty string is returned
+    # otherwise the labels are formatted with escaped values
+    if not labels: return ""
+    return "{" + ",".join("%s=\"%s\"" % (name, _escape_value(value)) for name, value in labels) + "}"
+
+def _escape_value(value):
+    value = type(value) == types.UnicodeType and value.encode("utf-8") or str(value)
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_value(value):
+    # floats are formatted with their (shortest) representation
+    # and the special values with the format specific ones
+    if not type(value) == types.FloatType: return str(value)
+    if math.isinf(value): return value > 0 and "+Inf" or "-Inf"
+    if math.isnan(value): return "NaN"
+    return repr(value)
@@ -0,0 +1,432 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import sys
+import Queue
+import threading
+
+DEFAULT_POOL_SIZE = 4
+""" The default number of worker threads in the pool """
+
+class Future:
+    """
+    The future class, representing the (pending) result
+    of a call submitted to a thread pool.
+    """
+
+    condition = None
+    """ The condition used to wait for the result """
+
+    finished = False
+    """ Flag indicating if the call is finished """
+
+    result_value = None
+    """ The value returned by the call """
+
+    exception = None
+    """ The exception raised by the call (if any) """
+
+    exception_info = None
+    """ The exception information (type, value and traceback)
+    of the exception raised by the call """
+
+    callbacks = []
+    """ The list of callbacks to be called once the
+    call is finished (receiving the future) """
+
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
+
+        self.condition = threading.Condition()
+        self.finished = False
+        self.result_value = None
+        self.exception = None
+        self.exception_info = None
+        self.callbacks = []
+
+    def set_result(self, result_value):
+        """
+        Sets the result of the call, finishing the future
+        and notifying the waiting threads.
+
+        @type result_value: Object
+        @param result_value: The value returned by the call.
+        """
+
+        self.condition.acquire()
+        try:
+            self.result_value = result_value
+            self.finished = True
+            self.condition.notifyAll()
+        finally:
+            self.condition.release()
+        self._run_callbacks()
+
+    def set_exception(self, exception, exception_info = None):
+        """
+        Sets the exception raised by the call, finishing the
+        future and notifying the waiting threads.
+
+        @type exception: Exception
+        @param exception: The exception raised by the call.
+        @type exception_info: Tuple
+        @param exception_info: The exception information tuple
+        as returned by the sys exc info function.
+        """
+
+        self.condition.acquire()
+        try:
+            self.exception = exception
+            self.exception_info = exception_info
+            self.finished = True
+            self.condition.notifyAll()
+        finally:
+            self.condition.release()
+        self._run_callbacks()
+
+    def add_callback(self, callback):
+        """
+        Adds a callback to be called once the call is finished,
+        in case the call is already finished the callback is
+        called immediately.
+
+        @type callback: Function
+        @param callback: The callback function, receiving the
+        future as the only argument.
+        """
+
+        self.condition.acquire()
+        try:
+            finished = self.finished
+            if not finished: self.callbacks.append(callback)
+        finally:
+            self.condition.release()
+        if finished: callback(self)
+
+    def done(self):
+        """
+        Retrieves if the call is finished.
+
+        @rtype: bool
+        @return: If the call is finished.
+        """
+
+        return self.finished
+
+    def wait(self, timeout = None):
+        """
+        Waits for the call to be finished for the given
+        amount of time.
+
+        @type timeout: float
+        @param timeout: The maximum amount of time to wait
+        (in seconds), in case none the wait is unbounded.
+        @rtype: bool
+        @return: If the call is finished.
+        """
+
+        self.condition.acquire()
+        try:
+            if not self.finished: self.condition.wait(timeout)
+            return self.finished
+        finally:
+            self.condition.release()
+
+    def result(self, timeout = None):
+        """
+        Retrieves the result of the call, waiting for it
+        in case it's not finished, in case the call raised
+        an exception the exception is re-raised.
+
+        @type timeout: float
+        @param timeout: The maximum amount of time to wait
+        (in seconds), in case none the wait is unbounded.
+        @rtype: Object
+        @return: The value returned by the call.
+        """
+
+        # waits for the call to be finished and in case
+        # it's not (timeout) raises a runtime error
+        if not self.wait(timeout): raise RuntimeError("timeout waiting for result")
+
+        # in case the call raised an exception re-raises it
+        # (using the original traceback if available)
+        if self.exception_info: raise self.exception_info[0], self.exception_info[1], self.exception_info[2]
+        if self.exception: raise self.exception
+
+        # returns the value returned by the call
+        return self.result_value
+
+    def _run_callbacks(self):
+        # iterates over all the registered callbacks
+        # calling them with the current future
+        for callback in self.callbacks: callback(self)
+        self.callbacks = []
+
+class ThreadPool:
+    """
+    The thread pool class, executing the submitted calls
+    in a bounded set of (daemon) worker threads.
+    """
+
+    size = DEFAULT_POOL_SIZE
+    """ The number of worker threads in the pool """
+
+    name = None
+    """ The name of the pool, used as prefix for the
+    name of the worker threads """
+
+    queue = None
+    """ The queue of pending work items """
+
+    workers = []
+    """ The list of worker threads """
+
+    detached = []
+    """ The list of worker threads detached from the pool,
+    that exit once their current call is finished """
+
+    counter = 0
+    """ The counter used to create the (unique) name
+    of the worker threads """
+
+    lock = None
+    """ The lock controlling the start and stop
+    of the worker threads """
+
+    running = False
+    """ Flag indicating if the pool is running """
+
+    def __init__(self, size = DEFAULT_POOL_SIZE, name = "pool"):
+        """
+        Constructor of the class.
+
+        @type size: int
+        @param size: The number of worker threads in the pool.
+        @type name: String
+        @param name: The name of the pool.
+        """
+
+        self.size = size
+        self.name = name
+        self.queue = Queue.Queue()
+        self.workers = []
+        self.detached = []
+        self.counter = 0
+        self.lock = threading.Lock()
+        self.running = False
+
+    def start(self):
+        """
+        Starts the worker threads of the pool, this method is
+        called implicitly on the first submission.
+        """
+
+        self.lock.acquire()
+        try:
+            # in case the pool is already running
+            # there's nothing remaining to be done
+            if self.running: return
+
+            # creates and starts the various worker threads
+            for _index in range(self.size): self._start_worker()
+
+            # sets the pool as running
+            self.running = True
+        finally:
+            self.lock.release()
+
+    def stop(self, timeout = None):
+        """
+        Stops the worker threads of the pool, the pending
+        work items are processed before the workers exit.
+
+        @type timeout: float
+        @param timeout: The maximum amount of time to wait for
+        each of the worker threads.
+        """
+
+        self.lock.acquire()
+        try:
+            # in case the pool is not running there's
+            # nothing remaining to be done
+            if not self.running: return
+
+            # adds one stop marker per worker and then waits
+            # for each of them to finish
+            for _worker in self.workers: self.queue.put(None)
+            for worker in self.workers: worker.join(timeout)
+
+            # resets the list of workers and unsets
+            # the running flag
+            self.workers = []
+            self.running = False
+        finally:
+            self.lock.release()
+
+    def detach(self, worker = None):
+        """
+        Detaches the given worker thread (by default the current
+        one) from the pool, starting a replacement worker so that
+        the number of available workers is kept.
+        The detached worker exits once its current call is finished,
+        this is useful for calls that are known to run for a long
+        (or unbounded) amount of time.
+
+        @type worker: Thread
+        @param worker: The worker thread to be detached, in case
+        it's not defined the current thread is used.
+        @rtype: bool
+        @return: If the worker thread was detached from the pool.
+        """
+
+        # retrieves the worker thread to be detached
+        # defaulting to the current thread
+        worker = worker or threading.currentThread()
+
+        self.lock.acquire()
+        try:
+            # in case the worker is not one of the pool (not
+            # running or already detached) there's nothing to be done
+            if not worker in self.workers: return False
+
+            # moves the worker to the list of detached
+            # workers and starts a replacement worker
+            self.workers.remove(worker)
+            self.detached.append(worker)
+            self._start_worker()
+        finally:
+            self.lock.release()
+
+        # returns valid (worker detached)
+        return True
+
+    def submit(self, method, *arguments, **keyword_arguments):
+        """
+        Submits the given method to be called with the given
+        arguments in one of the worker threads.
+
+        @type method: Method
+        @param method: The method to be called.
+        @rtype: Future
+        @return: The future representing the result of the call.
+        """
+
+        # starts the pool in case it's not running
+        # (lazy start of the worker threads)
+        if not self.running: self.start()
+
+        # creates the future for the call and adds the
+        # work item to the queue of pending work items
+        future = Future()
+        self.queue.put((future, method, arguments, keyword_arguments))
+
+        # returns the future
+        return future
+
+    def map(self, method, items):
+        """
+        Calls the given method for each of the items (concurrently)
+        waiting for all of the calls to be finished.
+
+        @type method: Method
+        @param method: The method to be called for each item.
+        @type items: List
+        @param items: The list of items to be used as argument.
+        @rtype: List
+        @return: The list of results in the order of the items.
+        """
+
+        futures = [self.submit(method, item) for item in items]
+        return [future.result() for future in futures]
+
+    def pending(self):
+        """
+        Retrieves the (approximate) number of pending work items.
+
+        @rtype: int
+        @return: The number of pending work items.
+        """
+
+        return self.queue.qsize()
+
+    def _start_worker(self):
+        # creates the worker thread (as daemon so that it does
+        # not block the exit of the process) and starts it
+        worker = threading.Thread(
+            target = self._work,
+            name = "%s-%d" % (self.name, self.counter)
+        )
+        worker.daemon = True
+        worker.start()
+        self.workers.append(worker)
+        self.counter += 1
+
+    def _work(self):
+        while True:
+            # retrieves the next work item from the queue, in case
+            # it's the stop marker returns immediately
+            work_item = self.queue.get()
+            if work_item == None: return
+
+            # unpacks the work item and runs the method, setting
+            # the result (or exception) in the future
+            future, method, arguments, keyword_arguments = work_item
+            try: result_value = method(*arguments, **keyword_arguments)
+            except BaseException, exception: future.set_exception(exception, sys.exc_info())
+            else: future.set_result(result_value)
+
+            # in case the current worker has been detached from
+            # the pool (while running the call) it must exit
+            if self._is_detached(): return
+
+    def _is_detached(self):
+        # tests the current worker against the detached workers
+        # without the lock first (fast path) so that a worker being
+        # joined (lock held in the stop) is never blocked
+        worker = threading.currentThread()
+        if not worker in self.detached: return False
+        self.lock.acquire()
+        try:
+            if not worker in self.detached: return False
+            self.detached.remove(worker)
+            return True
+        finally:
+            self.lock.release()
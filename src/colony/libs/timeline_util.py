@@ -0,0 +1,195 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import os
+import json
+import time
+import thread
+import threading
+
+class Timeline:
+    """
+    The timeline class, recording spans of execution (with
+    the thread they ran on and their nesting depth) that may
+    be exported in the chrome trace event format.
+    """
+
+    events = []
+    """ The list of (complete) trace events recorded """
+
+    threads = {}
+    """ The map associating the identifier of the threads
+    with their names (for the trace metadata) """
+
+    start_time = None
+    """ The time of creation of the timeline, used as
+    the origin of the trace event timestamps """
+
+    lock = None
+    """ The lock controlling the access to the events """
+
+    local = None
+    """ The thread local storage holding the current
+    nesting depth of the spans for each thread """
+
+    def __init__(self):
+        """
+        Constructor of the class.
+        """
+
+        self.events = []
+        self.threads = {}
+        self.start_time = time.time()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def begin(self, name, category = None, arguments = None):
+        """
+        Begins a span with the given name and category, the
+        span is only recorded once it's ended.
+
+        @type name: String
+        @param name: The name of the span.
+        @type category: String
+        @param category: The category of the span.
+        @type arguments: Dictionary
+        @param arguments: The map of arguments associated with the span.
+        @rtype: Tuple
+        @return: The span to be used in the ending of it.
+        """
+
+        # retrieves the current nesting depth for the thread
+        # and increments it (for the inner spans)
+        depth = getattr(self.local, "depth", 0)
+        self.local.depth = depth + 1
+
+        # creates the span tuple with the current time
+        # and returns it to the caller method
+        return (name, category, arguments, time.time(), depth)
+
+    def end(self, span):
+        """
+        Ends the given span, recording it (as a complete
+        event) in the timeline.
+
+        @type span: Tuple
+        @param span: The span to be ended (as returned by begin).
+        """
+
+        # retrieves the current time and unpacks the span
+        # values, restoring the nesting depth of the thread
+        end_time = time.time()
+        name, category, arguments, start_time, depth = span
+        self.local.depth = depth
+
+        # creates the arguments of the event, adding
+        # the nesting depth of the span to them
+        arguments = dict(arguments or {})
+        arguments["depth"] = depth
+
+        # creates the complete event with the timestamp and the
+        # duration in microseconds (as defined by the format)
+        thread_id = thread.get_ident()
+        event = {
+            "name" : name,
+            "cat" : category or "default",
+            "ph" : "X",
+            "ts" : int((start_time - self.start_time) * 1000000),
+            "dur" : int((end_time - start_time) * 1000000),
+            "pid" : os.getpid(),
+            "tid" : thread_id,
+            "args" : arguments
+        }
+
+        # adds the event to the events list and registers
+        # the name of the thread (in case it's new)
+        self.lock.acquire()
+        try:
+            self.events.append(event)
+            if not thread_id in self.threads:
+                self.threads[thread_id] = threading.currentThread().getName()
+        finally:
+            self.lock.release()
+
+    def get_trace(self):
+        """
+        Retrieves the structure of the timeline in the
+        chrome trace event format.
+
+        @rtype: Dictionary
+        @return: The trace event structure of the timeline.
+        """
+
+        self.lock.acquire()
+        try:
+            # creates the metadata events naming the
+            # threads and adds the recorded events
+            process_id = os.getpid()
+            trace_events = [{
+                "name" : "thread_name",
+                "ph" : "M",
+                "pid" : process_id,
+                "tid" : thread_id,
+                "args" : {"name" : thread_name}
+            } for thread_id, thread_name in self.threads.items()]
+            trace_events.extend(self.events)
+        finally:
+            self.lock.release()
+
+        # returns the trace event structure
+        return {
+            "traceEvents" : trace_events,
+            "displayTimeUnit" : "ms"
+        }
+
+    def dump(self, file_path):
+        """
+        Dumps the timeline in the chrome trace event format
+        (json) into the file in the given path.
+
+        @type file_path: String
+        @param file_path: The path to the file to dump the timeline.
+        """
+
+        # retrieves the trace structure and writes
+        # it (serialized as json) into the file
+        trace = self.get_trace()
+        file = open(file_path, "wb")
+        try: json.dump(trace, file)
+        finally: file.close()
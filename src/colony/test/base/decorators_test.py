@@ -0,0 +1,220 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import gc
+import weakref
+
+import colony.base.system
+import colony.base.decorators
+import colony.libs.test_util
+
+class AllowedPlugin(object):
+    """
+    Class that describes a (fake) plugin handling the loading
+    of allowed plugins through the allowed decorators.
+    """
+
+    handled = []
+    """ The list of handler name and capability tuples
+    for the handled allowed plugins """
+
+    def __init__(self):
+        self.handled = []
+
+    @colony.base.decorators.load_allowed
+    def load_allowed(self, plugin, capability):
+        pass
+
+    @colony.base.decorators.load_allowed_capability("format")
+    def format_load_allowed(self, plugin, capability):
+        self.handled.append(("format", capability))
+
+    @colony.base.decorators.load_allowed_capability("format.json")
+    def json_load_allowed(self, plugin, capability):
+        self.handled.append(("json", capability))
+
+class LoadManager:
+    """
+    Class that describes a (fake) plugin manager counting the
+    loading of the plugins (for the intercepted calls).
+    """
+
+    metrics = None
+    """ The registry of the metrics (not enabled) """
+
+    lock_monitor = None
+    """ The monitor of the locks (not enabled) """
+
+    loads = 0
+    """ The number of loadings of plugins """
+
+    def __init__(self):
+        self.loads = 0
+
+    def load_plugin(self, plugin_id, type = None):
+        self.loads += 1
+        return True
+
+class CallPlugin(colony.base.system.Plugin):
+    """
+    Class that describes a (lazy) plugin with a front-end
+    method intercepted for the loading of the plugin.
+    """
+
+    valid = False
+    id = "pt.test.call"
+
+    @colony.base.decorators.plugin_call(True)
+    def call(self, value):
+        return value * 2
+
+    @colony.base.decorators.plugin_call(False)
+    def call_direct(self, value):
+        return value * 3
+
+class LoadAllowedTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the load allowed decorators.
+    """
+
+    def test_dispatch(self):
+        """
+        Tests the dispatch of the allowed plugins to the
+        handlers of the (super) capabilities.
+        """
+
+        # creates the plugin and loads an allowed plugin with
+        # a sub capability verifying that the handlers of both
+        # super capabilities are called
+        plugin = AllowedPlugin()
+        plugin.load_allowed(None, "format.json.pretty")
+        self.assertEqual(sorted(plugin.handled), [
+            ("format", "format.json.pretty"),
+            ("json", "format.json.pretty")
+        ])
+
+        # loads an allowed plugin with a capability that
+        # is not handled verifying that nothing is called
+        plugin.handled = []
+        plugin.load_allowed(None, "template")
+        self.assertEqual(plugin.handled, [])
+
+        # loads an allowed plugin with the exact capability of
+        # an handler verifying that the (already resolved) super
+        # capability handlers are not affected
+        plugin.load_allowed(None, "format")
+        plugin.load_allowed(None, "format.json.pretty")
+        self.assertEqual(sorted(plugin.handled), [
+            ("format", "format"),
+            ("format", "format.json.pretty"),
+            ("json", "format.json.pretty")
+        ])
+
+class PluginCallTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the plugin call decorator.
+    """
+
+    def test_bind_loaded_methods(self):
+        """
+        Tests the binding of the loaded methods, removing the
+        interceptors for the loading of the plugin.
+        """
+
+        # creates the plugin (not loaded) and calls the front-end
+        # method verifying that the loading of it is requested
+        plugin = CallPlugin(LoadManager())
+        self.assertEqual(plugin.call(2), 4)
+        self.assertEqual(plugin.manager.loads, 1)
+
+        # sets the plugin as loaded and binds the loaded methods
+        # verifying that the calls no longer test the loading
+        plugin.loaded = True
+        plugin.bind_loaded_methods()
+        self.assertEqual(plugin.loaded_methods, ["call"])
+        plugin.loaded = False
+        self.assertEqual(plugin.call(3), 6)
+        self.assertEqual(plugin.manager.loads, 1)
+
+        # unbinds the loaded methods verifying that the
+        # interceptor for the loading is restored
+        plugin.unbind_loaded_methods()
+        self.assertEqual(plugin.call(4), 8)
+        self.assertEqual(plugin.manager.loads, 2)
+
+    def test_bind_metered_methods(self):
+        """
+        Tests the binding of the metered methods (with the metrics
+        not enabled), removing the interceptors for the metrics.
+        """
+
+        # creates the plugin (not loaded) verifying that the method
+        # not intercepted for the loading is bound (since the creation)
+        # to the original function and that it's kept after the
+        # unbinding of the loaded methods
+        plugin = CallPlugin(LoadManager())
+        function = CallPlugin.__dict__["call_direct"].metered_function
+        self.assertEqual(plugin.call_direct.im_func, function)
+        self.assertEqual(plugin.call_direct(2), 6)
+        plugin.unbind_loaded_methods()
+        self.assertEqual(plugin.call_direct.im_func, function)
+        self.assertEqual(plugin.manager.loads, 0)
+
+    def test_functions_cache(self):
+        """
+        Tests the caches of the loaded and metered functions,
+        verifying that a plugin class (eg: replaced by a reload)
+        is not kept alive by them.
+        """
+
+        # creates the plugin class (derived from the call plugin)
+        # and an instance of it binding the loaded methods so that
+        # both function caches are populated for the plugin class
+        plugin_class = type("ReloadPlugin", (CallPlugin,), dict(valid = False))
+        plugin = plugin_class(LoadManager())
+        plugin.loaded = True
+        plugin.bind_loaded_methods()
+        self.assertTrue(plugin_class in colony.base.system.loaded_functions_cache)
+        self.assertTrue(plugin_class in colony.base.system.metered_functions_cache)
+
+        # removes the (only) references to the plugin class and to
+        # its instance verifying that the plugin class is collected
+        plugin_class_reference = weakref.ref(plugin_class)
+        del plugin, plugin_class
+        gc.collect()
+        self.assertEqual(plugin_class_reference(), None)
@@ -0,0 +1,1702 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import os
+import sys
+import time
+import types
+import shutil
+import logging
+import tempfile
+import threading
+
+import colony.base.util
+import colony.base.system
+import colony.libs.pool_util
+import colony.libs.test_util
+import colony.base.exceptions
+import colony.base.configuration
+
+RELOAD_PLUGIN_MODULE = """import colony.base.system
+
+class %(class_name)s(colony.base.system.Plugin):
+
+    id = "%(id)s"
+    name = "%(id)s"
+    version = "1.0.0"
+    platforms = [colony.base.system.CPYTHON_ENVIRONMENT]
+    capabilities = [colony.base.system.STARTUP_TYPE]
+    dependencies = [%(dependencies)s]
+    main_modules = [%(main_modules)s]
+
+    loads = 0
+    value = None
+
+    def load_plugin(self):
+        colony.base.system.Plugin.load_plugin(self)
+        self.loads += 1
+        if not self.main_modules: return
+        import reload_base.system
+        self.value = reload_base.system.VALUE
+"""
+""" The template of the (source) module of the plugins
+used in the reload test, the plugins with a main module
+retrieve the value from it upon loading """
+
+class CapabilityTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the capability structure.
+    """
+
+    def test_get_capability(self):
+        """
+        Tests the get capability function (interning) and the
+        sub capability tests of the capability structure.
+        """
+
+        # retrieves a series of capability structures and verifies
+        # that the same string always retrieves the same structure
+        capability = colony.base.system.get_capability("rest_service.json")
+        sub_capability = colony.base.system.get_capability("rest_service.json.pretty")
+        empty_capability = colony.base.system.get_capability("")
+        self.assertTrue(colony.base.system.get_capability("rest_service.json") is capability)
+        self.assertEqual(capability, colony.base.system.Capability("rest_service.json"))
+        self.assertEqual(len(set([capability, colony.base.system.Capability("rest_service.json")])), 1)
+
+        # verifies the sub capability tests and the
+        # capability and super capabilities list
+        self.assertTrue(capability.is_sub_capability(sub_capability))
+        self.assertFalse(sub_capability.is_sub_capability(capability))
+        self.assertFalse(capability.is_sub_capability(capability))
+        self.assertTrue(capability.is_capability_or_sub_capability(capability))
+        self.assertFalse(capability.is_capability_or_sub_capability(colony.base.system.get_capability("rest_service.jsonp")))
+        self.assertFalse(empty_capability.is_capability_or_sub_capability(capability))
+        self.assertFalse(empty_capability == empty_capability)
+        self.assertEqual(sub_capability.capability_and_super_capabilites(), ["rest_service", "rest_service.json", "rest_service.json.pretty"])
+
+        # verifies that the capability structure is immutable
+        self.assert_raises(AttributeError, setattr, capability, "list_value", ())
+
+class CapabilityIndexTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the capability index structure.
+    """
+
+    def test_get(self):
+        """
+        Tests the get method of the capability index.
+        """
+
+        # creates a capability index and registers a series of
+        # (fake) plugins under multiple capabilities
+        capability_index = colony.base.system.CapabilityIndex()
+        capability_index.add("rest_service", "first")
+        capability_index.add("rest_service.json", "second")
+        capability_index.add("rest_service.json.pretty", "third")
+        capability_index.add("rest", "fourth")
+        capability_index.add(("rest_service.xml", "same_diffusion_scope"), "fifth")
+
+        # verifies that the sub capabilities are retrieved
+        # in registration order and that the capabilities
+        # that only share a prefix string are not matched
+        self.assertEqual(capability_index.get("rest_service"), ["first", "second", "third", "fifth"])
+        self.assertEqual(capability_index.get("rest_service.json"), ["second", "third"])
+        self.assertEqual(capability_index.get("rest"), ["fourth"])
+        self.assertEqual(capability_index.get("rest_service.yaml"), [])
+        self.assertEqual(capability_index.get(""), [])
+
+    def test_remove(self):
+        """
+        Tests the remove method of the capability index.
+        """
+
+        # creates a capability index and registers a series of
+        # (fake) plugins under multiple capabilities
+        capability_index = colony.base.system.CapabilityIndex()
+        capability_index.add("rest_service", "first")
+        capability_index.add("rest_service.json", "second")
+        capability_index.add("rest_service.json", "third")
+
+        # retrieves the plugins (populating the cache) and then
+        # removes one of them verifying that the cache is invalidated
+        self.assertEqual(capability_index.get("rest_service"), ["first", "second", "third"])
+        capability_index.remove("rest_service.json", "second")
+        self.assertEqual(capability_index.get("rest_service"), ["first", "third"])
+
+        # removes the remaining plugin of the sub capability and
+        # verifies that the (empty) node is pruned from the index
+        capability_index.remove("rest_service.json", "third")
+        self.assertEqual(capability_index.get("rest_service.json"), [])
+        self.assertEqual(capability_index.root_node.children["rest_service"].children, {})
+
+class EventRoutingTableTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the event routing table structure.
+    """
+
+    def test_get_handlers(self):
+        """
+        Tests the get handlers method of the event routing table.
+        """
+
+        # creates the map of handlers (by event name) and the
+        # event routing table to be used for the routing
+        handlers_map = {
+            "plugin_manager" : ["first"],
+            "plugin_manager.end_load_plugin" : ["second"],
+            "plugin_manager.end_load" : ["third"]
+        }
+        event_routing_table = colony.base.system.EventRoutingTable()
+
+        # verifies that the handlers for the event and the super
+        # events are retrieved (from the generic to the specific)
+        handlers = event_routing_table.get_handlers("plugin_manager.end_load_plugin", handlers_map)
+        self.assertEqual(handlers, ("first", "second"))
+        handlers = event_routing_table.get_handlers("plugin_manager.unload_plugin", handlers_map)
+        self.assertEqual(handlers, ("first",))
+        handlers = event_routing_table.get_handlers("other", handlers_map)
+        self.assertEqual(handlers, ())
+
+        # changes the map of handlers and verifies that the (cached)
+        # route is only changed after the invalidation
+        handlers_map["plugin_manager.unload_plugin"] = ["fourth"]
+        handlers = event_routing_table.get_handlers("plugin_manager.unload_plugin", handlers_map)
+        self.assertEqual(handlers, ("first",))
+        event_routing_table.invalidate()
+        handlers = event_routing_table.get_handlers("plugin_manager.unload_plugin", handlers_map)
+        self.assertEqual(handlers, ("first", "fourth"))
+
+class DiscoveryManifestTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the discovery manifest structure.
+    """
+
+    def test_flush(self):
+        """
+        Tests the flush and load methods of the discovery manifest.
+        """
+
+        # creates the path to the (temporary) manifest file
+        # and the discovery manifest to be flushed
+        directory_path = tempfile.mkdtemp()
+        file_path = os.path.join(directory_path, "var", "discovery.manifest")
+        discovery_manifest = colony.base.system.DiscoveryManifest(file_path)
+
+        try:
+            # sets the modules for an old modification time and for a
+            # (too) recent one, verifying that only the first is set
+            discovery_manifest.set("/plugins", "plugin", 1000.0, ["first_plugin"])
+            discovery_manifest.set("/recent", "plugin", time.time(), ["second_plugin"])
+            self.assertEqual(discovery_manifest.get("/plugins", "plugin", 1000.0), ["first_plugin"])
+            self.assertEqual(discovery_manifest.get("/recent", "plugin", time.time()), None)
+
+            # flushes the discovery manifest and loads it into a new
+            # one verifying that the entries are only valid for the
+            # same modification time and suffix
+            discovery_manifest.flush()
+            discovery_manifest = colony.base.system.DiscoveryManifest(file_path)
+            discovery_manifest.load()
+            self.assertEqual(discovery_manifest.get("/plugins", "plugin", 1000.0), ["first_plugin"])
+            self.assertEqual(discovery_manifest.get("/plugins", "plugin", 1001.0), None)
+            self.assertEqual(discovery_manifest.get("/plugins", None, 1000.0), None)
+
+            # writes an invalid manifest file and verifies
+            # that the loaded manifest is empty
+            file = open(file_path, "wb")
+            try: file.write("invalid")
+            finally: file.close()
+            discovery_manifest = colony.base.system.DiscoveryManifest(file_path)
+            discovery_manifest.load()
+            self.assertEqual(discovery_manifest.get("/plugins", "plugin", 1000.0), None)
+        finally:
+            # removes the temporary directory
+            shutil.rmtree(directory_path)
+
+class PluginRegistryTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the plugin registry structure.
+    """
+
+    def test_get_proxy_class(self):
+        """
+        Tests the get proxy class method of the plugin registry.
+        """
+
+        # creates the path to the (temporary) registry file
+        # and the plugin registry to be tested
+        directory_path = tempfile.mkdtemp()
+        file_path = os.path.join(directory_path, "plugins.registry")
+        plugin_registry = colony.base.system.PluginRegistry(file_path)
+
+        try:
+            # sets both the lazy and the eager plugin classes in the
+            # registry and verifies that only the lazy one is registered
+            plugin_registry.set("lazy_plugin", LazyPlugin)
+            plugin_registry.set("eager_plugin", EagerPlugin)
+            self.assertNotEqual(plugin_registry.get("lazy_plugin"), None)
+            self.assertEqual(plugin_registry.get("eager_plugin"), None)
+
+            # flushes the plugin registry and loads it into a new one
+            # retrieving the proxy class for the lazy plugin module
+            plugin_registry.flush()
+            plugin_registry = colony.base.system.PluginRegistry(file_path)
+            plugin_registry.load()
+            proxy_class = plugin_registry.get_proxy_class("lazy_plugin")
+
+            # verifies that the proxy class contains the metadata
+            # of the plugin class and that it's the same class for
+            # subsequent retrievals (no re-creation)
+            self.assertEqual(proxy_class.__name__, "LazyPlugin")
+            self.assertEqual(proxy_class.__module__, "lazy_plugin")
+            self.assertEqual(proxy_class.id, "pt.test.lazy")
+            self.assertEqual(proxy_class.capabilities, ["lazy", "lazy.test"])
+            self.assertEqual(proxy_class.dependencies[0].get_tuple(), ("pt.test.eager", "1.0.0"))
+            self.assertTrue(issubclass(proxy_class, colony.base.system.PluginProxy))
+            self.assertTrue(proxy_class.valid)
+            self.assertEqual(plugin_registry.get_proxy_class("lazy_plugin"), proxy_class)
+            self.assertEqual(plugin_registry.get_proxy_class("eager_plugin"), None)
+        finally:
+            # removes the temporary directory
+            shutil.rmtree(directory_path)
+
+    def test_overridden_methods(self):
+        """
+        Tests the proxy methods of the proxy classes, for the methods
+        overridden by the real plugin class (materialized on call).
+        """
+
+        # creates the path to the (temporary) registry file
+        # and the plugin registry to be tested
+        directory_path = tempfile.mkdtemp()
+        file_path = os.path.join(directory_path, "plugins.registry")
+        plugin_registry = colony.base.system.PluginRegistry(file_path)
+
+        try:
+            # sets the plugin with the overridden (lifecycle) methods
+            # in the registry and verifies that they're recorded
+            plugin_registry.set("override_plugin", OverridePlugin)
+            self.assertEqual(plugin_registry.get("override_plugin")["overridden"], ["end_unload_plugin", "unload_plugin"])
+
+            # creates a proxy (instance) and calls one of the overridden
+            # methods verifying that the real plugin is materialized
+            # before the call (real method is called)
+            proxy_class = plugin_registry.get_proxy_class("override_plugin")
+            self.assertFalse("lazy_load_plugin" in proxy_class.__dict__)
+            manager = ProxyManager()
+            plugin = proxy_class(manager)
+            plugin.unload_plugin()
+            self.assertEqual(plugin.__class__, OverridePlugin)
+            self.assertEqual(plugin.unloads, 1)
+            self.assertEqual(manager.materializations, 1)
+
+            # verifies that a failed materialization is raised
+            # as an exception in the call of the method
+            manager.materialized = False
+            plugin = proxy_class(manager)
+            self.assertRaises(colony.base.exceptions.PluginSystemException, plugin.end_unload_plugin)
+        finally:
+            # removes the temporary directory
+            shutil.rmtree(directory_path)
+
+class LoadPlanTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the load plan structure.
+    """
+
+    def test_activate(self):
+        """
+        Tests the activate method of the load plan, with the
+        replay of the plan for the same fingerprint.
+        """
+
+        # creates the path to the (temporary) plan file
+        # and the load plan to be recorded
+        directory_path = tempfile.mkdtemp()
+        file_path = os.path.join(directory_path, "var", "load.plan")
+        load_plan = colony.base.system.LoadPlan(file_path)
+
+        try:
+            # activates the (empty) plan verifying that it's recorded,
+            # and records the resolution (nothing is replayed)
+            self.assertEqual(load_plan.activate("first"), False)
+            load_plan.set_satisfied("pt.test.lazy")
+            load_plan.set_capability("lazy", ["pt.test.lazy"])
+            load_plan.set_graph(("main", ("pt.test.lazy",)), (["pt.test.lazy", "pt.test.eager"], {}, {}))
+            self.assertEqual(load_plan.is_satisfied("pt.test.lazy"), False)
+            self.assertEqual(load_plan.get_capability("lazy"), None)
+
+            # flushes the load plan and loads it into a new one verifying
+            # that the resolution is replayed for the same fingerprint
+            load_plan.flush()
+            load_plan = colony.base.system.LoadPlan(file_path)
+            load_plan.load()
+            self.assertEqual(load_plan.activate("first"), True)
+            self.assertEqual(load_plan.dirty, False)
+            self.assertEqual(load_plan.is_satisfied("pt.test.lazy"), True)
+            self.assertEqual(load_plan.is_satisfied("pt.test.eager"), False)
+            self.assertEqual(load_plan.get_capability("lazy"), ["pt.test.lazy"])
+            self.assertEqual(load_plan.get_capability("eager"), None)
+            graph = load_plan.get_graph(("main", ("pt.test.lazy",)))
+            self.assertEqual(graph[0], ["pt.test.lazy", "pt.test.eager"])
+
+            # activates the plan for a different fingerprint verifying
+            # that the plan is reset (nothing is replayed)
+            self.assertEqual(load_plan.activate("second"), False)
+            self.assertEqual(load_plan.dirty, True)
+            self.assertEqual(load_plan.is_satisfied("pt.test.lazy"), False)
+            self.assertEqual(load_plan.get_graph(("main", ("pt.test.lazy",))), None)
+        finally:
+            # removes the temporary directory
+            shutil.rmtree(directory_path)
+
+class ConfigurationCacheTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the configuration cache structure.
+    """
+
+    def test_get(self):
+        """
+        Tests the get method of the configuration cache.
+        """
+
+        # creates the (temporary) global and workspace configuration
+        # paths and the configuration cache (checking on every access)
+        directory_path = tempfile.mkdtemp()
+        global_file_path = os.path.join(directory_path, "global.conf")
+        workspace_file_path = os.path.join(directory_path, "workspace.conf")
+        file_paths = [workspace_file_path, global_file_path]
+        configuration_cache = colony.base.system.ConfigurationCache(0.0)
+
+        try:
+            # verifies that the contents are invalid (and not
+            # changed) in case none of the files exists
+            self.assertEqual(configuration_cache.get("key", file_paths), (None, False))
+
+            # writes the global file and verifies that the contents
+            # are retrieved (and parsed) and that the change is notified
+            self._write_file(global_file_path, "1,2", 1000.0)
+            self.assertEqual(configuration_cache.get("key", file_paths), ("1,2", True))
+            self.assertEqual(configuration_cache.get("key", file_paths, _parse), (["1", "2"], False))
+
+            # writes the workspace file (precedence) and verifies that the
+            # change is only detected by the check of the cache
+            self._write_file(workspace_file_path, "3", 1000.0)
+            self.assertEqual(configuration_cache.check(), ["key"])
+            self.assertEqual(configuration_cache.get("key", file_paths, _parse), (["3"], False))
+            self.assertEqual(configuration_cache.check(), [])
+
+            # creates a cache with a long check interval and verifies
+            # that the change in the file is only seen after the
+            # invalidation of the entry
+            configuration_cache = colony.base.system.ConfigurationCache(3600.0)
+            self.assertEqual(configuration_cache.get("key", file_paths), ("3", False))
+            self._write_file(workspace_file_path, "4", 2000.0)
+            self.assertEqual(configuration_cache.get("key", file_paths), ("3", False))
+            configuration_cache.invalidate("key")
+            self.assertEqual(configuration_cache.get("key", file_paths), ("4", False))
+
+            # verifies that the parsed value is stored under the parser
+            # and that the same (read-only) value is returned
+            values, _changed = configuration_cache.get("key", file_paths, _parse)
+            self.assertTrue(configuration_cache.get("key", file_paths, _parse)[0] is values)
+            self.assertEqual(configuration_cache.entries["key"][4].keys(), [_parse])
+
+            # verifies that the parsers with the same name (created by
+            # the same factory) have their own values and that their
+            # values are released with them (weak references)
+            self._write_file(workspace_file_path, "a,b;c", 3000.0)
+            configuration_cache.invalidate("key")
+            make = lambda separator: lambda contents: contents.split(separator)
+            self.assertEqual(configuration_cache.get("key", file_paths, make(",")), (["a", "b;c"], False))
+            self.assertEqual(configuration_cache.get("key", file_paths, make(";")), (["a,b", "c"], False))
+            self.assertEqual(len(configuration_cache.entries["key"][4]), 0)
+
+            # verifies that a parser that is not referenceable (builtin)
+            # is called on every retrieval (nothing is stored)
+            self.assertEqual(configuration_cache.get("key", file_paths, len), (5, False))
+            self.assertEqual(len(configuration_cache.entries["key"][4]), 0)
+
+            # verifies that the parser is called without holding the lock
+            # of the cache (the lock is acquirable from another thread)
+            def parse_unlocked(contents):
+                def acquire():
+                    acquired.append(configuration_cache.lock.acquire(False))
+                    acquired[0] and configuration_cache.lock.release()
+                acquired = []
+                thread = threading.Thread(target = acquire)
+                thread.start()
+                thread.join()
+                return acquired
+            self.assertEqual(configuration_cache.get("key", file_paths, parse_unlocked), ([True], False))
+        finally:
+            # removes the temporary directory
+            shutil.rmtree(directory_path)
+
+    def _write_file(self, file_path, contents, modification_time):
+        file = open(file_path, "wb")
+        try: file.write(contents)
+        finally: file.close()
+        os.utime(file_path, (modification_time, modification_time))
+
+class FileMonitorTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the file monitor structure.
+    """
+
+    def test_check(self):
+        """
+        Tests the check method of the file monitor.
+        """
+
+        # creates the (temporary) files to be watched
+        # and the file monitor to be tested
+        directory_path = tempfile.mkdtemp()
+        first_file_path = os.path.join(directory_path, "first.py")
+        second_file_path = os.path.join(directory_path, "second.py")
+        file_monitor = colony.base.system.FileMonitor()
+
+        try:
+            # creates both files and watches them associating
+            # the first one with two keys
+            self._touch(first_file_path, 1000.0)
+            self._touch(second_file_path, 1000.0)
+            file_monitor.update({first_file_path : ["first", "common"], second_file_path : ["second"]})
+            self.assertEqual(file_monitor.check(), set())
+
+            # changes the first file and verifies that its keys are
+            # returned only once (the modification time is updated)
+            self._touch(first_file_path, 2000.0)
+            self.assertEqual(file_monitor.check(), set(["first", "common"]))
+            self.assertEqual(file_monitor.check(), set())
+
+            # changes the second file and updates the watched files
+            # (keeping the second one) verifying that the change is
+            # not lost in the update, then removes the file
+            self._touch(second_file_path, 2000.0)
+            file_monitor.update({second_file_path : ["second"]})
+            self.assertEqual(file_monitor.check(), set(["second"]))
+            os.remove(second_file_path)
+            self.assertEqual(file_monitor.check(), set(["second"]))
+        finally:
+            # removes the temporary directory
+            shutil.rmtree(directory_path)
+
+    def _touch(self, file_path, modification_time):
+        open(file_path, "wb").close()
+        os.utime(file_path, (modification_time, modification_time))
+
+class ReplicaPoolTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the replica pool structure.
+    """
+
+    def test_take(self):
+        """
+        Tests the take method of the replica pool.
+        """
+
+        # creates a replica pool for a plugin with a low watermark
+        # of one and a high watermark of two replicas
+        replica_pool = colony.base.system.ReplicaPool({"pt.test.lazy" : (1, 2)})
+
+        # verifies that the empty pool must be refilled and that
+        # only one refill may be started at a time
+        self.assertEqual(replica_pool.needs_refill("pt.test.lazy"), True)
+        self.assertEqual(replica_pool.needs_refill("pt.test.eager"), False)
+        self.assertEqual(replica_pool.begin_refill("pt.test.lazy"), True)
+        self.assertEqual(replica_pool.begin_refill("pt.test.lazy"), False)
+        self.assertEqual(replica_pool.needs_refill("pt.test.lazy"), False)
+
+        # puts replicas in the pool until it's full
+        # and then ends the refill
+        replica_pool.put("pt.test.lazy", "first")
+        self.assertEqual(replica_pool.is_full("pt.test.lazy"), False)
+        replica_pool.put("pt.test.lazy", "second")
+        self.assertEqual(replica_pool.is_full("pt.test.lazy"), True)
+        replica_pool.end_refill("pt.test.lazy")
+
+        # takes the replicas (in order) verifying that the refill is
+        # only required below the low watermark and that a miss occurs
+        # once the pool is empty
+        self.assertEqual(replica_pool.take("pt.test.lazy"), "first")
+        self.assertEqual(replica_pool.needs_refill("pt.test.lazy"), False)
+        self.assertEqual(replica_pool.take("pt.test.lazy"), "second")
+        self.assertEqual(replica_pool.needs_refill("pt.test.lazy"), True)
+        self.assertEqual(replica_pool.take("pt.test.lazy"), None)
+
+        # verifies the statistics of the pool and that
+        # no replicas are taken once the pool is closed
+        statistics = replica_pool.get_statistics()
+        self.assertEqual((statistics["hits"], statistics["misses"]), (2, 1))
+        self.assertEqual(statistics["plugins"]["pt.test.lazy"]["created"], 2)
+        self.assertEqual(statistics["plugins"]["pt.test.lazy"]["available"], 0)
+        replica_pool.put("pt.test.lazy", "third")
+        replica_pool.close()
+        self.assertEqual(replica_pool.take("pt.test.lazy"), None)
+        self.assertEqual(replica_pool.begin_refill("pt.test.lazy"), False)
+
+    def test_take_version(self):
+        """
+        Tests the take method of the replica pool with the version
+        of the plugin, verifying that a replica of another version
+        is kept in the pool (as a miss).
+        """
+
+        # creates a replica pool and puts a replica (of
+        # the lazy plugin) in the pool of the plugin
+        replica_pool = colony.base.system.ReplicaPool({"pt.test.lazy" : (1, 2)})
+        replica = LazyPlugin()
+        replica_pool.put("pt.test.lazy", replica)
+
+        # takes the replica with another version verifying that it's
+        # kept in the pool and that only the miss is accounted
+        self.assertEqual(replica_pool.take("pt.test.lazy", "2.0.0"), None)
+        statistics = replica_pool.get_statistics()
+        self.assertEqual((statistics["hits"], statistics["misses"]), (0, 1))
+        self.assertEqual(statistics["plugins"]["pt.test.lazy"]["created"], 1)
+        self.assertEqual(statistics["plugins"]["pt.test.lazy"]["available"], 1)
+
+        # takes the replica with the valid version
+        self.assertEqual(replica_pool.take("pt.test.lazy", "1.0.0"), replica)
+        statistics = replica_pool.get_statistics()
+        self.assertEqual((statistics["hits"], statistics["misses"]), (1, 1))
+        self.assertEqual(statistics["plugins"]["pt.test.lazy"]["available"], 0)
+
+class LifecycleWatchdogTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the lifecycle watchdog structure.
+    """
+
+    def test_check(self):
+        """
+        Tests the check method of the lifecycle watchdog, with
+        a lifecycle call that exceeds its deadline.
+        """
+
+        # creates the manager, the plugin and the plugin thread and
+        # adds the load event (the load of the plugin hangs)
+        manager = WatchdogManager()
+        plugin = HangPlugin(manager)
+        executor = colony.libs.pool_util.ThreadPool(1, "lifecycle")
+        plugin_thread = colony.base.system.PluginThread(plugin, executor)
+        plugin_thread.add_event(colony.base.util.Event(colony.base.system.LOAD_VALUE))
+
+        try:
+            # verifies that the call is not expired before its deadline
+            # and waits for the expiration of the call (ready semaphore)
+            self.assertEqual(manager.lifecycle_watchdog.check(), [])
+            plugin.acquire_ready_semaphore()
+
+            # verifies that the plugin is set in error state and that
+            # the stack of the hanging call was dumped (after the release)
+            for _index in range(100):
+                if manager.errors: break
+                time.sleep(0.01)
+            self.assertEqual(plugin.error_state, True)
+            self.assertTrue(isinstance(plugin.exception, colony.base.exceptions.OperationTimeout))
+            self.assertEqual(len(manager.errors), 1)
+            self.assertTrue("in load_plugin" in manager.errors[0])
+        finally:
+            # unblocks the load of the plugin and waits
+            # for the end of the (expired) call
+            plugin.hang_event.set()
+            for _index in range(100):
+                if not plugin.ready_semaphore_expired: break
+                time.sleep(0.01)
+            manager.lifecycle_watchdog.stop()
+            executor.stop(1.0)
+
+        # verifies that the late release of the ready
+        # semaphore by the expired call was ignored
+        self.assertEqual(plugin.ready_semaphore_expired, [])
+        self.assertEqual(plugin.ready_semaphore.acquire(0), False)
+
+class PluginSnapshotTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the (lock free) retrieval of the plugins
+    from the plugin snapshot map of the plugin manager.
+    """
+
+    def test_get_plugin(self):
+        """
+        Tests the get plugin method of the plugin manager, verifying
+        that the loaded plugins are retrieved without locking and that
+        the plugins not yet published fall back to the locked lookup.
+        """
+
+        # creates the plugin classes, an eager (startup) plugin
+        # and a lazy plugin depending on it
+        eager_class = _create_plugin_class(
+            "pt.test.snapshot.eager",
+            capabilities = [colony.base.system.STARTUP_TYPE]
+        )
+        lazy_class = _create_plugin_class(
+            "pt.test.snapshot.lazy",
+            loading_type = colony.base.system.LAZY_LOADING_TYPE,
+            dependencies = [colony.base.system.PluginDependency(eager_class.id, "1.0.0")]
+        )
+
+        plugin_manager = _create_manager()
+        try:
+            # boots the plugin manager and replaces the retrieve lock
+            # with a counting one, so that the locked lookups are visible
+            plugin_manager.load_system()
+            plugin_manager.retrieve_lock = CountingLock()
+
+            # verifies that the eager plugin is published and that it's
+            # retrieved (by id and valid version) without locking
+            eager_plugin = plugin_manager._get_plugin_by_id(eager_class.id)
+            self.assertEqual(plugin_manager.plugin_snapshot_map.get(eager_class.id), eager_plugin)
+            self.assertEqual(plugin_manager.get_plugin(eager_class.id), eager_plugin)
+            self.assertEqual(plugin_manager.get_plugin(eager_class.id, "1.0.0"), eager_plugin)
+            self.assertEqual(plugin_manager.retrieve_lock.acquisitions, 0)
+
+            # verifies that an invalid version falls back to the
+            # locked lookup (that fails to retrieve the plugin)
+            self.assertEqual(plugin_manager.get_plugin(eager_class.id, "2.0.0"), None)
+            self.assertEqual(plugin_manager.retrieve_lock.acquisitions, 1)
+
+            # verifies that the (lazy loaded) lazy plugin is not published
+            # and that its retrieval falls back to the locked lookup
+            self.assertEqual(plugin_manager.plugin_snapshot_map.get(lazy_class.id), None)
+            lazy_plugin = plugin_manager.get_plugin(lazy_class.id)
+            self.assertEqual(lazy_plugin.is_lazy_loaded(), True)
+            self.assertEqual(plugin_manager.retrieve_lock.acquisitions, 2)
+
+            # fully loads the lazy plugin verifying that it's published
+            # and that the next retrieval is lock free
+            plugin_manager.load_plugin(lazy_class.id, colony.base.system.FULL_LOAD_TYPE)
+            self.assertEqual(plugin_manager.plugin_snapshot_map.get(lazy_class.id), lazy_plugin)
+            self.assertEqual(plugin_manager.get_plugin(lazy_class.id), lazy_plugin)
+            self.assertEqual(plugin_manager.retrieve_lock.acquisitions, 2)
+
+            # unloads the lazy plugin (the unloading acquires the lock twice)
+            # verifying that it's removed from the snapshot and that its
+            # retrieval is locked again
+            plugin_manager.unload_plugin(lazy_class.id)
+            self.assertEqual(plugin_manager.retrieve_lock.acquisitions, 4)
+            self.assertEqual(plugin_manager.plugin_snapshot_map.get(lazy_class.id), None)
+            self.assertEqual(plugin_manager.get_plugin(lazy_class.id), lazy_plugin)
+            self.assertEqual(plugin_manager.retrieve_lock.acquisitions, 5)
+        finally:
+            plugin_manager.unload_system(False)
+            shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+            eager_class.valid = False
+            lazy_class.valid = False
+
+class ConcurrentLoadTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the concurrent loading of the plugins
+    in the plugin manager (with diffusion scopes).
+    """
+
+    def test_load_system(self):
+        """
+        Tests the load system method of the plugin manager with
+        concurrent loading workers, verifying that the allowed
+        plugins (including the diffusion scope ones) are injected
+        exactly once, as in the serial loading.
+        """
+
+        # retrieves the current number of loading workers so that
+        # it may be restored at the end of the test
+        configuration = colony.base.configuration.plugin_manager_configuration
+        load_workers = configuration.get("load_workers", 0)
+
+        # creates the (startup) plugin classes, both the host and the
+        # allowed plain plugin depend on a scope plugin so that they're
+        # loaded in the same (later) wave as the scope plugins are
+        # injected in the host (replicas) in the loading of it
+        scope_classes = [_create_plugin_class(
+            "pt.test.concurrent.scope%d" % index,
+            capabilities = ["test_scope", colony.base.system.STARTUP_TYPE]
+        ) for index in range(2)]
+        same_class = _create_plugin_class(
+            "pt.test.concurrent.same",
+            capabilities = ["test_same", colony.base.system.STARTUP_TYPE]
+        )
+        plain_class = _create_plugin_class(
+            "pt.test.concurrent.plain",
+            capabilities = ["test_plain", colony.base.system.STARTUP_TYPE],
+            dependencies = [colony.base.system.PluginDependency(scope_classes[0].id, "1.0.0")]
+        )
+        host_class = _create_plugin_class(
+            "pt.test.concurrent.host",
+            capabilities = [colony.base.system.STARTUP_TYPE],
+            dependencies = [colony.base.system.PluginDependency(scope_classes[1].id, "1.0.0")],
+            capabilities_allowed = [
+                ("test_scope", colony.base.system.NEW_DIFFUSION_SCOPE),
+                ("test_same", colony.base.system.SAME_DIFFUSION_SCOPE),
+                "test_plain"
+            ]
+        )
+        plugin_classes = scope_classes + [same_class, plain_class, host_class]
+
+        try:
+            allowed_lists = []
+
+            for workers in (0, 4):
+                # boots the plugin manager with the current number
+                # of loading workers (serial for no workers)
+                configuration["load_workers"] = workers
+                plugin_manager = _create_manager(threads = True)
+                try:
+                    return_value = plugin_manager.load_system()
+                    self.assertEqual(return_value, 0)
+
+                    # retrieves the (allowed) plugins injected in the host
+                    # verifying that the new diffusion scope ones are
+                    # replicas (there's no duplicate injection)
+                    host_plugin = plugin_manager._get_plugin_by_id(host_class.id)
+                    allowed = [(plugin.original_id, capability) for plugin, capability in host_plugin.allowed_loaded_capability]
+                    self.assertEqual(len(allowed), len(set(allowed)))
+                    for plugin, capability in host_plugin.allowed_loaded_capability:
+                        if not capability == "test_scope": continue
+                        self.assertNotEqual(plugin.id, plugin.original_id)
+                    allowed_lists.append(sorted(allowed))
+                finally:
+                    plugin_manager.unload_system(False)
+                    shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+
+            # verifies that the allowed plugins are the same for both
+            # the serial and the concurrent loading
+            self.assertEqual(allowed_lists[0], allowed_lists[1])
+            self.assertEqual(allowed_lists[0], [
+                ("pt.test.concurrent.plain", "test_plain"),
+                ("pt.test.concurrent.same", "test_same"),
+                ("pt.test.concurrent.scope0", "test_scope"),
+                ("pt.test.concurrent.scope1", "test_scope")
+            ])
+        finally:
+            # restores the number of loading workers and invalidates
+            # the plugin classes so that they're not discovered
+            configuration["load_workers"] = load_workers
+            for plugin_class in plugin_classes: plugin_class.valid = False
+
+class MainLoopTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the main loop (event queue) of
+    the plugin manager.
+    """
+
+    def test_main_loop(self):
+        """
+        Tests the main loop of the plugin manager, verifying that
+        the events are processed in order and in batches and that
+        the adding of events is not blocked by a running execution.
+        """
+
+        # creates the list of the executed values and the events
+        # controlling the blocking execution
+        values = []
+        started_event = threading.Event()
+        release_event = threading.Event()
+
+        def block():
+            started_event.set()
+            release_event.wait(5.0)
+
+        def execute(method, *arguments):
+            plugin_manager.add_event(colony.base.util.Event(
+                colony.base.system.EXECUTE_VALUE, [method] + list(arguments)
+            ))
+
+        plugin_manager = _create_manager()
+        try:
+            # adds the first batch of events (before the main
+            # loop is running) including the blocking execution
+            execute(values.append, 1)
+            execute(values.append, 2)
+            execute(block)
+
+            # starts the main loop in a separate thread and waits
+            # for the blocking execution to be started
+            plugin_manager.main_loop_active = True
+            loop_thread = threading.Thread(target = plugin_manager.main_loop)
+            loop_thread.start()
+            self.assertEqual(started_event.wait(5.0), True)
+
+            # adds an event (in a separate thread) while the execution
+            # is running verifying that the adding is not blocked
+            add_thread = threading.Thread(target = execute, args = (values.append, 3))
+            add_thread.start()
+            add_thread.join(5.0)
+            self.assertEqual(add_thread.isAlive(), False)
+            self.assertEqual(plugin_manager.get_main_loop_statistics()["depth"], 1)
+
+            # adds the exit event, releases the blocking execution
+            # and waits for the main loop to exit
+            plugin_manager.add_event(colony.base.util.Event(colony.base.system.EXIT_VALUE))
+            release_event.set()
+            loop_thread.join(5.0)
+            self.assertEqual(loop_thread.isAlive(), False)
+        finally:
+            release_event.set()
+            shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+
+        # verifies the order of the executions and the statistics
+        # of the main loop (two batches of events)
+        self.assertEqual(values, [1, 2, 3])
+        statistics = plugin_manager.get_main_loop_statistics()
+        self.assertEqual(statistics["enqueued"], 5)
+        self.assertEqual(statistics["processed"], 5)
+        self.assertEqual(statistics["batches"], 2)
+        self.assertEqual(statistics["maximum_depth"], 3)
+        self.assertEqual(statistics["depth"], 0)
+        self.assertTrue(statistics["maximum_latency"] >= statistics["average_latency"])
+
+class ResolutionTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the (memoized) resolution of the string
+    values and paths in the plugin manager.
+    """
+
+    def test_resolve_string_value(self):
+        """
+        Tests the resolve string value method of the plugin manager,
+        verifying that the resolved values are memoized (as copies),
+        that the volatile commands are not memoized and that the
+        registration of plugins invalidates the memoized values.
+        """
+
+        plugin_class = _create_plugin_class("pt.test.resolution")
+        plugin_manager = _create_manager()
+        manager_path = plugin_manager.manager_path
+        try:
+            # resolves the manager path value verifying that it's
+            # memoized and that a copy of the values is returned
+            values = plugin_manager.resolve_string_value("%manager_path%/file")
+            self.assertEqual(values, [manager_path + "/file"])
+            self.assertEqual(plugin_manager.resolution_cache.get("%manager_path%/file"), (manager_path + "/file",))
+            values.append("invalid")
+            self.assertEqual(plugin_manager.resolve_string_value("%manager_path%/file"), [manager_path + "/file"])
+
+            # changes the manager path (without invalidation) verifying
+            # that the memoized values are used until the invalidation
+            plugin_manager.manager_path = "/changed"
+            self.assertEqual(plugin_manager.resolve_string_value("%manager_path%/file"), [manager_path + "/file"])
+            plugin_manager.invalidate_resolution_cache()
+            self.assertEqual(plugin_manager.resolve_string_value("%manager_path%/file"), ["/changed/file"])
+            plugin_manager.manager_path = manager_path
+
+            # resolves an environment value verifying that the volatile
+            # command is resolved again after the environment change
+            os.environ["COLONY_TEST_RESOLUTION"] = "first"
+            try:
+                self.assertEqual(plugin_manager.resolve_string_value("%environment:COLONY_TEST_RESOLUTION%"), ["first"])
+                os.environ["COLONY_TEST_RESOLUTION"] = "second"
+                self.assertEqual(plugin_manager.resolve_string_value("%environment:COLONY_TEST_RESOLUTION%"), ["second"])
+                self.assertEqual(plugin_manager.resolution_cache.get("%environment:COLONY_TEST_RESOLUTION%"), None)
+            finally:
+                del os.environ["COLONY_TEST_RESOLUTION"]
+
+            # boots the plugin manager and creates a replica of the plugin
+            # verifying that its registration invalidates the memoized values
+            plugin_manager.load_system()
+            plugin_manager.resolve_string_value("%manager_path%/file")
+            self.assertNotEqual(plugin_manager.resolution_cache.get("%manager_path%/file"), None)
+            plugin_manager.create_plugin(plugin_class.id, "1.0.0")
+            self.assertEqual(plugin_manager.resolution_cache.get("%manager_path%/file"), None)
+            plugin_manager.unload_system(False)
+        finally:
+            shutil.rmtree(manager_path, ignore_errors = True)
+            plugin_class.valid = False
+
+    def test_path_exists(self):
+        """
+        Tests the (cached) test of path existence of the plugin
+        manager, verifying that both the positive and negative
+        results are cached until the invalidation.
+        """
+
+        plugin_manager = _create_manager()
+        file_path = os.path.join(plugin_manager.manager_path, "file")
+        try:
+            # tests the (missing) path and creates the file verifying
+            # that the negative result is cached until the invalidation
+            self.assertEqual(plugin_manager._path_exists(file_path), False)
+            open(file_path, "wb").close()
+            self.assertEqual(plugin_manager._path_exists(file_path), False)
+            plugin_manager.invalidate_resolution_cache()
+            self.assertEqual(plugin_manager._path_exists(file_path), True)
+
+            # removes the file verifying that the positive result is
+            # cached (the resolution returns the cached path)
+            os.remove(file_path)
+            self.assertEqual(plugin_manager._path_exists(file_path), True)
+            self.assertEqual(plugin_manager.resolve_file_path(file_path), file_path)
+            plugin_manager.invalidate_resolution_cache()
+            self.assertEqual(plugin_manager._path_exists(file_path), False)
+        finally:
+            shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+
+class ReplicaInjectionTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the injection of the (pooled) replicas
+    of the allowed plugins in the plugin manager.
+    """
+
+    def test_inject_allowed(self):
+        """
+        Tests the injection of an allowed plugin with a new diffusion
+        scope, verifying that the pooled replicas are injected and
+        that the pool is refilled below the low watermark.
+        """
+
+        # retrieves the current replica pool configuration so that
+        # it may be restored at the end of the test
+        configuration = colony.base.configuration.plugin_manager_configuration
+        replica_pool = configuration.get("replica_pool", {})
+
+        # creates the plugin classes, the (startup) scope plugin
+        # and the hosts that allow it with a new diffusion scope
+        scope_class = _create_plugin_class(
+            "pt.test.replica.scope",
+            capabilities = ["test_scope", colony.base.system.STARTUP_TYPE]
+        )
+        host_classes = [_create_plugin_class(
+            "pt.test.replica.host%d" % index,
+            capabilities_allowed = [("test_scope", colony.base.system.NEW_DIFFUSION_SCOPE)]
+        ) for index in range(2)]
+        plugin_classes = [scope_class] + host_classes
+        capability = ("test_scope", colony.base.system.NEW_DIFFUSION_SCOPE)
+
+        configuration["replica_pool"] = {scope_class.id : (1, 2)}
+        plugin_manager = _create_manager()
+        try:
+            # boots the plugin manager and waits for the
+            # (background) filling of the replica pool
+            self.assertEqual(plugin_manager.load_system(), 0)
+            self._wait_refill(plugin_manager, scope_class.id)
+            scope_plugin = plugin_manager._get_plugin_by_id(scope_class.id)
+            hosts = [plugin_manager._get_plugin_by_id(host_class.id) for host_class in host_classes]
+            pooled = list(plugin_manager.replica_pool.replicas[scope_class.id])
+            self.assertEqual(len(pooled), 2)
+
+            # injects the scope plugin in the first host verifying that
+            # the first pooled replica is injected (hit) and that the
+            # pool is not refilled (not below the low watermark)
+            plugin_manager._inject_allowed(hosts[0], scope_plugin, capability)
+            self.assertEqual(hosts[0].allowed_loaded_capability, [(pooled[0], "test_scope")])
+            statistics = plugin_manager.get_replica_pool_statistics()
+            self.assertEqual((statistics["hits"], statistics["misses"]), (1, 0))
+            self.assertEqual(statistics["plugins"][scope_class.id]["available"], 1)
+
+            # takes a replica with another version verifying that it's
+            # a miss and that the replica is kept in the pool
+            self.assertEqual(plugin_manager.take_replica(scope_class.id, "2.0.0"), None)
+            statistics = plugin_manager.get_replica_pool_statistics()
+            self.assertEqual((statistics["hits"], statistics["misses"]), (1, 1))
+            self.assertEqual(statistics["plugins"][scope_class.id]["created"], 2)
+            self.assertEqual(statistics["plugins"][scope_class.id]["available"], 1)
+
+            # injects the scope plugin in the second host verifying that
+            # the second pooled replica is injected and that the pool
+            # is refilled (below the low watermark) to the high watermark,
+            # with the retrieve lock acquired for the taken replica and
+            # for each of the created replicas
+            plugin_manager.retrieve_lock = CountingLock()
+            plugin_manager._inject_allowed(hosts[1], scope_plugin, capability)
+            self.assertEqual(hosts[1].allowed_loaded_capability, [(pooled[1], "test_scope")])
+            self._wait_refill(plugin_manager, scope_class.id)
+            self.assertEqual(plugin_manager.retrieve_lock.acquisitions, 3)
+            statistics = plugin_manager.get_replica_pool_statistics()
+            self.assertEqual((statistics["hits"], statistics["misses"]), (2, 1))
+            self.assertEqual(statistics["plugins"][scope_class.id]["created"], 4)
+            self.assertEqual(statistics["plugins"][scope_class.id]["available"], 2)
+        finally:
+            # restores the replica pool configuration and invalidates
+            # the plugin classes so that they're not discovered
+            plugin_manager.unload_system(False)
+            shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+            configuration["replica_pool"] = replica_pool
+            for plugin_class in plugin_classes: plugin_class.valid = False
+
+    def test_load_plugin(self):
+        """
+        Tests the loading (after the boot) of plugins allowing a pooled
+        plugin, verifying that the idle replicas are not injected and
+        that the host with a new diffusion scope takes a pooled replica.
+        """
+
+        # retrieves the current replica pool configuration so that
+        # it may be restored at the end of the test
+        configuration = colony.base.configuration.plugin_manager_configuration
+        replica_pool = configuration.get("replica_pool", {})
+
+        # creates the plugin classes, the (startup) scope plugin, the
+        # plugin that allows it (plain capability) and the host that
+        # allows it with a new diffusion scope
+        scope_class = _create_plugin_class(
+            "pt.test.replica.scope",
+            capabilities = ["test_scope", colony.base.system.STARTUP_TYPE]
+        )
+        plain_class = _create_plugin_class(
+            "pt.test.replica.plain",
+            capabilities_allowed = ["test_scope"]
+        )
+        host_classes = [_create_plugin_class(
+            "pt.test.replica.host%d" % index,
+            capabilities_allowed = [("test_scope", colony.base.system.NEW_DIFFUSION_SCOPE)]
+        ) for index in range(2)]
+        plugin_classes = [scope_class, plain_class] + host_classes
+
+        configuration["replica_pool"] = {scope_class.id : (1, 2)}
+        plugin_manager = _create_manager()
+        try:
+            # boots the plugin manager and waits for the (background)
+            # filling of the replica pool, verifying that the idle
+            # replicas are not registered for the capability
+            self.assertEqual(plugin_manager.load_system(), 0)
+            self._wait_refill(plugin_manager, scope_class.id)
+            scope_plugin = plugin_manager._get_plugin_by_id(scope_class.id)
+            pooled = list(plugin_manager.replica_pool.replicas[scope_class.id])
+            self.assertEqual(plugin_manager._get_plugins_by_capability("test_scope"), [scope_plugin])
+
+            # loads the plugin allowing the plain capability verifying
+            # that only the (original) scope plugin is injected
+            plugin_manager.load_plugin(plain_class.id)
+            plain = plugin_manager._get_plugin_by_id(plain_class.id)
+            self.assertEqual(plain.allowed_loaded_capability, [(scope_plugin, "test_scope")])
+
+            # loads the hosts verifying that the pooled replicas are
+            # injected (hits) and registered (taken) and that the taken
+            # replica is not replicated for the second host
+            for index, host_class in enumerate(host_classes):
+                plugin_manager.load_plugin(host_class.id)
+                host = plugin_manager._get_plugin_by_id(host_class.id)
+                self.assertEqual(host.allowed_loaded_capability, [(pooled[index], "test_scope")])
+            self.assertEqual(plugin_manager.get_replica_pool_statistics()["hits"], 2)
+            self.assertEqual(plugin_manager._get_plugins_by_capability("test_scope"), [scope_plugin] + pooled)
+        finally:
+            # restores the replica pool configuration and invalidates
+            # the plugin classes so that they're not discovered
+            plugin_manager.unload_system(False)
+            shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+            configuration["replica_pool"] = replica_pool
+            for plugin_class in plugin_classes: plugin_class.valid = False
+
+    def _wait_refill(self, plugin_manager, plugin_id):
+        # waits for the (background) refill of the pool of the plugin
+        # to be started and finished (up to the high watermark)
+        replica_pool = plugin_manager.replica_pool
+        timeout = time.time() + 5.0
+        while time.time() < timeout and (plugin_id in replica_pool.refilling or\
+            not replica_pool.is_full(plugin_id)): time.sleep(0.01)
+
+class LifecycleExecutorTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the (shared) lifecycle executor running
+    the lifecycle calls of the main plugins.
+    """
+
+    def test_long_running(self):
+        """
+        Tests the loading of more long running main plugins (calls
+        that keep running after the release of the ready semaphore)
+        than workers of the lifecycle executor, verifying that all
+        of them are loaded (the calls are detached upon release).
+        """
+
+        # retrieves the current number of lifecycle workers so that
+        # it may be restored at the end of the test
+        configuration = colony.base.configuration.plugin_manager_configuration
+        lifecycle_workers = configuration.get("lifecycle_workers", 4)
+
+        # creates the (main) long running plugin classes, more
+        # than the number of workers of the lifecycle executor
+        stop_event = threading.Event()
+        plugin_classes = [_create_plugin_class(
+            "pt.test.serving%d" % index,
+            ServingPlugin,
+            capabilities = [colony.base.system.MAIN_TYPE],
+            stop_event = stop_event,
+            valid = True
+        ) for index in range(4)]
+
+        configuration["lifecycle_workers"] = 2
+        plugin_manager = _create_manager(threads = True)
+        try:
+            # boots the plugin manager and verifies that all the
+            # plugins are loaded and still running (serving)
+            self.assertEqual(plugin_manager.load_system(), 0)
+            for plugin_class in plugin_classes:
+                plugin = plugin_manager._get_plugin_by_id(plugin_class.id)
+                self.assertEqual(plugin.is_loaded(), True)
+                self.assertEqual(plugin.serving, True)
+        finally:
+            # stops the long running calls and unloads the system
+            # restoring the number of lifecycle workers
+            stop_event.set()
+            plugin_manager.unload_system(False)
+            shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+            configuration["lifecycle_workers"] = lifecycle_workers
+            for plugin_class in plugin_classes: plugin_class.valid = False
+
+class UnloadTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the (concurrent) unloading of the
+    system in the plugin manager.
+    """
+
+    def test_unload_system(self):
+        """
+        Tests the concurrent unloading of the system, verifying that
+        the plugins are unloaded in reverse dependency order, that the
+        plugin exceeding the deadline is abandoned (keeping the plugin
+        it requires) and that the report of the unloading contains
+        all the plugins.
+        """
+
+        # retrieves the current unloading configuration so that
+        # it may be restored at the end of the test
+        configuration = colony.base.configuration.plugin_manager_configuration
+        unload_workers = configuration.get("unload_workers", 0)
+        unload_timeout = configuration.get("unload_timeout", 60.0)
+
+        # creates the (startup) plugin classes, a chain of dependencies
+        # (base, middle and top), an unrelated plugin, a shared plugin
+        # allowed in two (concurrently unloaded) hosts and a slow plugin
+        # that exceeds the deadline of the unloading and the plugin it
+        # requires (to be kept loaded)
+        unloaded = []
+        startup = [colony.base.system.STARTUP_TYPE]
+        base_class = _create_plugin_class(
+            "pt.test.unload.base", UnloadPlugin,
+            capabilities = startup, unloaded = unloaded, valid = True
+        )
+        middle_class = _create_plugin_class(
+            "pt.test.unload.middle", UnloadPlugin,
+            capabilities = startup, unloaded = unloaded, valid = True,
+            dependencies = [colony.base.system.PluginDependency(base_class.id, "1.0.0")]
+        )
+        top_class = _create_plugin_class(
+            "pt.test.unload.top", UnloadPlugin,
+            capabilities = startup, unloaded = unloaded, valid = True,
+            dependencies = [colony.base.system.PluginDependency(middle_class.id, "1.0.0")]
+        )
+        other_class = _create_plugin_class(
+            "pt.test.unload.other", UnloadPlugin,
+            capabilities = startup, unloaded = unloaded, valid = True
+        )
+        shared_class = _create_plugin_class(
+            "pt.test.unload.shared", UnloadPlugin,
+            capabilities = startup + ["test_unload"], unloaded = unloaded, valid = True
+        )
+        host_classes = [_create_plugin_class(
+            "pt.test.unload.host%d" % index, UnloadPlugin,
+            capabilities = startup, capabilities_allowed = ["test_unload"], unloaded = unloaded, valid = True
+        ) for index in range(2)]
+        required_class = _create_plugin_class(
+            "pt.test.unload.required", UnloadPlugin,
+            capabilities = startup, unloaded = unloaded, valid = True
+        )
+        slow_class = _create_plugin_class(
+            "pt.test.unload.slow", UnloadPlugin,
+            capabilities = startup, unloaded = unloaded, valid = True, delay = 1.5,
+            dependencies = [colony.base.system.PluginDependency(required_class.id, "1.0.0")]
+        )
+        plugin_classes = [base_class, middle_class, top_class, other_class, shared_class] +\
+            host_classes + [required_class, slow_class]
+
+        configuration["unload_workers"] = 4
+        configuration["unload_timeout"] = 0.5
+        plugin_manager = _create_manager(threads = True)
+        try:
+            # boots and unloads the plugin manager (concurrently)
+            self.assertEqual(plugin_manager.load_system(), 0)
+            plugins = [plugin_manager._get_plugin_by_id(plugin_class.id) for plugin_class in plugin_classes]
+            self.assertEqual(len(plugin_manager.get_plugin_allowed_plugins_map(shared_class.id)), 2)
+            plugin_manager.unload_system(False)
+
+            # verifies that the plugins (except the abandoned one and the
+            # one it requires) are unloaded, that the dependencies are
+            # unloaded after the plugins that depend on them and that the
+            # shared plugin is removed from the allowed maps of both hosts
+            self.assertEqual([plugin.is_loaded() for plugin in plugins[:7]], [False] * 7)
+            self.assertTrue(unloaded.index(top_class.id) < unloaded.index(middle_class.id))
+            self.assertTrue(unloaded.index(middle_class.id) < unloaded.index(base_class.id))
+            self.assertEqual(plugin_manager.get_plugin_allowed_plugins_map(shared_class.id), [])
+            self.assertEqual(plugin_manager.unload_abandoned, set([slow_class.id]))
+            self.assertEqual(plugins[7].is_loaded(), True)
+            self.assertFalse(required_class.id in unloaded)
+
+            # verifies the report of the unloading, the abandoned plugin
+            # is the slowest one (first) and is reported as timeout and
+            # the plugin it requires is reported as kept
+            unload_report = plugin_manager.get_unload_report()
+            self.assertEqual(unload_report[0][0], slow_class.id)
+            self.assertEqual(unload_report[0][2], "timeout")
+            self.assertTrue(unload_report[0][1] >= 0.5)
+            self.assertEqual(
+                sorted([(plugin_id, state) for plugin_id, _duration, state in unload_report[1:]]),
+                sorted([(plugin_class.id, "unloaded") for plugin_class in plugin_classes[:7]] +\
+                    [(required_class.id, "kept")])
+            )
+        finally:
+            # restores the unloading configuration and invalidates
+            # the plugin classes so that they're not discovered
+            configuration["unload_workers"] = unload_workers
+            configuration["unload_timeout"] = unload_timeout
+            shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+            for plugin_class in plugin_classes: plugin_class.valid = False
+
+class ReloadTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the reloading of the (changed) plugins
+    in the plugin manager.
+    """
+
+    def test_reload_plugins(self):
+        """
+        Tests the reload plugins method of the plugin manager, changing
+        the main module of a plugin and verifying that the plugin is
+        replaced, that the plugins that depend on it are re-loaded and
+        that the unrelated plugins are kept running.
+        """
+
+        # creates the (temporary) plugin path with the plugin modules,
+        # the base plugin (with a main module), the dependent plugin
+        # and an unrelated plugin
+        plugins_path = tempfile.mkdtemp()
+        main_path = os.path.join(plugins_path, "reload_base", "system.py")
+        os.makedirs(os.path.dirname(main_path))
+        self._write_file(os.path.join(plugins_path, "reload_base", "__init__.py"), "")
+        self._write_file(main_path, "VALUE = 1\n")
+        self._write_file(os.path.join(plugins_path, "reload_base_plugin.py"), RELOAD_PLUGIN_MODULE % {
+            "class_name" : "ReloadBasePlugin", "id" : "pt.test.reload.base",
+            "dependencies" : "", "main_modules" : "\"reload_base.system\""
+        })
+        self._write_file(os.path.join(plugins_path, "reload_dependent_plugin.py"), RELOAD_PLUGIN_MODULE % {
+            "class_name" : "ReloadDependentPlugin", "id" : "pt.test.reload.dependent",
+            "dependencies" : "colony.base.system.PluginDependency(\"pt.test.reload.base\", \"1.0.0\")",
+            "main_modules" : ""
+        })
+        self._write_file(os.path.join(plugins_path, "reload_other_plugin.py"), RELOAD_PLUGIN_MODULE % {
+            "class_name" : "ReloadOtherPlugin", "id" : "pt.test.reload.other",
+            "dependencies" : "", "main_modules" : ""
+        })
+
+        plugin_manager = _create_manager(plugin_paths = [plugins_path])
+        try:
+            # boots the plugin manager and retrieves the plugins
+            # verifying that the main module value is loaded
+            self.assertEqual(plugin_manager.load_system(), 0)
+            base = plugin_manager._get_plugin_by_id("pt.test.reload.base")
+            dependent = plugin_manager._get_plugin_by_id("pt.test.reload.dependent")
+            other = plugin_manager._get_plugin_by_id("pt.test.reload.other")
+            self.assertEqual(base.value, 1)
+
+            # verifies that the main module is watched for the base
+            # plugin and that the closure contains the dependent plugin
+            self.assertEqual(plugin_manager.get_reload_files_map()[main_path], set([base.id]))
+            self.assertEqual(plugin_manager.get_reload_closure([base]), [base, dependent])
+
+            # changes the main module of the base plugin (with a newer
+            # modification time) and reloads the base plugin
+            self._write_file(main_path, "VALUE = 2\n")
+            os.utime(main_path, (time.time() + 10.0, time.time() + 10.0))
+            plugin_manager.reload_plugins([base.id])
+
+            # verifies that the base plugin is replaced by a new instance
+            # (with the changed value), that the dependent plugin is
+            # re-loaded (with the new base plugin injected) and that the
+            # unrelated plugin is kept running (same instance)
+            new_base = plugin_manager._get_plugin_by_id("pt.test.reload.base")
+            self.assertNotEqual(new_base, base)
+            self.assertEqual(new_base.is_loaded(), True)
+            self.assertEqual(new_base.value, 2)
+            self.assertEqual(plugin_manager._get_plugin_by_id("pt.test.reload.dependent"), dependent)
+            self.assertEqual(dependent.is_loaded(), True)
+            self.assertEqual(dependent.loads, 2)
+            self.assertEqual(dependent.dependencies_loaded, [new_base])
+            self.assertEqual(plugin_manager._get_plugin_by_id("pt.test.reload.other"), other)
+            self.assertEqual(other.is_loaded(), True)
+            self.assertEqual(other.loads, 1)
+            plugin_manager.unload_system(False)
+        finally:
+            # invalidates the plugin classes (including the stale ones)
+            # so that they're not discovered and removes the plugin
+            # modules and path from the interpreter
+            plugin_classes = colony.base.system.Plugin.__subclasses__()
+            while plugin_classes:
+                plugin_class = plugin_classes.pop()
+                plugin_classes.extend(plugin_class.__subclasses__())
+                if plugin_class.id.startswith("pt.test.reload"): plugin_class.valid = False
+            for module_name in sys.modules.keys():
+                if module_name.startswith("reload_"): del sys.modules[module_name]
+            plugins_path in sys.path and sys.path.remove(plugins_path)
+            shutil.rmtree(plugins_path, ignore_errors = True)
+            shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+
+    def _write_file(self, file_path, contents):
+        file = open(file_path, "wb")
+        try: file.write(contents)
+        finally: file.close()
+
+class MemoryTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the accounting of the memory of
+    the plugins in the plugin manager.
+    """
+
+    def test_top_growers(self):
+        """
+        Tests the memory snapshots of the plugin manager, growing a
+        module level list (builtin containers) of a plugin module and
+        verifying that the growth is attributed to the plugin.
+        """
+
+        # creates the (plugin) modules holding the module level lists
+        # and registers them in the interpreter so that the plugin
+        # classes (defined in them) are attributed to the modules
+        modules = [types.ModuleType("memory_plugin%d" % index) for index in range(2)]
+        plugin_classes = []
+        for index, module in enumerate(modules):
+            module.__file__ = __file__
+            module.values = []
+            sys.modules[module.__name__] = module
+            plugin_classes.append(_create_plugin_class(
+                "pt.test.memory.plugin%d" % index, __module__ = module.__name__
+            ))
+
+        plugin_manager = _create_manager()
+        try:
+            # boots the plugin manager, takes the first (baseline)
+            # snapshot and grows the list of the first module
+            self.assertEqual(plugin_manager.load_system(), 0)
+            plugin_manager.take_memory_snapshot()
+            modules[0].values.extend([dict(index = index) for index in range(20000)])
+            diffs = plugin_manager.take_memory_snapshot()
+
+            # verifies that the growth of the dictionaries is attributed
+            # to the first plugin (top grower) and not to the other one
+            self.assertEqual(diffs[plugin_classes[0].id]["types"]["dict"][0], 20000)
+            self.assertEqual(diffs.get(plugin_classes[1].id, {}).get("count", 0), 0)
+            top_growers = plugin_manager.get_memory_top_growers()
+            plugin_id, size, count, top_types = top_growers[0]
+            self.assertEqual(plugin_id, plugin_classes[0].id)
+            self.assertTrue(size > 20000 * sys.getsizeof({}))
+            self.assertTrue(count >= 20000)
+            self.assertEqual(top_types[0][0], "dict")
+            plugin_manager.unload_system(False)
+        finally:
+            # invalidates the plugin classes so that they're not
+            # discovered and removes the modules from the interpreter
+            for plugin_class in plugin_classes: plugin_class.valid = False
+            for module in modules: del sys.modules[module.__name__]
+            shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+
+class LoggerTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the logging (level gating) of
+    the plugin manager.
+    """
+
+    def test_level(self):
+        """
+        Tests the gating of the logging messages by the configured
+        level, verifying that the messages below it are neither
+        formatted nor delivered to the (in memory) handler.
+        """
+
+        # creates the argument that counts its formatting so that
+        # the (deferred) formatting of the messages is verified
+        formats = []
+        class Argument(object):
+            def __str__(self):
+                formats.append(self)
+                return "argument"
+        argument = Argument()
+
+        plugin_manager = _create_manager()
+        try:
+            # verifies that the logger is gated at the configured level
+            # (no handler lowers it) and that the messages below it are
+            # neither formatted nor handled (in memory)
+            memory_handler = plugin_manager.logger_handlers["memory"]
+            self.assertEqual(plugin_manager.logger.level, logging.ERROR)
+            self.assertEqual(memory_handler.level, logging.ERROR)
+            self.assertFalse(plugin_manager.logger.isEnabledFor(logging.INFO))
+            plugin_manager.info("info %s", argument)
+            plugin_manager.warning("warning %s", argument)
+            self.assertEqual(len(formats), 0)
+            self.assertEqual(len(memory_handler.get_latest(level = "INFO")), 0)
+
+            # logs an error message (at the configured level) and
+            # verifies that it's formatted and handled (in memory)
+            plugin_manager.error("error %s", argument)
+            self.assertEqual(len(formats), 1)
+            self.assertEqual(len(memory_handler.get_latest(level = "ERROR")), 1)
+        finally:
+            shutil.rmtree(plugin_manager.manager_path, ignore_errors = True)
+
+class LazyPlugin(colony.base.system.Plugin):
+    """
+    The lazy (test) plugin class.
+    """
+
+    valid = False
+    id = "pt.test.lazy"
+    name = "Lazy"
+    version = "1.0.0"
+    loading_type = colony.base.system.LAZY_LOADING_TYPE
+    capabilities = ["lazy", "lazy.test"]
+    dependencies = [colony.base.system.PluginDependency("pt.test.eager", "1.0.0")]
+
+class OverridePlugin(LazyPlugin):
+    """
+    The lazy (test) plugin class overriding
+    the unload (lifecycle) methods.
+    """
+
+    unloads = 0
+    """ The number of unloads of the plugin """
+
+    def unload_plugin(self):
+        self.unloads += 1
+
+    def end_unload_plugin(self):
+        pass
+
+class EagerPlugin(colony.base.system.Plugin):
+    """
+    The eager (test) plugin class.
+    """
+
+    valid = False
+    id = "pt.test.eager"
+    name = "Eager"
+    version = "1.0.0"
+
+class HangPlugin(colony.base.system.Plugin):
+    """
+    The hang (test) plugin class, the load of the
+    plugin hangs until the hang event is set.
+    """
+
+    valid = False
+    id = "pt.test.hang"
+    name = "Hang"
+    version = "1.0.0"
+    attributes = {"lifecycle_timeout" : 0.1}
+
+    hang_event = None
+    """ The event that unblocks the load of the plugin """
+
+    def __init__(self, manager = None):
+        colony.base.system.Plugin.__init__(self, manager)
+        self.hang_event = threading.Event()
+
+    def load_plugin(self):
+        self.hang_event.wait(5.0)
+        self.release_ready_semaphore()
+
+class ServingPlugin(colony.base.system.Plugin):
+    """
+    The serving (test) plugin class, the end load of the plugin
+    releases the ready semaphore and keeps running (serving)
+    until the stop event is set.
+    """
+
+    valid = False
+    id = "pt.test.serving"
+    name = "Serving"
+    version = "1.0.0"
+
+    stop_event = None
+    """ The event that stops the serving of the plugin """
+
+    serving = False
+    """ Flag indicating if the plugin is serving """
+
+    def load_plugin(self):
+        colony.base.system.Plugin.load_plugin(self)
+        self.release_ready_semaphore()
+
+    def end_load_plugin(self):
+        colony.base.system.Plugin.end_load_plugin(self)
+        self.serving = True
+        self.release_ready_semaphore()
+        self.stop_event.wait(5.0)
+        self.serving = False
+
+    def unload_plugin(self):
+        colony.base.system.Plugin.unload_plugin(self)
+        self.release_ready_semaphore()
+
+    def end_unload_plugin(self):
+        colony.base.system.Plugin.end_unload_plugin(self)
+        self.release_ready_semaphore()
+
+class UnloadPlugin(colony.base.system.Plugin):
+    """
+    The unload (test) plugin class, the unloading of the plugin
+    is delayed (optionally) and recorded in the unloaded list.
+    """
+
+    valid = False
+    id = "pt.test.unload"
+    name = "Unload"
+    version = "1.0.0"
+
+    delay = 0.0
+    """ The delay (in seconds) of the unloading """
+
+    unloaded = []
+    """ The list of the ids of the unloaded plugins """
+
+    def unload_plugin(self):
+        time.sleep(self.delay)
+        colony.base.system.Plugin.unload_plugin(self)
+        self.unloaded.append(self.id)
+
+class WatchdogManager:
+    """
+    Class that describes a (fake) plugin manager with a
+    lifecycle watchdog, gathering the error messages.
+    """
+
+    metrics = None
+    """ The registry of the metrics (not enabled) """
+
+    lock_monitor = None
+    """ The monitor of the locks (not enabled) """
+
+    stop_on_cycle_error = False
+    """ If the cycle errors stop the lifecycle calls """
+
+    lifecycle_watchdog = None
+    """ The watchdog of the lifecycle calls """
+
+    errors = []
+    """ The list of the error messages """
+
+    def __init__(self):
+        self.lifecycle_watchdog = colony.base.system.LifecycleWatchdog(self)
+        self.errors = []
+
+    def instrument_lock(self, lock, name, owned = True):
+        return lock
+
+    def error(self, message, *arguments):
+        self.errors.append(message)
+
+class ProxyManager:
+    """
+    Class that describes a (fake) plugin manager that
+    materializes the plugin proxies (class conversion).
+    """
+
+    metrics = None
+    """ The registry of the metrics (not enabled) """
+
+    lock_monitor = None
+    """ The monitor of the locks (not enabled) """
+
+    materialized = True
+    """ If the materialization of the plugins succeeds """
+
+    materializations = 0
+    """ The number of materializations of plugins """
+
+    def __init__(self):
+        self.materialized = True
+        self.materializations = 0
+
+    def materialize_plugin(self, plugin):
+        if not self.materialized: return False
+        self.materializations += 1
+        plugin.__class__ = OverridePlugin
+        return True
+
+class CountingLock:
+    """
+    Class that describes a (test) lock that counts
+    the number of acquisitions.
+    """
+
+    lock = None
+    """ The underlying (reentrant) lock """
+
+    acquisitions = 0
+    """ The number of acquisitions of the lock """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.acquisitions = 0
+
+    def acquire(self):
+        self.acquisitions += 1
+        self.lock.acquire()
+
+    def release(self):
+        self.lock.release()
+
+def _parse(contents):
+    return contents.split(",")
+
+def _create_plugin_class(plugin_id, base_class = colony.base.system.Plugin, **values):
+    # creates the (test) plugin class for the given identifier (from
+    # the given base class) updating the default values with the given ones
+    _values = {
+        "id" : plugin_id,
+        "name" : plugin_id,
+        "version" : "1.0.0",
+        "platforms" : [colony.base.system.CPYTHON_ENVIRONMENT]
+    }
+    _values.update(values)
+    return type("TestPlugin", (base_class,), _values)
+
+def _create_manager(threads = False, plugin_paths = []):
+    # creates the temporary path to be used as the manager path
+    # and the logger path, and the plugin manager (without the
+    # main loop and signals) with the logger started
+    manager_path = tempfile.mkdtemp()
+    logger_path = os.path.join(manager_path, "log")
+    os.makedirs(logger_path)
+    plugin_manager = colony.base.system.PluginManager(
+        manager_path = manager_path,
+        logger_path = logger_path,
+        plugin_paths = plugin_paths,
+        loop = False,
+        threads = threads,
+        signals = False
+    )
+    plugin_manager.start_logger(logging.ERROR)
+    return plugin_manager
@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import sys
+import time
+
+import colony.base.system
+import colony.base.decorators
+
+DEFAULT_ITERATIONS = 1000000
+""" The default number of calls measured for each method """
+
+class BenchmarkManager:
+    """
+    Class that describes a (fake) plugin manager for the
+    benchmark, with the metrics not enabled.
+    """
+
+    metrics = None
+    """ The registry of the metrics (not enabled) """
+
+    lock_monitor = None
+    """ The monitor of the locks (not enabled) """
+
+    def load_plugin(self, plugin_id, type = None):
+        return True
+
+class BenchmarkPlugin(colony.base.system.Plugin):
+    """
+    Class that describes a (lazy) plugin with a raw method
+    and a front-end method intercepted for the loading.
+    """
+
+    valid = False
+    id = "pt.benchmark.call"
+
+    def raw_call(self, value):
+        return value
+
+    @colony.base.decorators.plugin_call(True)
+    def call(self, value):
+        return value
+
+def measure(method, iterations):
+    """
+    Measures the time per call (in nanoseconds) of the given
+    method, called the given number of times.
+
+    @type method: Method
+    @param method: The method to be measured.
+    @type iterations: int
+    @param iterations: The number of calls to be measured.
+    @rtype: float
+    @return: The time per call in nanoseconds.
+    """
+
+    _range = xrange(iterations)
+    start_time = time.time()
+    for index in _range: method(index)
+    return (time.time() - start_time) * 1e9 / iterations
+
+def run(iterations = DEFAULT_ITERATIONS):
+    """
+    Runs the benchmark of the calls of a (loaded) plugin, for
+    the raw method and for the front-end method both with the
+    interceptor for the loading and with the loaded method bound.
+
+    @type iterations: int
+    @param iterations: The number of calls measured for each method.
+    @rtype: Dictionary
+    @return: The map containing the time per call (in nanoseconds)
+    of each case and the overhead of the interception.
+    """
+
+    # creates the (loaded) plugin and measures the raw
+    # method and the front-end method (intercepted)
+    plugin = BenchmarkPlugin(BenchmarkManager())
+    plugin.loaded = True
+    raw = measure(plugin.raw_call, iterations)
+    intercepted = measure(plugin.call, iterations)
+
+    # binds the loaded methods (as done at the end of the
+    # loading) and measures the front-end method again
+    plugin.bind_loaded_methods()
+    bound = measure(plugin.call, iterations)
+
+    # returns the map of results with the overhead (over the
+    # raw method) before and after the binding
+    return {
+        "iterations" : iterations,
+        "raw" : raw,
+        "intercepted" : intercepted,
+        "bound" : bound,
+        "overhead_intercepted" : intercepted - raw,
+        "overhead_bound" : bound - raw
+    }
+
+def main():
+    iterations = len(sys.argv) > 1 and int(sys.argv[1]) or DEFAULT_ITERATIONS
+    results = run(iterations)
+    print "calls: %d" % results["iterations"]
+    print "raw: %.1f ns/call" % results["raw"]
+    print "intercepted: %.1f ns/call (overhead %.1f ns)" % (results["intercepted"], results["overhead_intercepted"])
+    print "bound: %.1f ns/call (overhead %.1f ns)" % (results["bound"], results["overhead_bound"])
+
+if __name__ == "__main__":
+    main()
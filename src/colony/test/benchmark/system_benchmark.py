@@ -0,0 +1,404 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import os
+import sys
+import json
+import time
+import random
+import getopt
+import shutil
+import logging
+import tempfile
+import subprocess
+
+import colony.base.system
+
+DEFAULT_PARAMETERS = {
+    "plugins" : 200,
+    "fan_out" : 3,
+    "depth" : 3,
+    "lazy_ratio" : 0.5,
+    "scopes" : 4,
+    "repeat" : 100,
+    "seed" : 0,
+    "log_level" : "ERROR"
+}
+""" The default parameters of the benchmark (number of plugins,
+dependency fan-out, capability hierarchy depth, ratio of lazy
+plugins, number of diffusion scope plugins, number of repetitions
+of the retrieval operations, seed of the random generator and
+level of the logger of the plugin manager) """
+
+CAPABILITY_BRANCHING = 4
+""" The branching factor of the capability hierarchy, the
+number of sub capabilities for each capability """
+
+BASE_CAPABILITY = "benchmark"
+""" The base (root) capability of the generated plugins """
+
+SCOPE_CAPABILITY = "benchmark_scope"
+""" The capability of the diffusion scope plugins, allowed
+by the (last) host plugin with a new diffusion scope (a
+new replica is injected for each of them) """
+
+EVENT_NAME = "plugin_manager.benchmark.event"
+""" The name of the (plugin manager) event handled by the
+generated plugins, used to measure the event fan-out """
+
+run_count = 0
+""" The number of benchmark runs in the current process,
+used to create unique identifiers for the plugins """
+
+def get_capability(index, depth):
+    """
+    Retrieves the (hierarchical) capability for the plugin with
+    the given index, the plugins share the capability prefixes
+    according to the branching of the hierarchy.
+
+    @type index: int
+    @param index: The index of the plugin.
+    @type depth: int
+    @param depth: The depth of the capability hierarchy.
+    @rtype: String
+    @return: The capability for the plugin.
+    """
+
+    parts = [BASE_CAPABILITY]
+    for level in range(depth):
+        parts.append("n%d" % ((index // CAPABILITY_BRANCHING ** level) % CAPABILITY_BRANCHING))
+    return ".".join(parts)
+
+def create_plugin_classes(parameters):
+    """
+    Creates the synthetic plugin classes for the given parameters,
+    each plugin depends on a random set of the previous plugins
+    (fan-out), provides a capability of the hierarchy, handles
+    the benchmark event and is either lazy or eager (startup).
+    The last (host) plugin allows the scope capability with a new
+    diffusion scope, provided by the first plugins, both the host
+    and the scope plugins are always eager so that the diffusion
+    scopes are exercised in the boot.
+
+    @type parameters: Dictionary
+    @param parameters: The parameters of the benchmark.
+    @rtype: List
+    @return: The list of created plugin classes.
+    """
+
+    global run_count
+
+    # increments the number of runs (unique identifiers) and
+    # creates the random generator with the defined seed
+    run_count += 1
+    _random = random.Random(parameters["seed"])
+
+    # unpacks the parameters to be used in the creation
+    count = parameters["plugins"]
+    fan_out = parameters["fan_out"]
+    depth = parameters["depth"]
+    lazy_ratio = parameters["lazy_ratio"]
+    scopes = min(parameters["scopes"], count - 1)
+
+    plugin_classes = []
+
+    for index in range(count):
+        # creates the identifier of the plugin and selects the
+        # (previous) plugins that are dependencies of the plugin
+        plugin_id = "pt.benchmark.r%d.p%d" % (run_count, index)
+        dependency_indexes = _random.sample(xrange(index), min(fan_out, index))
+        dependencies = [colony.base.system.PluginDependency(
+            plugin_classes[dependency_index].id, "1.0.0"
+        ) for dependency_index in dependency_indexes]
+
+        # creates the capabilities of the plugin, the eager plugins are
+        # loaded at startup (the host and scope plugins are always eager)
+        # and the first plugins are the ones injected in the host plugin
+        host = scopes and index == count - 1
+        lazy = _random.random() < lazy_ratio and not host and not index < scopes
+        capabilities = [get_capability(index, depth)]
+        if not lazy: capabilities.append(colony.base.system.STARTUP_TYPE)
+        if index < scopes: capabilities.append(SCOPE_CAPABILITY)
+
+        # the host plugin allows the scope capability with a
+        # new diffusion scope (replicas of the first plugins)
+        capabilities_allowed = host and\
+            [(SCOPE_CAPABILITY, colony.base.system.NEW_DIFFUSION_SCOPE)] or []
+
+        # creates the plugin class with the generated values
+        plugin_class = type("BenchmarkPlugin%d" % index, (colony.base.system.Plugin,), {
+            "id" : plugin_id,
+            "name" : "Benchmark %d" % index,
+            "version" : "1.0.0",
+            "platforms" : [colony.base.system.CPYTHON_ENVIRONMENT],
+            "capabilities" : capabilities,
+            "capabilities_allowed" : capabilities_allowed,
+            "dependencies" : dependencies,
+            "events_handled" : [EVENT_NAME],
+            "loading_type" : lazy and colony.base.system.LAZY_LOADING_TYPE or colony.base.system.EAGER_LOADING_TYPE
+        })
+        plugin_classes.append(plugin_class)
+
+    # returns the created plugin classes
+    return plugin_classes
+
+def measure(method, *arguments):
+    """
+    Measures the time (in seconds) taken by the call of
+    the given method with the given arguments.
+
+    @type method: Method
+    @param method: The method to be measured.
+    @rtype: Tuple
+    @return: The time taken by the call and its return value.
+    """
+
+    start_time = time.time()
+    return_value = method(*arguments)
+    return time.time() - start_time, return_value
+
+def run(parameters = None):
+    """
+    Runs the benchmark of the plugin manager core for the given
+    parameters (updating the default ones), booting a plugin
+    manager (without loop and threads) over synthetic plugins.
+
+    @type parameters: Dictionary
+    @param parameters: The parameters of the benchmark.
+    @rtype: Dictionary
+    @return: The map containing the parameters, the environment
+    and the results (timings in seconds) of the benchmark.
+    """
+
+    # creates the complete parameters (from the default
+    # ones) and the synthetic plugin classes
+    _parameters = dict(DEFAULT_PARAMETERS)
+    _parameters.update(parameters or {})
+    parameters = _parameters
+    repeat = parameters["repeat"]
+    plugin_classes = create_plugin_classes(parameters)
+    plugin_ids = [plugin_class.id for plugin_class in plugin_classes]
+
+    # creates the temporary path to be used as the manager
+    # path (logging and variable files) and the logger path
+    manager_path = tempfile.mkdtemp()
+    logger_path = os.path.join(manager_path, "log")
+    os.makedirs(logger_path)
+
+    try:
+        # creates the plugin manager without the main loop, threads
+        # and signals (no plugin paths, the synthetic plugins are
+        # discovered as sub classes of the plugin class)
+        plugin_manager = colony.base.system.PluginManager(
+            manager_path = manager_path,
+            logger_path = logger_path,
+            plugin_paths = [],
+            loop = False,
+            threads = False,
+            signals = False
+        )
+        plugin_manager.start_logger(getattr(logging, parameters["log_level"]))
+
+        results = {}
+
+        # measures the loading of the system, counting the loaded
+        # plugins and the replicas (diffusion scopes) separately
+        results["load_system"], _return_code = measure(plugin_manager.load_system)
+        loaded_plugins = [plugin for plugin in plugin_manager.plugin_instances if plugin.is_loaded()]
+        results["loaded_plugins"] = len([plugin for plugin in loaded_plugins if not plugin.is_replica()])
+        results["replicas"] = len([plugin for plugin in loaded_plugins if plugin.is_replica()])
+
+        # measures the (first) retrieval of the plugins, loading
+        # the lazy ones and the repeated (warm) retrievals
+        results["get_plugin_cold"], _value = measure(lambda: [plugin_manager.get_plugin(plugin_id) for plugin_id in plugin_ids])
+        results["get_plugin"], _value = measure(lambda: [plugin_manager.get_plugin(plugin_id) for _index in xrange(repeat) for plugin_id in plugin_ids])
+        results["get_plugin"] /= repeat
+
+        # measures the retrieval of the plugins by capability
+        # for the capabilities of the various levels of the
+        # hierarchy (from the base capability)
+        capabilities = sorted(set(get_capability(index, level) for index in range(len(plugin_ids)) for level in range(parameters["depth"] + 1)))
+        results["capabilities"] = len(capabilities)
+        results["get_plugins_by_capability"], _value = measure(lambda: [plugin_manager.get_plugins_by_capability(capability) for _index in xrange(repeat) for capability in capabilities])
+        results["get_plugins_by_capability"] /= repeat
+
+        # measures the fan-out of the benchmark event (handled
+        # by all the loaded plugins)
+        results["event_handlers"] = len(plugin_manager.event_plugins_fired_loaded_map.get(EVENT_NAME, []))
+        results["generate_event"], _value = measure(lambda: [plugin_manager.generate_event(EVENT_NAME, []) for _index in xrange(repeat)])
+        results["generate_event"] /= repeat
+
+        # measures the unloading of the system (no thread
+        # safety as there's no main loop running)
+        results["unload_system"], _value = measure(plugin_manager.unload_system, False)
+    finally:
+        # invalidates the synthetic plugin classes so that they're
+        # not discovered by other plugin managers and removes
+        # the temporary manager path
+        for plugin_class in plugin_classes: plugin_class.valid = False
+        shutil.rmtree(manager_path, ignore_errors = True)
+
+    # returns the map of the benchmark run
+    return {
+        "benchmark" : "system",
+        "timestamp" : time.time(),
+        "parameters" : parameters,
+        "environment" : get_environment(),
+        "results" : results
+    }
+
+def get_environment():
+    """
+    Retrieves the map describing the environment of the benchmark
+    (python version, platform and revision of the source code),
+    so that the results may be compared across commits.
+
+    @rtype: Dictionary
+    @return: The map describing the environment.
+    """
+
+    # tries to retrieve the revision of the source
+    # code from the git repository (if available)
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    try:
+        process = subprocess.Popen(
+            ["git", "rev-parse", "HEAD"],
+            cwd = base_path,
+            stdout = subprocess.PIPE,
+            stderr = subprocess.PIPE
+        )
+        output, _error = process.communicate()
+        revision = process.returncode == 0 and output.strip() or None
+    except BaseException:
+        revision = None
+
+    # returns the environment map
+    return {
+        "python" : sys.version.split()[0],
+        "platform" : sys.platform,
+        "revision" : revision
+    }
+
+def dump(benchmark, file_path):
+    """
+    Dumps the given benchmark run into the file in the given
+    path, the file contains the list of the runs (history) and
+    the run is appended to it.
+
+    @type benchmark: Dictionary
+    @param benchmark: The map of the benchmark run.
+    @type file_path: String
+    @param file_path: The path to the file of the runs.
+    """
+
+    # loads the runs from the file in case it exists
+    # (the file must contain a list of runs)
+    runs = []
+    if os.path.exists(file_path):
+        file = open(file_path, "rb")
+        try: runs = json.load(file)
+        finally: file.close()
+
+    # appends the run and writes the runs
+    # back into the file
+    runs.append(benchmark)
+    file = open(file_path, "wb")
+    try: json.dump(runs, file, indent = 4, separators = (",", " : "), sort_keys = True)
+    finally: file.close()
+
+def usage():
+    print "Usage: python -m colony.test.benchmark.system_benchmark [options]"
+    print "  -n, --plugins=COUNT       number of synthetic plugins"
+    print "  -f, --fan_out=COUNT       number of dependencies per plugin"
+    print "  -d, --depth=DEPTH         depth of the capability hierarchy"
+    print "  -l, --lazy_ratio=RATIO    ratio of lazy plugins"
+    print "  -s, --scopes=COUNT        number of diffusion scope plugins"
+    print "  -r, --repeat=COUNT        repetitions of the retrieval operations"
+    print "  -e, --seed=SEED           seed of the random generator"
+    print "  -g, --log_level=LEVEL     level of the plugin manager logger"
+    print "  -o, --output=PATH         json file to append the results"
+
+def main():
+    try:
+        options, _args = getopt.getopt(
+            sys.argv[1:],
+            "hn:f:d:l:s:r:e:g:o:",
+            [
+                "help",
+                "plugins=",
+                "fan_out=",
+                "depth=",
+                "lazy_ratio=",
+                "scopes=",
+                "repeat=",
+                "seed=",
+                "log_level=",
+                "output="
+            ]
+        )
+    except getopt.GetoptError, error:
+        print str(error)
+        usage()
+        sys.exit(2)
+
+    # starts the parameters and the
+    # path to the output file
+    parameters = {}
+    output_path = None
+
+    for option, value in options:
+        if option in ("-h", "--help"): usage(); sys.exit(0)
+        elif option in ("-n", "--plugins"): parameters["plugins"] = int(value)
+        elif option in ("-f", "--fan_out"): parameters["fan_out"] = int(value)
+        elif option in ("-d", "--depth"): parameters["depth"] = int(value)
+        elif option in ("-l", "--lazy_ratio"): parameters["lazy_ratio"] = float(value)
+        elif option in ("-s", "--scopes"): parameters["scopes"] = int(value)
+        elif option in ("-r", "--repeat"): parameters["repeat"] = int(value)
+        elif option in ("-e", "--seed"): parameters["seed"] = int(value)
+        elif option in ("-g", "--log_level"): parameters["log_level"] = value.upper()
+        elif option in ("-o", "--output"): output_path = value
+
+    # runs the benchmark and in case an output file is defined
+    # appends the results to it, otherwise prints them
+    benchmark = run(parameters)
+    if output_path: dump(benchmark, output_path)
+    else: print json.dumps(benchmark, indent = 4, separators = (",", " : "), sort_keys = True)
+
+if __name__ == "__main__":
+    main()
@@ -37,5 +37,10 @@ __license__ = "GNU General Public License (GPL), Version 3"
 from barcode_util_test import *
 from gtin_util_test import *
 from lazy_util_test import *
+from lock_util_test import *
+from memory_util_test import *
+from metrics_util_test import *
 from number_util_test import *
+from pool_util_test import *
 from structures_util_test import *
+from timeline_util_test import *
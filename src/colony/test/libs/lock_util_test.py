@@ -0,0 +1,126 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import time
+import threading
+
+import colony.libs.lock_util
+import colony.libs.test_util
+
+class LockMonitorTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the lock monitor structure.
+    """
+
+    def test_statistics(self):
+        """
+        Tests the recording of the wait and hold times of the
+        instrumented locks (and conditions) in the monitor.
+        """
+
+        # creates the monitor and an instrumented (reentrant) lock
+        # and holds it (reentrant) while another thread waits for it
+        lock_monitor = colony.libs.lock_util.LockMonitor()
+        lock = lock_monitor.instrument(threading.RLock(), "lock")
+        lock.acquire()
+        lock.acquire()
+        thread = threading.Thread(target = lambda: lock.acquire() and lock.release())
+        thread.start()
+        time.sleep(0.05)
+        lock.release()
+        lock.release()
+        thread.join()
+
+        # verifies the acquisitions, the contention (with the call
+        # site of the waiting thread) and the times of the lock
+        statistics = lock_monitor.statistics["lock"]
+        self.assertEqual(statistics.acquisitions, 3)
+        self.assertEqual(statistics.contentions, 1)
+        self.assertTrue(statistics.wait_time > 0.0)
+        self.assertTrue(statistics.hold_time >= 0.04)
+        self.assertEqual(statistics.get_top_sites()[0][0].split(" ")[1], "(<lambda>)")
+        self.assertEqual(lock_monitor.get_hottest(), [statistics])
+        self.assertEqual(lock.holders, {})
+
+        # creates an instrumented condition and waits on it verifying
+        # that the wait for the notification is not accounted
+        condition = lock_monitor.instrument(threading.Condition(), "condition")
+        with condition: condition.wait(0.05)
+        statistics = lock_monitor.statistics["condition"]
+        self.assertEqual(statistics.contentions, 0)
+        self.assertTrue(statistics.hold_time < 0.05)
+
+    def test_get_blocked_report(self):
+        """
+        Tests the get blocked report method of the lock monitor,
+        with two threads in a deadlock (wait-for graph cycle).
+        """
+
+        # creates the monitor and two instrumented locks acquired
+        # in a different order by two threads (deadlock)
+        lock_monitor = colony.libs.lock_util.LockMonitor()
+        first = lock_monitor.instrument(threading.Lock(), "first")
+        second = lock_monitor.instrument(threading.Lock(), "second")
+        def run(locks):
+            locks[0].acquire()
+            time.sleep(0.05)
+            locks[1].acquire()
+        threads = [
+            threading.Thread(target = run, args = ((first, second),), name = "one"),
+            threading.Thread(target = run, args = ((second, first),), name = "two")
+        ]
+        for thread in threads: thread.daemon = True
+        for thread in threads: thread.start()
+        time.sleep(0.2)
+
+        # retrieves the report verifying that the waits and the
+        # deadlock are reported (only once for the same waits)
+        report = lock_monitor.get_blocked_report(0.1)
+        self.assertTrue("one waiting" in report)
+        self.assertTrue("two waiting" in report)
+        self.assertTrue("Deadlock between" in report)
+        self.assertEqual(len(lock_monitor.get_cycles(lock_monitor.get_wait_graph())), 1)
+        self.assertEqual(lock_monitor.get_blocked_report(0.1), None)
+
+        # releases the locks (unblocking the threads) and verifies
+        # that there's no longer a blocked acquisition
+        first.lock.release()
+        second.lock.release()
+        for thread in threads: thread.join()
+        self.assertEqual(lock_monitor.get_wait_graph(), [])
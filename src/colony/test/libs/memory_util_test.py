@@ -0,0 +1,112 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import types
+
+import colony.libs.test_util
+import colony.libs.memory_util
+
+class MemoryObject(object):
+    """
+    Class that describes an object (defined in this module)
+    to be accounted in the memory snapshots.
+    """
+
+    pass
+
+class MemorySnapshotTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the memory snapshot structure.
+    """
+
+    def test_compare(self):
+        """
+        Tests the compare method of the memory snapshot, with the
+        objects attributed by the reachability from the roots.
+        """
+
+        # creates the roots map with the (root) list of objects and
+        # takes a snapshot before and after the creation of a series
+        # of objects (appended to the list)
+        objects = []
+        roots = dict(test = [objects])
+        previous = colony.libs.memory_util.take_snapshot(roots)
+        objects.extend([MemoryObject() for _index in range(100)])
+        snapshot = colony.libs.memory_util.take_snapshot(roots)
+
+        # verifies that the growth of the objects is attributed
+        # to the owner (with the size of the objects)
+        diffs = snapshot.compare(previous)
+        self.assertEqual(diffs.keys(), ["test"])
+        self.assertEqual(diffs["test"]["count"], 100)
+        self.assertTrue(diffs["test"]["size"] > 0)
+        self.assertEqual(diffs["test"]["types"]["MemoryObject"][0], 100)
+
+        # releases the objects and verifies that the
+        # (negative) growth is attributed to the owner
+        del objects[:]
+        diffs = colony.libs.memory_util.take_snapshot(roots).compare(snapshot)
+        self.assertEqual(diffs["test"]["count"], -100)
+        self.assertEqual(snapshot.get_totals("other"), (0, 0))
+
+    def test_take_snapshot(self):
+        """
+        Tests the take snapshot function, with the builtin containers
+        held by a module, the objects shared between owners and the
+        objects reachable only from the boundaries.
+        """
+
+        # creates a module holding a list of dictionaries (builtin
+        # containers) and a shared object referred by both owners
+        # and by a boundary (not to be walked) object
+        module = types.ModuleType("memory_module")
+        module.values = [dict(index = index) for index in range(1000)]
+        shared = [MemoryObject()]
+        boundary = [shared, [MemoryObject() for _index in range(10)]]
+        roots = dict(module = [module, shared], other = [[shared]], boundary = [[boundary]])
+        snapshot = colony.libs.memory_util.take_snapshot(roots, (boundary,))
+
+        # verifies that the dictionaries are attributed to the module
+        # owner and that the shared object is only accounted once (by
+        # the first owner) and that the boundary is not walked
+        self.assertEqual(snapshot.owners["module"]["dict"][0], 1001)
+        self.assertEqual(snapshot.owners["module"]["MemoryObject"][0], 1)
+        self.assertEqual(snapshot.owners["other"].get("MemoryObject", [0])[0], 0)
+        self.assertEqual(snapshot.owners["boundary"].get("MemoryObject", [0])[0], 0)
+        self.assertEqual(snapshot.get_totals("boundary")[0], 1)
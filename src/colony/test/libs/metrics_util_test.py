@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import threading
+
+import colony.libs.test_util
+import colony.libs.metrics_util
+
+class MetricsRegistryTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the metrics registry structure.
+    """
+
+    def test_get_snapshot(self):
+        """
+        Tests the get snapshot method of the metrics registry.
+        """
+
+        # creates a metrics registry and records counters and
+        # histogram values from a series of threads
+        metrics_registry = colony.libs.metrics_util.MetricsRegistry()
+        def record():
+            for index in range(100):
+                metrics_registry.increment("calls_total", labels = {"plugin" : "first"})
+                metrics_registry.observe("call_seconds", (index + 1) / 1000.0, {"plugin" : "first"})
+        threads = [threading.Thread(target = record) for _index in range(4)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        metrics_registry.set_gauge("plugins", 3)
+
+        # retrieves the snapshot and verifies that the values of
+        # the various threads are merged and that the stores of
+        # the exited threads are folded into the retired store
+        snapshot = metrics_registry.get_snapshot()
+        key = ("calls_total", (("plugin", "first"),))
+        self.assertEqual(snapshot["counters"][key], 400)
+        self.assertEqual(snapshot["gauges"][("plugins", ())], 3)
+        self.assertEqual(len(metrics_registry.stores), 0)
+
+        # verifies the aggregated values of the histogram and that
+        # the estimated quantiles are within the precision bounds
+        histogram = snapshot["histograms"][("call_seconds", (("plugin", "first"),))]
+        self.assertEqual(histogram.count, 400)
+        self.assertEqual(histogram.minimum, 0.001)
+        self.assertEqual(histogram.maximum, 0.1)
+        self.assertTrue(abs(histogram.get_quantile(0.5) - 0.05) < 0.05 / 8)
+        self.assertEqual(histogram.get_quantile(1.0), 0.1)
+
+        # verifies that a new snapshot (retired store
+        # merged) contains the same values
+        snapshot = metrics_registry.get_snapshot()
+        self.assertEqual(snapshot["counters"][key], 400)
+
+    def test_retire_stores(self):
+        """
+        Tests the retirement of the stores of the exited threads
+        in a registry that is never read (no snapshot).
+        """
+
+        # records a counter from a series of (sequential) threads
+        # verifying that the stores of the exited threads are
+        # retired when the store of a new thread is added
+        metrics_registry = colony.libs.metrics_util.MetricsRegistry()
+        for _index in range(10):
+            thread = threading.Thread(target = lambda: metrics_registry.increment("calls_total"))
+            thread.start()
+            thread.join()
+            self.assertEqual(len(metrics_registry.stores), 1)
+
+        # verifies that the values of the retired
+        # stores are kept in the snapshot
+        snapshot = metrics_registry.get_snapshot()
+        self.assertEqual(snapshot["counters"][("calls_total", ())], 10)
+        self.assertEqual(len(metrics_registry.stores), 0)
+
+    def test_get_prometheus(self):
+        """
+        Tests the get prometheus method of the metrics registry.
+        """
+
+        # creates a metrics registry with a counter, a gauge
+        # and a histogram and retrieves the prometheus text
+        metrics_registry = colony.libs.metrics_util.MetricsRegistry()
+        metrics_registry.increment("calls_total", 2, {"plugin" : "a\"b"})
+        metrics_registry.set_gauge("plugins", 1.5)
+        metrics_registry.observe("call_seconds", 1.0)
+        metrics_registry.observe("call_seconds", 3.0)
+        lines = metrics_registry.get_prometheus().splitlines()
+
+        # verifies the type comments and the values (with
+        # the escaping of the labels) in the text
+        self.assertTrue("# TYPE calls_total counter" in lines)
+        self.assertTrue("calls_total{plugin=\"a\\\"b\"} 2" in lines)
+        self.assertTrue("# TYPE plugins gauge" in lines)
+        self.assertTrue("plugins 1.5" in lines)
+
+        # verifies the buckets of the histogram (cumulative counts
+        # with the upper bounds of the buckets) and the sum and count
+        self.assertTrue("# TYPE call_seconds histogram" in lines)
+        self.assertTrue("call_seconds_bucket{le=\"1.0625\"} 1" in lines)
+        self.assertTrue("call_seconds_bucket{le=\"3.125\"} 2" in lines)
+        self.assertTrue("call_seconds_bucket{le=\"+Inf\"} 2" in lines)
+        self.assertTrue("call_seconds_sum 4.0" in lines)
+        self.assertTrue("call_seconds_count 2" in lines)
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import threading
+
+import colony.libs.pool_util
+import colony.libs.test_util
+
+class ThreadPoolTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the thread pool structure.
+    """
+
+    def test_submit(self):
+        """
+        Tests the submit method of the thread pool.
+        """
+
+        # creates a thread pool and submits a simple call
+        # verifying the result of the returned future
+        thread_pool = colony.libs.pool_util.ThreadPool(2)
+        future = thread_pool.submit(sum, [1, 2, 3])
+        self.assertEqual(future.result(), 6)
+        self.assertEqual(future.done(), True)
+
+        # submits a call that raises an exception and verifies
+        # that the exception is re-raised by the future
+        future = thread_pool.submit(int, "invalid")
+        self.assert_raises(ValueError, future.result)
+
+        # stops the thread pool
+        thread_pool.stop()
+
+    def test_map(self):
+        """
+        Tests the map method of the thread pool.
+        """
+
+        # creates a thread pool and maps a call over a series
+        # of items verifying that the order is kept
+        thread_pool = colony.libs.pool_util.ThreadPool(3)
+        result = thread_pool.map(abs, [-1, -2, 3, -4])
+        self.assertEqual(result, [1, 2, 3, 4])
+
+        # stops the thread pool
+        thread_pool.stop()
+
+    def test_detach(self):
+        """
+        Tests the detach method of the thread pool.
+        """
+
+        # creates a thread pool with a single worker and a call that
+        # detaches its worker and then blocks until the event is set
+        thread_pool = colony.libs.pool_util.ThreadPool(1)
+        event = threading.Event()
+        def blocking():
+            thread_pool.detach()
+            event.wait()
+            return "blocking"
+        blocking_future = thread_pool.submit(blocking)
+
+        # verifies that another call is executed (by the replacement
+        # worker) while the detached call is still blocked
+        future = thread_pool.submit(sum, [1, 2])
+        self.assertEqual(future.result(5.0), 3)
+        self.assertEqual(blocking_future.done(), False)
+
+        # unblocks the detached call and verifies its result
+        # and that the pool still contains a single worker
+        event.set()
+        self.assertEqual(blocking_future.result(5.0), "blocking")
+        self.assertEqual(len(thread_pool.workers), 1)
+
+        # stops the thread pool
+        thread_pool.stop()
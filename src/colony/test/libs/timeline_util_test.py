@@ -0,0 +1,75 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Hive Colony Framework
+# Copyright (c) 2008-2012 Hive Solutions Lda.
+#
+# This file is part of Hive Colony Framework.
+#
+# Hive Colony Framework is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hive Colony Framework is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hive Colony Framework. If not, see <http://www.gnu.org/licenses/>.
+
+__author__ = "João Magalhães <joamag@hive.pt>"
+""" The author(s) of the module """
+
+__version__ = "1.0.0"
+""" The version of the module """
+
+__revision__ = "$LastChangedRevision$"
+""" The revision number of the module """
+
+__date__ = "$LastChangedDate$"
+""" The last change date of the module """
+
+__copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
+""" The copyright for the module """
+
+__license__ = "GNU General Public License (GPL), Version 3"
+""" The license for the module """
+
+import colony.libs.test_util
+import colony.libs.timeline_util
+
+class TimelineTest(colony.libs.test_util.ColonyTestCase):
+    """
+    Class that tests the timeline structure.
+    """
+
+    def test_get_trace(self):
+        """
+        Tests the get trace method of the timeline.
+        """
+
+        # creates a timeline and records a span with
+        # a nested (inner) span inside of it
+        timeline = colony.libs.timeline_util.Timeline()
+        outer_span = timeline.begin("outer", "load", {"plugin" : "first"})
+        inner_span = timeline.begin("inner", "load")
+        timeline.end(inner_span)
+        timeline.end(outer_span)
+
+        # retrieves the trace and the complete events from it
+        # verifying that both spans are recorded with the
+        # proper nesting depth and arguments
+        trace = timeline.get_trace()
+        events = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+        self.assertEqual([event["name"] for event in events], ["inner", "outer"])
+        self.assertEqual(events[0]["args"], {"depth" : 1})
+        self.assertEqual(events[1]["args"], {"plugin" : "first", "depth" : 0})
+        self.assertTrue(events[1]["dur"] >= events[0]["dur"])
+
+        # verifies that the thread running the
+        # spans is named in the metadata events
+        metadata_events = [event for event in trace["traceEvents"] if event["ph"] == "M"]
+        self.assertEqual(len(metadata_events), 1)
+        self.assertEqual(metadata_events[0]["tid"], events[0]["tid"])
@@ -65,7 +65,8 @@ USAGE = "Help:\n\
 --logger_dir[-g]=(LOGGER_DIR) - sets the logger directory to be used by the manager for the logger\n\
 --library_dir[-i]=(LIBRARY_DIR_1;LIBRARY_DIR_2;...) - sets the series of library directories to use\n\
 --plugin_dir[-p]=(PLUGIN_DIR_1;PLUGIN_DIR_2;...) - sets the series of plugin directories to use\r\
---execution_command[-e]=plugin_id:method [argument1 argument2 ...] - executes the given execution command at the end of loading"
+--execution_command[-e]=plugin_id:method [argument1 argument2 ...] - executes the given execution command at the end of loading\n\
+--profile[-x] - profiles the loading of the plugins (chrome trace written to the variable path)"
 """ The usage string for the command line arguments """
 
 BRANDING_TEXT = "Hive Colony %s (Hive Solutions Lda. r%s:%s %s)"
@@ -175,7 +176,7 @@ def print_information():
     # prints some help information
     print HELP_TEXT
 
-def run(manager_path, logger_path, library_path, meta_path, plugin_path, verbose = False, debug = False, silent = False, layout_mode = DEFAULT_STRING_VALUE, run_mode = DEFAULT_STRING_VALUE, stop_on_cycle_error = True, loop = False, threads = True, signals = True, container = DEFAULT_STRING_VALUE, prefix_paths = [], daemon_pid = None, daemon_file_path = None, execution_command = None, attributes_map = {}):
+def run(manager_path, logger_path, library_path, meta_path, plugin_path, verbose = False, debug = False, silent = False, layout_mode = DEFAULT_STRING_VALUE, run_mode = DEFAULT_STRING_VALUE, stop_on_cycle_error = True, loop = False, threads = True, signals = True, container = DEFAULT_STRING_VALUE, prefix_paths = [], daemon_pid = None, daemon_file_path = None, execution_command = None, attributes_map = {}, profile = False):
     """
     Starts the loading of the plugin manager.
 
@@ -219,6 +220,8 @@ def run(manager_path, logger_path, library_path, meta_path, plugin_path, verbose
     @param execution_command: The command to be executed by the plugin manager (script mode).
     @type attributes_map: Dictionary
     @param attributes_map: The name of the plugin manager container.
+    @type profile: bool
+    @param profile: If the loading of the plugins should be profiled.
     @rtype: int
     @return: The return code.
     """
@@ -279,6 +282,10 @@ def run(manager_path, logger_path, library_path, meta_path, plugin_path, verbose
     elif silent: plugin_manager.start_logger(logging.ERROR)
     else: plugin_manager.start_logger(logging.WARN)
 
+    # starts the load profiler in case the
+    # profiling of the loading is requested
+    if profile: plugin_manager.start_load_profiler()
+
     # starts and loads the plugin system
     return_code = plugin_manager.load_system()
 
@@ -293,7 +300,7 @@ def main():
     try:
         options, _args = getopt.getopt(
             sys.argv[1:],
-            "hvdsnl:r:c:o:a:f:d:m:g:i:t:p:e:",
+            "hvdsnxl:r:c:o:a:f:d:m:g:i:t:p:e:",
             [
                  "help",
                  "verbose",
@@ -312,7 +319,8 @@ def main():
                  "library_dir=",
                  "meta_dir=",
                  "plugin_dir=",
-                 "execution_command="
+                 "execution_command=",
+                 "profile"
             ]
         )
     except getopt.GetoptError, error:
@@ -348,6 +356,7 @@ def main():
     meta_path = None
     plugin_path = None
     execution_command = None
+    profile = False
 
     # iterates over all the options
     for option, value in options:
@@ -362,6 +371,8 @@ def main():
             silent = True
         elif option in ("-n", "--noloop"):
             loop = False
+        elif option in ("-x", "--profile"):
+            profile = True
         elif option in ("-l", "--layout_mode"):
             layout_mode = value
         elif option in ("-r", "--run_mode"):
@@ -435,7 +446,8 @@ def main():
         daemon_pid,
         daemon_file_path,
         execution_command,
-        attributes_map
+        attributes_map,
+        profile
     )
 
     # exits the process with return code
@@ -37,10 +37,14 @@ __copyright__ = "Copyright (c) 2008-2012 Hive Solutions Lda."
 __license__ = "GNU General Public License (GPL), Version 3"
 """ The license for the module """
 
+import gc
 import os
 import sys
 import glob
+import time
 import atexit
+import signal
+import socket
 import logging
 import warnings
 import traceback
@@ -55,6 +59,26 @@ DEFAULT_CONFIG_PATH = "config/python/devel.py"
 used in case no path is specified using the environment
 variable bases strategy """
 
+PREFORK_BACKLOG = 128
+""" The size of the backlog (pending connections queue)
+of the listening sockets shared by the pre-fork workers """
+
+PREFORK_GC_THRESHOLD = 100
+""" The threshold for the oldest generation of the garbage
+collector in the pre-fork workers, raised so that the (full)
+collections touching the objects inherited from the master
+process (breaking the copy on write sharing) are rare """
+
+PREFORK_RESPAWN_DELAY = 1.0
+""" The minimum lifetime (in seconds) of a pre-fork worker,
+a worker exiting before it is restarted only after this
+delay (avoids a busy restart loop for a broken worker) """
+
+PREFORK_RECYCLE_DELAY = 1.0
+""" The delay (in seconds) before a pre-fork worker that
+reached the maximum number of requests is recycled, gives
+time for the last response to be flushed """
+
 # retrieves the base path for the current file and uses
 # it to insert it in the current system path in case it's
 # not already present (required for module importing)
@@ -151,7 +175,28 @@ plugin_manager.start_logger(logging.INFO)
 return_code = plugin_manager.load_system()
 alias = None
 
+# the maximum number of requests to be handled by a pre-fork
+# worker before it's recycled (zero for unlimited) and the
+# number of requests handled by the current (worker) process
+max_requests = 0
+requests_count = 0
+
+# the flag controlling the supervision loop of the pre-fork
+# master process and the map associating the identifier of
+# the running worker processes with their start time
+prefork_running = False
+prefork_workers = {}
+
 def application(environ, start_response):
+    # counts the request in case there's a maximum number
+    # of requests to be handled by the (pre-fork) worker
+    max_requests and count_request()
+
+    # retrieves the metrics of the plugin manager (in case they're
+    # enabled) and the start time of the handling of the request
+    metrics = plugin_manager.metrics
+    start_time = time.time()
+
     try:
         # retrieves the currently set alias list, loading
         # it in case this is the first run, this value may
@@ -165,6 +210,10 @@ def application(environ, start_response):
         wsgi_plugin = plugin_manager.get_plugin("pt.hive.colony.plugins.wsgi")
         sequence = wsgi_plugin.handle(environ, start_response, prefix, alias)
     except:
+        # counts the error in the metrics
+        # (in case they're enabled)
+        metrics and metrics.increment("colony_wsgi_errors_total")
+
         # in case the run mode is development the exception should
         # be processed and a description sent to the output
         if run_mode == "development":
@@ -176,6 +225,10 @@ def application(environ, start_response):
         # by the upper levels
         raise
 
+    # records the latency of the handling of the request (the
+    # iteration over the sequence is not included)
+    metrics and metrics.observe("colony_wsgi_request_seconds", time.time() - start_time)
+
     # returns the sequence object that may be used by the caller
     # method to retrieve the contents of the message to be sent
     return sequence
@@ -206,6 +259,25 @@ def get_alias():
     # file, this value may be unsets in case there was an error
     return alias
 
+def count_request():
+    global requests_count
+
+    # increments the number of handled requests and in case
+    # the maximum has not been reached returns immediately
+    requests_count += 1
+    if not requests_count == max_requests: return
+
+    # schedules the graceful termination of the current worker
+    # (the master process is responsible for its replacement)
+    # after a small delay so that the response is flushed
+    timer = threading.Timer(
+        PREFORK_RECYCLE_DELAY,
+        os.kill,
+        (os.getpid(), signal.SIGTERM)
+    )
+    timer.daemon = True
+    timer.start()
+
 @atexit.register
 def unload_system():
     # unloads the plugin manager system releasing all
@@ -291,16 +363,208 @@ def serve_legacy(host, port):
     print >> sys.stderr, "Running on http://%s:%d/" % (host, port)
     httpd.serve_forever()
 
+def serve_prefork(server = "legacy", hosts = ("127.0.0.1",), ports = (8080,), workers = 2, requests = 0):
+    global max_requests
+    global prefork_running
+
+    # sets the maximum number of requests per worker, this value
+    # is inherited by the worker processes on fork
+    max_requests = requests
+
+    # creates the listening sockets in the master process, so
+    # that they are shared by all the worker processes
+    sockets = [create_socket(host, port) for host, port in zip(hosts, ports)]
+    for host, port in zip(hosts, ports):
+        print >> sys.stderr, "Running on http://%s:%d/ (%d workers)" % (host, port, workers)
+
+    # collects the garbage and disables the garbage collector in
+    # the master process (the plugin system is already loaded)
+    # so that the heap is "frozen" and the memory pages remain
+    # shared with the workers (copy on write)
+    gc.collect()
+    gc.disable()
+
+    # registers the handlers for the termination signals, that
+    # stop the supervision of the workers
+    signal.signal(signal.SIGTERM, stop_prefork)
+    signal.signal(signal.SIGINT, stop_prefork)
+    prefork_running = True
+
+    print >> sys.stderr, "Starting with '%s' (pre-fork) ..." % server
+
+    while prefork_running:
+        # starts worker processes until the requested number
+        # of workers is running
+        while len(prefork_workers) < workers:
+            pid = spawn_worker(server, sockets)
+            prefork_workers[pid] = time.time()
+
+        # waits for any of the worker processes to exit, the wait
+        # is interrupted by the (termination) signal handlers
+        try: pid, status = os.wait()
+        except OSError: continue
+
+        # removes the worker from the map of running workers, in
+        # case the master is stopping there's nothing more to be done
+        start_time = prefork_workers.pop(pid, None)
+        if start_time == None or not prefork_running: continue
+
+        # prints a message about the exit of the worker and in case
+        # it was short lived waits before restarting it
+        print >> sys.stderr, "Worker %d exited with status %d, restarting ..." % (pid, status)
+        if time.time() - start_time < PREFORK_RESPAWN_DELAY: time.sleep(PREFORK_RESPAWN_DELAY)
+
+    # sends the termination signal to the remaining workers
+    # (graceful stop) and waits for them to exit
+    for pid in prefork_workers:
+        try: os.kill(pid, signal.SIGTERM)
+        except OSError: pass
+    for pid in prefork_workers:
+        try: os.waitpid(pid, 0)
+        except OSError: pass
+    prefork_workers.clear()
+
+    # closes the listening sockets and re-enables the
+    # garbage collector in the master process
+    for _socket in sockets: _socket.close()
+    gc.enable()
+
+    print >> sys.stderr, "Stopped in '%s' (pre-fork) ..." % server
+
+def stop_prefork(signum, frame):
+    global prefork_running
+
+    # unsets the running flag so that the supervision
+    # loop of the master process is stopped
+    prefork_running = False
+
+def spawn_worker(server, sockets):
+    # forks the current (master) process, in case this is
+    # the master returns the identifier of the worker
+    pid = os.fork()
+    if pid: return pid
+
+    # runs the worker, this call never returns
+    # as the worker process exits at the end
+    run_worker(server, sockets)
+
+def run_worker(server, sockets):
+    # the worker process does not supervise any worker, the
+    # interrupt signal is ignored (handled by the master) and
+    # the termination signal stops the worker gracefully
+    prefork_workers.clear()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, exit_worker)
+
+    # re-enables the garbage collector with a raised threshold
+    # for the oldest generation, avoiding frequent full collections
+    # over the objects shared with the master process
+    threshold_0, threshold_1, _threshold_2 = gc.get_threshold()
+    gc.set_threshold(threshold_0, threshold_1, PREFORK_GC_THRESHOLD)
+    gc.enable()
+
+    # retrieves the method to be used to serve the shared
+    # sockets (defaulting to the legacy method)
+    _globals = globals()
+    method = _globals.get("serve_" + server + "_socket", serve_legacy_socket)
+
+    return_code = 0
+    try:
+        # serves the extra sockets in (daemon) threads and
+        # the first socket in the main thread
+        for _socket in sockets[1:]:
+            thread = threading.Thread(target = method, args = (_socket,))
+            thread.daemon = True
+            thread.start()
+        method(sockets[0])
+    except SystemExit:
+        pass
+    except:
+        traceback.print_exc(file = sys.stderr)
+        return_code = 1
+
+    # unloads the plugin system in the worker (releasing the
+    # worker resources) and exits the process without running
+    # the exit handlers inherited from the master process
+    try: unload_system()
+    except: traceback.print_exc(file = sys.stderr)
+    os._exit(return_code)
+
+def exit_worker(signum, frame):
+    # raises the exit exception in the main thread of
+    # the worker stopping the serving of requests
+    raise SystemExit(0)
+
+def create_socket(host, port):
+    # creates the listening socket, allowing the re-use of the
+    # address so that a restarted master binds immediately
+    _socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    _socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    _socket.bind((host, port))
+    _socket.listen(PREFORK_BACKLOG)
+    return _socket
+
+def serve_waitress_socket(_socket):
+    import waitress
+    waitress.serve(application, sockets = [_socket])
+
+def serve_tornado_socket(_socket):
+    import tornado.wsgi
+    import tornado.ioloop
+    import tornado.httpserver
+
+    container = tornado.wsgi.WSGIContainer(application)
+    server = tornado.httpserver.HTTPServer(container)
+    server.add_sockets([_socket])
+    instance = tornado.ioloop.IOLoop.instance()
+    instance.start()
+
+def serve_legacy_socket(_socket):
+    import wsgiref.simple_server
+
+    # creates the server without binding it and replaces
+    # its socket with the shared (listening) socket
+    host, port = _socket.getsockname()[:2]
+    httpd = wsgiref.simple_server.WSGIServer(
+        (host, port),
+        wsgiref.simple_server.WSGIRequestHandler,
+        False
+    )
+    httpd.socket.close()
+    httpd.socket = _socket
+    httpd.server_name = socket.getfqdn(host)
+    httpd.server_port = port
+    httpd.setup_environ()
+    httpd.set_app(application)
+
+    # handles requests until the maximum number of requests
+    # is reached (recycle) or forever in case there's no maximum
+    while not max_requests or requests_count < max_requests: httpd.handle_request()
+
 if __name__ == "__main__":
     server = os.environ.get("SERVER", "legacy")
     host = os.environ.get("HOST", "127.0.0.1")
     port = os.environ.get("PORT", "8080")
+    workers = int(os.environ.get("WORKERS", "0"))
+    requests = int(os.environ.get("MAX_REQUESTS", "0"))
 
     hosts = [value.strip() for value in host.split(",")]
     ports = [int(value.strip()) for value in port.split(",")]
 
-    serve_multiple(
-        server,
-        hosts,
-        ports
-    )
+    # in case a number of workers is defined the pre-fork mode
+    # is used (workers forked from the loaded master process)
+    # otherwise the servers are run in threads of this process
+    if workers:
+        serve_prefork(
+            server,
+            hosts,
+            ports,
+            workers,
+            requests
+        )
+    else:
+        serve_multiple(
+            server,
+            hosts,
+            ports
+        )